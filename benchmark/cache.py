@@ -0,0 +1,63 @@
+#!/usr/bin/env python2
+#
+# Cold and warm plots with the on-disk cache of pyxflow.Cache.  A synthetic
+# case (see synthetic.py) is plotted once with an empty cache, which reads the
+# solution and extracts the arrays, and then several more times from the
+# cache.  The median time of the warm plots is printed.
+#
+#   $ ./cache.py [n] [p] [r]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing and temporary files
+import time
+import shutil
+import tempfile
+# Use a non-interactive backend.
+import matplotlib
+matplotlib.use('Agg')
+# Python/XFlow interface
+from pyxflow.Cache import xf_Cache
+from pyxflow.Plot import plt
+# Case generator
+import synthetic
+
+
+# Plot and draw once; returns the time
+def plot(C, fxfa):
+    t0 = time.time()
+    h = C.Plot(fxfa, None)
+    h.figure.canvas.draw()
+    plt.close(h.figure)
+    return time.time() - t0
+
+
+# Method
+def main(argv):
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ cache.py"
+        print "  $ cache.py 256 3 5"
+        sys.exit(2)
+    n = int(argv[1]) if len(argv) > 1 else 128
+    p = int(argv[2]) if len(argv) > 2 else 2
+    r = int(argv[3]) if len(argv) > 3 else 5
+    # Test case and an empty cache
+    fxfa = synthetic.WriteCase('synthetic', 'tri', n, 1, p)
+    fdir = tempfile.mkdtemp()
+    C = xf_Cache(fdir)
+    t = plot(C, fxfa)
+    print "%-8s %10.4f s" % ("cold", t)
+    # A new cache object has no solution in memory.
+    T = sorted([plot(xf_Cache(fdir), fxfa) for i in range(r)])
+    print "%-8s %10.4f s" % ("warm", T[r/2])
+    print "%-8s %10.2f" % ("speedup", t / T[r/2])
+    shutil.rmtree(fdir)
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
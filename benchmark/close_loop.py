@@ -0,0 +1,89 @@
+#!/usr/bin/env python2
+#
+# Peak memory of a loop over many solutions.  Synthetic cases (see
+# synthetic.py) are read one after another, first by reassigning a variable
+# and then inside a ``with`` block.  When the variable is reassigned, the
+# previous xf_All is only freed after the next one has been read, so two files
+# are in memory at once; with close() the peak is set by one file.  The
+# resident set size after each file and the peak are printed in MB.
+#
+#   $ ./close_loop.py [n] [p] [m]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Peak memory
+import resource
+# Python/XFlow interface
+from pyxflow.All import xf_All
+# Case generator
+import synthetic
+
+
+# Current resident set size in MB
+def rss():
+    for line in open('/proc/self/status'):
+        if line.startswith('VmRSS:'):
+            return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+# Peak resident set size in MB
+def peak():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# Loop using reassignment
+def loop_plain(fnames):
+    R = []
+    for f in fnames:
+        All = xf_All(f)
+        All.Mesh.Coord.max()
+        R.append(rss())
+    del All
+    return R
+
+
+# Loop using close()
+def loop_close(fnames):
+    R = []
+    for f in fnames:
+        with xf_All(f) as All:
+            All.Mesh.Coord.max()
+        R.append(rss())
+    return R
+
+
+# Method
+def main(argv):
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ close_loop.py"
+        print "  $ close_loop.py 256 3 10"
+        sys.exit(2)
+    n = int(argv[1]) if len(argv) > 1 else 256
+    p = int(argv[2]) if len(argv) > 2 else 3
+    m = int(argv[3]) if len(argv) > 3 else 10
+    # Test cases of different sizes, largest first
+    fnames = [synthetic.WriteCase('synthetic', 'tri', n - 16*(i % 4), 1, p)
+        for i in range(m)]
+    print "%i files, baseline %.1f MB" % (m, rss())
+    # Memory of one file
+    r0 = rss()
+    All = xf_All(fnames[0])
+    r1 = rss() - r0
+    All.close()
+    print "%-10s %10.1f MB" % ("one file", r1)
+    # The loop with close() goes first so that the peak of the plain loop
+    # does not hide it.
+    for name, f in [('close', loop_close), ('plain', loop_plain)]:
+        R = f(fnames)
+        print "%-10s %10.1f MB after each file (max), peak %.1f MB" % (
+            name, max(R), peak())
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python2
+#
+# Compare two result files from suite.py, for example from two commits.  The
+# minimum time of each step is printed side by side for the cases found in
+# both files, along with the ratio new/old.  Ratios above the threshold are
+# flagged, and the exit status is 1 if any are.
+#
+#   $ ./compare.py old.json new.json [threshold]
+#
+
+# Module to import command-line arguments.
+import sys
+# Reading the results
+import json
+
+
+# Read a results file; returns the header and a dictionary of cases
+def read(fname):
+    f = open(fname)
+    R = json.load(f)
+    f.close()
+    C = {}
+    for c in R['cases']:
+        C[(c['shape'], c['n'], c['q'], c['p'])] = c['times']
+    return R, C
+
+
+# Method
+def main(argv):
+    # Input files needed
+    if len(argv) < 3:
+        print "Usage:"
+        print "  $ compare.py old.json new.json"
+        print "  $ compare.py old.json new.json 1.10"
+        sys.exit(2)
+    # Ratio considered a regression
+    tol = float(argv[3]) if len(argv) > 3 else 1.2
+    R0, C0 = read(argv[1])
+    R1, C1 = read(argv[2])
+    print "old: %s (%s)" % (R0.get('commit'), R0.get('date'))
+    print "new: %s (%s)" % (R1.get('commit'), R1.get('date'))
+    print ""
+    print "%-22s %-16s %10s %10s %7s" % (
+        "case", "step", "old (s)", "new (s)", "ratio")
+    # Status
+    ierr = 0
+    for key in sorted(C0):
+        if key not in C1:
+            continue
+        name = '%s_n%i_q%i_p%i' % key
+        for step in sorted(C0[key]):
+            if step not in C1[key]:
+                continue
+            t0 = C0[key][step]['min']
+            t1 = C1[key][step]['min']
+            ratio = t1 / t0 if t0 > 0 else float('inf')
+            flag = ''
+            if ratio > tol:
+                flag = ' *'
+                ierr = 1
+            print "%-22s %-16s %10.4f %10.4f %7.2f%s" % (
+                name, step, t0, t1, ratio, flag)
+    sys.exit(ierr)
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
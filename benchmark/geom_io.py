@@ -0,0 +1,93 @@
+#!/usr/bin/env python2
+#
+# Read and write times for .geom files using XFlow and the NumPy reader and
+# writer in pyxflow.Geom.  A triangulated panel surface with about 2*n^2
+# panels is written first; each reader and writer is then timed several times
+# and the median is printed.
+#
+#   $ ./geom_io.py [n] [r]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing and temporary files
+import os
+import time
+import tempfile
+# Used for more efficient data storage
+import numpy as np
+# Python/XFlow interface
+from pyxflow.Geom import xf_Geom, xf_GeomComp, xf_GeomCompPanel
+from pyxflow.Geom import ReadGeom, WriteGeom
+import pyxflow._pyxflow as px
+
+
+# Triangulated bump surface with n-by-n cells
+def surface(n):
+    t, s = np.mgrid[0:n+1, 0:n+1] / float(n)
+    z = 0.1*np.sin(np.pi*s)*np.sin(np.pi*t)
+    Coord = np.column_stack((s.ravel(), t.ravel(), z.ravel()))
+    J, I = np.mgrid[0:n, 0:n]
+    v = (J*(n+1) + I).ravel()
+    Panels = np.vstack((
+        np.column_stack((v, v+1, v+n+1)),
+        np.column_stack((v+1, v+n+2, v+n+1)))).astype(np.int32)
+    GC = xf_GeomComp(None)
+    GC.Name = 'Bump'
+    GC.BFGTitle = 'Bump'
+    GC.Type = 'Panel'
+    GC.Data = xf_GeomCompPanel(1, 3, 'TriLagrange', Coord.shape[0],
+        Panels.shape[0], Coord, Panels)
+    Geom = xf_Geom(Comp=[GC])
+    Geom.Dim = 3
+    return Geom
+
+
+# Median time of r calls
+def timeit(f, r):
+    T = []
+    for i in range(r):
+        t0 = time.time()
+        f()
+        T.append(time.time() - t0)
+    T.sort()
+    return T[r/2]
+
+
+# Method
+def main(argv):
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ geom_io.py"
+        print "  $ geom_io.py 500 5"
+        sys.exit(2)
+    n = int(argv[1]) if len(argv) > 1 else 300
+    r = int(argv[2]) if len(argv) > 2 else 5
+    # Write the test file.
+    fdir = tempfile.mkdtemp()
+    fname = os.path.join(fdir, 'bump.geom')
+    fout = os.path.join(fdir, 'out.geom')
+    WriteGeom(surface(n), fname)
+    print "%i panels, %.1f MB" % (2*n*n, os.path.getsize(fname)/1048576.0)
+    # Readers
+    tx = timeit(lambda: xf_Geom(fname), r)
+    tp = timeit(lambda: ReadGeom(fname), r)
+    print "%-8s %12s %12s %8s" % ("", "XFlow (s)", "NumPy (s)", "speedup")
+    print "%-8s %12.4f %12.4f %8.2f" % ("read", tx, tp, tx/tp)
+    # Writers
+    G = xf_Geom(fname)
+    tx = timeit(lambda: px.WriteGeomFile(G._ptr, fout), r)
+    G = ReadGeom(fname)
+    tp = timeit(lambda: WriteGeom(G, fout), r)
+    print "%-8s %12.4f %12.4f %8.2f" % ("write", tx, tp, tx/tp)
+    # Clean up.
+    os.remove(fname)
+    os.remove(fout)
+    os.rmdir(fdir)
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
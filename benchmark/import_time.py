@@ -0,0 +1,80 @@
+#!/usr/bin/env python2
+#
+# Import-time benchmark for pyxflow.  Each module is imported in a fresh
+# interpreter several times, and the median wall time is printed.  The core
+# modules must not load matplotlib, so the script exits with a nonzero status
+# if any of them does.
+#
+#   $ ./import_time.py [n]
+#
+
+# Module to import command-line arguments.
+import sys
+# Fresh interpreters for each import
+import subprocess as sp
+# Path to the pyxflow folder
+import os.path as op
+
+# Folder containing the pyxflow package
+topdir = op.dirname(op.dirname(op.realpath(__file__)))
+
+# Modules to import; the last one loads the plotting stack for comparison
+modules = [
+    ('pyxflow', False),
+    ('pyxflow.All', False),
+    ('pyxflow.Mesh', False),
+    ('pyxflow.DataSet', False),
+    ('pyxflow.Plot', False),
+    ('matplotlib.pyplot', True),
+]
+
+# Command run in each interpreter; prints time and whether matplotlib loaded
+code = """
+import sys, time
+sys.path.insert(0, %r)
+t0 = time.time()
+import %s
+t1 = time.time()
+print t1 - t0, int('matplotlib' in sys.modules)
+"""
+
+
+# Import a module in a new interpreter
+def import_time(name):
+    p = sp.Popen([sys.executable, '-c', code % (topdir, name)],
+        stdout=sp.PIPE)
+    out = p.communicate()[0].split()
+    if p.returncode != 0:
+        raise RuntimeError("Importing '%s' failed." % name)
+    return float(out[0]), bool(int(out[1]))
+
+
+# Method
+def main(argv):
+    # Number of repetitions
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ import_time.py"
+        print "  $ import_time.py 20"
+        sys.exit(2)
+    n = int(argv[1]) if len(argv) > 1 else 10
+    # Status
+    ierr = 0
+    print "%-20s %10s  %s" % ("module", "median (s)", "matplotlib")
+    for name, mpl in modules:
+        T = []
+        for i in range(n):
+            t, loaded = import_time(name)
+            T.append(t)
+        T.sort()
+        print "%-20s %10.4f  %s" % (name, T[n/2], loaded)
+        # Core modules must not load the plotting stack.
+        if loaded and not mpl:
+            print "  ERROR: '%s' imports matplotlib" % name
+            ierr = 1
+    sys.exit(ierr)
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python2
+#
+# Scaling test for the multi-file loader.  The same list of files is read
+# with an increasing number of worker processes, and the wall time and
+# speedup are printed for each.
+#
+#   $ ./load_many.py a.xfa b.xfa c.xfa ...
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing
+import time
+# Number of processors
+import multiprocessing
+# Python/XFlow interface
+from pyxflow.Load import LoadMany
+
+
+# Method
+def main(argv):
+    # Input files needed
+    if len(argv) < 2:
+        print "Usage:"
+        print "  $ load_many.py a.xfa b.xfa c.xfa ..."
+        sys.exit(2)
+    fnames = argv[1:]
+    # Numbers of processes to try
+    nCPU = multiprocessing.cpu_count()
+    nProc = [1]
+    while 2*nProc[-1] <= min(nCPU, len(fnames)):
+        nProc.append(2*nProc[-1])
+    # Loop through the numbers of processes.
+    print "%6s %10s %8s %10s" % ("nProc", "time (s)", "speedup", "MB")
+    for n in nProc:
+        t0 = time.time()
+        D = LoadMany(fnames, vectors=["ElemState"], nProc=n)
+        t = time.time() - t0
+        if n == 1:
+            t1 = t
+        # Total size of the arrays
+        nb = 0
+        for d in D:
+            for v in d.values():
+                if isinstance(v, list):
+                    nb += sum([a.nbytes for a in v])
+                else:
+                    nb += v.nbytes
+        print "%6i %10.3f %8.2f %10.1f" % (n, t, t1/t, nb/1048576.0)
+        del D
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python2
+#
+# Per-file open overhead.  Each file is opened and closed repeatedly, first
+# with no other solution open, so that its equation set library is loaded and
+# closed every time, and then while another solution with the same equation
+# set is held open, so that the library is reused.
+#
+#   $ ./open_files.py a.xfa [b.xfa ...] [-n 20]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing
+import time
+# Python/XFlow interface
+from pyxflow.All import xf_All
+import pyxflow._pyxflow as px
+
+
+# Time to open and close each file n times
+def open_time(fnames, n):
+    t0 = time.time()
+    for i in range(n):
+        for fname in fnames:
+            All = xf_All(fname)
+            del All
+    return (time.time() - t0) / (n * len(fnames))
+
+
+# Method
+def main(argv):
+    # Input files needed
+    if len(argv) < 2:
+        print "Usage:"
+        print "  $ open_files.py a.xfa [b.xfa ...] [-n 20]"
+        sys.exit(2)
+    # Number of repetitions
+    argv = argv[1:]
+    n = 20
+    if '-n' in argv:
+        i = argv.index('-n')
+        n = int(argv[i+1])
+        argv = argv[:i] + argv[i+2:]
+    fnames = argv
+    # Library loaded and closed for each file
+    t1 = open_time(fnames, n)
+    print "library closed between files: %8.2f ms per file" % (1000*t1)
+    # Library kept loaded by another solution
+    All = xf_All(fnames[0])
+    t2 = open_time(fnames, n)
+    print "library held open:            %8.2f ms per file" % (1000*t2)
+    print "equation set libraries:", px.EqnSetLibraries()
+    del All
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
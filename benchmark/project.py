@@ -0,0 +1,95 @@
+#!/usr/bin/env python2
+#
+# Closest-point projection benchmark.  Random points around a spline are
+# projected onto it using the bounding volume hierarchy in px.ProjectPoints,
+# and a subset is checked against a brute-force search over all of the
+# polyline segments.  The spline is a NACA 0012 airfoil with N points unless
+# a .geom file is given, in which case its first spline component is used.
+#
+#   $ ./project.py [n] [N] [in.geom]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing
+import time
+# Used for more efficient data storage
+import numpy as np
+# Python/XFlow interface
+from pyxflow.Geom import xf_Geom, xf_GeomCompSpline
+import pyxflow._pyxflow as px
+
+
+# NACA 0012 airfoil as a closed spline
+def naca(N):
+    b = np.linspace(0, np.pi, N/2 + 1)
+    x = 0.5*(1 - np.cos(b))
+    y = 0.6*(0.2969*np.sqrt(x) - 0.1260*x - 0.3516*x**2 + 0.2843*x**3
+        - 0.1036*x**4)
+    X = np.hstack((x[::-1], x[1:]))
+    Y = np.hstack((y[::-1], -y[1:]))
+    return xf_GeomCompSpline(3, len(X), X, Y)
+
+
+# Brute-force distance from each point to a set of segments
+def brute(P, X):
+    A = P[:-1]
+    B = P[1:]
+    AB = B - A
+    L2 = np.sum(AB**2, axis=1)
+    D = np.empty(X.shape[0])
+    for i, x in enumerate(X):
+        t = np.clip(np.sum((x - A)*AB, axis=1) / L2, 0.0, 1.0)
+        D[i] = np.sqrt(np.min(np.sum((A + t[:, None]*AB - x)**2, axis=1)))
+    return D
+
+
+# Method
+def main(argv):
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ project.py"
+        print "  $ project.py 1000000 2000"
+        print "  $ project.py 1000000 0 naca.geom"
+        sys.exit(2)
+    # Number of points and spline points
+    n = int(argv[1]) if len(argv) > 1 else 1000000
+    N = int(argv[2]) if len(argv) > 2 else 2000
+    # Get the spline.
+    if len(argv) > 3:
+        Geom = xf_Geom(argv[3])
+        GCS = [GC.Data for GC in Geom.Comp if GC.Type == 'Spline'][0]
+    else:
+        GCS = naca(N)
+    # Random points in a box around the spline
+    P = np.column_stack((GCS.X, GCS.Y))
+    lo = P.min(axis=0) - 0.2
+    hi = P.max(axis=0) + 0.2
+    X = lo + (hi - lo)*np.random.RandomState(0).rand(n, 2)
+    print "%i points, %i spline points" % (n, GCS.N)
+    # Polyline projection with the tree
+    S = np.column_stack((np.arange(GCS.N-1), np.arange(1, GCS.N)))
+    t0 = time.time()
+    Y, I, W, D = px.ProjectPoints(P, S, X)
+    t1 = time.time() - t0
+    print "%-24s %10.3f s" % ("ProjectPoints", t1)
+    # Full projection onto the spline
+    t0 = time.time()
+    GCS.Project(X)
+    t2 = time.time() - t0
+    print "%-24s %10.3f s" % ("xf_GeomCompSpline.Project", t2)
+    # Brute force on a subset
+    m = min(n, 2000)
+    t0 = time.time()
+    DB = brute(P, X[:m])
+    t3 = (time.time() - t0) * n / m
+    print "%-24s %10.3f s (estimated from %i points)" % ("brute force", t3, m)
+    print "%-24s %10.2f" % ("speedup", t3 / t1)
+    print "%-24s %10.2e" % ("max difference", np.max(np.abs(DB - D[:m])))
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
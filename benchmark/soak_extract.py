@@ -0,0 +1,75 @@
+#!/usr/bin/env python2
+#
+# Soak test for the plot data extractors.  Each extractor is called many
+# times on the same solution and the resident set size of the process is
+# printed as it goes; the arrays returned by the extractors own their memory,
+# so the RSS should stay flat.
+#
+#   $ ./soak_extract.py in.xfa [n] [scalar]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Memory page size
+import resource
+# Python/XFlow interface
+from pyxflow.All import xf_All
+from pyxflow.Plot import GetXLims
+import pyxflow._pyxflow as px
+
+
+# Current resident set size in MB
+def rss():
+    # Read the second field of the statm file (in pages).
+    f = open('/proc/self/statm')
+    n = int(f.read().split()[1])
+    f.close()
+    return n * resource.getpagesize() / 1048576.0
+
+
+# Method
+def main(argv):
+    # Input file needed
+    if len(argv) < 2:
+        print "Usage:"
+        print "  $ soak_extract.py in.xfa"
+        print "  $ soak_extract.py in.xfa 10000 Pressure"
+        sys.exit(2)
+    # Number of repetitions
+    n = int(argv[2]) if len(argv) > 2 else 10000
+    # Scalar to extract
+    scalar = argv[3] if len(argv) > 3 else None
+    # Read the solution.
+    All = xf_All(argv[1])
+    Mesh = All.Mesh
+    U = All.GetPrimalState().GetVector()
+    xmin, xmax = GetXLims(Mesh)
+    # Extraction functions
+    f = [
+        ('MeshPlotData', lambda: px.MeshPlotData(
+            Mesh._ptr, xmin, xmax, None)),
+        ('ScalarPlotData', lambda: px.ScalarPlotData(
+            U._ptr, Mesh._ptr, All.EqnSet._ptr, scalar, xmin, xmax, None)),
+    ]
+    if Mesh.nBFaceGroup > 0:
+        f.append(('BFaceScalarData', lambda: px.BFaceScalarData(
+            U._ptr, Mesh._ptr, All.EqnSet._ptr, 0, [scalar], None)))
+    # Loop through the extractors.
+    for name, fn in f:
+        # Warm up (basis tables, allocator pools, etc.).
+        for i in range(10):
+            fn()
+        r0 = rss()
+        print "%s:" % name
+        for i in range(n):
+            fn()
+            if (i+1) % (max(n/10, 1)) == 0:
+                print "  %6i  RSS = %8.2f MB" % (i+1, rss())
+        print "  growth over %i calls: %.2f MB" % (n, rss() - r0)
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
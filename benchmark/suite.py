@@ -0,0 +1,140 @@
+#!/usr/bin/env python2
+#
+# Benchmark suite for pyxflow.  Synthetic cases (see synthetic.py) are
+# generated for each combination of element shape, mesh size, geometry order,
+# and solution order, and the main steps of reading and plotting a solution
+# are timed for each.  The results are written to a JSON file that can be
+# compared with another run using compare.py.
+#
+#   $ ./suite.py [options]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing and output
+import time
+import json
+import platform
+import subprocess as sp
+import os.path as op
+# Use a non-interactive backend for the plotting steps.
+import matplotlib
+matplotlib.use('Agg')
+# Python/XFlow interface
+from pyxflow.All import xf_All
+from pyxflow.Mesh import xf_Mesh
+from pyxflow.Plot import GetXLims, plt
+import pyxflow._pyxflow as px
+# Case generator
+import synthetic
+
+# Default options
+opts = {
+    'shape': 'tri,quad',
+    'n': '16,64,256',
+    'q': '1,2',
+    'p': '1,3',
+    'r': '5',
+    'dir': 'synthetic',
+    'o': 'bench.json',
+}
+
+
+# Time a function; returns a summary of the times
+def timeit(f, r):
+    T = []
+    for i in range(r):
+        t0 = time.time()
+        f()
+        T.append(time.time() - t0)
+    T.sort()
+    return {'min': T[0], 'median': T[r/2], 'n': r}
+
+
+# Commit of the pyxflow tree, if any
+def commit():
+    topdir = op.dirname(op.dirname(op.realpath(__file__)))
+    try:
+        p = sp.Popen(['git', 'rev-parse', 'HEAD'], cwd=topdir,
+            stdout=sp.PIPE, stderr=sp.PIPE)
+        return p.communicate()[0].strip() or None
+    except OSError:
+        return None
+
+
+# Time the steps for one case
+def bench(fxfa, r):
+    # Times for each step
+    T = {}
+    T['ReadAllBinary'] = timeit(lambda: xf_All(fxfa), r)
+    T['ReadGriFile'] = timeit(lambda: xf_Mesh(fxfa[:-4] + '.gri'), r)
+    # Solution used for the other steps
+    All = xf_All(fxfa)
+    Mesh = All.Mesh
+    T['DataSet'] = timeit(
+        lambda: All.GetPrimalState().GetVector('ElemState'), r)
+    U = All.GetPrimalState().GetVector('ElemState')
+    xmin, xmax = GetXLims(Mesh)
+    T['MeshPlotData'] = timeit(
+        lambda: px.MeshPlotData(Mesh._ptr, xmin, xmax, None), r)
+    T['ScalarPlotData'] = timeit(
+        lambda: px.ScalarPlotData(U._ptr, Mesh._ptr, All.EqnSet._ptr, None,
+            xmin, xmax, None), r)
+    # Python-side plotting, including drawing the figure
+    def plot(**kwargs):
+        h = All.Plot(**kwargs)
+        h.figure.canvas.draw()
+        plt.close(h.figure)
+    T['PlotScalar'] = timeit(lambda: plot(mesh=False), r)
+    T['PlotMesh'] = timeit(lambda: plot(scalar=False), r)
+    # Size of the case
+    size = {'nNode': Mesh.nNode,
+        'nElem': sum([EG.nElem for EG in Mesh.ElemGroup])}
+    return size, T
+
+
+# Method
+def main(argv):
+    # Process the options.
+    k = 1
+    while k < len(argv):
+        key = argv[k].lstrip('-')
+        if key in ['h', 'help'] or key not in opts or k+1 == len(argv):
+            print "Usage:"
+            print "  $ suite.py [-shape tri,quad] [-n 16,64,256] [-q 1,2]"
+            print "        [-p 1,3] [-r 5] [-dir synthetic] [-o bench.json]"
+            sys.exit(2)
+        opts[key] = argv[k+1]
+        k += 2
+    r = int(opts['r'])
+    # Results
+    R = {
+        'commit': commit(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'repeat': r,
+        'cases': []
+    }
+    # Loop through the cases.
+    for shape in opts['shape'].split(','):
+        for n in [int(v) for v in opts['n'].split(',')]:
+            for q in [int(v) for v in opts['q'].split(',')]:
+                for p in [int(v) for v in opts['p'].split(',')]:
+                    fxfa = synthetic.WriteCase(opts['dir'], shape, n, q, p)
+                    size, T = bench(fxfa, r)
+                    R['cases'].append(dict(shape=shape, n=n, q=q, p=p,
+                        times=T, **size))
+                    print "%-24s %s" % (op.basename(fxfa)[:-4], ' '.join(
+                        ["%s=%.4f" % (s, T[s]['min']) for s in sorted(T)]))
+    # Write the results.
+    f = open(opts['o'], 'w')
+    json.dump(R, f, indent=1, sort_keys=True)
+    f.close()
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
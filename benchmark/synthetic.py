@@ -0,0 +1,206 @@
+#!/usr/bin/env python2
+#
+# Synthetic meshes and solutions for the benchmarks.  A structured mesh of
+# n-by-n cells (split into triangles or kept as quadrilaterals) is written to a
+# .gri file with geometry order q.  The nodes are placed by a smooth map of the
+# unit square, so elements with q > 1 are curved.  The mesh is then read with
+# a scalar equation set and interpolation order p, the state is set to a
+# manufactured solution at the Lagrange nodes, and the result is written to a
+# .xfa file.  The same inputs always produce the same files.
+#
+#   $ ./synthetic.py shape n q p [dir]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# File names
+import os
+# Used for more efficient data storage
+import numpy as np
+# Python/XFlow interface
+import pyxflow._pyxflow as px
+from pyxflow.DataSet import xf_VectorGroup
+
+# Amplitude of the node displacement
+a = 0.05
+
+# Equation set file
+eqn = """EqnSetLibrary = libScalar.so
+
+STARTBLOCK PARAM
+Viscosity = 1.0
+ENDBLOCK
+
+STARTBLOCK RESTERM
+nResTerm = 1
+TermType = Diffusion
+ENDBLOCK
+
+STARTBLOCK IC
+ICType = FullState
+Data = 0.0
+ENDBLOCK
+
+STARTBLOCK BC
+nBC = 4
+BFGTitle = Bottom
+BCType = FullState
+Data = 0.0
+BFGTitle = Right
+BCType = FullState
+Data = 0.0
+BFGTitle = Top
+BCType = FullState
+Data = 0.0
+BFGTitle = Left
+BCType = FullState
+Data = 0.0
+ENDBLOCK
+"""
+
+# Job file
+job = """Restart = False
+InputFile = %s.gri
+SavePrefix = %s
+EqnSetFile = %s.eqn
+InterpBasis = %s
+InterpOrder = %i
+SpaceScheme = HDG
+TimeScheme = Steady
+"""
+
+# Lagrange basis for each shape
+Basis = {'tri': 'TriLagrange', 'quad': 'QuadLagrange'}
+
+
+# Map from the unit square to the physical domain (keeps the boundary)
+def Map(s, t):
+    d = a * np.sin(np.pi*s) * np.sin(np.pi*t)
+    return s + d, t + d
+
+
+# Manufactured solution
+def Solution(x, y):
+    return np.sin(2*np.pi*x) * np.sin(2*np.pi*y) + x*x
+
+
+# Reference node indices of a Lagrange element of order p
+def RefNodes(shape, p):
+    if shape == 'tri':
+        return [(i, j) for j in range(p+1) for i in range(p+1-j)]
+    else:
+        return [(i, j) for j in range(p+1) for i in range(p+1)]
+
+
+# Lower-left corner (in cells) and orientation of each element
+def Cells(shape, n):
+    J, I = np.mgrid[0:n, 0:n]
+    I = I.ravel()
+    J = J.ravel()
+    if shape == 'quad':
+        return I, J, np.ones(n*n, dtype=int)
+    # Two triangles per cell; the second is rotated by 180 degrees.
+    I = np.repeat(I, 2)
+    J = np.repeat(J, 2)
+    R = np.tile([1, -1], n*n)
+    return I, J, R
+
+
+# Parametric coordinates of the order-p nodes of each element
+def ElemParams(shape, n, p):
+    I, J, R = Cells(shape, n)
+    ij = np.array(RefNodes(shape, p), dtype=float) / p
+    # Rotated triangles start from the upper-right corner.
+    s0 = (I + (R < 0))[:, None]
+    t0 = (J + (R < 0))[:, None]
+    s = (s0 + R[:, None]*ij[None, :, 0]) / float(n)
+    t = (t0 + R[:, None]*ij[None, :, 1]) / float(n)
+    return s, t
+
+
+# Write a .gri file
+def WriteGri(fname, shape, n, q):
+    # Nodes on a fine parametric grid
+    m = n*q + 1
+    t, s = np.mgrid[0:m, 0:m] / float(n*q)
+    x, y = Map(s.ravel(), t.ravel())
+    # Element nodes (1-based)
+    I, J, R = Cells(shape, n)
+    ij = np.array(RefNodes(shape, q))
+    base = (J + (R < 0)) * q * m + (I + (R < 0)) * q
+    Node = base[:, None] + R[:, None] * (ij[None, :, 1]*m + ij[None, :, 0])
+    Node += 1
+    # Boundary faces: (title, start nodes, end nodes)
+    k = np.arange(n) * q
+    BFG = [
+        ('Bottom', k, k + q),
+        ('Right', k*m + m-1, (k+q)*m + m-1),
+        ('Top', (m-1)*m + k + q, (m-1)*m + k),
+        ('Left', (k+q)*m, k*m)]
+    # Write the file.
+    f = open(fname, 'w')
+    f.write('%i %i 2\n' % (m*m, Node.shape[0]))
+    np.savetxt(f, np.c_[x, y], fmt='%.15e')
+    f.write('%i\n' % len(BFG))
+    for title, n0, n1 in BFG:
+        f.write('%i 2 %s\n' % (n, title))
+        np.savetxt(f, np.c_[n0, n1] + 1, fmt='%i')
+    f.write('%i %i %s\n' % (Node.shape[0], q, Basis[shape]))
+    np.savetxt(f, Node, fmt='%i')
+    f.close()
+
+
+# Write a mesh and solution; returns the name of the .xfa file
+def WriteCase(fdir, shape, n, q, p):
+    # Name of the case
+    name = '%s_n%i_q%i_p%i' % (shape, n, q, p)
+    fxfa = os.path.join(fdir, name + '.xfa')
+    if os.path.isfile(fxfa):
+        return fxfa
+    if not os.path.isdir(fdir):
+        os.makedirs(fdir)
+    # Write the inputs.
+    WriteGri(os.path.join(fdir, name + '.gri'), shape, n, q)
+    f = open(os.path.join(fdir, name + '.eqn'), 'w')
+    f.write(eqn)
+    f.close()
+    f = open(os.path.join(fdir, name + '.job'), 'w')
+    f.write(job % (name, name, name, Basis[shape], p))
+    f.close()
+    # The job refers to the other files by relative names.
+    cwd = os.getcwd()
+    os.chdir(fdir)
+    try:
+        ptr = px.ReadAllInputFile(name + '.job', True)
+    finally:
+        os.chdir(cwd)
+    try:
+        # Set the state to the manufactured solution.
+        U = xf_VectorGroup(px.GetPrimalState(ptr, 0)).GetVector('ElemState')
+        s, t = ElemParams(shape, n, p)
+        x, y = Map(s, t)
+        U.GenArray[0].rValue[:] = Solution(x, y)
+        px.WriteAllBinary(ptr, fxfa)
+    finally:
+        px.DestroyAll(ptr)
+    return fxfa
+
+
+# Method
+def main(argv):
+    # Inputs needed
+    if len(argv) < 5 or argv[1] not in Basis:
+        print "Usage:"
+        print "  $ synthetic.py tri 32 2 3"
+        print "  $ synthetic.py quad 64 1 2 cases/"
+        sys.exit(2)
+    # Folder for the files
+    fdir = argv[5] if len(argv) > 5 else 'synthetic'
+    print WriteCase(fdir, argv[1], int(argv[2]), int(argv[3]), int(argv[4]))
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
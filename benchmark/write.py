@@ -0,0 +1,83 @@
+#!/usr/bin/env python2
+#
+# Write times for .xfa files.  A synthetic case (see synthetic.py) is read,
+# its mesh nodes are moved, and the result is written with the XFlow writer,
+# with xf_All.Write from memory, and with xf_All.Write copying the unchanged
+# sections from the original file.  The median of several writes is printed.
+# Last, a file read with only one of its data entries is written back and
+# checked to still have all of them.
+#
+#   $ ./write.py [n] [p] [r]
+#
+
+# Module to import command-line arguments.
+import sys
+# Add the pyxflow folder.
+sys.path.append("..")
+# Timing and temporary files
+import os
+import time
+import tempfile
+# Python/XFlow interface
+from pyxflow.All import xf_All, IndexAll
+import pyxflow._pyxflow as px
+# Case generator
+import synthetic
+
+
+# Median time of r calls
+def timeit(f, r):
+    T = []
+    for i in range(r):
+        t0 = time.time()
+        f()
+        T.append(time.time() - t0)
+    T.sort()
+    return T[r/2]
+
+
+# Method
+def main(argv):
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
+        print "Usage:"
+        print "  $ write.py"
+        print "  $ write.py 512 3 5"
+        sys.exit(2)
+    n = int(argv[1]) if len(argv) > 1 else 256
+    p = int(argv[2]) if len(argv) > 2 else 3
+    r = int(argv[3]) if len(argv) > 3 else 5
+    # Test case
+    fxfa = synthetic.WriteCase('synthetic', 'tri', n, 1, p)
+    print "%s, %.1f MB" % (fxfa, os.path.getsize(fxfa)/1048576.0)
+    # Build the index before timing.
+    IndexAll(fxfa)
+    All = xf_All(fxfa)
+    All.Mesh.Coord[:, 1] *= 1.01
+    fout = os.path.join(tempfile.mkdtemp(), 'out.xfa')
+    # Writers
+    T = [
+        ('WriteAllBinary', lambda: px.WriteAllBinary(All._ptr, fout)),
+        ('Write', lambda: All.Write(fout)),
+        ('Write (copy)', lambda: All.Write(fout, changed=['Mesh']))]
+    for name, f in T:
+        print "%-16s %10.4f s" % (name, timeit(f, r))
+    # Round trip of a partial read
+    D = IndexAll(fxfa)['Data']
+    All = xf_All(fxfa, load=['Mesh', D[0][0]])
+    All.Write(fout)
+    # Read the whole file rather than trusting the saved index.
+    with xf_All(fout) as B:
+        ok = [d.Title for d in B.DataSet.Data] == [d[0] for d in D]
+    print "%-16s %12s" % ("partial", "ok" if ok else "FAILED")
+    if not ok:
+        sys.exit(1)
+    # Clean up.
+    os.remove(fout)
+    if os.path.isfile(fout + '.xfi'):
+        os.remove(fout + '.xfi')
+    os.rmdir(os.path.dirname(fout))
+
+
+# Check if run as a script.
+if __name__ == "__main__":
+    main(sys.argv)
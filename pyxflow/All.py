@@ -12,6 +12,11 @@ representation of XFlow *xf_All* structs.  Its primary contents are the
 
 # ------- Modules required -------
 
+# File status and the index cache
+import os
+import json
+# Used for more efficient data storage
+import numpy as np
 # The background pyxflow workhorse module
 from . import _pyxflow as px
 # Mesh
@@ -20,15 +25,92 @@ from pyxflow.Mesh import xf_Mesh
 from pyxflow.Geom import xf_Geom
 # DataSet
 from pyxflow.DataSet import xf_DataSet, xf_VectorGroup, xf_Vector
+# Base class with close() and context managers
+from pyxflow.Handle import xf_Handle
 # Plotting
 from pyxflow.Plot import xf_Plot
+# VTK output
+from pyxflow import VTK
+
+
+# Sections of a .xfa file, in the order of px.GetAllMembers
+Sections = ['Mesh', 'Geom', 'DataSet', 'Param', 'EqnSet']
+
+
+# Function to get the section index of a .xfa file
+def IndexAll(fname):
+    """
+    Get the byte offsets of the sections of an ``'.xfa'`` file.
+
+    The index is built by reading the file once and is then cached in
+    ``fname + '.xfi'``.  The cache is rebuilt if the size or modification time
+    of the file changes, and it is only kept in memory if the folder cannot be
+    written.
+
+    :Call:
+        >>> I = pyxflow.All.IndexAll(fname)
+
+    :Parameters:
+        *fname*: :class:`str`
+            Name of ``'.xfa'`` file
+
+    :Returns:
+        *I*: :class:`dict`
+            Index with the following keys
+
+            * ``'Size'``, ``'MTime'``: status of the indexed file
+            * ``'Sections'``: (start, end) of each section, by name
+            * ``'Data'``: list of (title, type, start, end) of each *xf_Data*
+              entry
+            * ``'DataHeader'``: bytes of the header of a data set with one
+              entry, or ``None`` if the entries cannot be read on their own
+    """
+    # Status of the file
+    st = os.stat(fname)
+    fidx = fname + '.xfi'
+    # Try the cached index.
+    try:
+        f = open(fidx)
+        I = json.load(f)
+        f.close()
+        if (I['Size'] == st.st_size and I['MTime'] == st.st_mtime
+                and 'DataHeader' in I):
+            return I
+    except (IOError, ValueError, KeyError, TypeError):
+        pass
+    # Read the file.
+    O, D, H = px.IndexAllBinary(fname)
+    if H is not None:
+        H = [ord(b) for b in H]
+    I = {
+        'Size': st.st_size,
+        'MTime': st.st_mtime,
+        'Sections': dict(zip(Sections, O)),
+        'Data': D,
+        'DataHeader': H
+    }
+    _SaveIndex(fname, I)
+    return I
+
+
+# Save an index beside the file if possible
+def _SaveIndex(fname, I):
+    fidx = fname + '.xfi'
+    ftmp = '%s.%i.tmp' % (fidx, os.getpid())
+    try:
+        f = open(ftmp, 'w')
+        json.dump(I, f, indent=1, sort_keys=True)
+        f.close()
+        os.rename(ftmp, fidx)
+    except (IOError, OSError):
+        pass
 
 
 class xf_Param:
     pass
 
 
-class xf_EqnSet:
+class xf_EqnSet(xf_Handle):
     """
     Interface to XFlow *xf_EqnSet*
     
@@ -52,7 +134,7 @@ class xf_EqnSet:
         self._ptr = ptr
 
 
-class xf_All:
+class xf_All(xf_Handle):
     """
     Interface to XFlow *xf_All*
     
@@ -60,13 +142,24 @@ class xf_All:
     solution.
     
     :Call:
-        >>> All = pyxflow.xf_All(fname, DefaultFlag=True)
+        >>> All = pyxflow.xf_All(fname, DefaultFlag=True, load=None,
+                mmap=False)
     
     :Parameters:
         *fname*: :class:`str`
             Name of file to read (usually ends in ``'.xfa'``)
         *DefaultFlag*: :class:`bool`
             Whether or not to use defaults internally
+        *load*: :class:`str` list
+            Sections (``'Mesh'``, ``'Geom'``, ``'DataSet'``, ``'Param'``,
+            ``'EqnSet'``) and *xf_Data* titles to read.  The default reads
+            the whole file.  Other sections are skipped using the index from
+            :func:`pyxflow.All.IndexAll` and their members are ``None``.  The
+            mesh is always read.  Data titles are read on their own, and the
+            other *xf_Data* are skipped as well.
+        *mmap*: :class:`bool`
+            Whether or not to map the real values of the data set from a
+            cache file (see :func:`pyxflow.DataSet.MapDataSet`)
     
     :Data members:
         *All._ptr*: :class:`int`
@@ -88,17 +181,45 @@ class xf_All:
             ...
             >>> All.Mesh
             <pyxflow.Mesh.xf_Mesh instance at ...>
+        
+        Only the mesh and the state are read from disk in this example.
+        
+            >>> All = xf_All("naca_Adapt.xfa", load=['Mesh', 'State'])
+            >>> All.Geom is None
+            True
+        
+        The memory is freed at the end of a ``with`` block (or by
+        :func:`close`) instead of whenever the instance is garbage-collected.
+        The members are closed along with it.
+        
+            >>> with xf_All("naca_Adapt.xfa") as All:
+            ...     X = All.Mesh.Coord.copy()
+            >>> All.Mesh
+            ValueError: xf_All has been closed
     
     """
     
     # Initialization method
-    def __init__(self, fname, DefaultFlag=True):
+    def __init__(self, fname, DefaultFlag=True, load=None, mmap=False):
         """
         Initialization method for :class:`pyxflow.All.xf_All`
         """
 
+        # The xf_All is freed by close().
+        self.owner = True
+
+        # Remember the source for copying unchanged sections.
+        st = os.stat(fname)
+        self._fname = fname
+        self._stamp = (st.st_size, st.st_mtime)
+
         # Create an xf_All instance in memory
-        self._ptr = px.ReadAllBinary(fname, DefaultFlag)
+        if load is None:
+            self._ptr = px.ReadAllBinary(fname, DefaultFlag)
+            self.Loaded = list(Sections)
+            self._Partial = False
+        else:
+            self._ptr = self._ReadSections(fname, DefaultFlag, load)
 
         # Get pointers to all members
         (Mesh_ptr, Geom_ptr, DataSet_ptr, Param_ptr,
@@ -106,36 +227,271 @@ class xf_All:
 
         # Shadow the members inside this class
         self.Mesh = xf_Mesh(ptr=Mesh_ptr)
-        self.Geom = xf_Geom(ptr=Geom_ptr)
-        self.EqnSet = xf_EqnSet(EqnSet_ptr)
-        self.DataSet = xf_DataSet(ptr=DataSet_ptr)
+        self.Geom = None
+        self.EqnSet = None
+        self.DataSet = None
+        if 'Geom' in self.Loaded:
+            self.Geom = xf_Geom(ptr=Geom_ptr)
+        if 'EqnSet' in self.Loaded:
+            self.EqnSet = xf_EqnSet(EqnSet_ptr)
+        if 'DataSet' in self.Loaded:
+            self.DataSet = xf_DataSet(ptr=DataSet_ptr, fname=fname,
+                mmap=mmap)
+
+    # Partial read using the index
+    def _ReadSections(self, fname, DefaultFlag, load):
+        """
+        Read the requested sections of a file; returns the pointer
+        """
+        # Get the index.
+        I = IndexAll(fname)
+        titles = [D[0] for D in I['Data']]
+        # Split the request into sections and data titles.
+        data = []
+        for k in load:
+            if k in Sections:
+                continue
+            elif k not in titles:
+                raise KeyError("File '%s' has no section or data '%s'"
+                    % (fname, k))
+            data.append(str(k))
+        # Sections to read
+        self.Loaded = [k for k in Sections
+            if k == 'Mesh' or k in load or (k == 'DataSet' and data)]
+        # Keep all of the data if the whole data set was requested.
+        if 'DataSet' in load:
+            data = None
+        # A data set filtered by title cannot replace the one in the file.
+        self._Partial = data is not None
+        # Start of each section
+        O = [I['Sections'][k][0] for k in Sections]
+        L = [k in self.Loaded for k in Sections]
+        # Read only the requested data entries if they were indexed.
+        if data is None or I['DataHeader'] is None:
+            return px.ReadAllSections(fname, DefaultFlag, O, L, data)
+        E = [(D[2], D[3]) for D in I['Data'] if D[0] in data]
+        H = ''.join([chr(b) for b in I['DataHeader']])
+        return px.ReadAllSections(fname, DefaultFlag, O, L, data, E, H)
 
     # xf_All destructor
-    def __del__(self):
+    def _Destroy(self):
         """
         Deletion method for :class:`pyxflow.All.xf_All`
         """
         px.DestroyAll(self._ptr)
         
     # Method to write the xf_All back to file (after changes?)
-    def Write(self, fname):
+    def Write(self, fname, changed=None, data=None):
         """
         Write *xf_All* back to file.
         
+        The file is written under a temporary name in the same folder and
+        renamed when it is complete, so other processes never see part of it.
+        Sections that were not read (see the *load* keyword of
+        :class:`pyxflow.All.xf_All`) and sections that are not listed in
+        *changed* are copied byte for byte from the original file.  If only
+        some of the *xf_Data* entries were read, the data set is also copied
+        from the original file unless *data* is given, so the entries that
+        were not read are never lost.
+        
         :Call:
-            >>> All.Write(fname)
+            >>> All.Write(fname, changed=None, data=None)
         
         :Parameters:
             *All*: :class:`pyxflow.All.xf_All`
                 Instance of pyXFlow *xf_All* representation
             *fname*: :class:`str`
                 Name of file to create
+            *changed*: :class:`str` list
+                Sections that have changed since the file was read; the
+                default writes every section that was read from memory
+                except a data set that was only read in part
+            *data*: :class:`str` list
+                Titles of the *xf_Data* entries to write; default is all
         
         :Returns:
             ``None``
-        """
+        
+        :Examples:
+            Move the mesh and save it without rewriting the solution.
             
+                >>> All = xf_All("naca_Adapt.xfa")
+                >>> All.Mesh.Coord[:, 1] *= 1.1
+                >>> All.Write("naca_Thick.xfa", changed=['Mesh'])
+        """
+        # Sections copied from the source file
+        copy = [k not in self.Loaded or
+            (changed is not None and k not in changed) for k in Sections]
+        # A data set that was read in part is copied unless the entries to
+        # write are given.
+        iD = Sections.index('DataSet')
+        if self._Partial and data is None:
+            if changed is not None and 'DataSet' in changed:
+                raise ValueError("Only part of the data set was read from "
+                    + "'%s'; give the titles to write with data=" % self._fname)
+            copy[iD] = True
+        # A subset of the data must be written from memory.
+        if data is not None:
+            if 'DataSet' not in self.Loaded:
+                raise ValueError("The data set was not read from '%s'"
+                    % self._fname)
+            titles = [D.Title for D in self.DataSet.Data]
+            for t in data:
+                if t not in titles:
+                    raise KeyError("All has no data '%s'" % t)
+            data = [str(t) for t in data]
+            copy[iD] = False
+        # Offsets of the sections in the source file
+        if any(copy):
+            st = os.stat(self._fname)
+            if (st.st_size, st.st_mtime) != self._stamp:
+                raise IOError("File '%s' has changed since it was read"
+                    % self._fname)
+            I = IndexAll(self._fname)
+            src = self._fname
+            O = [tuple(I['Sections'][k]) for k in Sections]
+        else:
+            src = None
+            O = None
+        # Write to a temporary file and move it into place.
+        ftmp = '%s.%i.tmp' % (fname, os.getpid())
+        try:
+            O, E, H = px.WriteAllSections(self._ptr, ftmp, src, O, copy,
+                data)
+            os.rename(ftmp, fname)
+        except:
+            if os.path.isfile(ftmp):
+                os.remove(ftmp)
+            raise
+        # Entries of the new data set
+        if copy[iD]:
+            # Copied entries move with the start of the data set.
+            s = O[iD][0] - I['Sections']['DataSet'][0]
+            D = [(d[0], d[1], d[2] + s, d[3] + s) if d[2] is not None
+                else tuple(d) for d in I['Data']]
+            H = I['DataHeader']
+        else:
+            D = [(d.Title, d.Type) for d in self.DataSet.Data
+                if data is None or d.Title in data]
+            if E is None:
+                D = [d + (None, None) for d in D]
+            else:
+                D = [d + tuple(e) for d, e in zip(D, E)]
+                H = [ord(b) for b in H]
+        # Save the index of the new file so that it is never read to find it.
+        st = os.stat(fname)
+        _SaveIndex(fname, {
+            'Size': st.st_size,
+            'MTime': st.st_mtime,
+            'Sections': dict(zip(Sections, O)),
+            'Data': D,
+            'DataHeader': H
+        })
+        # The new file has everything that is in memory unless data was left
+        # out, so later writes can copy from it.
+        if data is None:
+            self._fname = fname
+            self._stamp = (st.st_size, st.st_mtime)
+
+
+    # Method to write the solution for ParaView
+    def WriteVTU(self, fname, scalars=None, **kwargs):
+        """
+        Write the subdivided solution to a binary VTK unstructured grid file.
+        
+        :Call:
+            >>> All.WriteVTU(fname, scalars=None, **kwargs)
+        
+        :Parameters:
+            *All*: :class:`pyxflow.All.xf_All`
+                Instance of pyXFlow *xf_All* representation
+            *fname*: :class:`str`
+                Name of file to create
+            *scalars*: :class:`str` list
+                Names of equation set scalars to write
+        
+        :Returns:
+            ``None``
+        
+        :See also:
+            :func:`pyxflow.VTK.WriteVTU` for the kwargs
+        """
+        VTK.WriteVTU(self, fname, scalars, **kwargs)
+
+    # Method to check that the boundary lies on the geometry
+    def CheckGeomConformity(self, tol=1e-8, order=None, **kwargs):
+        """
+        Check that the boundary nodes lie on the geometry components.
+
+        Each boundary face group with a geometry component of the same
+        *BFGTitle* is subdivided, and the sub-nodes, which by default are the
+        Lagrange nodes of each face including the high-order nodes of curved
+        faces, are projected onto the component in one batch.  Only the mesh
+        and geometry are needed.
+
+        :Call:
+            >>> R = All.CheckGeomConformity(tol=1e-8, order=None, **kwargs)
+
+        :Parameters:
+            *All*: :class:`pyxflow.All.xf_All`
+                Instance of pyXFlow *xf_All* representation
+            *tol*: :class:`float`
+                Largest allowed distance from a node to the geometry
+            *order*: :class:`int`
+                Face subdivision order; default is the geometry order
+                *QOrder* of the element next to each face.  Higher orders
+                also check points between the nodes, which are only on the
+                component if the geometry is represented exactly.
+
+        :Returns:
+            *R*: :class:`dict`
+                Results for each checked boundary face group, by title.  Each
+                entry is a :class:`dict` with the following keys.
 
+                * ``'Comp'``: name of the geometry component
+                * ``'nNode'``: number of sub-nodes checked
+                * ``'Max'``: largest distance to the component
+                * ``'RMS'``: root-mean-square distance
+                * ``'Faces'``: indices of faces with a distance above *tol*
+
+        :Kwargs:
+            *nThread*: :class:`int`
+                Number of threads for the projection
+
+        :Examples:
+            Check an adapted airfoil mesh.
+
+                >>> R = All.CheckGeomConformity(tol=1e-6)
+                >>> R['Airfoil']['Max'], R['Airfoil']['Faces']
+                (3.1e-07, array([], dtype=int64))
+        """
+        # Order 0 gives the nodes of each face.
+        if order is None:
+            order = 0
+        # Results
+        R = {}
+        for i, BFG in enumerate(self.Mesh.BFaceGroup):
+            # Find the geometry component.
+            GC = [G for G in self.Geom.Comp if G.BFGTitle == BFG.Title]
+            if len(GC) == 0 or GC[0].Data is None or BFG.nBFace == 0:
+                continue
+            GC = GC[0]
+            # Face sub-nodes
+            X, S, C = px.BFaceScalarData(0, self.Mesh._ptr, 0, i, [],
+                order)
+            # Distance to the component
+            D = self.Geom.Project(X, GC.i, **kwargs)[2]
+            # Largest distance on each face
+            F = np.maximum.reduceat(D, C[:-1])
+            R[BFG.Title] = {
+                'Comp': GC.Name,
+                'nNode': len(D),
+                'Max': D.max(),
+                'RMS': np.sqrt(np.mean(D**2)),
+                'Faces': np.nonzero(F > tol)[0]
+            }
+        return R
+        
     # Method to find the primal state automatically
     def GetPrimalState(self, TimeIndex=0):
         """
@@ -155,7 +511,7 @@ class xf_All:
                 Vector group for the primal state
         """
         ptr = px.GetPrimalState(self._ptr, TimeIndex)
-        return xf_VectorGroup(ptr)
+        return self._Adopt(xf_VectorGroup(ptr))
         
         
     # Method to find a vector group by name
@@ -216,6 +572,9 @@ class xf_All:
                 The default value is ``'ElemState'``.
             *order*: :class:`int`
                 Interpolation order for mesh faces
+            *contour*: :class:`int` or :class:`float` list
+                Number of contour levels or list of levels to draw on top of
+                the scalar plot
             *vgroup*: :class:`pyxflow.DataSet.xf_VectorGroup`
                 Vector group to use for plot
                 
@@ -270,7 +629,68 @@ class xf_All:
         if scalar is not False and UG is not None:
             kwargs["scalar"] = scalar
             kwargs["Plot"] = UG.Plot(self.Mesh, self.EqnSet, **kwargs)
+        # Plot the contours.
+        if kwargs.get("contour") is not None and UG is not None:
+            U = UG.GetVector(kwargs.get("role", "ElemState"))
+            kwargs["Plot"] = U.Contour(self.Mesh, self.EqnSet,
+                levels=kwargs.pop("contour"), **kwargs)
         # Return the plot handle.
         return kwargs["Plot"]
+        
+    # Animation method
+    def Animate(self, scalar=None, TimeIndex=None, fname=None, **kwargs):
+        """
+        Animate a scalar through the time history of the primal state
+        
+        :Call:
+            >>> Plot = All.Animate(scalar=None, TimeIndex=None, fname=None,
+                **kwargs)
+        
+        :Parameters:
+            *All*: :class:`pyxflow.All.xf_All`
+                Instance of the pyXFlow *xf_All* interface
+            *scalar*: :class:`str`
+                Name of scalar to plot
+            *TimeIndex*: :class:`int` list
+                List of time indices to animate
+            *fname*: :class:`str`
+                Name of movie file or pattern for numbered images
+        
+        :Returns:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                pyXFlow plot instance with mesh and scalar handles
+        
+        :Kwargs:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Instance of plot class (plot handle)
+            *role*: :class:`str`
+                Identifier for the vector to use for plot
+                The default value is ``'ElemState'``.
+            *mesh*: :class:`bool`
+                Whether or not to plot the mesh (once) under the scalar
+            
+            See also kwargs for :func:`pyxflow.Plot.xf_Plot.Animate`
+        """
+        # Process the plot handle.
+        Plot = kwargs.pop("Plot", None)
+        if Plot is None:
+            Plot = xf_Plot()
+        elif not isinstance(Plot, xf_Plot):
+            raise IOError("Plot handle must be instance of " +
+                "pyxflow.Plot.xf_Plot")
+        # Default time indices
+        if TimeIndex is None:
+            raise IOError("List of time indices must be specified.")
+        # Vector for each frame
+        role = kwargs.get("role", "ElemState")
+        frames = [self.GetPrimalState(i).GetVector(role) for i in TimeIndex]
+        # Plot the mesh.
+        if kwargs.get("mesh", False) is True:
+            Plot = self.Mesh.Plot(Plot=Plot, **kwargs)
+        # Animate.
+        Plot.Animate(self.Mesh, self.EqnSet, frames, scalar=scalar,
+            fname=fname, **kwargs)
+        # Return the plot handle.
+        return Plot
 
 
@@ -0,0 +1,492 @@
+"""
+The *Cache* module keeps the arrays extracted from XFlow solutions on disk so
+that they can be reused by later processes and sessions.
+
+Each result is stored under a key made from the identity of the source file
+(its size and modification time, or a hash of its contents) and the inputs of
+the extraction, such as the scalar name, plot window, and order.  The arrays
+are saved as uncompressed ``.npy`` files and read back as read-only memory
+maps, so a cached plot never touches libXF and never reads more of the cache
+than it uses.  When the cache grows beyond its size limit, the
+least-recently used results are removed.
+"""
+
+# ------- Modules required -------
+# Used for more efficient data storage
+import numpy as np
+# File names, keys, and entry metadata
+import os
+import json
+import shutil
+import hashlib
+# The background pyxflow workhorse module
+import pyxflow._pyxflow as px
+# Solutions are only read when something is missing.
+from pyxflow.All import xf_All
+from pyxflow.Plot import xf_Plot, GetXLims, plt
+# Optional performance counters
+from pyxflow import perf
+
+# Version of the cache layout; part of each key
+Version = 1
+
+
+# ------- Class for the cache -------
+class xf_Cache:
+    """
+    On-disk cache of extracted plot data and scalar values
+
+    :Call:
+        >>> C = xf_Cache(path=None, maxbytes=4294967296, key='mtime')
+
+    :Parameters:
+        *path*: :class:`str`
+            Folder for the cache; default is ``$PYXFLOW_CACHE`` or
+            ``~/.cache/pyxflow``
+        *maxbytes*: :class:`int`
+            Maximum total size of the cached arrays
+        *key*: ``'mtime'`` | ``'hash'``
+            Identify source files by path, size, and modification time, or by
+            a hash of their contents, which survives copies and renames
+
+    :Data members:
+        *C.path*: :class:`str`
+            Folder for the cache
+        *C.hits*: :class:`int`
+            Number of results read from the cache
+        *C.misses*: :class:`int`
+            Number of results extracted by libXF
+
+    :Examples:
+        Plot the pressure on an airfoil; the second call reads nothing but the
+        cached arrays.
+
+            >>> C = xf_Cache()
+            >>> h = C.Plot("naca_Adapt.xfa", "Pressure", xlim=[-0.5, 1.5])
+            >>> h = C.Plot("naca_Adapt.xfa", "Pressure", xlim=[-0.5, 1.5])
+            >>> C.hits, C.misses
+            (3, 3)
+    """
+
+    # Initialization method
+    def __init__(self, path=None, maxbytes=4294967296, key='mtime'):
+        """
+        Initialization method for :class:`pyxflow.Cache.xf_Cache`
+        """
+        # Default folder
+        if path is None:
+            path = os.environ.get('PYXFLOW_CACHE',
+                os.path.join(os.path.expanduser('~'), '.cache', 'pyxflow'))
+        if key not in ['mtime', 'hash']:
+            raise ValueError("Unknown key type '%s'" % key)
+        # Options
+        self.path = path
+        self.maxbytes = maxbytes
+        self.key = key
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        # Hashes of file contents by (path, size, mtime)
+        self._hash = {}
+        # Last solution read, kept for the next miss on the same file
+        self._all = None
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    # Method to empty the cache
+    def Clear(self):
+        """
+        Remove all results from the cache
+
+        :Call:
+            >>> C.Clear()
+        """
+        for d in os.listdir(self.path):
+            if len(d) == 2:
+                shutil.rmtree(os.path.join(self.path, d), ignore_errors=True)
+        self._all = None
+
+    # Identity of a source file
+    def FileKey(self, fname):
+        """
+        Get the part of the keys that identifies a source file
+
+        :Call:
+            >>> k = C.FileKey(fname)
+
+        :Parameters:
+            *fname*: :class:`str`
+                Name of ``.xfa`` file
+
+        :Returns:
+            *k*: :class:`str`
+                Path, size, and modification time, or hash of the contents
+        """
+        fname = os.path.realpath(fname)
+        st = os.stat(fname)
+        stamp = '%s:%i:%r' % (fname, st.st_size, st.st_mtime)
+        if self.key == 'mtime':
+            return stamp
+        # Hash each version of a file only once.
+        if stamp not in self._hash:
+            h = hashlib.sha1()
+            f = open(fname, 'rb')
+            for b in iter(lambda: f.read(1 << 22), b''):
+                h.update(b)
+            f.close()
+            self._hash[stamp] = h.hexdigest()
+        return self._hash[stamp]
+
+    # Key for one result
+    def Key(self, fname, name, **params):
+        """
+        Get the key of an extraction from a file
+
+        :Call:
+            >>> key = C.Key(fname, name, **params)
+
+        :Parameters:
+            *fname*: :class:`str`
+                Name of ``.xfa`` file
+            *name*: :class:`str`
+                Name of the extraction
+            *params*: :class:`dict`
+                Inputs of the extraction; lists and arrays are compared by
+                value
+
+        :Returns:
+            *key*: :class:`str`
+                Hexadecimal key
+        """
+        # Plain values so that equal inputs give the same text
+        P = {}
+        for k, v in params.items():
+            if isinstance(v, (list, tuple, np.ndarray)):
+                v = [float(x) for x in np.ravel(v)]
+            elif isinstance(v, (np.floating, np.integer)):
+                v = v.item()
+            P[k] = v
+        txt = json.dumps([Version, self.FileKey(fname), name, P],
+            sort_keys=True)
+        return hashlib.sha1(txt.encode('utf-8')).hexdigest()
+
+    # Folder of an entry
+    def _Dir(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    # Read a result
+    def Get(self, key):
+        """
+        Read a result from the cache
+
+        :Call:
+            >>> D = C.Get(key)
+
+        :Parameters:
+            *key*: :class:`str`
+                Key from :func:`Key`
+
+        :Returns:
+            *D*: :class:`tuple` or ``None``
+                Read-only memory maps of the arrays (``None`` for outputs
+                that were ``None``), or ``None`` if the result is not cached
+        """
+        fdir = self._Dir(key)
+        try:
+            f = open(os.path.join(fdir, 'meta.json'))
+            meta = json.load(f)
+            f.close()
+            D = tuple([None if m is None else
+                np.load(os.path.join(fdir, m), mmap_mode='r') for m in meta])
+            # Mark it as recently used.
+            os.utime(fdir, None)
+        except (IOError, OSError, ValueError):
+            return None
+        return D
+
+    # Save a result
+    def Put(self, key, D):
+        """
+        Save a result in the cache
+
+        The entry is written to a temporary folder and renamed, so other
+        processes never see part of it.  Old entries are then evicted.
+
+        :Call:
+            >>> C.Put(key, D)
+
+        :Parameters:
+            *key*: :class:`str`
+                Key from :func:`Key`
+            *D*: :class:`tuple` of :class:`numpy.ndarray`
+                Arrays to save; entries may be ``None``
+        """
+        fdir = self._Dir(key)
+        ftmp = '%s.%i.tmp' % (fdir, os.getpid())
+        if not os.path.isdir(os.path.dirname(fdir)):
+            try:
+                os.makedirs(os.path.dirname(fdir))
+            except OSError:
+                pass
+        if os.path.isdir(ftmp):
+            shutil.rmtree(ftmp)
+        os.mkdir(ftmp)
+        meta = []
+        for i, v in enumerate(D):
+            if v is None:
+                meta.append(None)
+                continue
+            np.save(os.path.join(ftmp, '%i.npy' % i), np.asarray(v))
+            meta.append('%i.npy' % i)
+        f = open(os.path.join(ftmp, 'meta.json'), 'w')
+        json.dump(meta, f)
+        f.close()
+        try:
+            os.rename(ftmp, fdir)
+        except OSError:
+            # Another process saved the same result first.
+            shutil.rmtree(ftmp, ignore_errors=True)
+        self.Evict()
+
+    # Remove the oldest entries
+    def Evict(self):
+        """
+        Remove least-recently used results until the cache fits *maxbytes*
+
+        :Call:
+            >>> nbytes = C.Evict()
+
+        :Returns:
+            *nbytes*: :class:`int`
+                Total size of the remaining results
+        """
+        # (last use, size, folder) of each entry
+        E = []
+        for d in os.listdir(self.path):
+            if len(d) != 2:
+                continue
+            for k in os.listdir(os.path.join(self.path, d)):
+                if k.endswith('.tmp'):
+                    continue
+                fdir = os.path.join(self.path, d, k)
+                try:
+                    n = sum([os.path.getsize(os.path.join(fdir, f))
+                        for f in os.listdir(fdir)])
+                    E.append((os.path.getmtime(fdir), n, fdir))
+                except OSError:
+                    pass
+        E.sort()
+        nbytes = sum([e[1] for e in E])
+        for t, n, fdir in E:
+            if nbytes <= self.maxbytes:
+                break
+            shutil.rmtree(fdir, ignore_errors=True)
+            nbytes -= n
+        return nbytes
+
+    # Read the solution on a miss
+    def _All(self, fname):
+        k = self.FileKey(fname)
+        if self._all is None or self._all[0] != k:
+            # Free the previous solution first.
+            self._all = None
+            self._all = (k, xf_All(fname))
+        return self._all[1]
+
+    # Generic cached extraction
+    def Fetch(self, fname, name, extract, **params):
+        """
+        Get a result from the cache or extract it from the solution
+
+        :Call:
+            >>> D = C.Fetch(fname, name, extract, **params)
+
+        :Parameters:
+            *fname*: :class:`str`
+                Name of ``.xfa`` file
+            *name*: :class:`str`
+                Name of the extraction
+            *extract*: :class:`function`
+                Function that takes a :class:`pyxflow.All.xf_All` and returns
+                a tuple of arrays; only called if the result is not cached
+            *params*: :class:`dict`
+                Inputs of the extraction, used for the key
+
+        :Returns:
+            *D*: :class:`tuple`
+                Arrays from the cache or from *extract*
+        """
+        key = self.Key(fname, name, **params)
+        with perf.timer('Cache.Get'):
+            D = self.Get(key)
+        if D is not None:
+            self.hits += 1
+            return D
+        self.misses += 1
+        D = tuple(extract(self._All(fname)))
+        with perf.timer('Cache.Put'):
+            self.Put(key, D)
+        return D
+
+    # Bounding box of the mesh
+    def Limits(self, fname):
+        """
+        Get the bounding box of the mesh nodes
+
+        :Call:
+            >>> xmin, xmax = C.Limits(fname)
+        """
+        def extract(All):
+            X = All.Mesh.Coord
+            return X.min(axis=0), X.max(axis=0)
+        return self.Fetch(fname, 'Limits', extract)
+
+    # Mesh plot data
+    def MeshPlotData(self, fname, xmin, xmax, Order=None):
+        """
+        Get mesh plot data, extracting it only if it is not cached
+
+        :Call:
+            >>> x, y, c = C.MeshPlotData(fname, xmin, xmax, Order=None)
+
+        :See also:
+            :func:`pyxflow._pyxflow.MeshPlotData`
+        """
+        def extract(All):
+            return px.MeshPlotData(All.Mesh._ptr, xmin, xmax, Order)
+        return self.Fetch(fname, 'MeshPlotData', extract,
+            xmin=xmin, xmax=xmax, Order=Order)
+
+    # Scalar plot data
+    def ScalarPlotData(self, fname, scalar, xmin, xmax, Order=None,
+            role='ElemState', TimeIndex=0):
+        """
+        Get scalar plot data, extracting it only if it is not cached
+
+        :Call:
+            >>> x, y, tri, c = C.ScalarPlotData(fname, scalar, xmin, xmax,
+                Order=None, role='ElemState', TimeIndex=0)
+
+        :See also:
+            :func:`pyxflow._pyxflow.ScalarPlotData`
+        """
+        def extract(All):
+            U = All.GetPrimalState(TimeIndex).GetVector(role)
+            return px.ScalarPlotData(U._ptr, All.Mesh._ptr,
+                All.EqnSet._ptr, scalar, xmin, xmax, Order)
+        return self.Fetch(fname, 'ScalarPlotData', extract, scalar=scalar,
+            xmin=xmin, xmax=xmax, Order=Order, role=role, TimeIndex=TimeIndex)
+
+    # Scalars on a boundary
+    def BFaceScalarData(self, fname, BFG, scalars, Order=None,
+            role='ElemState', TimeIndex=0):
+        """
+        Get scalars on a boundary, evaluating them only if they are not cached
+
+        :Call:
+            >>> X, S, C = C.BFaceScalarData(fname, BFG, scalars, Order=None,
+                role='ElemState', TimeIndex=0)
+
+        :Parameters:
+            *BFG*: :class:`str`
+                Title of the boundary face group
+            *scalars*: :class:`str` list
+                Names of equation set scalars
+
+        :See also:
+            :func:`pyxflow._pyxflow.BFaceScalarData`
+        """
+        def extract(All):
+            titles = [B.Title for B in All.Mesh.BFaceGroup]
+            if BFG not in titles:
+                raise KeyError("Mesh has no boundary '%s'" % BFG)
+            U = All.GetPrimalState(TimeIndex).GetVector(role)
+            return px.BFaceScalarData(U._ptr, All.Mesh._ptr,
+                All.EqnSet._ptr, titles.index(BFG), list(scalars), Order)
+        return self.Fetch(fname, 'BFaceScalarData', extract, BFG=BFG,
+            scalars='\n'.join(scalars), Order=Order, role=role,
+            TimeIndex=TimeIndex)
+
+    # Plot from cached data
+    def Plot(self, fname, scalar=None, mesh=True, **kwargs):
+        """
+        Plot the mesh and a scalar of a 2D solution using cached data
+
+        If every array is in the cache, the solution file is not read.
+
+        :Call:
+            >>> Plot = C.Plot(fname, scalar=None, mesh=True, **kwargs)
+
+        :Parameters:
+            *fname*: :class:`str`
+                Name of ``.xfa`` file
+            *scalar*: :class:`str`
+                Name of scalar to plot; ``None`` uses the default scalar and
+                ``False`` plots no scalar
+            *mesh*: :class:`bool`
+                Whether or not to plot the mesh
+
+        :Returns:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                pyXFlow plot instance with mesh and scalar handles
+
+        :Kwargs:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Instance of plot class (plot handle)
+            *order*: :class:`int`
+                Interpolation order
+            *role*: :class:`str`
+                Vector to plot; default is ``'ElemState'``
+            *TimeIndex*: :class:`int`
+                Time index of the primal state
+
+            See also kwargs for :func:`pyxflow.Plot.GetXLims`
+        """
+        # Plot window
+        x0, x1 = self.Limits(fname)
+        if len(x0) != 2:
+            raise ValueError("Cached plots are only available for 2D meshes")
+        xmin, xmax = GetXLims(_Box(len(x0)), xmindef=x0, xmaxdef=x1,
+            **kwargs)
+        Order = kwargs.get('order')
+        # Plot handle
+        Plot = kwargs.get('Plot')
+        if Plot is None:
+            Plot = xf_Plot()
+        if Plot.figure is None:
+            Plot.figure = plt.gcf()
+        if Plot.axes is None:
+            Plot.axes = plt.gca()
+        Plot.xmin = xmin
+        Plot.xmax = xmax
+        # Scalar
+        if scalar is not False:
+            x, y, tri, c = self.ScalarPlotData(fname, scalar, xmin, xmax,
+                Order, kwargs.get('role', 'ElemState'),
+                kwargs.get('TimeIndex', 0))
+            from matplotlib.tri import Triangulation
+            with perf.timer('tripcolor'):
+                T = Triangulation(x, y, triangles=tri)
+                Plot.scalar = Plot.axes.tripcolor(T, c, shading='gouraud')
+        # Mesh
+        if mesh:
+            x, y, c = self.MeshPlotData(fname, xmin, xmax, Order)
+            s = [np.column_stack((x[c[f]:c[f+1]], y[c[f]:c[f+1]]))
+                for f in range(len(c) - 1)]
+            from matplotlib.collections import LineCollection
+            with perf.timer('LineCollection'):
+                Plot.mesh = LineCollection(s, colors=(0, 0, 0, 1))
+            Plot.axes.add_collection(Plot.mesh)
+        # Window
+        if kwargs.get('reset_limits', True):
+            Plot.axes.set_xlim(xmin[0], xmax[0])
+            Plot.axes.set_ylim(xmin[1], xmax[1])
+        if plt.isinteractive():
+            plt.draw()
+        return Plot
+
+
+# Dimension holder for GetXLims when the mesh is not read
+class _Box:
+    def __init__(self, Dim):
+        self.Dim = Dim
@@ -22,21 +22,26 @@ functions.  In other words, it provides an API for XFlow data sets.
 #  2013-09-25 @dalle   : First version
 
 # ------- Modules required -------
+# Cache files for mapped data
+import os
+import json
+import hashlib
 # Used for more efficient data storage
 import numpy as np
 # The background pyxflow workhorse module
 import pyxflow._pyxflow as px
-# Matplotlib for plotting
-import matplotlib.pyplot as plt
-from matplotlib.tri import Triangulation
-
-# Import plotting methods
+# Import plotting methods (matplotlib is loaded on first use)
 import pyxflow.Plot
+from pyxflow.Plot import plt
+# Optional performance counters
+from pyxflow import perf
+# Base class with close() and context managers
+from pyxflow.Handle import xf_Handle
 
 # ------- Class for xf_Geom objects -------
 
 
-class xf_DataSet:
+class xf_DataSet(xf_Handle):
     """
     A Python class for XFlow *xf_DataSet* objects
     
@@ -45,15 +50,19 @@ class xf_DataSet:
     the data set is constructed by reading from a `.data.` file.
     
     :Call:
-        >>> DS = xf_DataSet(ptr=None, fname=None, Mesh=None)
+        >>> DS = xf_DataSet(ptr=None, fname=None, Mesh=None, mmap=False)
     
     :Parameters:
         *ptr*: :class:`int`
             Pointer to *xf_DataSet* from which to read
         *fname*: :class:`str`
-            Name of `.data` file to read from
+            Name of `.data` file to read from, or the file that *ptr* was
+            read from if *mmap* is used
         *Mesh*: :class:`int` or :class:`pyxflow.Mesh.xf_Mesh`
             Pointer to *xf_Mesh* (``Mesh._ptr`` is used if it exists)
+        *mmap*: :class:`bool`
+            Whether or not to map the real values from a cache file; see
+            :func:`pyxflow.DataSet.MapDataSet`
     
     :Data members:
         *DS._ptr*: :class:`int`
@@ -65,7 +74,7 @@ class xf_DataSet:
     """
 
     # Initialization methd
-    def __init__(self, ptr=None, fname=None, Mesh=None):
+    def __init__(self, ptr=None, fname=None, Mesh=None, mmap=False):
         """
         Initialization method for *xf_DataSet*
         """
@@ -98,28 +107,109 @@ class xf_DataSet:
             # Exit the function
             return None
         
+        # Map the values before any arrays are made from them.
+        if mmap:
+            if fname is None:
+                raise ValueError("Mapped data sets need the file name")
+            MapDataSet(self._ptr, fname)
+
         # Get the number of components.
         self.nData = px.nDataSetData(self._ptr)
         # Get the components
         self.Data = [xf_Data(self._ptr, i) for i in range(self.nData)]
 
     # xf_DataSet destructor method
-    def __del__(self):
+    def _Destroy(self):
         """
         *xf_DataSet* destructor
 
         This function reminds the pyxflow module to clean up the C
-        xf_DataSet object when the Python object is deleted.
+        xf_DataSet object when the interface is closed or deleted.
         """
         # Version:
         #  2013-09-25 @dalle   : First version
 
-        if self.owner and self._ptr is not None:
-            px.DestroyDataSet(self._ptr)
+        px.DestroyDataSet(self._ptr)
+
+
+# Function to map the values of a data set from a cache
+def MapDataSet(ptr, fname):
+    """
+    Map the real values of a data set from cache files.
+
+    The values of each *xf_Data* are written to a file in the folder
+    ``fname + '.xfm'`` the first time and mapped from there afterward, so
+    processes that read the same file share one copy in the page cache, and
+    element groups that are never used are paged out again.  This saves
+    memory but not reading: libxf has already read the whole data set from
+    *fname* in every process before it is mapped.  The cache is rebuilt if
+    the size or modification time of *fname* changes.
+
+    :Call:
+        >>> n = pyxflow.DataSet.MapDataSet(ptr, fname)
+
+    :Parameters:
+        *ptr*: :class:`int`
+            Pointer to *xf_DataSet* that was read from *fname*
+        *fname*: :class:`str`
+            Name of the ``.xfa`` or ``.data`` file
+
+    :Returns:
+        *n*: :class:`int`
+            Number of *xf_GenArray* structs that were mapped
+
+    Only arrays with real values and a constant rank are mapped.  The mapped
+    *rValue* arrays are read-only, and arrays made from the data set before
+    this call must not be used afterward.
+    """
+    # Status of the source file
+    st = os.stat(fname)
+    stamp = {'Size': st.st_size, 'MTime': st.st_mtime}
+    # Cache folder
+    fdir = fname + '.xfm'
+    fstamp = os.path.join(fdir, 'stamp.json')
+    if not os.path.isdir(fdir):
+        os.makedirs(fdir)
+    # Check the cache against the file.
+    try:
+        f = open(fstamp)
+        valid = (json.load(f) == stamp)
+        f.close()
+    except (IOError, ValueError):
+        valid = False
+    # Clear a stale cache.
+    if not valid:
+        for fbin in os.listdir(fdir):
+            if fbin.endswith('.bin'):
+                os.remove(os.path.join(fdir, fbin))
+        _AtomicWrite(fstamp, json.dumps(stamp))
+    # Map each entry.
+    n = 0
+    for i in range(px.nDataSetData(ptr)):
+        Title, Type, D, _Data = px.GetData(ptr, i)
+        # Titles need not be unique, and a stale stamp must never match.
+        key = '%i:%s:%i:%r' % (i, Title, stamp['Size'], stamp['MTime'])
+        fbin = os.path.join(fdir, hashlib.md5(key).hexdigest() + '.bin')
+        # Write the entry once; other processes may be doing the same.
+        if not os.path.isfile(fbin):
+            ftmp = '%s.%i.tmp' % (fbin, os.getpid())
+            px.WriteDataMap(D, ftmp)
+            os.rename(ftmp, fbin)
+        n += px.MapData(D, fbin)
+    return n
+
+
+# Write a small file so that readers never see part of it
+def _AtomicWrite(fname, txt):
+    ftmp = '%s.%i.tmp' % (fname, os.getpid())
+    f = open(ftmp, 'w')
+    f.write(txt)
+    f.close()
+    os.rename(ftmp, fname)
 
 
 # ---- Class for xf_Data struts ----
-class xf_Data:
+class xf_Data(xf_Handle):
     """
     A Python class for XFlow *xf_Data* objects
     
@@ -183,7 +273,7 @@ class xf_Data:
 
 
 # ---- Class for xf_VectorGroup ----
-class xf_VectorGroup:
+class xf_VectorGroup(xf_Handle):
     """
     A Python class for XFlow *xf_VectorGroup* objects.
     
@@ -239,7 +329,7 @@ class xf_VectorGroup:
                 Appropriate vector based on the role
         """
         _ptr = px.GetVectorFromGroup(self._ptr, role)
-        return xf_Vector(_ptr)
+        return self._Adopt(xf_Vector(_ptr))
         
     # Method to plot (passes information to xf_Vector.Plot())
     def Plot(self, Mesh, EqnSet, role="ElemState", **kwargs):
@@ -331,7 +421,7 @@ class xf_VectorGroup:
 
 
 # ---- Class for xf_Vector ----
-class xf_Vector:
+class xf_Vector(xf_Handle):
     """
     A Python class for XFlow *xf_Vector* objects
     
@@ -417,8 +507,18 @@ class xf_Vector:
         :Kwargs:
             *order*: :class:`int`
                 Interpolation order for mesh faces
+            *raster*: :class:`bool` or :class:`int`
+                Draw an image instead of triangles; an integer gives the
+                number of horizontal pixels (see :func:`Raster`)
+            *nThread*: :class:`int`
+                Number of threads used to extract the plot data
                 
-            See also kwargs for :func:`pyxflow.Plot.GetXLims`
+            See also kwargs for :func:`pyxflow.Plot.GetXLims`; for 3D meshes,
+            the scalar is plotted on a slice plane (see
+            :func:`pyxflow.Plot.GetPlane`)
+            
+            If ``Plot.tiles`` is not ``None``, the plot data is extracted
+            using the tile cache; see :func:`pyxflow.Plot.xf_Plot.UseTileCache`
         
         :See also:
             :func:`pyxflow.All.xf_All.Plot()`,
@@ -434,6 +534,9 @@ class xf_Vector:
         elif not isinstance(Plot, pyxflow.Plot.xf_Plot):
             raise IOError("Plot handle must be instance of " +
                 "pyxflow.Plot.xf_Plot")
+        # Save the inputs for redrawing.
+        Plot._sources['scalar'] = (self.Plot,
+            dict(kwargs, Mesh=Mesh, EqnSet=EqnSet, scalar=scalar))
         # Use specified defaults for plot window if they exist.
         kwargs.setdefault('xmindef', Plot.xmin)
         kwargs.setdefault('xmaxdef', Plot.xmax)
@@ -467,21 +570,64 @@ class xf_Vector:
         Name = scalar
         # Process the colormap option...
         colormap = kwargs.get('colormap', plt.cm.jet)
+        # Check for a rasterized plot.
+        if kwargs.get('raster') and dim == 2:
+            # Number of pixels; use the axes width by default.
+            nx = kwargs['raster']
+            if nx is True:
+                nx = int(Plot.axes.get_window_extent().width)
+            # Get the image.
+            I = self.Raster(Mesh, EqnSet, scalar=Name, xmin=xmin, xmax=xmax,
+                nx=nx, order=Order)
+            # Show it.
+            Plot.scalar = Plot.axes.imshow(I, origin='lower', cmap=colormap,
+                extent=(xmin[0], xmax[0], xmin[1], xmax[1]),
+                interpolation='nearest', aspect='auto')
+            # Apply the bounding box that was created earlier.
+            if kwargs.get('reset_limits', True):
+                Plot.axes.set_xlim(xmin[0], xmax[0])
+                Plot.axes.set_ylim(xmin[1], xmax[1])
+            # Draw if necessary.
+            if plt.isinteractive():
+                plt.draw()
+            return Plot
         # Get the mesh nodes and subnodes and their scalar values.
-        x, y, tri, scalar = px.ScalarPlotData(
-            self._ptr, Mesh._ptr, EqnSet._ptr, Name, xmin, xmax, Order)
+        if Plot.tiles is not None and dim == 2:
+            # Use the cached tiles.
+            x, y, tri, scalar = Plot.tiles.ScalarPlotData(
+                self, Mesh, EqnSet, Name, xmin, xmax, Order)
+            # Redraw when the limits change.
+            if Plot._track: Plot.TrackLimits()
+        elif dim == 3:
+            # Slice the mesh.
+            plane = pyxflow.Plot.GetPlane(Mesh, xmin, xmax, **kwargs)
+            x, y, tri, scalar = px.ScalarPlotData(
+                self._ptr, Mesh._ptr, EqnSet._ptr, Name, xmin, xmax, Order,
+                0.5, plane, Mesh.GetElemBounds(), kwargs.get('nThread', 1))
+        else:
+            x, y, tri, scalar = px.ScalarPlotData(
+                self._ptr, Mesh._ptr, EqnSet._ptr, Name, xmin, xmax, Order,
+                0.5, None, None, kwargs.get('nThread', 1))
         # Check the dimension.
         if dim > 1:
             # Create a set of triangles with gradient colors.
-            T = Triangulation(x, y, triangles=tri)
-            p = Plot.axes.tripcolor(T, scalar, shading='gouraud', cmap=colormap)
+            from matplotlib.tri import Triangulation
+            with perf.timer('tripcolor'):
+                T = Triangulation(x, y, triangles=tri)
+                p = Plot.axes.tripcolor(T, scalar, shading='gouraud',
+                    cmap=colormap)
             # Store the tripcolor handle.
             Plot.scalar = p
         else:
             # Plot the value versus x.
             Plot.scalar = Plot.axes.plot(x, scalar)
         # Apply the bounding box that was created earlier.
-        if kwargs.get('reset_limits', True):
+        if kwargs.get('reset_limits', True) and dim == 3:
+            # Use the extents of the slice.
+            if len(x) > 0:
+                Plot.axes.set_xlim(x.min(), x.max())
+                Plot.axes.set_ylim(y.min(), y.max())
+        elif kwargs.get('reset_limits', True):
             Plot.axes.set_xlim(xmin[0], xmax[0])
             if dim > 1:
                 Plot.axes.set_ylim(xmin[1], xmax[1])
@@ -491,9 +637,238 @@ class xf_Vector:
         # Return the plot.
         return Plot
 
+    # Contour plotting method
+    def Contour(self, Mesh, EqnSet, scalar=None, levels=10, Plot=None,
+            **kwargs):
+        """
+        Plot iso-contours of a scalar.
+        
+        The scalar is evaluated on subdivided elements in the same way as for
+        :func:`Plot`, and the contour lines are found for all levels in a
+        single pass by :func:`pyxflow._pyxflow.ScalarContour`.  The lines are
+        stored in ``Plot.contour``.
+        
+        :Call:
+            >>> Plot = U.Contour(Mesh, EqnSet, scalar=None, levels=10,
+                Plot=None, **kwargs)
+            
+        :Parameters:
+            *U*: :class:`pyxflow.DataSet.xf_Vector`
+                Vector containing scalar data to plot
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh for geometry data required for plotting
+            *EqnSet*: :class:`pyxflow.All.xf_EqnSet`
+                Equation set data
+            *scalar*: :class:`str`
+                Name of scalar to plot
+            *levels*: :class:`int` or :class:`float` list
+                Number of contour levels or list of levels
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Instance of plot class (plot handle) to use instead of creating
+                a new one
+                
+        :Returns:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Instance of plot class (plot handle)
+            
+        :Kwargs:
+            *order*: :class:`int`
+                Interpolation order for mesh faces
+            *colormap*: :class:`matplotlib.colors.Colormap`
+                Colormap for the contour levels
+            *line_options*: :class:`dict`
+                Options for :class:`matplotlib.collections.LineCollection`
+            *nThread*: :class:`int`
+                Number of threads used to extract the plot data
+                
+            See also kwargs for :func:`pyxflow.Plot.GetXLims`
+        
+        :Examples:
+            The following draws twenty pressure contours on top of the
+            pressure plot.
+            
+                >>> All = xf_All("naca_adapt_0.xfa")
+                >>> U = All.GetPrimalState().GetVector()
+                >>> Plot = U.Plot(All.Mesh, All.EqnSet, "Pressure")
+                >>> Plot = U.Contour(All.Mesh, All.EqnSet, "Pressure", 20,
+                    Plot=Plot)
+        """
+        # Process the plot.
+        if Plot is None:
+            # Initialize a plot.
+            Plot = pyxflow.Plot.xf_Plot()
+        elif not isinstance(Plot, pyxflow.Plot.xf_Plot):
+            raise IOError("Plot handle must be instance of " +
+                "pyxflow.Plot.xf_Plot")
+        # Only defined for two-dimensional meshes and slices.
+        if Mesh.Dim < 2:
+            raise RuntimeError("Contours require a 2D or 3D mesh.")
+        # Use specified defaults for plot window if they exist.
+        kwargs.setdefault('xmindef', Plot.xmin)
+        kwargs.setdefault('xmaxdef', Plot.xmax)
+        # Get the limits based on the Mesh and keyword args
+        xmin, xmax = pyxflow.Plot.GetXLims(Mesh, **kwargs)
+        # Save the plot limits.
+        Plot.xmin = xmin
+        Plot.xmax = xmax
+        # Check for an existing contour plot.
+        if Plot.contour is not None:
+            # Delete it!
+            Plot.contour.remove()
+        # Determine what figure to use.
+        if kwargs.get('figure') is not None:
+            Plot.figure = kwargs['figure']
+        elif Plot.figure is None:
+            Plot.figure = plt.gcf()
+        # Determine what axes to use.
+        if kwargs.get('axes') is not None:
+            Plot.axes = kwargs['axes']
+        else:
+            Plot.axes = plt.gca()
+        # Plot order
+        Order = kwargs.get('order')
+        # Get the mesh nodes and subnodes and their scalar values.
+        if Plot.tiles is not None and Mesh.Dim == 2:
+            x, y, tri, c = Plot.tiles.ScalarPlotData(
+                self, Mesh, EqnSet, scalar, xmin, xmax, Order)
+        elif Mesh.Dim == 3:
+            # Slice the mesh.
+            plane = pyxflow.Plot.GetPlane(Mesh, xmin, xmax, **kwargs)
+            x, y, tri, c = px.ScalarPlotData(
+                self._ptr, Mesh._ptr, EqnSet._ptr, scalar, xmin, xmax, Order,
+                0.5, plane, Mesh.GetElemBounds(), kwargs.get('nThread', 1))
+        else:
+            x, y, tri, c = px.ScalarPlotData(
+                self._ptr, Mesh._ptr, EqnSet._ptr, scalar, xmin, xmax, Order,
+                0.5, None, None, kwargs.get('nThread', 1))
+        # There are no lines in an empty window.
+        if len(c) == 0:
+            Plot.contour = None
+            return Plot
+        # Process the levels.
+        if np.isscalar(levels):
+            # Evenly spaced levels strictly inside the range
+            levels = np.linspace(c.min(), c.max(), levels+2)[1:-1]
+        levels = np.sort(np.array(levels, dtype=float))
+        # Get the line segments for each level.
+        S = px.ScalarContour(x, y, tri, c, levels)
+        # Value of each segment for coloring
+        v = np.hstack([levels[i]*np.ones(len(S[i])) for i in range(len(S))])
+        # Get any options that should be applied to the lines.
+        line_options = dict(kwargs.get('line_options', {}))
+        line_options.setdefault('cmap', kwargs.get('colormap', plt.cm.jet))
+        # Create the lines efficiently.
+        from matplotlib.collections import LineCollection
+        with perf.timer('LineCollection'):
+            h = LineCollection(np.vstack(S), **line_options)
+        h.set_array(v)
+        h.set_clim(levels[0], levels[-1])
+        # Plot them.
+        Plot.axes.add_collection(h)
+        Plot.contour = h
+        # Apply the bounding box that was created earlier.
+        if kwargs.get('reset_limits', True) and Mesh.Dim == 3:
+            # Use the extents of the slice.
+            if len(x) > 0:
+                Plot.axes.set_xlim(x.min(), x.max())
+                Plot.axes.set_ylim(y.min(), y.max())
+        elif kwargs.get('reset_limits', True):
+            Plot.axes.set_xlim(xmin[0], xmax[0])
+            Plot.axes.set_ylim(xmin[1], xmax[1])
+        # Draw if necessary.
+        if plt.isinteractive():
+            plt.draw()
+        # Return the plot.
+        return Plot
+    
+    # Rasterization method
+    def Raster(self, Mesh, EqnSet, scalar=None, nx=800, ny=None, **kwargs):
+        """
+        Evaluate a scalar on a uniform grid of pixels.
+        
+        Each pixel is assigned the value of the scalar at its center, so the
+        memory required depends only on the image size and not on the number
+        of elements in the window.  Pixels that are not inside any element are
+        set to ``NaN``.
+        
+        :Call:
+            >>> I = U.Raster(Mesh, EqnSet, scalar=None, nx=800, ny=None,
+                **kwargs)
+            
+        :Parameters:
+            *U*: :class:`pyxflow.DataSet.xf_Vector`
+                Vector containing scalar data to rasterize
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh for geometry data
+            *EqnSet*: :class:`pyxflow.All.xf_EqnSet`
+                Equation set data
+            *scalar*: :class:`str`
+                Name of scalar to evaluate
+            *nx*: :class:`int`
+                Number of pixels in the *x*-direction
+            *ny*: :class:`int`
+                Number of pixels in the *y*-direction; by default the pixels
+                are square
+                
+        :Returns:
+            *I*: :class:`numpy.array` (*ny*, *nx*) or (*ny*, *nx*, 4)
+                Scalar value at each pixel center with row ``0`` at the
+                bottom of the window, or RGBA bytes if *colormap* is given
+            
+        :Kwargs:
+            *order*: :class:`int`
+                Interpolation order for subdividing elements
+            *colormap*: :class:`matplotlib.colors.Colormap` or :class:`str`
+                Colormap used to convert the image to RGBA
+            *clim*: :class:`float` list
+                Color limits for *colormap*; default is the image range
+            *fname*: :class:`str`
+                Name of image file to write
+                
+            See also kwargs for :func:`pyxflow.Plot.GetXLims`
+        
+        :Examples:
+            The following evaluates the pressure near an airfoil on a
+            1200-pixel-wide image and saves it to file.
+            
+                >>> All = xf_All("naca_adapt_0.xfa")
+                >>> U = All.GetPrimalState().GetVector()
+                >>> I = U.Raster(All.Mesh, All.EqnSet, "Pressure", nx=1200,
+                    xlim=[-0.5,1.5,-0.6,0.6], fname="pressure.png")
+        """
+        # Get the limits based on the Mesh and keyword args
+        xmin, xmax = pyxflow.Plot.GetXLims(Mesh, **kwargs)
+        # Default height preserves the aspect ratio.
+        if ny is None:
+            ny = int(round(nx * (xmax[1]-xmin[1]) / (xmax[0]-xmin[0])))
+            ny = max(ny, 1)
+        # Evaluate the scalar.
+        I = px.ScalarRaster(self._ptr, Mesh._ptr, EqnSet._ptr, scalar,
+            xmin, xmax, nx, ny, kwargs.get('order'))
+        # Process the colormap option.
+        colormap = kwargs.get('colormap')
+        # Write the file if requested.
+        if kwargs.get('fname') is not None:
+            # Color limits
+            clim = kwargs.get('clim', (np.nanmin(I), np.nanmax(I)))
+            plt.imsave(kwargs['fname'], I, cmap=colormap, origin='lower',
+                vmin=clim[0], vmax=clim[1])
+        # Convert to colors if requested.
+        if colormap is not None:
+            # Get the colormap by name if necessary.
+            colormap = plt.get_cmap(colormap)
+            # Color limits
+            clim = kwargs.get('clim', (np.nanmin(I), np.nanmax(I)))
+            # Scale to [0, 1].
+            I = (I - clim[0]) / max(clim[1] - clim[0], 1e-300)
+            # Apply the colormap.
+            I = colormap(I, bytes=True)
+        # Output
+        return I
+
 
 # ---- Class for xf_GenArray ----
-class xf_GenArray:
+class xf_GenArray(xf_Handle):
     """
     A Python class for XFlow *xf_GenArray* objects
     
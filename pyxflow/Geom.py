@@ -20,10 +20,12 @@ shifting the node locations and rewriting the geometry to file.
 import numpy as np
 # The background pyxflow workhorse module
 import pyxflow._pyxflow as px
+# Base class with close() and context managers
+from pyxflow.Handle import xf_Handle
 
 
 # ------- Class for xf_Geom objects -------
-class xf_Geom:
+class xf_Geom(xf_Handle):
     """
     A Python class for XFlow *xf_Geom* objects
     
@@ -31,16 +33,19 @@ class xf_Geom:
     processed from the existing *xf_Geom* struct (through the XFlow API).
     
     If both the file name and the pointer are ``None``, an empty *xf_Geom* is
-    created.
+    created.  If a list of components is given instead, the geom exists only
+    in Python (see :func:`pyxflow.Geom.ReadGeom`).
     
     :Call:
-        >>> Geom = pyxflow.xf_Geom(fname=None, ptr=None)
+        >>> Geom = pyxflow.xf_Geom(fname=None, ptr=None, Comp=None)
     
     :Parameters:
         *fname*: :class:`str`
             Name of *.geom* file to read the geometry from
         *ptr*: :class:`int`
             Pointer to existing *xf_Geom* struct
+        *Comp*: :class:`pyxflow.Geom.xf_GeomComp` list
+            Components of a geom that has no *xf_Geom* struct
     
     :Data members:
         *Geom._ptr*: :class:`int`
@@ -53,7 +58,7 @@ class xf_Geom:
 
     # Initialization method:
     #  can be read from '.geom' file or existing binary object
-    def __init__(self, fname=None, ptr=None):
+    def __init__(self, fname=None, ptr=None, Comp=None):
         """
         Initialization method for *xf_Geom*
         """
@@ -61,7 +66,14 @@ class xf_Geom:
         #  2013-09-25 @dalle   : First version
 
         # Check the parameters.
-        if fname is not None:
+        if Comp is not None:
+            # Components without a struct
+            self._ptr = None
+            self.owner = False
+            self.nComp = len(Comp)
+            self.Comp = Comp
+            return None
+        elif fname is not None:
             if ptr is not None:
                 raise NameError
             # Read the file and get the pointer.
@@ -87,16 +99,15 @@ class xf_Geom:
         # Initialize the components
         self.Comp = [xf_GeomComp(self._ptr, i) for i in range(self.nComp)]
 
-    # Destructor method for xf_Mesh
-    def __del__(self):
+    # Destructor method for xf_Geom
+    def _Destroy(self):
         """
         Destructor for *xf_Geom*
         """
         # Version:
         #  2013-09-24 @dalle   : First version
 
-        if self.owner and self._ptr is not None:
-            px.DestroyGeom(self._ptr)
+        px.DestroyGeom(self._ptr)
 
     # Write method
     def Write(self, fname):
@@ -118,14 +129,132 @@ class xf_Geom:
         # Versions:
         #  2013-09-30 @dalle   : First version
 
-        # Use the low-level API.
-        px.WriteGeomFile(self._ptr, fname)
+        # Use the low-level API if there is a struct.
+        if self._ptr is None:
+            WriteGeom(self, fname)
+        else:
+            px.WriteGeomFile(self._ptr, fname)
         # Nothing to return
         return None
 
+    # Method to find a component
+    def GetComp(self, comp):
+        """
+        Find a geometry component by index, name, or boundary group.
+
+        :Call:
+            >>> GC = Geom.GetComp(comp)
+
+        :Parameters:
+            *comp*: :class:`int` or :class:`str`
+                Index of the component, or its *Name* or *BFGTitle*
+
+        :Returns:
+            *GC*: :class:`pyxflow.Geom.xf_GeomComp`
+                Geometry component
+        """
+        # Check for an index.
+        if isinstance(comp, int):
+            return self.Comp[comp]
+        # Search by name first, then by boundary face group.
+        for GC in self.Comp:
+            if GC.Name == comp:
+                return GC
+        for GC in self.Comp:
+            if GC.BFGTitle == comp:
+                return GC
+        raise KeyError("No geometry component '%s'" % comp)
+
+    # Method to set panel coordinates
+    def SetPanelCoord(self, comp, Coord, Panels=None):
+        """
+        Replace the node coordinates of a panel component.
+
+        The whole array is copied into the *xf_Geom* struct at once.  If
+        *Coord* is the component's own *Coord* array, modified in place,
+        nothing is copied.  The component's data are reread afterward, so
+        :func:`Write` saves the new coordinates.
+
+        :Call:
+            >>> Geom.SetPanelCoord(comp, Coord, Panels=None)
+
+        :Parameters:
+            *comp*: :class:`int` or :class:`str`
+                Index of the component, or its *Name* or *BFGTitle*
+            *Coord*: :class:`numpy.array` (*nNode*, *Dim*)
+                New node coordinates
+            *Panels*: :class:`numpy.array` (*nPanel*, *nn*) or ``None``
+                New node indices of each panel; if ``None``, the panels are
+                kept
+
+        :Examples:
+            Scale a panel surface and save it.
+
+                >>> GCP = Geom.GetComp('Wing').Data
+                >>> Geom.SetPanelCoord('Wing', 1.1*GCP.Coord)
+                >>> Geom.Write('wing_scaled.geom')
+        """
+        # Get the component.
+        GC = self.GetComp(comp)
+        # Components without a struct just keep the arrays.
+        if self._ptr is None:
+            GC.Data.Coord = np.asarray(Coord, dtype=float)
+            GC.Data.nNode = GC.Data.Coord.shape[0]
+            if Panels is not None:
+                GC.Data.Panels = np.asarray(Panels, dtype=np.int32)
+                GC.Data.nPanel = GC.Data.Panels.shape[0]
+            return None
+        # Copy the arrays.
+        px.SetGeomCompPanelCoord(self._ptr, GC.i, Coord, Panels)
+        # Reread the data in case the storage was reallocated.
+        GC.Update()
+
+    # Closest-point projection
+    def Project(self, X, comp, **kwargs):
+        """
+        Find the closest point on a geometry component to each point.
+
+        :Call:
+            >>> Y, t, D = Geom.Project(X, comp, **kwargs)
+
+        :Parameters:
+            *X*: :class:`numpy.array` (*n*, *dim*)
+                Coordinates of the points to project
+            *comp*: :class:`int` or :class:`str`
+                Index of the component, or its *Name* or *BFGTitle*
+
+        :Returns:
+            *Y*: :class:`numpy.array` (*n*, *dim*)
+                Closest point on the component to each point
+            *t*: :class:`numpy.array` or :class:`tuple`
+                Spline parameter of each closest point, or for panels a tuple
+                of the panel index and reference coordinates of each point
+            *D*: :class:`numpy.array` (*n*)
+                Distance from each point to the component
+
+        :Kwargs:
+            *nThread*: :class:`int`
+                Number of threads if compiled with OpenMP
+
+        :Examples:
+            Snap the nodes of the boundary group ``'Airfoil'`` back onto the
+            surface.
+
+                >>> Y, t, D = All.Geom.Project(X, 'Airfoil', nThread=4)
+
+        :See also:
+            :func:`pyxflow.Geom.xf_GeomCompSpline.Project`,
+            :func:`pyxflow.Geom.xf_GeomCompPanel.Project`
+        """
+        # Get the component.
+        GC = self.GetComp(comp)
+        if GC.Data is None:
+            raise TypeError("Cannot project onto '%s' component" % GC.Type)
+        return GC.Data.Project(X, **kwargs)
+
 
 # ---- Class for Geom Components ----
-class xf_GeomComp:
+class xf_GeomComp(xf_Handle):
     """
     A Python class for XFlow *xf_GeomComp* objects
     
@@ -158,7 +287,8 @@ class xf_GeomComp:
         #  2013-09-25 @dalle   : First version
 
         # Set the initial fields.
-        self.ptr = None
+        self.ptr = ptr
+        self.i = i
         self.Name = None
         self.Type = None
         self.BFGTitle = None
@@ -183,9 +313,38 @@ class xf_GeomComp:
                 D["dim"], D["Basis"], D["nNode"], D["nPanel"],
                 D["Coord"], D["Panels"])
 
+    # Method to reread the data
+    def Update(self):
+        """
+        Reread the component data from the *xf_Geom* struct.
+
+        The existing *Data* instance is updated in place, so references to it
+        remain valid, and any tables derived from the old data are discarded.
+
+        :Call:
+            >>> GC.Update()
+        """
+        # Read the data.
+        D = px.GeomComp(self.ptr, self.i)[3]
+        if D is None or self.Data is None:
+            return
+        # Update the fields.
+        if self.Type == "Spline":
+            self.Data.Order = D["Order"]
+            self.Data.N = D["N"]
+            self.Data.X = D["X"]
+            self.Data.Y = D["Y"]
+            self.Data._tables = None
+        elif self.Type == "Panel":
+            self.Data.Order = D["Order"]
+            self.Data.nNode = D["nNode"]
+            self.Data.nPanel = D["nPanel"]
+            self.Data.Coord = D["Coord"]
+            self.Data.Panels = D["Panels"]
+
 
 # ---- Class for xf_GeomCompSline (geometry splines) ----
-class xf_GeomCompSpline:
+class xf_GeomCompSpline(xf_Handle):
     """
     A Python class for XFlow *xf_GeomCompSpline* objects
     
@@ -219,10 +378,455 @@ class xf_GeomCompSpline:
         self.N = N
         self.X = X
         self.Y = Y
+        # Interpolation and arc-length tables (built on first use)
+        self._tables = None
+
+    # Method to (re)build the tables
+    def Refresh(self):
+        """
+        Rebuild the interpolation and arc-length tables from *X* and *Y*.
+
+        The tables are also rebuilt automatically when the points change, so
+        this is only needed to move the cost of building them elsewhere.
+
+        :Call:
+            >>> GCS.Refresh()
+        """
+        # Points and parameter (cumulative chord length)
+        P = np.column_stack((self.X, self.Y)).astype(float)
+        t = np.zeros(P.shape[0])
+        t[1:] = np.cumsum(np.sqrt(np.sum(np.diff(P, axis=0)**2, axis=1)))
+        # Second derivatives of the natural cubic spline
+        if self.Order > 1 and P.shape[0] > 2:
+            M = _SplineSecondDerivs(t, P)
+        else:
+            M = np.zeros_like(P)
+        # Save the tables before integrating the arc length.
+        T = {'X': np.array(self.X), 'Y': np.array(self.Y),
+            't': t, 'P': P, 'M': M}
+        self._tables = T
+        # Arc length of each interval
+        i = np.arange(P.shape[0] - 1)
+        S = np.zeros(P.shape[0])
+        S[1:] = np.cumsum(self._Integrate(i, t[:-1], t[1:]))
+        T['S'] = S
+
+    # Get the tables, rebuilding them if necessary
+    def _Tables(self):
+        """Return the tables, rebuilding them if *X* or *Y* has changed"""
+        T = self._tables
+        if (T is None or not np.array_equal(T['X'], self.X)
+                or not np.array_equal(T['Y'], self.Y)):
+            self.Refresh()
+        return self._tables
+
+    # Interval containing each parameter value
+    def _Interval(self, t):
+        """Index of the interval containing each parameter value"""
+        tk = self._tables['t']
+        return np.clip(np.searchsorted(tk, t, side='right') - 1,
+            0, len(tk) - 2)
+
+    # Position and derivatives in given intervals
+    def _Eval(self, i, t, der=2):
+        """Evaluate the spline and derivatives in intervals *i* at *t*"""
+        T = self._tables
+        tk, P, M = T['t'], T['P'], T['M']
+        h = (tk[i+1] - tk[i])[:, None]
+        a = ((tk[i+1] - t)[:, None]) / h
+        b = 1.0 - a
+        # Derivatives
+        R1 = ((P[i+1] - P[i]) / h - (3*a*a - 1) / 6 * h * M[i]
+            + (3*b*b - 1) / 6 * h * M[i+1])
+        if der == 1:
+            return R1
+        # Position and second derivative
+        R0 = (a*P[i] + b*P[i+1]
+            + ((a**3 - a)*M[i] + (b**3 - b)*M[i+1]) * h*h / 6)
+        R2 = a*M[i] + b*M[i+1]
+        return R0, R1, R2
+
+    # Arc length from the start of interval i
+    def _Integrate(self, i, t0, t1):
+        """Arc length of the spline from *t0* to *t1* within intervals *i*"""
+        # Five-point Gauss-Legendre quadrature
+        L = 0.0
+        for x, w in zip(_GaussX, _GaussW):
+            tq = 0.5*(t0 + t1) + 0.5*(t1 - t0)*x
+            R1 = self._Eval(i, tq, der=1)
+            L = L + 0.5*w*(t1 - t0)*np.sqrt(np.sum(R1**2, axis=1))
+        return L
+
+    # Total length
+    def Length(self):
+        """
+        Get the total arc length of the spline.
+
+        :Call:
+            >>> L = GCS.Length()
+
+        :Returns:
+            *L*: :class:`float`
+                Arc length from the first point to the last point
+        """
+        return self._Tables()['S'][-1]
+
+    # Evaluation method
+    def Evaluate(self, t):
+        """
+        Evaluate the spline at an array of parameter values.
+
+        The parameter is the cumulative chord length between the spline
+        points.  Splines with *Order* of ``1`` are piecewise linear, and
+        splines of higher order are natural cubic splines.
+
+        :Call:
+            >>> P, T, K = GCS.Evaluate(t)
+
+        :Parameters:
+            *t*: :class:`numpy.array` (*n*)
+                Parameter values
+
+        :Returns:
+            *P*: :class:`numpy.array` (*n*, 2)
+                Coordinates of each point
+            *T*: :class:`numpy.array` (*n*, 2)
+                Unit tangent at each point
+            *K*: :class:`numpy.array` (*n*)
+                Signed curvature at each point (positive for
+                counterclockwise turning)
+
+        :Examples:
+            Resample the first component of a geometry at 200 points.
+
+                >>> GCS = Geom.Comp[0].Data
+                >>> P, T, K = GCS.Evaluate(GCS.Param(
+                        np.linspace(0, GCS.Length(), 200)))
+        """
+        self._Tables()
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        R0, R1, R2 = self._Eval(self._Interval(t), t)
+        # Speed
+        v = np.sqrt(np.sum(R1**2, axis=1))
+        # Unit tangent and curvature
+        T = R1 / v[:, None]
+        K = (R1[:, 0]*R2[:, 1] - R1[:, 1]*R2[:, 0]) / v**3
+        return R0, T, K
+
+    # Arc length at parameter values
+    def ArcLength(self, t):
+        """
+        Get the arc length from the start of the spline to each parameter.
+
+        :Call:
+            >>> s = GCS.ArcLength(t)
+
+        :Parameters:
+            *t*: :class:`numpy.array` (*n*)
+                Parameter values
+
+        :Returns:
+            *s*: :class:`numpy.array` (*n*)
+                Arc length at each parameter value
+        """
+        T = self._Tables()
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        i = self._Interval(t)
+        return T['S'][i] + self._Integrate(i, T['t'][i], t)
+
+    # Closest-point projection
+    def Project(self, X, nSub=8, **kwargs):
+        """
+        Find the closest point on the spline to each point.
+
+        The spline is sampled with *nSub* segments per interval, the closest
+        point on the polyline is found using a bounding volume hierarchy (see
+        :func:`pyxflow._pyxflow.ProjectPoints`), and the parameter is then
+        refined by Newton's method on the spline itself.
+
+        :Call:
+            >>> Y, t, D = GCS.Project(X, nSub=8, **kwargs)
+
+        :Parameters:
+            *X*: :class:`numpy.array` (*n*, 2)
+                Coordinates of the points to project
+            *nSub*: :class:`int`
+                Number of polyline segments per spline interval
+
+        :Returns:
+            *Y*: :class:`numpy.array` (*n*, 2)
+                Closest point on the spline to each point
+            *t*: :class:`numpy.array` (*n*)
+                Parameter of each closest point
+            *D*: :class:`numpy.array` (*n*)
+                Distance from each point to the spline
+
+        :Kwargs:
+            *nThread*: :class:`int`
+                Number of threads if compiled with OpenMP
+        """
+        T = self._Tables()
+        tk = T['t']
+        X = np.asarray(X, dtype=float)
+        # Sample points on each interval
+        if self.Order <= 1:
+            nSub = 1
+        f = np.arange(nSub) / float(nSub)
+        ts = np.hstack(((tk[:-1, None] + f[None, :]*np.diff(tk)[:, None]).ravel(),
+            tk[-1:]))
+        P = self._Eval(self._Interval(ts), ts)[0]
+        # Segments of the polyline
+        S = np.column_stack((np.arange(len(ts)-1), np.arange(1, len(ts))))
+        Y, I, W, D = px.ProjectPoints(P, S, X, kwargs.get('nThread', 1))
+        t = ts[I] + W[:, 0]*(ts[I+1] - ts[I])
+        # The polyline is exact for linear splines.
+        if self.Order <= 1:
+            return Y, t, D
+        # Move the points from the polyline onto the spline.
+        Y = self._Eval(self._Interval(t), t)[0]
+        D = np.sqrt(np.sum((Y - X)**2, axis=1))
+        # Newton iterations for the stationary point of the distance
+        for k in range(kwargs.get('nIter', 4)):
+            R0, R1, R2 = self._Eval(self._Interval(t), t)
+            E = R0 - X
+            g = np.sum(E*R1, axis=1)
+            dg = np.sum(R1*R1, axis=1) + np.sum(E*R2, axis=1)
+            dt = np.where(dg > 0, g/np.where(dg > 0, dg, 1.0), 0.0)
+            t1 = np.clip(t - dt, tk[0], tk[-1])
+            # Only keep steps that move closer.
+            Y1 = self._Eval(self._Interval(t1), t1)[0]
+            D1 = np.sqrt(np.sum((Y1 - X)**2, axis=1))
+            q = D1 < D
+            t[q] = t1[q]
+            Y[q] = Y1[q]
+            D[q] = D1[q]
+        return Y, t, D
+
+    # Parameter values at arc lengths
+    def Param(self, s):
+        """
+        Get the parameter values at given arc lengths.
+
+        The interval containing each arc length is found by a binary search
+        of the arc-length table, and the parameter within the interval is
+        found by Newton's method.
+
+        :Call:
+            >>> t = GCS.Param(s)
+
+        :Parameters:
+            *s*: :class:`numpy.array` (*n*)
+                Arc lengths from the start of the spline
+
+        :Returns:
+            *t*: :class:`numpy.array` (*n*)
+                Parameter values
+        """
+        T = self._Tables()
+        tk, S = T['t'], T['S']
+        s = np.atleast_1d(np.asarray(s, dtype=float))
+        # Interval from the arc-length table
+        i = np.clip(np.searchsorted(S, s, side='right') - 1, 0, len(S) - 2)
+        t0 = tk[i]
+        t1 = tk[i+1]
+        # Initial guess by linear interpolation
+        f = (s - S[i]) / (S[i+1] - S[i])
+        t = t0 + f*(t1 - t0)
+        # Newton iterations
+        for k in range(8):
+            r = S[i] + self._Integrate(i, t0, t) - s
+            v = np.sqrt(np.sum(self._Eval(i, t, der=1)**2, axis=1))
+            t = np.clip(t - r/v, t0, t1)
+            if np.all(np.abs(r) <= 1e-12*S[-1]):
+                break
+        return t
+
+
+# ------- Functions -------
+def ReadGeom(fname):
+    """
+    Read a *.geom* file without creating an *xf_Geom* struct.
+
+    The numeric blocks of the file are parsed in bulk using NumPy, which is
+    much faster than :func:`pyxflow._pyxflow.ReadGeomFile` for large panel
+    components.  The components are the same classes as for a geom read by
+    XFlow, but their arrays are owned by NumPy.
+
+    :Call:
+        >>> Geom = ReadGeom(fname)
+
+    :Parameters:
+        *fname*: :class:`str`
+            Name of *.geom* file to read
+
+    :Returns:
+        *Geom*: :class:`pyxflow.Geom.xf_Geom`
+            Geometry with *Geom._ptr* set to ``None``
+
+    :Examples:
+        Read, scale, and rewrite an airfoil.
+
+            >>> Geom = ReadGeom("naca.geom")
+            >>> GCS = Geom.Comp[0].Data
+            >>> GCS.Y *= 1.2
+            >>> Geom.Write("naca_thick.geom")
+    """
+    # Read the whole file.
+    f = open(fname)
+    L = f.read().splitlines()
+    f.close()
+    # Header and components
+    Dim = None
+    Comp = []
+    GC = None
+    D = {}
+    k = 0
+    while k < len(L):
+        line = L[k].split('#')[0].strip()
+        k += 1
+        if line == '':
+            continue
+        elif line == 'ENDCOMPONENT':
+            # Finish the component.
+            GC.Data = _GeomCompData(GC.Type, D, Dim)
+            Comp.append(GC)
+            GC = None
+            continue
+        # Parse "key = value".
+        key, val = [v.strip() for v in line.split('=', 1)]
+        if key == 'Dim':
+            Dim = int(val)
+        elif key == 'ComponentName':
+            GC = xf_GeomComp(None)
+            GC.Name = val
+            GC.i = len(Comp)
+            D = {}
+        elif key == 'BFGTitle':
+            GC.BFGTitle = val
+        elif key == 'Type':
+            GC.Type = val
+        elif val == 'Inline':
+            # Count followed by a block of rows
+            n = int(L[k].split()[0])
+            D[key] = _ReadBlock(L[k+1:k+1+n], n)
+            k += n + 1
+        elif key != 'nComponent':
+            D[key] = val
+    # Create the geom.
+    Geom = xf_Geom(Comp=Comp)
+    Geom.Dim = Dim
+    return Geom
+
+
+def WriteGeom(Geom, fname):
+    """
+    Write a geometry to a *.geom* file using bulk formatting.
+
+    The layout and number format are the same as those of
+    :func:`pyxflow._pyxflow.WriteGeomFile`, so the file can be read by either
+    :func:`ReadGeom` or XFlow.
+
+    :Call:
+        >>> WriteGeom(Geom, fname)
+
+    :Parameters:
+        *Geom*: :class:`pyxflow.Geom.xf_Geom`
+            Geometry to write, with or without an *xf_Geom* struct
+        *fname*: :class:`str`
+            Name of *.geom* file to create
+    """
+    # Dimension of the geometry
+    Dim = getattr(Geom, 'Dim', None)
+    if Dim is None:
+        Dim = 2
+        for GC in Geom.Comp:
+            if GC.Type == 'Panel':
+                Dim = GC.Data.Dim
+    # Header
+    f = open(fname, 'w')
+    f.write('# spatial dimension\nDim = %i\n\n' % Dim)
+    f.write('# number of components\nnComponent = %i\n\n' % Geom.nComp)
+    # Components
+    for i, GC in enumerate(Geom.Comp):
+        f.write('# Component %i\n' % (i+1))
+        f.write('ComponentName = %s\n' % GC.Name)
+        f.write('BFGTitle = %s\n' % GC.BFGTitle)
+        f.write('Type = %s\n' % GC.Type)
+        if GC.Type == 'Spline':
+            f.write('Order = %i\n' % GC.Data.Order)
+            f.write('Points = Inline\n')
+            _WriteBlock(f, np.column_stack((GC.Data.X, GC.Data.Y)), '%.15E')
+        elif GC.Type == 'Panel':
+            f.write('Order = %i\n' % GC.Data.Order)
+            f.write('Basis = %s\n' % GC.Data.Basis)
+            f.write('Nodes = Inline\n')
+            _WriteBlock(f, GC.Data.Coord, '%.15E')
+            f.write('Panels = Inline\n')
+            _WriteBlock(f, GC.Data.Panels + 1, '%i')
+        f.write('ENDCOMPONENT\n\n')
+    f.close()
+
+
+def _ReadBlock(L, n):
+    """Parse a block of *n* rows of numbers"""
+    A = np.array(' '.join(L).split(), dtype=float)
+    return A.reshape((n, -1))
+
+
+def _WriteBlock(f, A, fmt):
+    """Write a count and a block of rows of numbers"""
+    n, m = A.shape
+    f.write('%i\n' % n)
+    if n > 0:
+        f.write((' '.join([fmt]*m) + '\n')*n % tuple(A.ravel()))
+
+
+def _GeomCompData(Type, D, Dim):
+    """Create the data for a component from the parsed fields"""
+    if Type == 'Spline':
+        P = D['Points']
+        return xf_GeomCompSpline(int(D.get('Order', 3)), P.shape[0],
+            P[:, 0].copy(), P[:, 1].copy())
+    elif Type == 'Panel':
+        C = D['Nodes']
+        P = D['Panels'].astype(np.int32) - 1
+        return xf_GeomCompPanel(int(D['Order']), C.shape[1], D['Basis'],
+            C.shape[0], P.shape[0], C, P)
+    return None
+
+
+# Five-point Gauss-Legendre quadrature on [-1, 1]
+_GaussX = np.array([-0.9061798459386640, -0.5384693101056831, 0.0,
+    0.5384693101056831, 0.9061798459386640])
+_GaussW = np.array([0.2369268850561891, 0.4786286704993665,
+    0.5688888888888889, 0.4786286704993665, 0.2369268850561891])
+
+
+# Second derivatives of a natural cubic spline
+def _SplineSecondDerivs(t, P):
+    """Solve for the second derivatives of a natural cubic spline"""
+    n = len(t)
+    h = np.diff(t)
+    # Tridiagonal system for the interior points
+    a = h[:-1] / 6.0
+    b = (h[:-1] + h[1:]) / 3.0
+    c = h[1:] / 6.0
+    d = (P[2:] - P[1:-1]) / h[1:, None] - (P[1:-1] - P[:-2]) / h[:-1, None]
+    # Forward elimination
+    for k in range(1, n-2):
+        w = a[k] / b[k-1]
+        b[k] -= w*c[k-1]
+        d[k] -= w*d[k-1]
+    # Back substitution
+    M = np.zeros_like(P)
+    M[n-2] = d[n-3] / b[n-3]
+    for k in range(n-4, -1, -1):
+        M[k+1] = (d[k] - c[k]*M[k+2]) / b[k]
+    return M
 
 
 # ---- Class for xf_GeomCompPanel (geometry panels) ----
-class xf_GeomCompPanel:
+class xf_GeomCompPanel(xf_Handle):
     """
     A Python class for XFlow *xf_GeomCompPanel* objects
     
@@ -264,3 +868,78 @@ class xf_GeomCompPanel:
         self.Coord = Coord
         self.Panels = Panels
 
+    # Closest-point projection
+    def Project(self, X, **kwargs):
+        """
+        Find the closest point on the panels to each point.
+
+        Higher-order panels are split into linear segments or triangles at
+        their Lagrange nodes, and the closest point on these is found using a
+        bounding volume hierarchy (see :func:`pyxflow._pyxflow.ProjectPoints`).
+
+        :Call:
+            >>> Y, (I, U), D = GCP.Project(X, **kwargs)
+
+        :Parameters:
+            *X*: :class:`numpy.array` (*n*, *Dim*)
+                Coordinates of the points to project
+
+        :Returns:
+            *Y*: :class:`numpy.array` (*n*, *Dim*)
+                Closest point on the panels to each point
+            *I*: :class:`numpy.array` (*n*)
+                Index of the panel containing each closest point
+            *U*: :class:`numpy.array` (*n*, *Dim* - 1)
+                Reference coordinates of each closest point within its panel
+            *D*: :class:`numpy.array` (*n*)
+                Distance from each point to the panels
+
+        :Kwargs:
+            *nThread*: :class:`int`
+                Number of threads if compiled with OpenMP
+        """
+        # Linear cells of one panel
+        C, R = _LagrangeSubCells(self.Basis, self.Order)
+        m = C.shape[0]
+        # Linear cells of all panels
+        P = self.Panels[:, C].reshape(-1, C.shape[1])
+        Y, I, W, D = px.ProjectPoints(self.Coord, P, X,
+            kwargs.get('nThread', 1))
+        # Reference coordinates of the vertices of each cell
+        RC = R[C[I % m]]
+        U = RC[:, 0]
+        for j in range(W.shape[1]):
+            U = U + W[:, j, None]*(RC[:, j+1] - RC[:, 0])
+        return Y, (I // m, U), D
+
+
+# Linear cells of a Lagrange panel
+def _LagrangeSubCells(Basis, Order):
+    """Node indices of linear sub-cells and reference node coordinates"""
+    q = Order
+    if Basis.startswith('Seg'):
+        R = np.arange(q+1)[:, None] / float(q)
+        C = [(i, i+1) for i in range(q)]
+        return np.array(C), R
+    elif Basis.startswith('Tri'):
+        # Nodes ordered by rows
+        ij = [(i, j) for j in range(q+1) for i in range(q+1-j)]
+        n = dict((v, k) for k, v in enumerate(ij))
+        C = []
+        for i, j in ij:
+            if i + j < q:
+                C.append((n[i, j], n[i+1, j], n[i, j+1]))
+            if i + j < q - 1:
+                C.append((n[i+1, j], n[i+1, j+1], n[i, j+1]))
+    elif Basis.startswith('Quad'):
+        ij = [(i, j) for j in range(q+1) for i in range(q+1)]
+        n = dict((v, k) for k, v in enumerate(ij))
+        C = []
+        for i, j in ij:
+            if i < q and j < q:
+                C.append((n[i, j], n[i+1, j], n[i+1, j+1]))
+                C.append((n[i, j], n[i+1, j+1], n[i, j+1]))
+    else:
+        raise TypeError("Projection onto '%s' panels is not supported" % Basis)
+    return np.array(C), np.array(ij, dtype=float) / q
+
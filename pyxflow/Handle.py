@@ -0,0 +1,96 @@
+"""
+The *Handle* module contains the base class of the pyXFlow interfaces to XFlow
+structs, which gives them a :func:`close` method and lets them be used in
+``with`` statements.
+
+Closing an interface that owns its struct (for example an
+:class:`pyxflow.All.xf_All` read from a file) frees the struct right away
+instead of whenever the interface is garbage-collected.  Every interface
+reached from it, such as ``All.Mesh`` or the element groups and arrays of the
+data set, is closed along with it, since their arrays point into the freed
+memory.  Any later use of a closed interface raises a :class:`ValueError`.
+"""
+
+# Weak references to interfaces created on request
+import weakref
+
+
+# ------- Base class -------
+class xf_Handle:
+    """
+    Base class for pyXFlow interfaces that can be closed
+
+    :Call:
+        >>> H.close()
+        >>> with H:
+        ...     pass
+
+    :Data members:
+        *H.closed*: :class:`bool`
+            Whether or not the interface has been closed
+    """
+
+    # Not closed until close() is called
+    closed = False
+
+    # Free the struct; overloaded by interfaces that own one
+    def _Destroy(self):
+        pass
+
+    # Keep track of an interface created from this one
+    def _Adopt(self, child):
+        """
+        Close *child* along with this interface; returns *child*
+        """
+        kids = [r for r in self.__dict__.get('_kids', []) if r() is not None]
+        kids.append(weakref.ref(child))
+        self.__dict__['_kids'] = kids
+        return child
+
+    # Close method
+    def close(self):
+        """
+        Free the struct (if owned) and close all interfaces into it
+
+        :Call:
+            >>> H.close()
+        """
+        D = self.__dict__
+        if D.get('closed'):
+            return
+        # Interfaces to the same struct are closed with it.
+        if D.get('_ptr') is not None or D.get('ptr') is not None:
+            for v in list(D.values()):
+                for c in (v if isinstance(v, list) else [v]):
+                    if isinstance(c, xf_Handle):
+                        c.close()
+            for r in D.get('_kids', []):
+                c = r()
+                if c is not None:
+                    c.close()
+        # Free the struct.
+        if D.get('owner') and D.get('_ptr') is not None:
+            self._Destroy()
+        # Drop all of the data, including views of the freed memory.
+        D.clear()
+        D['closed'] = True
+
+    # Context manager
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    # Destructor
+    def __del__(self):
+        # Only interfaces that free memory close others implicitly.
+        if self.__dict__.get('owner'):
+            self.close()
+
+    # Errors for closed interfaces
+    def __getattr__(self, name):
+        if self.__dict__.get('closed') and not name.startswith('__'):
+            raise ValueError("%s has been closed" % self.__class__.__name__)
+        raise AttributeError(name)
@@ -0,0 +1,209 @@
+"""
+The *Load* module reads many XFlow solutions at once, for example the steps of
+an adaptation history or the cases of a parameter sweep.
+
+Because libXF keeps global state, each file is read by a separate worker
+process rather than a thread.  The workers copy the requested arrays into
+memory-mapped files in a shared-memory folder (``/dev/shm`` if available), and
+the parent process maps the same files, so the arrays are not pickled or
+copied a second time on their way back.  The files are unlinked as soon as the
+parent has mapped them, so the memory is released when the arrays are deleted.
+"""
+
+# ------- Modules required -------
+# Used for more efficient data storage
+import numpy as np
+# The background pyxflow workhorse module
+import pyxflow._pyxflow as px
+# File names and temporary storage
+import os
+import shutil
+import tempfile
+
+
+# ------- Functions -------
+def LoadMany(fnames, mesh=True, vectors=None, scalars=None, **kwargs):
+    """
+    Read arrays from several *.xfa* files in parallel.
+
+    :Call:
+        >>> D = LoadMany(fnames, mesh=True, vectors=None, scalars=None,
+            **kwargs)
+
+    :Parameters:
+        *fnames*: :class:`str` list
+            Names of files to read (usually end in ``'.xfa'``)
+        *mesh*: :class:`bool`
+            Whether or not to return the mesh nodes and element node lists
+        *vectors*: :class:`str` list
+            Roles of vectors in the state vector group to return, for example
+            ``['ElemState']``
+        *scalars*: :class:`str` list
+            Names of equation set scalars to evaluate at the sub-nodes of
+            each element
+
+    :Returns:
+        *D*: :class:`dict` list
+            Arrays from each file, in the same order as *fnames*.  Depending on
+            the inputs, each dictionary has the following keys.
+
+            * ``'Coord'``: node coordinates, (*nNode*, *dim*)
+            * ``'Node'``: list of element node arrays for each element group
+            * *role*: list of *rValue* arrays for each element group
+            * ``'X'``: list of sub-node coordinates for each element group
+            * ``'T'``: list of sub-element node indices for each element group
+            * *scalar*: list of scalar values for each element group
+
+    :Kwargs:
+        *nProc*: :class:`int`
+            Number of worker processes; default is the number of processors
+        *vgroup*: :class:`str`
+            Name of vector group; default is the primal state
+        *order*: :class:`int`
+            Subdivision order for the scalars; default is based on the
+            solution order
+        *dir*: :class:`str`
+            Folder for the shared arrays; default is ``'/dev/shm'`` if it
+            exists and the temporary folder otherwise
+
+    :Examples:
+        Read the mesh and state from each step of an adaptation.
+
+            >>> fnames = ["naca_adapt_%i.xfa" % i for i in range(10)]
+            >>> D = LoadMany(fnames, vectors=["ElemState"], nProc=4)
+            >>> D[3]['Coord'].shape
+            (2734, 2)
+    """
+    # Processes are forked so that workers have their own libXF state.
+    import multiprocessing
+    # Process the lists of vectors and scalars.
+    if vectors is None:
+        vectors = []
+    elif isinstance(vectors, str):
+        vectors = [vectors]
+    if scalars is None:
+        scalars = []
+    elif isinstance(scalars, str):
+        scalars = [scalars]
+    # Folder for the shared arrays
+    fdir = kwargs.get('dir')
+    if fdir is None:
+        if os.path.isdir('/dev/shm'):
+            fdir = '/dev/shm'
+        else:
+            fdir = tempfile.gettempdir()
+    # Private folder for the shared files from this call
+    sdir = tempfile.mkdtemp(prefix='pyxflow-', dir=fdir)
+    # Options for the workers
+    opts = {'order': kwargs.get('order'), 'vgroup': kwargs.get('vgroup')}
+    # One job per file
+    jobs = [(fname, os.path.join(sdir, '%i-' % i), mesh, vectors, scalars,
+        opts) for i, fname in enumerate(fnames)]
+    # Number of processes
+    nProc = kwargs.get('nProc') or multiprocessing.cpu_count()
+    nProc = max(1, min(nProc, len(fnames)))
+    # Read the files.
+    pool = multiprocessing.Pool(nProc)
+    D = []
+    try:
+        for meta in pool.imap(_LoadOne, jobs):
+            D.append(_Attach(meta))
+    finally:
+        pool.close()
+        pool.join()
+        # Remove the folder and any files left by a failure.
+        shutil.rmtree(sdir, ignore_errors=True)
+    return D
+
+
+def _LoadOne(job):
+    """Read one file and copy the arrays to shared files (worker)"""
+    # Avoid importing xf_All in the parent's namespace at import time.
+    from pyxflow.All import xf_All
+    fname, prefix, mesh, vectors, scalars, opts = job
+    # List of (key, index, shared array)
+    meta = []
+    try:
+        All = xf_All(fname)
+        Mesh = All.Mesh
+        # Mesh arrays
+        if mesh:
+            meta.append(('Coord', None, _Share(Mesh.Coord, prefix, len(meta))))
+            for egrp in range(Mesh.nElemGroup):
+                meta.append(('Node', egrp,
+                    _Share(Mesh.ElemGroup[egrp].Node, prefix, len(meta))))
+        # Vector group
+        if vectors or scalars:
+            if opts['vgroup'] is None:
+                UG = All.GetPrimalState()
+            else:
+                UG = All.GetVectorGroup(opts['vgroup'])
+        # Vectors
+        for role in vectors:
+            U = UG.GetVector(role)
+            for egrp, GA in enumerate(U.GenArray):
+                meta.append((role, egrp,
+                    _Share(GA.rValue, prefix, len(meta))))
+        # Scalars at the sub-nodes
+        if scalars:
+            U = UG.GetVector('ElemState')
+            for egrp in range(Mesh.nElemGroup):
+                X, T, V, S = px.ElemGroupSubData(U._ptr, Mesh._ptr,
+                    All.EqnSet._ptr, egrp, 0, Mesh.ElemGroup[egrp].nElem,
+                    scalars, opts['order'])
+                meta.append(('X', egrp, _Share(X, prefix, len(meta))))
+                meta.append(('T', egrp, _Share(T, prefix, len(meta))))
+                for k, name in enumerate(scalars):
+                    meta.append((name, egrp,
+                        _Share(S[:, k], prefix, len(meta))))
+        # Release the solution before returning.
+        del All, Mesh
+    except Exception:
+        # Clean up the files from this job.
+        for key, i, (f, dtype, shape, sizes) in meta:
+            if f is not None:
+                os.remove(f)
+        raise
+    return meta
+
+
+def _Share(a, prefix, k):
+    """Copy an array to a memory-mapped file; returns its description"""
+    # Variable-order arrays are lists of one array per element.
+    if isinstance(a, list):
+        sizes = [b.size for b in a]
+        a = np.concatenate([np.ravel(b) for b in a])
+    else:
+        sizes = None
+    a = np.ascontiguousarray(a)
+    # Empty files cannot be mapped.
+    if a.size == 0:
+        return None, a.dtype.str, a.shape, sizes
+    # Write the array.
+    f = '%s%i' % (prefix, k)
+    m = np.memmap(f, dtype=a.dtype, mode='w+', shape=a.shape)
+    m[...] = a
+    m.flush()
+    del m
+    return f, a.dtype.str, a.shape, sizes
+
+
+def _Attach(meta):
+    """Map the shared files from one worker and assemble the dictionary"""
+    D = {}
+    for key, i, (f, dtype, shape, sizes) in meta:
+        # Map the file, which can be removed once it is mapped.
+        if f is None:
+            a = np.empty(shape, dtype=dtype)
+        else:
+            a = np.memmap(f, dtype=dtype, mode='r+', shape=shape)
+            os.remove(f)
+        # Split variable-order arrays.
+        if sizes is not None:
+            a = np.split(a, np.cumsum(sizes)[:-1])
+        # Save it.
+        if i is None:
+            D[key] = a
+        else:
+            D.setdefault(key, []).append(a)
+    return D
@@ -18,18 +18,18 @@ shifting the node locations and rewriting the mesh to file.
 import numpy as np
 # The background pyxflow workhorse module
 from . import _pyxflow as px
-# Matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.collections import LineCollection
-
-# Import the plot class
-from pyxflow.Plot import xf_Plot, GetXLims
+# Import the plot class (matplotlib is loaded on first use)
+from pyxflow.Plot import xf_Plot, GetXLims, GetPlane, plt
+# Optional performance counters
+from pyxflow import perf
+# Base class with close() and context managers
+from pyxflow.Handle import xf_Handle
 
 # ------- CLASSES -------
 # --- Class to represent the (full) mesh ---
 
 
-class xf_Mesh:
+class xf_Mesh(xf_Handle):
     """
     A Python class for XFlow mesh objects.
     
@@ -72,6 +72,12 @@ class xf_Mesh:
         
             >>> Mesh = xf_Mesh("naca_quad.gri")
         
+        The mesh is freed when it is closed, for example at the end of a
+        ``with`` block, and the interface cannot be used afterward.
+        
+            >>> with xf_Mesh("naca_quad.gri") as Mesh:
+            ...     X = Mesh.Coord.copy()
+        
         The other way that meshes are instantiated usually involves reading
         the mesh component of an *.xfa* file.
         
@@ -83,18 +89,6 @@ class xf_Mesh:
         changes to one will affect the other.
     """
 
-    # Parameters
-    _ptr = None
-    Dim = 0
-    nNode = 0
-    Coord = None
-    nIFace = 0
-    IFace = None
-    nBFaceGroup = 0
-    BFaceGroup = None
-    nElemGroup = 0
-    ElemGroup = None
-
     # Method to initialize the object
     def __init__(self, fname=None, ptr=None):
         """
@@ -103,6 +97,21 @@ class xf_Mesh:
         # Versions:
         #  2013-09-23 @dalle   : First version
 
+        # Parameters
+        self._ptr = None
+        self.owner = False
+        self.Dim = 0
+        self.nNode = 0
+        self.Coord = None
+        self.nIFace = 0
+        self.IFace = None
+        self.nBFaceGroup = 0
+        self.BFaceGroup = None
+        self.nElemGroup = 0
+        self.ElemGroup = None
+        self._bounds = None
+        self._boundsCoord = None
+
         # Check the parameters.
         if fname is not None:
             if ptr is not None:
@@ -141,18 +150,46 @@ class xf_Mesh:
                           for i in range(self.nElemGroup)]
 
     # Destructor method for xf_Mesh
-    def __del__(self):
+    def _Destroy(self):
         """
         xf_Mesh destructor
 
         This function reminds the pyxflow module to clean up the C
-        xf_Mesh object when the python object is deleted.
+        xf_Mesh object when the interface is closed or deleted.
         """
         # Version:
         #  2013-09-23 @dalle   : First version
 
-        if self.owner:
-            px.DestroyMesh(self._ptr)
+        px.DestroyMesh(self._ptr)
+
+    # Method to get element bounding boxes
+    def GetElemBounds(self):
+        """
+        Get the bounding box of the nodes of each element.
+        
+        The bounds are saved so that repeated slices of a three-dimensional
+        mesh only do significant work for the elements that the slice plane
+        crosses.  A copy of the node coordinates is saved with them, and the
+        bounds are recalculated if the nodes have moved since.
+        
+        :Call:
+            >>> B = Mesh.GetElemBounds()
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh to be processed
+        
+        :Returns:
+            *B*: :class:`numpy.array` (*nElem*, 2 * *Dim*)
+                Minimum coordinates followed by maximum coordinates of each
+                element, with element groups listed in order
+        """
+        # Recalculate the bounds if the nodes have moved since.
+        if self._bounds is None or not np.array_equal(self.Coord,
+                self._boundsCoord):
+            self._bounds = px.ElemBounds(self._ptr)
+            self._boundsCoord = self.Coord.copy()
+        return self._bounds
 
     # Plot method for mesh
     def Plot(self, Plot=None, **kwargs):
@@ -181,7 +218,11 @@ class xf_Mesh:
             *line_options*: :class:`dict`
                 Options for :class:`matplotlib.pyplot.LineCollection`
                 
-            See also kwargs for :func:`pyxflow.Plot.GetXLims`
+            See also kwargs for :func:`pyxflow.Plot.GetXLims`; for 3D meshes,
+            the mesh is sliced by a plane (see :func:`pyxflow.Plot.GetPlane`)
+            
+            If ``Plot.tiles`` is not ``None``, the plot data is extracted
+            using the tile cache; see :func:`pyxflow.Plot.xf_Plot.UseTileCache`
         
         :Examples:
             The following loads an airfoil mesh and plots the portion of it
@@ -204,6 +245,8 @@ class xf_Mesh:
         elif not isinstance(Plot, xf_Plot):
             raise IOError("Plot handle must be instance of " +
                 "pyxflow.plot.xf_Plot")
+        # Save the inputs for redrawing.
+        Plot._sources['mesh'] = (self.Plot, dict(kwargs))
         # Use specified defaults for plot window if they exist.
         kwargs.setdefault('xmindef', Plot.xmin)
         kwargs.setdefault('xmaxdef', Plot.xmax)
@@ -236,7 +279,18 @@ class xf_Mesh:
 
         # Get the plot data for each element.
         # It's a list of the node indices in each mesh element.
-        x, y, c = px.MeshPlotData(self._ptr, xLimMin, xLimMax, Order)
+        if Plot.tiles is not None and self.Dim < 3:
+            # Use the cached tiles.
+            x, y, c = Plot.tiles.MeshPlotData(self, xLimMin, xLimMax, Order)
+            # Redraw when the limits change.
+            if Plot._track: Plot.TrackLimits()
+        elif self.Dim == 3:
+            # Slice the mesh.
+            plane = GetPlane(self, xLimMin, xLimMax, **kwargs)
+            x, y, c = px.MeshPlotData(self._ptr, xLimMin, xLimMax, Order,
+                0.5, plane, self.GetElemBounds())
+        else:
+            x, y, c = px.MeshPlotData(self._ptr, xLimMin, xLimMax, Order)
         # Turn this into a list of coordinates.
         s = []
         for f in range(len(c) - 1):
@@ -247,11 +301,18 @@ class xf_Mesh:
         # Set the default color.
         line_options.setdefault('colors', (0,0,0,1))
         # Create the lines efficiently.
-        hl = LineCollection(s, **line_options)
+        from matplotlib.collections import LineCollection
+        with perf.timer('LineCollection'):
+            hl = LineCollection(s, **line_options)
         # Plot them.
         Plot.axes.add_collection(hl)
         # Apply the bounding box that was created earlier.
-        if kwargs.get('reset_limits', True):
+        if kwargs.get('reset_limits', True) and self.Dim == 3:
+            # Use the extents of the slice.
+            if len(x) > 0:
+                Plot.axes.set_xlim(x.min(), x.max())
+                Plot.axes.set_ylim(y.min(), y.max())
+        elif kwargs.get('reset_limits', True):
             Plot.axes.set_xlim(xLimMin[0], xLimMax[0])
             Plot.axes.set_ylim(xLimMin[1], xLimMax[1])
         # Store the handle to the line collection.
@@ -267,7 +328,7 @@ class xf_Mesh:
 # --- Class for boundary face groups ---
 
 
-class xf_BFaceGroup:
+class xf_BFaceGroup(xf_Handle):
     """
     Boundary face group object for :mod:`pyxflow`
     
@@ -294,6 +355,8 @@ class xf_BFaceGroup:
             Name of the group, often *All->Mesh->BFaceGroup[i]->Title*
         *BG.nBFace*: :class:`int`
             Number of boundary faces in the group
+        *BG.i*: :class:`int`
+            Index of the group in the mesh
     """
     # Versions:
     #  2013-09-24 @dalle   : _pyxflow version
@@ -306,18 +369,93 @@ class xf_BFaceGroup:
         self.Title = Title
         self.nBFace = nBFace
         self.BFace = None
+        self.i = i
         self._ptr = None
+        self._Mesh = ptr
         # Check for a pointer.
         if ptr is not None:
             # index
             if i is None:
                 i = 0
+            self.i = i
             # Fields
             self.Title, self.nBFace, self._ptr = px.BFaceGroup(ptr, i)
+            
+    # Method to evaluate scalars along the boundary
+    def ExtractScalar(self, All, names=None, order=None, **kwargs):
+        """
+        Evaluate scalars at the subdivided nodes of each face in the group
+        
+        All faces are evaluated in a single call to the C API, and in two
+        dimensions the faces are then chained together so that the outputs are
+        ordered along the boundary.
+        
+        :Call:
+            >>> s, X, V = BG.ExtractScalar(All, names=None, order=None)
+        
+        :Parameters:
+            *BG*: :class:`pyxflow.Mesh.xf_BFaceGroup`
+                Boundary face group
+            *All*: :class:`pyxflow.All.xf_All`
+                Solution containing the mesh, equation set, and state
+            *names*: :class:`str` or :class:`str` list
+                Name of scalar or list of names; ``None`` uses the first state
+            *order*: :class:`int`
+                Face subdivision order; default is based on the mesh order
+        
+        :Returns:
+            *s*: :class:`numpy.array` (*np*) or ``None``
+                Arc length along the boundary, without the gaps between
+                disjoint curves (two-dimensional meshes only)
+            *X*: :class:`numpy.array` (*np*, *Dim*)
+                Coordinates of the sub-nodes
+            *V*: :class:`numpy.array` (*np*) or (*np*, *ns*)
+                Value of each scalar; one-dimensional if *names* is a string
+        
+        :Kwargs:
+            *role*: :class:`str`
+                Identifier for the vector to use; default is ``'ElemState'``
+            *vgroup*: :class:`str`
+                Name of vector group; default is the primal state
+        
+        :Examples:
+            The following gets the pressure along an airfoil surface.
+            
+                >>> All = xf_All("naca_adapt_0.xfa")
+                >>> BG = All.Mesh.BFaceGroup[0]
+                >>> s, X, p = BG.ExtractScalar(All, "Pressure")
+        """
+        # Determine the vector group to use.
+        vgroup = kwargs.get("vgroup")
+        if vgroup is None:
+            UG = All.GetPrimalState()
+        else:
+            UG = All.GetVectorGroup(vgroup)
+        # Get the vector.
+        U = UG.GetVector(kwargs.get("role", "ElemState"))
+        # Process the list of names.
+        if isinstance(names, (list, tuple)):
+            Names = list(names)
+        else:
+            Names = [names]
+        # Evaluate the scalars at each face.
+        X, V, C = px.BFaceScalarData(U._ptr, All.Mesh._ptr, All.EqnSet._ptr,
+            self.i, Names, order)
+        # Order the faces along the boundary in two dimensions.
+        if All.Mesh.Dim == 2:
+            s, I = ChainFaces(X, C)
+            X = X[I]
+            V = V[I]
+        else:
+            s = None
+        # Return a vector for a single scalar.
+        if not isinstance(names, (list, tuple)):
+            V = V[:, 0]
+        return s, X, V
 
 
 # --- Class for boundary face groups ---
-class xf_ElemGroup:
+class xf_ElemGroup(xf_Handle):
 
     """
     Element group object for :mod:`pyxflow`
@@ -367,6 +505,95 @@ class xf_ElemGroup:
                 self.Node) = px.ElemGroup(ptr, i)
 
 
+# --- Function to order boundary faces ---
+def ChainFaces(X, C):
+    """
+    Order the sub-nodes of a set of two-dimensional faces along a curve
+    
+    The faces are connected end to end by matching their end points.  Shared
+    end points are only listed once, and each disjoint curve is appended
+    after the previous one.  The arc length carries on from one curve to the
+    next without counting the gap between them.
+    
+    :Call:
+        >>> s, I = ChainFaces(X, C)
+    
+    :Parameters:
+        *X*: :class:`numpy.array` (*np*, 2)
+            Coordinates of the sub-nodes of each face
+        *C*: :class:`numpy.array` (*nFace* + 1)
+            Offsets; face ``f`` has sub-nodes ``C[f]`` to ``C[f+1]-1``
+    
+    :Returns:
+        *s*: :class:`numpy.array` (*n*)
+            Arc length at each ordered sub-node
+        *I*: :class:`numpy.array` (*n*)
+            Indices of the sub-nodes in order
+    """
+    # Number of faces
+    nFace = len(C) - 1
+    if nFace == 0:
+        return np.zeros(0), np.zeros(0, dtype=int)
+    # Tolerance for matching end points
+    tol = 1e-9 * max(np.ptp(X, axis=0).max(), 1e-300)
+    # Rounded end points of each face
+    A = [tuple(a) for a in np.round(X[C[:-1]] / tol).astype(np.int64)]
+    B = [tuple(b) for b in np.round(X[C[1:]-1] / tol).astype(np.int64)]
+    # Faces touching each end point
+    F = {}
+    for f in range(nFace):
+        F.setdefault(A[f], []).append(f)
+        F.setdefault(B[f], []).append(f)
+    # Faces that have been used
+    used = np.zeros(nFace, dtype=bool)
+    # Prefer to start curves at end points with only one face.
+    start = [f for f in range(nFace) if len(F[A[f]]) == 1] + \
+        [f for f in range(nFace) if len(F[B[f]]) == 1] + range(nFace)
+    # Ordered list of sub-node index arrays
+    I = []
+    # Number of ordered sub-nodes and the first one of each curve
+    n = 0
+    K = []
+    # Loop until all faces are used.
+    for f0 in start:
+        if used[f0]:
+            continue
+        K.append(n)
+        # Direction of the first face
+        if len(F[B[f0]]) == 1 and len(F[A[f0]]) != 1:
+            # Reverse so that the free end is first.
+            I.append(np.arange(C[f0+1]-1, C[f0]-1, -1))
+            p = A[f0]
+        else:
+            I.append(np.arange(C[f0], C[f0+1]))
+            p = B[f0]
+        used[f0] = True
+        n += len(I[-1])
+        # Follow the curve.
+        while True:
+            # Find an unused face at the current end point.
+            f = [g for g in F[p] if not used[g]]
+            if len(f) == 0:
+                break
+            f = f[0]
+            used[f] = True
+            # Skip the shared end point and orient the face.
+            if A[f] == p:
+                I.append(np.arange(C[f]+1, C[f+1]))
+                p = B[f]
+            else:
+                I.append(np.arange(C[f+1]-2, C[f]-1, -1))
+                p = A[f]
+            n += len(I[-1])
+    # Assemble the indices.
+    I = np.hstack(I)
+    # Arc length, without the jumps from one curve to the next
+    ds = np.sqrt(np.sum(np.diff(X[I], axis=0)**2, axis=1))
+    ds[np.array(K[1:], dtype=int) - 1] = 0.0
+    s = np.hstack(([0.0], np.cumsum(ds)))
+    return s, I
+
+
 # --- Class for boundary faces ---
 class xf_BFace:
     """
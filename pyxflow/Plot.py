@@ -6,23 +6,44 @@ plotting capabilities.  The data members
 # Background pyxflow module
 from . import _pyxflow as px
 
-# Import plotting functions
-import matplotlib.pyplot as plt
-# Line collection
-from matplotlib.collections import LineCollection
-# Color conversion
-from matplotlib.colors import colorConverter
-# Import the customizable colormap class
-from matplotlib.colors import LinearSegmentedColormap
-
-# Import matplotlib
-from matplotlib import rcParams
-# Move those damn ticks to the outside.
-rcParams['xtick.direction'] = 'out'
-rcParams['ytick.direction'] = 'out'
-
 # Variable testing
 import numpy as np
+# Ordered dictionary for least-recently-used tile eviction
+from collections import OrderedDict
+# Tile index ranges
+import itertools
+
+# Matplotlib is imported the first time it is needed so that reading and
+# processing solutions does not load it.
+_plt = None
+
+
+def _pyplot():
+    """Import :mod:`matplotlib.pyplot` and apply the pyxflow defaults"""
+    global _plt
+    if _plt is None:
+        # Import matplotlib
+        import matplotlib.pyplot
+        from matplotlib import rcParams
+        # Move those damn ticks to the outside.
+        rcParams['xtick.direction'] = 'out'
+        rcParams['ytick.direction'] = 'out'
+        _plt = matplotlib.pyplot
+    return _plt
+
+
+class _LazyPyplot(object):
+    """Stand-in for :mod:`matplotlib.pyplot` that imports it on first use"""
+    def __getattr__(self, name):
+        return getattr(_pyplot(), name)
+
+
+# Plotting functions
+plt = _LazyPyplot()
+
+# Keyword arguments that specify the plot window
+_WindowKeys = ['xmin', 'xmax', 'xlim', 'ymin', 'ymax', 'ylim',
+    'zmin', 'zmax', 'zlim', 'xmindef', 'xmaxdef']
 
 # Class for xf_Plot objects
 class xf_Plot:
@@ -59,6 +80,8 @@ class xf_Plot:
             List of minimum coordinate in the plot window for each dimension
         *h.xmax*: :class:`float` list
             List of maximum coordinate in the plot window for each dimension
+        *h.tiles*: :class:`pyxflow.Plot.xf_TileCache` or ``None``
+            Cache of extracted plot data; see :func:`UseTileCache`
     
     :Kwargs:
         The kwargs are passed to :func:`pyxflow.Mesh.Plot()` or
@@ -84,6 +107,13 @@ class xf_Plot:
         # Store the limits.
         self.xmin = None
         self.xmax = None
+        # Extraction cache (off by default)
+        self.tiles = None
+        # Sources of the mesh and scalar plots for redrawing
+        self._sources = {}
+        self._track = False
+        self._cid = None
+        self._timer = None
             
         # Determine if an input allows plots to be made.
         if All is not None:
@@ -144,6 +174,122 @@ class xf_Plot:
         
 
     
+    # Method to turn on the tile cache
+    def UseTileCache(self, maxbytes=268435456, ntile=4, track=True):
+        """
+        Keep a spatial tile cache of extracted plot data
+        
+        Subsequent calls to :func:`pyxflow.Mesh.xf_Mesh.Plot` and
+        :func:`pyxflow.DataSet.xf_Vector.Plot` with this plot handle extract
+        data one quadtree tile at a time, so that panning or zooming only
+        extracts the tiles that have not been seen before.
+        
+        :Call:
+            >>> Plot.UseTileCache(maxbytes=268435456, ntile=4, track=True)
+        
+        :Parameters:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Plot handle
+            *maxbytes*: :class:`int`
+                Maximum memory used by cached tiles before eviction
+            *ntile*: :class:`int`
+                Approximate number of tiles across the plot window
+            *track*: :class:`bool`
+                Whether or not to redraw when the axes limits are changed
+        
+        :Returns:
+            ``None``
+        """
+        # Create the cache.
+        self.tiles = xf_TileCache(maxbytes=maxbytes, ntile=ntile)
+        # Follow the axes limits if requested.
+        self._track = track
+        if track:
+            self.TrackLimits()
+        return None
+        
+    
+    # Method to redraw the plot when the axes limits change
+    def TrackLimits(self):
+        """
+        Redraw mesh and scalar plots when the axes limits are changed
+        
+        This is usually called by :func:`UseTileCache`, and it is most useful
+        when a tile cache is active.
+        
+        :Call:
+            >>> Plot.TrackLimits()
+        
+        :Parameters:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Plot handle
+        
+        :Returns:
+            ``None``
+        """
+        # Check for existing callbacks.
+        if self._cid is not None or self.axes is None:
+            return None
+        # Connect both limit callbacks to the same method; it redraws once
+        # after both limits have changed.
+        self._cid = [
+            self.axes.callbacks.connect('xlim_changed', self._LimitsChanged),
+            self.axes.callbacks.connect('ylim_changed', self._LimitsChanged)]
+        return None
+        
+        
+    # Callback for changed axes limits
+    def _LimitsChanged(self, ax):
+        """
+        Schedule a redraw of the stored plot sources
+        """
+        # Panning and zooming set the x limits and then the y limits, so the
+        # redraw waits until the event loop is idle and is done once.
+        if self._timer is None:
+            # Import here, since matplotlib has been loaded by now.
+            from matplotlib.backend_bases import TimerBase
+            timer = ax.figure.canvas.new_timer(interval=0)
+            # Canvases without an event loop have timers that never fire.
+            if type(timer) is TimerBase:
+                return self._Redraw(ax)
+            timer.single_shot = True
+            timer.add_callback(self._Redraw, ax)
+            self._timer = timer
+        # Restart the timer.
+        self._timer.stop()
+        self._timer.start()
+        return None
+        
+    # Redraw for the current axes limits
+    def _Redraw(self, ax):
+        """
+        Redraw the stored plot sources using the new axes limits
+        """
+        # Current limits
+        xlim = ax.get_xlim()
+        ylim = ax.get_ylim()
+        # Check if there is anything to do.
+        if self.xmin is None or len(self.xmin) != 2:
+            return None
+        if np.allclose([xlim[0], ylim[0]], self.xmin) and \
+                np.allclose([xlim[1], ylim[1]], self.xmax):
+            return None
+        # Redraw each of the sources.
+        for k in ['mesh', 'scalar']:
+            # Check for the source.
+            if k not in self._sources:
+                continue
+            # Unpack the method and keyword arguments.
+            f, kw = self._sources[k]
+            # Remove any other window specifications.
+            kw = dict((j, kw[j]) for j in kw if j not in _WindowKeys)
+            # Use the new limits and keep them.
+            kw.update(xlim=[xlim[0], xlim[1], ylim[0], ylim[1]],
+                Plot=self, axes=ax, reset_limits=False)
+            f(**kw)
+        return None
+        
+
     # Method to show a damn colorbar (why is this so difficult?)
     def ShowColorbar(self, **kwargs):
         """
@@ -354,8 +500,578 @@ class xf_Plot:
         if self.contour is not None:
             set_colormap(self.contour, colorList)
         return None
+        
+    # Method to animate a sequence of vectors
+    def Animate(self, Mesh, EqnSet, frames, scalar=None, fname=None,
+            **kwargs):
+        """
+        Animate a scalar for a sequence of vectors on a fixed plot window
+        
+        The first frame is plotted normally using
+        :func:`pyxflow.DataSet.xf_Vector.Plot`.  For the remaining frames,
+        only the scalar values at the plot nodes are extracted (using
+        :func:`pyxflow._pyxflow.ScalarPlotValues`) and copied into the
+        existing artist, so the triangulation is never rebuilt.  The values
+        for the next frame are extracted in a background thread while the
+        current frame is drawn and written.
+        
+        :Call:
+            >>> Plot.Animate(Mesh, EqnSet, frames, scalar=None, fname=None,
+                **kwargs)
+        
+        :Parameters:
+            *Plot*: :class:`pyxflow.Plot.xf_Plot`
+                Plot handle
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh for geometry data required for plotting
+            *EqnSet*: :class:`pyxflow.All.xf_EqnSet`
+                Equation set data
+            *frames*: :class:`pyxflow.DataSet.xf_Vector` list
+                Vector for each frame
+            *scalar*: :class:`str`
+                Name of scalar to plot
+            *fname*: :class:`str`
+                Name of movie file to write, or a pattern such as
+                ``'frame%04i.png'`` to write numbered images; if ``None``,
+                the frames are only drawn
+        
+        :Returns:
+            ``None``
+        
+        :Kwargs:
+            *fps*: :class:`int`
+                Frames per second for movie files
+            *dpi*: :class:`int`
+                Resolution of frames
+            *writer*: :class:`str`
+                Name of :mod:`matplotlib.animation` movie writer that encodes
+                frames through a pipe; default is ``'ffmpeg'``
+            *clim*: :class:`float` list
+                Fixed color limits; default uses the limits of first frame
+            
+            The remaining kwargs are passed to
+            :func:`pyxflow.DataSet.xf_Vector.Plot`
+        
+        :Examples:
+            Write a movie of the pressure for the first 100 time steps.
+            
+                >>> All = xf_All("cylinder.xfa")
+                >>> U = [All.GetPrimalState(i).GetVector() for i in range(100)]
+                >>> Plot = xf_Plot()
+                >>> Plot.Animate(All.Mesh, All.EqnSet, U, "Pressure",
+                    fname="cylinder.mp4", fps=30)
+        """
+        # Thread-safe queue for overlapping extraction and rendering
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+        import threading
+        # List of frames
+        frames = list(frames)
+        if len(frames) == 0:
+            return None
+        # Only defined for color plots.
+        if Mesh.Dim < 2:
+            raise RuntimeError("Animation requires a 2D or 3D mesh.")
+        # The values have to line up with the first frame.
+        tiles = self.tiles
+        self.tiles = None
+        kwargs.pop('raster', None)
+        # Plot the first frame.
+        frames[0].Plot(Mesh, EqnSet, scalar=scalar, Plot=self, **kwargs)
+        self.tiles = tiles
+        # Fix the color limits.
+        if kwargs.get('clim') is not None:
+            self.scalar.set_clim(kwargs['clim'])
+        # Extraction inputs (same as the first frame)
+        xmin = self.xmin
+        xmax = self.xmax
+        Order = kwargs.get('order')
+        if Mesh.Dim == 3:
+            plane = GetPlane(Mesh, xmin, xmax, **kwargs)
+            bounds = Mesh.GetElemBounds()
+        else:
+            plane = None
+            bounds = None
+        # Extraction function
+        def extract(U):
+            return px.ScalarPlotValues(U._ptr, Mesh._ptr, EqnSet._ptr,
+                scalar, xmin, xmax, Order, 0.5, plane, bounds)
+        # Producer; extract the values for each frame in order.
+        Q = queue.Queue(maxsize=2)
+        stop = threading.Event()
+        def put(c):
+            # Wait for room, but give up if the main thread has stopped.
+            while not stop.is_set():
+                try:
+                    Q.put(c, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        def produce():
+            for U in frames[1:]:
+                try:
+                    c = extract(U)
+                except Exception as e:
+                    # Pass the error on to the main thread.
+                    put(e)
+                    return
+                if not put(c):
+                    return
+        thread = threading.Thread(target=produce)
+        thread.daemon = True
+        # Number of nodes in the first frame
+        n = len(self.scalar.get_array())
+        # Process the output options.
+        dpi = kwargs.get('dpi', 100)
+        if fname is None:
+            # Only draw.
+            writer = None
+        elif '%' in fname:
+            # Numbered images
+            writer = None
+            self.figure.savefig(fname % 0, dpi=dpi)
+        else:
+            # Movie encoded through a pipe
+            from matplotlib import animation
+            Writer = animation.writers[kwargs.get('writer', 'ffmpeg')]
+            writer = Writer(fps=kwargs.get('fps', 24))
+            writer.setup(self.figure, fname, dpi)
+        # Start extracting.
+        thread.start()
+        try:
+            # Write the first frame.
+            if writer is not None:
+                writer.grab_frame()
+            # Loop through the remaining frames.
+            for i in range(1, len(frames)):
+                # Get the values.
+                c = Q.get()
+                if isinstance(c, Exception):
+                    raise c
+                # Check for a change in the plot nodes.
+                if len(c) != n:
+                    raise RuntimeError(
+                        "Frame %i does not have the same plot nodes." % i)
+                # Update the artist.
+                self.scalar.set_array(c)
+                # Render the frame.
+                if writer is not None:
+                    writer.grab_frame()
+                elif fname is not None:
+                    self.figure.savefig(fname % i, dpi=dpi)
+                elif plt.isinteractive():
+                    plt.draw()
+        finally:
+            # Stop the producer, even if it is waiting for room.
+            stop.set()
+            while True:
+                try:
+                    Q.get_nowait()
+                except queue.Empty:
+                    break
+            thread.join()
+            # Close the pipe so the movie process exits.
+            if writer is not None:
+                writer.finish()
+        return None
 
 
+# Class for cached plot data tiles
+class xf_TileCache:
+    """
+    Spatial cache of extracted plot data for :class:`pyxflow.Plot.xf_Plot`
+    
+    The bounding box of each mesh is divided into a quadtree of tiles.  The
+    level of the tree is chosen so that roughly *ntile* tiles span the plot
+    window, and each tile is extracted separately and stored.  When the total
+    size of the stored arrays exceeds *maxbytes*, the least-recently used
+    tiles are discarded.
+    
+    Each element belongs to exactly one tile, so no element is drawn twice.
+    An element is stored at the deepest level whose tiles are at least as
+    large as its node bounding box, in the tile that contains the center of
+    that box.  Elements that are larger than the tiles of the plot window are
+    thus found in the tiles of coarser levels.  The elements are binned from
+    their bounding boxes once per mesh and level, and each tile is extracted
+    from its own list of elements, so a missing tile does not search the
+    whole mesh.
+    
+    :Call:
+        >>> T = xf_TileCache(maxbytes=268435456, ntile=4)
+    
+    :Parameters:
+        *maxbytes*: :class:`int`
+            Maximum memory used by cached tiles
+        *ntile*: :class:`int`
+            Approximate number of tiles across the plot window
+    
+    :Data members:
+        *T.nbytes*: :class:`int`
+            Total size of cached arrays
+        *T.hits*: :class:`int`
+            Number of tiles read from the cache
+        *T.misses*: :class:`int`
+            Number of tiles extracted
+    """
+    
+    # Deepest level of the quadtree
+    MaxLevel = 16
+    
+    # Initialization method
+    def __init__(self, maxbytes=268435456, ntile=4):
+        """
+        Initialization method for :class:`pyxflow.Plot.xf_TileCache`
+        """
+        # Options
+        self.maxbytes = maxbytes
+        self.ntile = ntile
+        # Cached tiles, oldest first
+        self.tile = OrderedDict()
+        # Bounding boxes of each mesh
+        self.bounds = {}
+        # Element centers and levels of each mesh, and the bins of each level
+        self.elems = {}
+        self.bins = {}
+        # Statistics
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        
+    # Method to empty the cache
+    def Clear(self):
+        """
+        Remove all tiles from the cache
+        
+        :Call:
+            >>> T.Clear()
+        """
+        self.tile = OrderedDict()
+        self.nbytes = 0
+        
+    # Get the bounding box of the tile grid for a mesh
+    def GetBounds(self, Mesh):
+        """
+        Get the bounding box of the tile grid for a mesh
+        
+        :Call:
+            >>> x0, x1 = T.GetBounds(Mesh)
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+        
+        :Returns:
+            *x0*: :class:`numpy.array` (*Dim*)
+                Minimum coordinates of level-0 tile
+            *x1*: :class:`numpy.array` (*Dim*)
+                Maximum coordinates of level-0 tile
+        """
+        # Check for an existing grid.
+        if Mesh._ptr not in self.bounds:
+            # Use the extents of the nodes.
+            x0 = Mesh.Coord.min(axis=0)
+            x1 = Mesh.Coord.max(axis=0)
+            # Avoid a degenerate grid.
+            x1 = np.maximum(x1, x0 + 1e-12)
+            self.bounds[Mesh._ptr] = (x0, x1)
+        return self.bounds[Mesh._ptr]
+        
+    # Get the elements of a mesh with their tile levels
+    def GetElems(self, Mesh):
+        """
+        Get the center and tile level of each element of a mesh
+        
+        :Call:
+            >>> E, u, s = T.GetElems(Mesh)
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+        
+        :Returns:
+            *E*: :class:`numpy.array` (*nElem*, 2)
+                Element group and element index of each element
+            *u*: :class:`numpy.array` (*nElem*, *Dim*)
+                Center of the node bounding box of each element, relative to
+                the level-0 tile
+            *s*: :class:`numpy.array` (*nElem*)
+                Deepest level whose tiles are at least as large as the
+                bounding box of each element
+        """
+        # Bounds of each element (recomputed if the nodes moved)
+        B = Mesh.GetElemBounds()
+        # Check for existing data for the same bounds.
+        if Mesh._ptr in self.elems and self.elems[Mesh._ptr][0] is B:
+            return self.elems[Mesh._ptr][1:]
+        # Forget the bins of the old bounds.
+        for k in [k for k in self.bins if k[0] == Mesh._ptr]:
+            del self.bins[k]
+        # Extents of the tile grid
+        x0, x1 = self.GetBounds(Mesh)
+        L = x1 - x0
+        d = len(x0)
+        # Element group and index of each row of the bounds
+        E = np.vstack([np.zeros((0, 2), dtype=np.intc)] + [
+            np.column_stack((np.repeat(np.intc(i), G.nElem),
+                np.arange(G.nElem, dtype=np.intc)))
+            for i, G in enumerate(Mesh.ElemGroup)])
+        # Centers and sizes relative to the level-0 tile
+        u = (0.5*(B[:, :d] + B[:, d:]) - x0) / L
+        r = ((B[:, d:] - B[:, :d]) / L).max(axis=1)
+        r = np.maximum(r, 2.0**-(self.MaxLevel+1))
+        # Deepest level with r*2**s <= 1, correcting the rounding of log2
+        s = np.floor(-np.log2(r))
+        s -= r * 2.0**s > 1
+        s += r * 2.0**(s+1) <= 1
+        s = np.clip(s, 0, self.MaxLevel).astype(int)
+        # Save them.
+        self.elems[Mesh._ptr] = (B, E, u, s)
+        return E, u, s
+        
+    # Get the elements in a tile
+    def GetTileElems(self, Mesh, key):
+        """
+        Get the elements stored in a tile
+        
+        The elements of each level are sorted by tile the first time that the
+        level is used, so that each tile is then a slice of that list.  The
+        elements are the ones from the last call to :func:`GetElems`.
+        
+        :Call:
+            >>> E = T.GetTileElems(Mesh, key)
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+            *key*: :class:`tuple`
+                Tile index, ``(level, rlo, i, j)``
+        
+        :Returns:
+            *E*: :class:`numpy.array` (*n*, 2)
+                Element group and element index of each element in the tile
+        """
+        B, E, u, s = self.elems[Mesh._ptr]
+        l = key[0]
+        # All smaller elements or only the ones stored at this level
+        deep = key[1] < 0
+        k = (Mesh._ptr, l, deep)
+        if k not in self.bins:
+            # Elements for this kind of tile
+            i = np.nonzero(s >= l if deep else s == l)[0]
+            # Tile index of each element
+            n = 2 ** l
+            I = np.clip(np.floor(u[i] * n).astype(int), 0, n-1)
+            c = np.ravel_multi_index(tuple(I.T), (n,) * u.shape[1])
+            # Sort by tile.
+            j = np.argsort(c, kind='mergesort')
+            self.bins[k] = (c[j], E[i[j]])
+        c, Ek = self.bins[k]
+        # Find the tile.
+        n = 2 ** l
+        ck = np.ravel_multi_index(key[2:], (n,) * u.shape[1])
+        a = np.searchsorted(c, ck, 'left')
+        b = np.searchsorted(c, ck, 'right')
+        return Ek[a:b]
+        
+    # Get the list of tiles covering a window
+    def GetKeys(self, Mesh, xmin, xmax):
+        """
+        Get the list of tiles needed to cover a plot window
+        
+        At the level of the window, the tiles hold all of the elements that
+        fit in one tile.  Each coarser level adds the tiles holding the
+        elements that are stored at that level.  One extra ring of tiles is
+        included at each level, since an element in the window can have the
+        center of its bounding box up to one tile outside of it.
+        
+        :Call:
+            >>> keys = T.GetKeys(Mesh, xmin, xmax)
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+            *xmin*: :class:`float` list
+                Minimum coordinates of plot window
+            *xmax*: :class:`float` list
+                Maximum coordinates of plot window
+        
+        :Returns:
+            *keys*: :class:`tuple` list
+                List of ``(level, rlo, i, j)`` tile indices, where elements
+                with a size in (*rlo*, 1] times the tile size are selected
+        """
+        # Extents of the tile grid
+        x0, x1 = self.GetBounds(Mesh)
+        L = x1 - x0
+        # Window size relative to the mesh
+        w = (np.array(xmax, dtype=float) - np.array(xmin, dtype=float)) / L
+        w = max(w.max(), 1e-12)
+        # Level such that there are about *ntile* tiles across the window
+        level = int(np.ceil(np.log2(self.ntile / w)))
+        level = min(max(level, 0), self.MaxLevel)
+        # List of keys
+        keys = []
+        for l in range(level, -1, -1):
+            # Number of tiles in each direction
+            n = 2 ** l
+            # Index ranges in each direction (with one extra tile)
+            I = []
+            for d in range(len(x0)):
+                i0 = int(np.floor((xmin[d] - x0[d]) / L[d] * n)) - 1
+                i1 = int(np.floor((xmax[d] - x0[d]) / L[d] * n)) + 1
+                I.append(range(max(i0, 0), min(i1, n-1) + 1))
+            # All small elements at the level of the window; only the
+            # elements stored at each coarser level
+            rlo = -1.0 if l == level else 0.5
+            keys += [(l, rlo) + k for k in itertools.product(*I)]
+        return keys
+        
+    # Get the coordinates of a tile
+    def GetTileLims(self, Mesh, key):
+        """
+        Get the bounding box of a tile
+        
+        :Call:
+            >>> xmin, xmax = T.GetTileLims(Mesh, key)
+        
+        :Parameters:
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+            *key*: :class:`tuple`
+                Tile index, ``(level, rlo, i, j)``
+        
+        :Returns:
+            *xmin*: :class:`float` list
+                Minimum coordinates of tile
+            *xmax*: :class:`float` list
+                Maximum coordinates of tile
+        """
+        # Extents of the tile grid
+        x0, x1 = self.GetBounds(Mesh)
+        # Tile size
+        h = (x1 - x0) / 2**key[0]
+        # Indices
+        i = np.array(key[2:], dtype=float)
+        # Output
+        return list(x0 + i*h), list(x0 + (i+1)*h)
+        
+    # Get a list of tiles, extracting the ones that are missing
+    def Get(self, tag, Mesh, xmin, xmax, fetch):
+        """
+        Get the data for all tiles in a window
+        
+        :Call:
+            >>> D = T.Get(tag, Mesh, xmin, xmax, fetch)
+        
+        :Parameters:
+            *tag*: :class:`tuple`
+                Identifier for the type of data being extracted
+            *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+                Mesh whose nodes define the tile grid
+            *xmin*: :class:`float` list
+                Minimum coordinates of plot window
+            *xmax*: :class:`float` list
+                Maximum coordinates of plot window
+            *fetch*: :class:`function`
+                Function ``fetch(xmin, xmax, elems)`` that extracts one tile,
+                where *elems* is the list of elements in the tile from
+                :func:`GetTileElems`
+        
+        :Returns:
+            *D*: :class:`tuple` list
+                Output of *fetch* for each tile
+        """
+        # Initialize output.
+        D = []
+        # Bin the elements if the mesh is new or has moved.
+        self.GetElems(Mesh)
+        # Loop through the needed tiles.
+        for key in self.GetKeys(Mesh, xmin, xmax):
+            k = tag + key
+            # Check for the tile.
+            if k in self.tile:
+                # Move it to the end of the list.
+                d = self.tile.pop(k)
+                self.tile[k] = d
+                self.hits += 1
+            else:
+                # Extract it.
+                x0, x1 = self.GetTileLims(Mesh, key)
+                d = fetch(x0, x1, self.GetTileElems(Mesh, key))
+                self.tile[k] = d
+                self.nbytes += sum([v.nbytes for v in d])
+                self.misses += 1
+            D.append(d)
+        # Evict the oldest tiles (but not any that are in use).
+        while self.nbytes > self.maxbytes and len(self.tile) > len(D):
+            k, d = self.tile.popitem(last=False)
+            self.nbytes -= sum([v.nbytes for v in d])
+        # Output
+        return D
+        
+    # Mesh plot data
+    def MeshPlotData(self, Mesh, xmin, xmax, Order):
+        """
+        Get mesh plot data using cached tiles
+        
+        :Call:
+            >>> x, y, c = T.MeshPlotData(Mesh, xmin, xmax, Order)
+        
+        :See also:
+            :func:`pyxflow._pyxflow.MeshPlotData`
+        """
+        # Extraction function
+        def fetch(x0, x1, elems):
+            return px.MeshPlotData(Mesh._ptr, x0, x1, Order, elems=elems)
+        # Get the tiles.
+        D = self.Get(('Mesh', Mesh._ptr, Order), Mesh, xmin, xmax, fetch)
+        # Check for nothing.
+        if len(D) == 0:
+            return np.zeros(0), np.zeros(0), np.zeros(0, dtype=int)
+        # Offsets for the connectivity
+        n = np.cumsum([0] + [len(d[0]) for d in D])
+        # Assemble.
+        x = np.hstack([d[0] for d in D])
+        y = np.hstack([d[1] for d in D])
+        c = np.hstack([d[2] + n[i] for i, d in enumerate(D)])
+        return x, y, c
+        
+    # Scalar plot data
+    def ScalarPlotData(self, U, Mesh, EqnSet, Name, xmin, xmax, Order):
+        """
+        Get scalar plot data using cached tiles
+        
+        :Call:
+            >>> x, y, tri, c = T.ScalarPlotData(U, Mesh, EqnSet, Name,
+                xmin, xmax, Order)
+        
+        :See also:
+            :func:`pyxflow._pyxflow.ScalarPlotData`
+        """
+        # Extraction function
+        def fetch(x0, x1, elems):
+            return px.ScalarPlotData(U._ptr, Mesh._ptr, EqnSet._ptr, Name,
+                x0, x1, Order, elems=elems)
+        # Get the tiles.
+        tag = ('Scalar', U._ptr, Mesh._ptr, Name, Order)
+        D = self.Get(tag, Mesh, xmin, xmax, fetch)
+        # Check for nothing.
+        if len(D) == 0:
+            return (np.zeros(0), np.zeros(0),
+                np.zeros((0, 3), dtype=int), np.zeros(0))
+        # Offsets for the triangles
+        n = np.cumsum([0] + [len(d[0]) for d in D])
+        # Assemble.
+        x = np.hstack([d[0] for d in D])
+        y = np.hstack([d[1] for d in D])
+        tri = np.vstack([d[2] + n[i] for i, d in enumerate(D)])
+        c = np.hstack([d[3] for d in D])
+        return x, y, tri, c
+        
+    
 def set_colormap(h, colorList, vabs=None):
     """
     Apply a customized color map using a simple list of colors
@@ -434,6 +1150,9 @@ def set_colormap(h, colorList, vabs=None):
     # Versions:
     #  2013-12-15 @dalle   : Introductory version
 
+    # Color conversion and the customizable colormap class
+    from matplotlib.colors import colorConverter, LinearSegmentedColormap
+
     # Determine the nature of the handle.
     if not hasattr(h, 'set_cmap'):
         raise AttributeError(
@@ -709,3 +1428,65 @@ def GetXLims(Mesh, **kwargs):
     # Output the limits.
     return xLimMin, xLimMax
                 
+
+
+# Function to process the slice plane for 3D plots
+def GetPlane(Mesh, xmin, xmax, **kwargs):
+    """
+    Process the optional slice plane for plots of three-dimensional meshes.
+    
+    :Call:
+        >>> plane = GetPlane(Mesh, xmin, xmax, **kwargs)
+        
+    :Parameters:
+        *Mesh*: :class:`pyxflow.Mesh.xf_Mesh`
+            Instance of mesh to use for dimension count
+        *xmin*: :class:`list`
+            Minimum coordinate of plot window for each dimension
+        *xmax*: :class:`list`
+            Maximum coordinate of plot window for each dimension
+            
+    :Returns:
+        *plane*: :class:`list` or ``None``
+            Plane as ``[x0, y0, z0, nx, ny, nz]``, or ``None`` if *Mesh* is
+            not three-dimensional
+            
+    :Kwargs:
+        *plane*: :class:`list`
+            Slice plane as ``[x0, y0, z0, nx, ny, nz]`` or as the pair
+            ``(origin, normal)``
+        *x*: :class:`float`
+            Coordinate of slice plane normal to the *x*-axis
+        *y*: :class:`float`
+            Coordinate of slice plane normal to the *y*-axis
+        *z*: :class:`float`
+            Coordinate of slice plane normal to the *z*-axis
+            
+    If no plane is specified, the plane normal to the *z*-axis through the
+    middle of the plot window is used.  The plot coordinates are the two
+    coordinate axes least aligned with the plane normal, projected onto the
+    plane.
+    """
+    # Only for 3D meshes
+    if Mesh.Dim != 3:
+        return None
+    # Middle of the window
+    x0 = [0.5*(xmin[i] + xmax[i]) for i in range(3)]
+    # Check for a full plane.
+    if kwargs.get('plane') is not None:
+        plane = [float(v) for v in np.hstack(kwargs['plane'])]
+        # Check the dimensions.
+        if len(plane) != 6:
+            raise IOError("Slice plane must be [x0, y0, z0, nx, ny, nz].")
+        return plane
+    # Check for coordinate planes.
+    for i, k in enumerate(['x', 'y', 'z']):
+        if kwargs.get(k) is not None:
+            # Point on the plane
+            x0[i] = float(kwargs[k])
+            # Normal
+            n = [0.0, 0.0, 0.0]
+            n[i] = 1.0
+            return x0 + n
+    # Default plane
+    return x0 + [0.0, 0.0, 1.0]
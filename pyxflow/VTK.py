@@ -0,0 +1,287 @@
+"""
+The *VTK* module writes XFlow solutions to VTK *UnstructuredGrid* files for
+use in `ParaView <http://www.paraview.org/>`_ and other VTK-based tools.
+
+Each element is subdivided into linear simplices using the same refinement as
+the plotting functions, and the state vector and any requested scalars are
+evaluated at the sub-nodes.  The files use the binary appended format, and
+the data are extracted and written in chunks of elements so that the memory
+required does not depend on the size of the mesh.
+"""
+
+# ------- Modules required -------
+# Used for more efficient data storage
+import numpy as np
+# The background pyxflow workhorse module
+import pyxflow._pyxflow as px
+# File names and temporary storage
+import os
+import shutil
+import tempfile
+
+# VTK cell type for simplices with each number of nodes
+_CellType = {2: 3, 3: 5, 4: 10}
+
+# Solution being written by parallel workers (inherited via fork)
+_All = None
+
+
+# ------- Functions -------
+def WriteVTU(All, fname, scalars=None, **kwargs):
+    """
+    Write a solution to a binary appended VTK unstructured grid file.
+
+    :Call:
+        >>> WriteVTU(All, fname, scalars=None, **kwargs)
+
+    :Parameters:
+        *All*: :class:`pyxflow.All.xf_All`
+            Solution containing the mesh, equation set, and state
+        *fname*: :class:`str`
+            Name of file to create (usually ends in ``'.vtu'``, or in
+            ``'.pvtu'`` when writing in parallel)
+        *scalars*: :class:`str` list
+            Names of equation set scalars to write
+
+    :Returns:
+        ``None``
+
+    :Kwargs:
+        *states*: :class:`bool`
+            Whether or not to write each component of the state vector;
+            default is ``True``
+        *order*: :class:`int`
+            Subdivision order; default is based on the solution order
+        *role*: :class:`str`
+            Identifier for the vector to use; default is ``'ElemState'``
+        *vgroup*: :class:`str`
+            Name of vector group; default is the primal state
+        *egroups*: :class:`int` list
+            Indices of element groups to write; default is all groups
+        *chunk*: :class:`int`
+            Maximum number of elements extracted at once
+        *nProc*: :class:`int`
+            Number of processes; if greater than ``1``, each element group is
+            written to its own *.vtu* file by a separate process, and a
+            *.pvtu* file that lists them is written to *fname* with its
+            extension replaced by ``'.pvtu'``
+
+    :Examples:
+        Write the states and the pressure for an airfoil solution.
+
+            >>> All = xf_All("naca_adapt_0.xfa")
+            >>> WriteVTU(All, "naca.vtu", ["Pressure", "MachNumber"])
+    """
+    # Process the list of scalars.
+    if scalars is None:
+        scalars = []
+    elif isinstance(scalars, str):
+        scalars = [scalars]
+    # Element groups
+    egroups = kwargs.get('egroups', range(All.Mesh.nElemGroup))
+    # Check for parallel output.
+    if kwargs.get('nProc', 1) > 1 and len(egroups) > 1:
+        return _WritePVTU(All, fname, scalars, egroups, **kwargs)
+    # Get the vector.
+    U = _GetVector(All, **kwargs)
+    # Names of point data
+    names = _PointDataNames(All, U, scalars, **kwargs)
+    # Other options
+    order = kwargs.get('order')
+    chunk = kwargs.get('chunk', 20000)
+    # Dimension
+    dim = All.Mesh.Dim
+    # Appended data are staged in a temporary file next to the output.
+    fdir = os.path.dirname(os.path.abspath(fname))
+    ftmp = tempfile.TemporaryFile(dir=fdir)
+    # XML description of each piece
+    pieces = []
+    # Current offset into the appended data
+    offset = 0
+    # Loop through element groups and chunks of elements.
+    for egrp in egroups:
+        nElem = All.Mesh.ElemGroup[egrp].nElem
+        for elem0 in range(0, nElem, chunk):
+            # Subdivide the elements and evaluate the data.
+            X, T, V, S = px.ElemGroupSubData(U._ptr, All.Mesh._ptr,
+                All.EqnSet._ptr, egrp, elem0, elem0+chunk, scalars, order)
+            # Check for empty chunks.
+            if T.shape[0] == 0:
+                continue
+            # Point data
+            D = []
+            if kwargs.get('states', True):
+                D += [V[:, k] for k in range(V.shape[1])]
+            D += [S[:, k] for k in range(S.shape[1])]
+            # Write the piece.
+            xml, offset = _WritePiece(ftmp, offset, dim, X, T, egrp, names, D)
+            pieces.append(xml)
+    # Write the file.
+    f = open(fname, 'wb')
+    f.write('<?xml version="1.0"?>\n')
+    f.write('<VTKFile type="UnstructuredGrid" version="1.0" ' +
+        'byte_order="LittleEndian" header_type="UInt64">\n')
+    f.write('<UnstructuredGrid>\n')
+    for xml in pieces:
+        f.write(xml)
+    f.write('</UnstructuredGrid>\n')
+    f.write('<AppendedData encoding="raw">\n_')
+    # Copy the appended data.
+    ftmp.seek(0)
+    shutil.copyfileobj(ftmp, f, 16777216)
+    ftmp.close()
+    f.write('\n</AppendedData>\n</VTKFile>\n')
+    f.close()
+    return None
+
+
+def _GetVector(All, **kwargs):
+    """Get the vector to write from an *xf_All* interface"""
+    # Determine the vector group to use.
+    vgroup = kwargs.get('vgroup')
+    if vgroup is None:
+        UG = All.GetPrimalState()
+    else:
+        UG = All.GetVectorGroup(vgroup)
+    # Get the vector.
+    return UG.GetVector(kwargs.get('role', 'ElemState'))
+
+
+def _PointDataNames(All, U, scalars, **kwargs):
+    """Names of the point data arrays"""
+    names = []
+    # States
+    if kwargs.get('states', True):
+        # Number of states from the first element
+        V = px.ElemGroupSubData(U._ptr, All.Mesh._ptr, All.EqnSet._ptr,
+            0, 0, 1, [], kwargs.get('order'))[2]
+        sr = V.shape[1]
+        # Get a list of the state names (if any).
+        if U.StateName is not None and len(U.StateName) == sr:
+            names += list(U.StateName)
+        else:
+            names += ['State%i' % k for k in range(sr)]
+    return names + list(scalars)
+
+
+def _WriteBlock(f, a):
+    """Write one appended data block; returns number of bytes written"""
+    # Ensure contiguous little-endian data.
+    a = np.ascontiguousarray(a)
+    if a.dtype.byteorder == '>':
+        a = a.byteswap()
+    # Block header: number of bytes
+    np.array([a.nbytes], dtype='<u8').tofile(f)
+    a.tofile(f)
+    return a.nbytes + 8
+
+
+def _WritePiece(f, offset, dim, X, T, egrp, names, D):
+    """Write the appended data for one piece and return its XML"""
+    # Number of points, cells, and nodes per cell
+    nPoint = X.shape[0]
+    nCell, nv = T.shape
+    # Pad the coordinates to three dimensions.
+    P = np.zeros((nPoint, 3), dtype='<f8')
+    P[:, :dim] = X
+    # Cell data
+    conn = T.astype('<i8').ravel()
+    offs = nv * np.arange(1, nCell+1, dtype='<i8')
+    types = np.empty(nCell, dtype='u1')
+    types.fill(_CellType[nv])
+    group = np.empty(nCell, dtype='<i4')
+    group.fill(egrp)
+    # XML description
+    xml = '<Piece NumberOfPoints="%i" NumberOfCells="%i">\n' % (nPoint, nCell)
+    # Point data
+    xml += '<PointData>\n'
+    for name, d in zip(names, D):
+        xml += ('<DataArray type="Float64" Name="%s" format="appended" ' +
+            'offset="%i"/>\n') % (name, offset)
+        offset += _WriteBlock(f, d.astype('<f8'))
+    xml += '</PointData>\n'
+    # Cell data
+    xml += '<CellData>\n'
+    xml += ('<DataArray type="Int32" Name="ElemGroup" format="appended" ' +
+        'offset="%i"/>\n') % offset
+    offset += _WriteBlock(f, group)
+    xml += '</CellData>\n'
+    # Points
+    xml += '<Points>\n'
+    xml += ('<DataArray type="Float64" NumberOfComponents="3" ' +
+        'format="appended" offset="%i"/>\n') % offset
+    offset += _WriteBlock(f, P)
+    xml += '</Points>\n'
+    # Cells
+    xml += '<Cells>\n'
+    xml += ('<DataArray type="Int64" Name="connectivity" ' +
+        'format="appended" offset="%i"/>\n') % offset
+    offset += _WriteBlock(f, conn)
+    xml += ('<DataArray type="Int64" Name="offsets" ' +
+        'format="appended" offset="%i"/>\n') % offset
+    offset += _WriteBlock(f, offs)
+    xml += ('<DataArray type="UInt8" Name="types" ' +
+        'format="appended" offset="%i"/>\n') % offset
+    offset += _WriteBlock(f, types)
+    xml += '</Cells>\n'
+    xml += '</Piece>\n'
+    return xml, offset
+
+
+def _WriteGroup(args):
+    """Write one element group to its own file (parallel worker)"""
+    egrp, fname, scalars, kwargs = args
+    kwargs = dict(kwargs, egroups=[egrp], nProc=1)
+    WriteVTU(_All, fname, scalars, **kwargs)
+    return fname
+
+
+def _WritePVTU(All, fname, scalars, egroups, **kwargs):
+    """Write one *.vtu* file per element group in parallel plus a *.pvtu*"""
+    # Processes are forked so that they share the solution in memory.
+    import multiprocessing
+    global _All
+    # Base name for the pieces
+    if fname.endswith('.pvtu'):
+        fbase = fname[:-5]
+    else:
+        fbase = os.path.splitext(fname)[0]
+    # The index must not take the name of a serial file such as "naca.vtu".
+    fname = fbase + '.pvtu'
+    # Name of each piece
+    fpiece = ['%s_%i.vtu' % (fbase, egrp) for egrp in egroups]
+    # Names of point data
+    U = _GetVector(All, **kwargs)
+    names = _PointDataNames(All, U, scalars, **kwargs)
+    # Write the pieces.
+    _All = All
+    pool = multiprocessing.Pool(kwargs['nProc'])
+    try:
+        pool.map(_WriteGroup, [(egrp, fpiece[i], scalars, kwargs)
+            for i, egrp in enumerate(egroups)])
+    finally:
+        pool.close()
+        pool.join()
+        _All = None
+    # Write the parallel file.
+    f = open(fname, 'w')
+    f.write('<?xml version="1.0"?>\n')
+    f.write('<VTKFile type="PUnstructuredGrid" version="1.0" ' +
+        'byte_order="LittleEndian" header_type="UInt64">\n')
+    f.write('<PUnstructuredGrid GhostLevel="0">\n')
+    f.write('<PPointData>\n')
+    for name in names:
+        f.write('<PDataArray type="Float64" Name="%s"/>\n' % name)
+    f.write('</PPointData>\n')
+    f.write('<PCellData>\n')
+    f.write('<PDataArray type="Int32" Name="ElemGroup"/>\n')
+    f.write('</PCellData>\n')
+    f.write('<PPoints>\n')
+    f.write('<PDataArray type="Float64" NumberOfComponents="3"/>\n')
+    f.write('</PPoints>\n')
+    for fp in fpiece:
+        f.write('<Piece Source="%s"/>\n' % os.path.basename(fp))
+    f.write('</PUnstructuredGrid>\n')
+    f.write('</VTKFile>\n')
+    f.close()
+    return None
@@ -4,6 +4,8 @@
 #include "px_DataSet.h"
 #include "px_Plot.h"
 #include "px_All.h"
+#include "px_Perf.h"
+#include "px_Map.h"
 
 // Need this to start NumPy C-API
 #define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
@@ -48,6 +50,8 @@ static PyMethodDef Methods[] = {
 		doc_WriteGeomFile},
     {"SetGeomCompPanelCoord", px_SetGeomCompPanelCoord, METH_VARARGS,
         doc_SetGeomCompPanelCoord},
+	{"ProjectPoints", px_ProjectPoints, METH_VARARGS,
+		doc_ProjectPoints},
 	// xf_DataSet methods
 	{"CreateDataSet", px_CreateDataSet, METH_VARARGS, 
 		doc_CreateDataSet},
@@ -78,15 +82,47 @@ static PyMethodDef Methods[] = {
 		doc_ReadAllInputFile},
 	{"ReadAllBinary", px_ReadAllBinary, METH_VARARGS,
 		doc_ReadAllBinary},
+	{"IndexAllBinary", px_IndexAllBinary, METH_VARARGS,
+		doc_IndexAllBinary},
+	{"ReadAllSections", px_ReadAllSections, METH_VARARGS,
+		doc_ReadAllSections},
 	{"WriteAllBinary", px_WriteAllBinary, METH_VARARGS,
 		doc_WriteAllBinary},
+	{"WriteAllSections", px_WriteAllSections, METH_VARARGS,
+		doc_WriteAllSections},
 	{"GetAllMembers", px_GetAllMembers, METH_VARARGS,
 		doc_GetAllMembers},
+	{"EqnSetLibraries", px_EqnSetLibraries, METH_NOARGS,
+		doc_EqnSetLibraries},
 	// Plotting methods
-	{"MeshPlotData", px_MeshPlotData, METH_VARARGS,
+	{"MeshPlotData", (PyCFunction) px_MeshPlotData, METH_VARARGS | METH_KEYWORDS,
 		doc_MeshPlotData},
-	{"ScalarPlotData", px_ScalarPlotData, METH_VARARGS,
+	{"ScalarPlotData", (PyCFunction) px_ScalarPlotData, METH_VARARGS | METH_KEYWORDS,
 		doc_ScalarPlotData},
+	{"ScalarPlotValues", (PyCFunction) px_ScalarPlotValues, METH_VARARGS | METH_KEYWORDS,
+		doc_ScalarPlotValues},
+	{"ElemBounds", px_ElemBounds, METH_VARARGS,
+		doc_ElemBounds},
+	{"ScalarRaster", px_ScalarRaster, METH_VARARGS,
+		doc_ScalarRaster},
+	{"ScalarContour", px_ScalarContour, METH_VARARGS,
+		doc_ScalarContour},
+	{"BFaceScalarData", px_BFaceScalarData, METH_VARARGS,
+		doc_BFaceScalarData},
+	{"ElemGroupSubData", px_ElemGroupSubData, METH_VARARGS,
+		doc_ElemGroupSubData},
+	// Performance counters
+	{"PerfEnable", px_PerfEnable, METH_VARARGS,
+		doc_PerfEnable},
+	{"PerfStats", px_PerfStats, METH_NOARGS,
+		doc_PerfStats},
+	{"PerfReset", px_PerfReset, METH_NOARGS,
+		doc_PerfReset},
+	// Mapped data
+	{"WriteDataMap", px_WriteDataMap, METH_VARARGS,
+		doc_WriteDataMap},
+	{"MapData", px_MapData, METH_VARARGS,
+		doc_MapData},
 	{NULL, NULL, 0, NULL}
 };
 
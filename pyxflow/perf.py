@@ -0,0 +1,230 @@
+"""
+The *perf* module contains opt-in counters for finding out where the time goes
+when reading and plotting XFlow solutions.
+
+When the counters are enabled, each function of :mod:`pyxflow._pyxflow` is
+wrapped so that the number of calls, the wall time, and the size of the NumPy
+arrays it returns are recorded.  The extraction functions also time their
+internal phases (culling, subdivision, basis evaluation, equation set scalars,
+and building the output arrays), and the plotting functions time the
+construction of the *matplotlib* objects.  When the counters are disabled,
+which is the default, nothing is wrapped and the only cost is one flag test
+per phase.
+"""
+
+# ------- Modules required -------
+# The background pyxflow workhorse module
+from . import _pyxflow as px
+# Timing and output
+import json
+import threading
+import time
+
+# Original functions of the workhorse module while the counters are on
+_orig = {}
+# Counters for each entry point and each Python phase
+_entry = {}
+_phase = {}
+# Entry points may be called from several threads.
+_lock = threading.Lock()
+
+
+# ------- Functions -------
+def enable():
+    """
+    Turn on the counters.
+
+    :Call:
+        >>> perf.enable()
+
+    :Examples:
+        Time the reading and plotting of a solution.
+
+            >>> from pyxflow import perf
+            >>> perf.enable()
+            >>> All = xf_All("naca_adapt_0.xfa")
+            >>> All.Plot(scalar="Pressure")
+            >>> perf.stats()['entry']['ReadAllBinary']
+            {'calls': 1, 'time': 0.0412, 'bytes': 0}
+    """
+    if _orig:
+        return
+    # Wrap each function of the workhorse module.
+    for name in dir(px):
+        f = getattr(px, name)
+        if name.startswith('_') or name.startswith('Perf'):
+            continue
+        if not callable(f):
+            continue
+        _orig[name] = f
+        setattr(px, name, _Wrap(name, f))
+    # Turn on the phase counters.
+    px.PerfEnable(1)
+
+
+def disable():
+    """
+    Turn off the counters and restore the original functions.
+
+    The counts are kept until :func:`reset` is called.
+
+    :Call:
+        >>> perf.disable()
+    """
+    px.PerfEnable(0)
+    for name, f in _orig.items():
+        setattr(px, name, f)
+    _orig.clear()
+
+
+def enabled():
+    """
+    Check whether the counters are on.
+
+    :Call:
+        >>> q = perf.enabled()
+
+    :Returns:
+        *q*: :class:`bool`
+            Whether or not :func:`enable` has been called
+    """
+    return bool(_orig)
+
+
+def reset():
+    """
+    Set all of the counters to zero.
+
+    :Call:
+        >>> perf.reset()
+    """
+    with _lock:
+        _entry.clear()
+        _phase.clear()
+    px.PerfReset()
+
+
+def stats():
+    """
+    Get the counters.
+
+    :Call:
+        >>> S = perf.stats()
+
+    :Returns:
+        *S*: :class:`dict`
+            Dictionary with two keys, ``'entry'`` and ``'phase'``.  Each is a
+            dictionary of ``{'calls': n, 'time': t, 'bytes': b}`` entries,
+            where *t* is the total wall time in seconds and *b* is the number
+            of bytes returned (for entry points) or allocated (for phases).
+            The ``'phase'`` entries include the internal phases of the
+            extraction functions and the Python plotting phases.
+    """
+    S = {'entry': {}, 'phase': {}}
+    with _lock:
+        for name, (n, t, b) in _entry.items():
+            S['entry'][name] = {'calls': n, 'time': t, 'bytes': b}
+        for name, (n, t, b) in _phase.items():
+            S['phase'][name] = {'calls': n, 'time': t, 'bytes': b}
+    # Phases timed by the C extension
+    for name, (n, t, b) in px.PerfStats().items():
+        S['phase'][name] = {'calls': n, 'time': t, 'bytes': int(b)}
+    return S
+
+
+def dump(fname=None, **kwargs):
+    """
+    Write the counters as JSON.
+
+    :Call:
+        >>> txt = perf.dump(fname=None, **kwargs)
+
+    :Parameters:
+        *fname*: :class:`str`
+            Name of file to write; if ``None``, nothing is written
+
+    :Returns:
+        *txt*: :class:`str`
+            JSON text of :func:`stats`
+
+    :Kwargs:
+        Other keyword arguments, for example *indent*, are passed to
+        :func:`json.dumps`
+    """
+    kwargs.setdefault('sort_keys', True)
+    txt = json.dumps(stats(), **kwargs)
+    if fname is not None:
+        f = open(fname, 'w')
+        f.write(txt)
+        f.write('\n')
+        f.close()
+    return txt
+
+
+def timer(name):
+    """
+    Context manager that times a Python phase.
+
+    :Call:
+        >>> with perf.timer(name):
+        ...     pass
+
+    :Parameters:
+        *name*: :class:`str`
+            Name of the phase, for example ``'tripcolor'``
+    """
+    if _orig:
+        return _Timer(name)
+    return _null
+
+
+# ------- Helpers -------
+def _Add(D, name, t, b):
+    """Add one call to a counter"""
+    with _lock:
+        n0, t0, b0 = D.get(name, (0, 0.0, 0))
+        D[name] = (n0 + 1, t0 + t, b0 + b)
+
+
+def _NBytes(v):
+    """Total size of the arrays in a return value"""
+    if isinstance(v, (tuple, list)):
+        return sum(_NBytes(a) for a in v)
+    return getattr(v, 'nbytes', 0)
+
+
+def _Wrap(name, f):
+    """Wrap a workhorse function with a counter"""
+    def wrapper(*args):
+        t0 = time.time()
+        v = f(*args)
+        _Add(_entry, name, time.time() - t0, _NBytes(v))
+        return v
+    wrapper.__name__ = name
+    wrapper.__doc__ = f.__doc__
+    return wrapper
+
+
+class _Timer(object):
+    """Context manager for one Python phase"""
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        _Add(_phase, self.name, time.time() - self.t0, 0)
+        return False
+
+
+class _NullTimer(object):
+    """Context manager that does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_null = _NullTimer()
@@ -1,15 +1,31 @@
 #include <Python.h>
+#include <pthread.h>
 #include "xf_AllStruct.h"
 #include "xf_All.h"
 #include "xf_EqnSetHook.h"
+#include "xf_Memory.h"
+#include "xf_Mesh.h"
+#include "xf_Geom.h"
+#include "xf_Data.h"
+#include "xf_Param.h"
+#include "xf_EqnSet.h"
 #include <dlfcn.h>
 
-static int
-LoadEqnSet(const xf_EqnSet *EqnSet)
+// Release the values mapped from a file (px_Map.c)
+void
+px_UnmapDataSet(xf_DataSet *DataSet);
+
+// The equation set library handle in libxf is global, so loading, registering,
+// and closing it are serialized with this lock.  The work is done with the GIL
+// released, so the lock is never requested while holding the GIL.
+static pthread_mutex_t EqnSetLock = PTHREAD_MUTEX_INITIALIZER;
+// Signaled when the last user of the hooks is done with them
+static pthread_cond_t HooksFree = PTHREAD_COND_INITIALIZER;
+
+static void
+EqnSetLibName(const xf_EqnSet *EqnSet, char *lib)
 {
-    int ierr;
     char px[] = "px";
-    char lib[xf_MAXSTRLEN];
 
     // Copy 'lib' into lib string.
     strncpy(lib, EqnSet->EqnSetLibrary, 3);
@@ -17,14 +33,275 @@ LoadEqnSet(const xf_EqnSet *EqnSet)
     strncpy(lib + 3, px, 2);
     // Copy rest of original library into lib string .
     strcpy(lib + 5, EqnSet->EqnSetLibrary + 3);
+}
+
+// Registry of the equation set libraries used by xf_All structs from
+// px_ReadAllBinary.  libxf has one set of equation set hooks, which point to
+// one library at a time, so they are pointed at the library of an xf_All
+// before each use and only reloaded when they point elsewhere.  Each library
+// is kept open with its own dlopen handle until the last xf_All that uses it
+// is destroyed.  Only accessed while holding EqnSetLock.
+typedef struct {
+    char Name[xf_MAXSTRLEN]; // library file name
+    void *Handle; // keeps the library in memory while in use
+    int Pending; // close once the hooks are free
+    int nAll; // number of xf_All structs using the library
+    int sizeAll; // size of All allocated
+    xf_All **All; // xf_All structs using the library
+} EqnSetEntry;
+
+static EqnSetEntry *EqnSetRegistry = NULL;
+static int nEqnSetRegistry = 0;
+// Entry that the libxf hooks point to, or -1
+static int ActiveEqnSet = -1;
+// Number of callers between px_HoldEqnSet and px_DropEqnSet; the hooks are
+// not moved or closed while this is positive.
+static int nHookUsers = 0;
+// Number of those callers in the current thread
+static __thread int nHookUsersHere = 0;
+// Close the hooks of an unregistered xf_All once they are free
+static int PendingHooks = 0;
+
+static enum xfe_Bool
+WaitHooks(void)
+{
+    /*  Wait until no other thread is calling through the hooks.  Called and
+        returns while holding EqnSetLock, which is released while waiting.
+        The current thread cannot wait for itself, for example when an
+        xf_All is collected between its own px_HoldEqnSet and px_DropEqnSet,
+        so this returns xfe_False if it still holds the hooks. */
+    while (nHookUsers > nHookUsersHere)
+        pthread_cond_wait(&HooksFree, &EqnSetLock);
+
+    return (nHookUsers == 0) ? xfe_True : xfe_False;
+}
+
+static int
+FindEqnSet(const xf_EqnSet *EqnSet, int *pi)
+{
+    // Index of the registry entry for the library of EqnSet; added if new.
+    int ierr, i;
+    char lib[xf_MAXSTRLEN];
+    EqnSetEntry *E;
+
+    EqnSetLibName(EqnSet, lib);
+
+    for (i = 0; i < nEqnSetRegistry; i++)
+        if (strcmp(EqnSetRegistry[i].Name, lib) == 0) break;
+
+    // new entry
+    if (i == nEqnSetRegistry) {
+        ierr = xf_Error(xf_ReAlloc((void **) &EqnSetRegistry, i + 1, sizeof(EqnSetEntry)));
 
-    ierr = xf_LoadEqnSetLibrary(lib);
+        if (ierr != xf_OK) return ierr;
+
+        E = EqnSetRegistry + i;
+        strcpy(E->Name, lib);
+        E->Handle = NULL;
+        E->Pending = 0;
+        E->nAll = 0;
+        E->sizeAll = 0;
+        E->All = NULL;
+        nEqnSetRegistry++;
+    }
+
+    (*pi) = i;
+
+    return xf_OK;
+}
+
+static int
+PointHooks(int i)
+{
+    /*  Point the hooks at the library of entry i.  Other callers may run
+        while waiting for the hooks to be free, so the check is repeated. */
+    int ierr;
+
+    while (ActiveEqnSet != i) {
+        if (nHookUsers > 0) {
+            // The hooks cannot move under this thread's own calls.
+            if (!WaitHooks()) return xf_Error(xf_CODE_LOGIC_ERROR);
+            continue;
+        }
+
+        ierr = xf_LoadEqnSetLibrary(EqnSetRegistry[i].Name);
+
+        if (ierr != xf_OK) {
+            ActiveEqnSet = -1;
+            return ierr;
+        }
+
+        ActiveEqnSet = i;
+    }
+
+    // Keep the library in memory if libxf moves its hooks elsewhere.
+    if (EqnSetRegistry[i].Handle == NULL)
+        EqnSetRegistry[i].Handle = dlopen(EqnSetRegistry[i].Name, RTLD_NOW);
+
+    return xf_OK;
+}
+
+static int
+AcquireEqnSet(xf_All *All)
+{
+    int ierr, i;
+    EqnSetEntry *E;
+
+    ierr = xf_Error(FindEqnSet(All->EqnSet, &i));
+
+    if (ierr != xf_OK) return ierr;
+
+    // Point the hooks at this library unless they already do.
+    ierr = PointHooks(i);
 
     if (ierr != xf_OK) return ierr;
 
+    E = EqnSetRegistry + i;
+
+    // Add the xf_All to the users.
+    if (E->sizeAll <= E->nAll) {
+        E->sizeAll = 2 * E->nAll + 1;
+        ierr = xf_Error(xf_ReAlloc((void **) &E->All, E->sizeAll, sizeof(xf_All *)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    E->All[E->nAll++] = All;
+
     return xf_OK;
 }
 
+static void
+CloseEqnSet(int i)
+{
+    // Close the library of entry i unless an xf_All uses it again.
+    EqnSetEntry *E = EqnSetRegistry + i;
+
+    E->Pending = 0;
+
+    if (E->nAll > 0) return;
+
+    if (ActiveEqnSet == i) {
+        xf_CloseEqnSetLibrary();
+        ActiveEqnSet = -1;
+    }
+
+    if (E->Handle != NULL) dlclose(E->Handle);
+    E->Handle = NULL;
+}
+
+static void
+ReleaseEqnSet(xf_All *All)
+{
+    /*  Called after an xf_All is destroyed.  Libraries close when their
+        last user is released.  An xf_All that is not in the registry (for
+        example from px_ReadAllInputFile) closes the hooks as before unless
+        a registered library is in use.  The hooks are never closed while
+        they point to a library that another entry still uses.  If the
+        current thread is itself using the hooks, the close is left for its
+        px_DropEqnSet. */
+
+    int i, k;
+    EqnSetEntry *E;
+
+    for (i = 0; i < nEqnSetRegistry; i++) {
+        E = EqnSetRegistry + i;
+        for (k = 0; k < E->nAll; k++)
+            if (E->All[k] == All) break;
+        if (k < E->nAll) break;
+    }
+
+    if (i == nEqnSetRegistry) {
+        if (ActiveEqnSet >= 0) return;
+
+        if (!WaitHooks())
+            PendingHooks = 1;
+        else if (ActiveEqnSet < 0)
+            xf_CloseEqnSetLibrary();
+
+        return;
+    }
+
+    // Remove the xf_All from the users.
+    E->All[k] = E->All[--E->nAll];
+
+    if (E->nAll > 0) return;
+
+    // Nobody may be calling into the library when it is closed.
+    if (!WaitHooks())
+        EqnSetRegistry[i].Pending = 1;
+    else
+        CloseEqnSet(i);
+}
+
+static void
+ClosePending(void)
+{
+    // Closes left by ReleaseEqnSet, once the hooks are free
+    int i;
+
+    if (PendingHooks && (ActiveEqnSet < 0)) xf_CloseEqnSetLibrary();
+    PendingHooks = 0;
+
+    for (i = 0; i < nEqnSetRegistry; i++)
+        if (EqnSetRegistry[i].Pending) CloseEqnSet(i);
+}
+
+int
+px_HoldEqnSet(const xf_EqnSet *EqnSet)
+{
+    /*  Point the hooks at the library of EqnSet and keep them there until
+        px_DropEqnSet is called.  Called while holding the GIL, which is
+        released while waiting.  Every call must be matched by a call to
+        px_DropEqnSet, even if it fails. */
+    int ierr = xf_OK, i;
+
+    Py_BEGIN_ALLOW_THREADS
+    pthread_mutex_lock(&EqnSetLock);
+
+    // Without a library there is nothing to point the hooks at.
+    if ((EqnSet != NULL) && (EqnSet->EqnSetLibrary[0] != '\0')) {
+        ierr = xf_Error(FindEqnSet(EqnSet, &i));
+
+        if (ierr == xf_OK) ierr = xf_Error(PointHooks(i));
+    }
+
+    nHookUsers++;
+    nHookUsersHere++;
+
+    pthread_mutex_unlock(&EqnSetLock);
+    Py_END_ALLOW_THREADS
+
+    if ((ierr != xf_OK) && !PyErr_Occurred())
+        PyErr_SetString(PyExc_RuntimeError,
+            "Could not load the equation set library");
+
+    return ierr;
+}
+
+void
+px_DropEqnSet(void)
+{
+    // End of a use of the hooks started by px_HoldEqnSet.
+    Py_BEGIN_ALLOW_THREADS
+    pthread_mutex_lock(&EqnSetLock);
+
+    nHookUsers--;
+    nHookUsersHere--;
+
+    // Wake up the threads waiting for the hooks, and do the closes that were
+    // waiting for this thread.
+    if (nHookUsers == 0) {
+        ClosePending();
+        pthread_cond_broadcast(&HooksFree);
+    } else if (nHookUsersHere == 0) {
+        pthread_cond_broadcast(&HooksFree);
+    }
+
+    pthread_mutex_unlock(&EqnSetLock);
+    Py_END_ALLOW_THREADS
+}
+
 PyObject *
 px_CreateAll(PyObject *self, PyObject *args)
 {
@@ -51,12 +328,24 @@ px_DestroyAll(PyObject *self, PyObject *args)
 
     if (!PyArg_ParseTuple(args, "n", &All)) return NULL;
 
+    // Values mapped from a file are not freed by libxf.
+    px_UnmapDataSet(All->DataSet);
+
+    // The library is released after the xf_All is destroyed, so the lock is
+    // held throughout to keep its address from being reused in the meantime.
+    Py_BEGIN_ALLOW_THREADS
+    pthread_mutex_lock(&EqnSetLock);
+
     // Destroy the xf_All struct
     ierr = xf_Error(xf_DestroyAll(All));
 
-    if (ierr != xf_OK) return NULL;
+    // Stop using the equation set library.
+    if (ierr == xf_OK) ReleaseEqnSet(All);
 
-    xf_CloseEqnSetLibrary();
+    pthread_mutex_unlock(&EqnSetLock);
+    Py_END_ALLOW_THREADS
+
+    if (ierr != xf_OK) return NULL;
 
     // Nothing to return
     Py_INCREF(Py_None);
@@ -93,22 +382,512 @@ px_ReadAllBinary(PyObject *self, PyObject *args)
     // Process python inputs.
     if (!PyArg_ParseTuple(args, "sb", &XfaFile, &DefaultFlag)) return NULL;
 
+    // No Python objects are touched until the file is read.
+    Py_BEGIN_ALLOW_THREADS
+
     // Create and read in the xf_All struct from file.
     ierr = xf_Error(xf_CreateAll(&All, DefaultFlag));
-    if (ierr != xf_OK) return NULL;
 
     // Use the xflow command to read a .xfa file.
-    ierr = xf_Error(xf_ReadAllBinary(XfaFile, All));
-    if (ierr != xf_OK) return NULL;
+    if (ierr == xf_OK)
+        ierr = xf_Error(xf_ReadAllBinary(XfaFile, All));
 
-    // Use the pyxflow command to load the equation set (libraries?).
-    ierr = xf_Error(LoadEqnSet(All->EqnSet));
-    if (ierr != xf_OK) return NULL;
+    if (ierr == xf_OK) {
+        pthread_mutex_lock(&EqnSetLock);
+
+        // Load the equation set library unless it is already loaded.
+        ierr = xf_Error(AcquireEqnSet(All));
+
+        // No idea
+        if (ierr == xf_OK)
+            ierr = xf_Error(xf_EqnSetRegister(All->EqnSet));
+
+        pthread_mutex_unlock(&EqnSetLock);
+    }
+
+    Py_END_ALLOW_THREADS
 
-    // No idea
-    ierr = xf_Error(xf_EqnSetRegister(All->EqnSet));
     if (ierr != xf_OK) return NULL;
-    
+
+    // Return the pointer.
+    return Py_BuildValue("n", All);
+}
+
+// Sections of a .xfa file, in the order written by xf_WriteAllBinary.  This
+// is also the order of the pointers from px_GetAllMembers.
+enum pxe_AllSection {
+    pxe_AllMesh,
+    pxe_AllGeom,
+    pxe_AllDataSet,
+    pxe_AllParam,
+    pxe_AllEqnSet,
+    pxe_AllSectionLast
+};
+
+static int
+ReadAllSection(FILE *fid, xf_All *All, enum pxe_AllSection k)
+{
+    // Read one section of a .xfa file from the current position.
+    switch (k) {
+    case pxe_AllMesh:
+        return xf_Error(xf_ReadMeshBinary(fid, NULL, All->Mesh));
+    case pxe_AllGeom:
+        return xf_Error(xf_ReadGeomBinary(fid, NULL, All->Geom));
+    case pxe_AllDataSet:
+        return xf_Error(xf_ReadDataSetBinary(All->Mesh, fid, NULL, All->DataSet));
+    case pxe_AllParam:
+        return xf_Error(xf_ReadParamBinary(fid, NULL, All->Param));
+    case pxe_AllEqnSet:
+        return xf_Error(xf_ReadEqnSetBinary(fid, NULL, All->EqnSet));
+    default:
+        return xf_Error(xf_CODE_LOGIC_ERROR);
+    }
+}
+
+static int
+WriteAllSection(FILE *fid, xf_All *All, enum pxe_AllSection k)
+{
+    // Write one section of a .xfa file at the current position.
+    switch (k) {
+    case pxe_AllMesh:
+        return xf_Error(xf_WriteMeshBinary(All->Mesh, fid));
+    case pxe_AllGeom:
+        return xf_Error(xf_WriteGeomBinary(All->Geom, fid));
+    case pxe_AllDataSet:
+        return xf_Error(xf_WriteDataSetBinary(All->Mesh, All->DataSet, fid));
+    case pxe_AllParam:
+        return xf_Error(xf_WriteParamBinary(All->Param, fid));
+    case pxe_AllEqnSet:
+        return xf_Error(xf_WriteEqnSetBinary(All->EqnSet, fid));
+    default:
+        return xf_Error(xf_CODE_LOGIC_ERROR);
+    }
+}
+
+static int
+CopyFileSection(FILE *src, FILE *fid, long Start, long End, char *buf, size_t nbuf)
+{
+    // Copy the bytes [Start, End) of one file to the end of another.
+    size_t n;
+    long left;
+
+    if (fseek(src, Start, SEEK_SET) != 0) return xf_Error(xf_FILE_READ_ERROR);
+
+    for (left = End - Start; left > 0; left -= (long) n) {
+        n = ((size_t) left < nbuf) ? (size_t) left : nbuf;
+
+        if (fread(buf, 1, n, src) != n) return xf_Error(xf_FILE_READ_ERROR);
+
+        if (fwrite(buf, 1, n, fid) != n) return xf_Error(xf_FILE_WRITE_ERROR);
+    }
+
+    return xf_OK;
+}
+
+/* libxf only reads a data set as a whole: a header, which includes the number
+   of entries, followed by each xf_Data.  Single entries are located by writing
+   them to a stream that only counts the bytes, and read back by giving libxf
+   a stream made of the header of a data set with one entry followed by the
+   bytes of that entry in the file. */
+
+// Largest data set header kept in the index
+#define PX_DATA_HEADER 64
+
+typedef struct {
+    long n; // bytes written so far
+    char *Keep; // copy of the first bytes written
+    long nKeep; // number of bytes to copy
+} CountSink;
+
+static ssize_t
+CountWrite(void *cookie, const char *buf, size_t size)
+{
+    CountSink *C = (CountSink *) cookie;
+    long i;
+
+    for (i = C->n; (i < C->nKeep) && (i - C->n < (long) size); i++)
+        C->Keep[i] = buf[i - C->n];
+
+    C->n += (long) size;
+
+    return (ssize_t) size;
+}
+
+static long
+DataSetSize(xf_Mesh *Mesh, xf_DataSet *DataSet, char *Keep, long nKeep)
+{
+    // Number of bytes written for a data set, or -1 on error.
+    int ierr;
+    CountSink C = {0, Keep, nKeep};
+    cookie_io_functions_t io = {NULL, CountWrite, NULL, NULL};
+    FILE *fid;
+
+    fid = fopencookie(&C, "w", io);
+    if (fid == NULL) return -1;
+
+    ierr = xf_Error(xf_WriteDataSetBinary(Mesh, DataSet, fid));
+
+    if ((fclose(fid) != 0) || (ierr != xf_OK)) return -1;
+
+    return C.n;
+}
+
+static int
+IndexDataEntries(xf_Mesh *Mesh, xf_DataSet *Set, long Start, long End,
+                 long *Offset, char *Header, long *pnHeader)
+{
+    /*  Find the start of each xf_Data in the data set section and the header
+        of a data set with one entry.  Offset has one more entry than the data
+        set.  Returns xf_NOT_FOUND if the bytes do not add up to the section,
+        in which case the data set can only be read in full. */
+
+    long nHeader, n;
+    xf_Data *D, *Next, *Prev;
+    xf_DataSet DataSet;
+
+    DataSet = *Set;
+    DataSet.Head = DataSet.Tail = NULL;
+
+    nHeader = DataSetSize(Mesh, &DataSet, NULL, 0);
+    if ((nHeader < 0) || (nHeader > PX_DATA_HEADER)) return xf_NOT_FOUND;
+
+    Offset[0] = Start + nHeader;
+    (*pnHeader) = nHeader;
+
+    n = 0;
+    for (D = Set->Head; D != NULL; D = D->Next, n++) {
+        // Write this entry on its own.
+        Next = D->Next;
+        Prev = D->Prev;
+        D->Next = D->Prev = NULL;
+        DataSet.Head = DataSet.Tail = D;
+
+        Offset[n+1] = DataSetSize(Mesh, &DataSet, Header, nHeader);
+
+        D->Next = Next;
+        D->Prev = Prev;
+
+        if (Offset[n+1] < nHeader) return xf_NOT_FOUND;
+
+        Offset[n+1] += Offset[n] - nHeader;
+    }
+
+    return (Offset[n] == End) ? xf_OK : xf_NOT_FOUND;
+}
+
+typedef struct {
+    const char *Header; // header of a data set with one entry
+    long nHeader; // length of the header
+    FILE *src; // file with the entry
+    long pos; // current position, counting from the start of the header
+    long Start, End; // bytes of the entry in the file
+} EntrySource;
+
+static ssize_t
+EntryRead(void *cookie, char *buf, size_t size)
+{
+    EntrySource *E = (EntrySource *) cookie;
+    size_t n, m;
+
+    // The header comes first.
+    for (n = 0; (n < size) && (E->pos < E->nHeader); n++)
+        buf[n] = E->Header[E->pos++];
+
+    if ((n == size) || (E->pos >= E->nHeader + E->End - E->Start)) return n;
+
+    m = (size_t) (E->nHeader + E->End - E->Start - E->pos);
+    if (m > size - n) m = size - n;
+
+    if (fseek(E->src, E->Start + E->pos - E->nHeader, SEEK_SET) != 0) return -1;
+
+    m = fread(buf + n, 1, m, E->src);
+    E->pos += (long) m;
+
+    return (ssize_t) (n + m);
+}
+
+static int
+ReadDataEntry(FILE *src, xf_All *All, const char *Header, long nHeader,
+              long Start, long End)
+{
+    // Read one xf_Data from the file and append it to the data set.
+    int ierr, ierr2;
+    EntrySource E = {Header, nHeader, src, 0, Start, End};
+    cookie_io_functions_t io = {EntryRead, NULL, NULL, NULL};
+    FILE *fid;
+    xf_DataSet *DataSet;
+
+    ierr = xf_Error(xf_CreateDataSet(&DataSet));
+    if (ierr != xf_OK) return ierr;
+
+    fid = fopencookie(&E, "r", io);
+    if (fid == NULL) {
+        ierr = xf_Error(xf_FILE_READ_ERROR);
+    } else {
+        ierr = xf_Error(xf_ReadDataSetBinary(All->Mesh, fid, NULL, DataSet));
+        fclose(fid);
+    }
+
+    // Move the entry to the end of the data set of the xf_All.
+    if ((ierr == xf_OK) && (DataSet->Head != NULL)) {
+        DataSet->Head->Prev = All->DataSet->Tail;
+        if (All->DataSet->Tail != NULL)
+            All->DataSet->Tail->Next = DataSet->Head;
+        else
+            All->DataSet->Head = DataSet->Head;
+        All->DataSet->Tail = DataSet->Tail;
+        DataSet->Head = DataSet->Tail = NULL;
+    }
+
+    ierr2 = xf_Error(xf_DestroyDataSet(DataSet));
+
+    return (ierr != xf_OK) ? ierr : ierr2;
+}
+
+PyObject *
+px_IndexAllBinary(PyObject *self, PyObject *args)
+{
+    int ierr, ierr2, k, nData, Entries;
+    long Offset[pxe_AllSectionLast + 1], *DataOffset = NULL, nHeader;
+    char *XfaFile, Header[PX_DATA_HEADER];
+    FILE *fid;
+    xf_All *All = NULL;
+    xf_Data *D;
+    PyObject *py_O, *py_D, *py_H;
+
+    if (!PyArg_ParseTuple(args, "s", &XfaFile)) return NULL;
+
+    Entries = 0;
+    nHeader = 0;
+    nData = 0;
+
+    Py_BEGIN_ALLOW_THREADS
+
+    ierr = xf_Error(xf_CreateAll(&All, xfe_False));
+
+    fid = NULL;
+    if (ierr == xf_OK) {
+        fid = fopen(XfaFile, "rb");
+        if (fid == NULL) ierr = xf_Error(xf_FILE_READ_ERROR);
+    }
+
+    // Read the sections in order, recording where each one starts.
+    for (k = 0; (ierr == xf_OK) && (k < pxe_AllSectionLast); k++) {
+        Offset[k] = ftell(fid);
+        ierr = ReadAllSection(fid, All, k);
+    }
+    Offset[pxe_AllSectionLast] = (ierr == xf_OK) ? ftell(fid) : 0;
+
+    if (fid != NULL) fclose(fid);
+
+    // Find where each xf_Data starts within the data set.
+    if (ierr == xf_OK) {
+        for (D = All->DataSet->Head; D != NULL; D = D->Next) nData++;
+
+        ierr = xf_Error(xf_Alloc((void **)&DataOffset, nData + 1, sizeof(long)));
+    }
+
+    if (ierr == xf_OK)
+        Entries = (IndexDataEntries(All->Mesh, All->DataSet,
+            Offset[pxe_AllDataSet], Offset[pxe_AllDataSet+1], DataOffset,
+            Header, &nHeader) == xf_OK);
+
+    Py_END_ALLOW_THREADS
+
+    if (ierr != xf_OK) {
+        if (All != NULL) xf_DestroyAll(All);
+        xf_Release(DataOffset);
+        if (!PyErr_Occurred())
+            PyErr_Format(PyExc_IOError, "Could not index '%s'", XfaFile);
+        return NULL;
+    }
+
+    // List of (start, end) of each section
+    py_O = PyList_New(pxe_AllSectionLast);
+
+    for (k = 0; (py_O != NULL) && (k < pxe_AllSectionLast); k++)
+        PyList_SET_ITEM(py_O, k, Py_BuildValue("ll", Offset[k], Offset[k+1]));
+
+    // List of (title, type, start, end) of each data entry
+    py_D = PyList_New(nData);
+
+    k = 0;
+    for (D = All->DataSet->Head; (py_D != NULL) && (D != NULL); D = D->Next, k++) {
+        if (Entries)
+            PyList_SET_ITEM(py_D, k, Py_BuildValue("ssll", D->Title,
+                xfe_DataName[D->Type], DataOffset[k], DataOffset[k+1]));
+        else
+            PyList_SET_ITEM(py_D, k, Py_BuildValue("ssOO", D->Title,
+                xfe_DataName[D->Type], Py_None, Py_None));
+    }
+
+    // Header of a data set with one entry
+    if (Entries) {
+        py_H = PyString_FromStringAndSize(Header, (Py_ssize_t) nHeader);
+    } else {
+        Py_INCREF(Py_None);
+        py_H = Py_None;
+    }
+
+    xf_Release(DataOffset);
+
+    // The equation set library was never loaded for this xf_All.
+    ierr2 = xf_Error(xf_DestroyAll(All));
+
+    if ((py_O == NULL) || (py_D == NULL) || (py_H == NULL) || (ierr2 != xf_OK)) {
+        Py_XDECREF(py_O);
+        Py_XDECREF(py_D);
+        Py_XDECREF(py_H);
+        return NULL;
+    }
+
+    return Py_BuildValue("NNN", py_O, py_D, py_H);
+}
+
+PyObject *
+px_ReadAllSections(PyObject *self, PyObject *args)
+{
+    int ierr, k, j, nTitle, keep, nEntry, nHeader;
+    int Load[pxe_AllSectionLast];
+    long Offset[pxe_AllSectionLast], *Entry = NULL;
+    enum xfe_Bool DefaultFlag;
+    char *XfaFile, **Titles = NULL, *Header = NULL;
+    FILE *fid;
+    xf_All *All = NULL;
+    xf_Data *D, *DNext;
+    PyObject *py_O, *py_L, *py_T, *py_t, *py_E = Py_None;
+
+    // Process python inputs.
+    if (!PyArg_ParseTuple(args, "sbOOO|Oz#", &XfaFile, &DefaultFlag,
+        &py_O, &py_L, &py_T, &py_E, &Header, &nHeader)) return NULL;
+
+    if (!PyList_Check(py_O) || (PyList_Size(py_O) != pxe_AllSectionLast) ||
+        !PyList_Check(py_L) || (PyList_Size(py_L) != pxe_AllSectionLast)) {
+        PyErr_Format(PyExc_ValueError,
+            "Offsets and flags must be lists of length %i", pxe_AllSectionLast);
+        return NULL;
+    }
+
+    for (k = 0; k < pxe_AllSectionLast; k++) {
+        Offset[k] = PyInt_AsLong(PyList_GetItem(py_O, k));
+        Load[k] = PyObject_IsTrue(PyList_GetItem(py_L, k));
+    }
+
+    if (PyErr_Occurred()) return NULL;
+
+    // The data set is read on the mesh.
+    Load[pxe_AllMesh] = 1;
+
+    // Data entries to keep; None keeps them all
+    nTitle = -1;
+    if (py_T != Py_None) {
+        if (!PyList_Check(py_T)) {
+            PyErr_SetString(PyExc_TypeError, "Data titles must be a list");
+            return NULL;
+        }
+
+        nTitle = (int) PyList_Size(py_T);
+
+        ierr = xf_Error(xf_Alloc((void **)&Titles, max(nTitle, 1), sizeof(char *)));
+
+        if (ierr != xf_OK) return NULL;
+
+        for (j = 0; j < nTitle; j++) {
+            py_t = PyList_GetItem(py_T, j);
+            Titles[j] = PyString_Check(py_t) ? PyString_AsString(py_t) : NULL;
+        }
+    }
+
+    // Byte ranges of the data entries to read; None reads the whole section
+    nEntry = -1;
+    if ((py_E != Py_None) && (Header != NULL)) {
+        if (!PyList_Check(py_E)) {
+            PyErr_SetString(PyExc_TypeError, "Data entries must be a list");
+            xf_Release(Titles);
+            return NULL;
+        }
+
+        nEntry = (int) PyList_Size(py_E);
+
+        ierr = xf_Error(xf_Alloc((void **)&Entry, 2*max(nEntry, 1), sizeof(long)));
+
+        for (j = 0; (ierr == xf_OK) && (j < nEntry); j++) {
+            if (!PyArg_ParseTuple(PyList_GetItem(py_E, j), "ll",
+                Entry + 2*j, Entry + 2*j + 1)) ierr = xf_INPUT_ERROR;
+        }
+
+        if (ierr != xf_OK) {
+            xf_Release(Titles);
+            xf_Release(Entry);
+            return NULL;
+        }
+    }
+
+    // No Python objects are touched until the file is read.
+    Py_BEGIN_ALLOW_THREADS
+
+    ierr = xf_Error(xf_CreateAll(&All, DefaultFlag));
+
+    fid = NULL;
+    if (ierr == xf_OK) {
+        fid = fopen(XfaFile, "rb");
+        if (fid == NULL) ierr = xf_Error(xf_FILE_READ_ERROR);
+    }
+
+    // Seek to each requested section; the others are never read.
+    for (k = 0; (ierr == xf_OK) && (k < pxe_AllSectionLast); k++) {
+        if (!Load[k]) continue;
+
+        if ((k == pxe_AllDataSet) && (nEntry >= 0)) {
+            // Only the requested xf_Data are read.
+            for (j = 0; (ierr == xf_OK) && (j < nEntry); j++)
+                ierr = ReadDataEntry(fid, All, Header, nHeader,
+                    Entry[2*j], Entry[2*j+1]);
+        } else if (fseek(fid, Offset[k], SEEK_SET) != 0) {
+            ierr = xf_Error(xf_FILE_READ_ERROR);
+        } else {
+            ierr = ReadAllSection(fid, All, k);
+        }
+    }
+
+    if (fid != NULL) fclose(fid);
+
+    // Drop the data entries that were not requested.
+    if ((ierr == xf_OK) && Load[pxe_AllDataSet] && (nTitle >= 0)) {
+        for (D = All->DataSet->Head; (ierr == xf_OK) && (D != NULL); D = DNext) {
+            DNext = D->Next;
+
+            for (j = 0, keep = 0; (j < nTitle) && !keep; j++)
+                keep = (Titles[j] != NULL) && (strcmp(Titles[j], D->Title) == 0);
+
+            if (!keep)
+                ierr = xf_Error(xf_DestroyDataInSet(All->DataSet, D));
+        }
+    }
+
+    // The equation set library is only needed with the equation set.
+    if ((ierr == xf_OK) && Load[pxe_AllEqnSet]) {
+        pthread_mutex_lock(&EqnSetLock);
+
+        ierr = xf_Error(AcquireEqnSet(All));
+
+        if (ierr == xf_OK)
+            ierr = xf_Error(xf_EqnSetRegister(All->EqnSet));
+
+        pthread_mutex_unlock(&EqnSetLock);
+    }
+
+    Py_END_ALLOW_THREADS
+
+    xf_Release(Titles);
+    xf_Release(Entry);
+
+    if (ierr != xf_OK) {
+        if (!PyErr_Occurred())
+            PyErr_Format(PyExc_IOError, "Could not read '%s'", XfaFile);
+        return NULL;
+    }
+
     // Return the pointer.
     return Py_BuildValue("n", All);
 }
@@ -132,6 +911,217 @@ px_WriteAllBinary(PyObject *self, PyObject *args)
     return Py_None;
 }
 
+// Size of the buffers used for writing and copying
+#define PX_WRITE_BUFFER (1 << 22)
+
+PyObject *
+px_WriteAllSections(PyObject *self, PyObject *args)
+{
+    int ierr, k, j, nTitle, nKept, nData, Entries;
+    int Copy[pxe_AllSectionLast];
+    long Start[pxe_AllSectionLast], End[pxe_AllSectionLast];
+    long Offset[pxe_AllSectionLast + 1], *DataOffset = NULL, nHeader;
+    char *fname, *Source, **Titles = NULL, *buf = NULL;
+    char Header[PX_DATA_HEADER];
+    FILE *fid, *src;
+    xf_All *All;
+    xf_Data *D, **Kept = NULL, **Next = NULL, **Prev = NULL;
+    xf_DataSet DataSet;
+    PyObject *py_O, *py_C, *py_T, *py_t, *py_L, *py_D, *py_H;
+
+    nKept = 0;
+    nData = 0;
+    Entries = 0;
+    nHeader = 0;
+
+    if (!PyArg_ParseTuple(args, "nszOOO", &All, &fname, &Source,
+        &py_O, &py_C, &py_T)) return NULL;
+
+    if (!PyList_Check(py_C) || (PyList_Size(py_C) != pxe_AllSectionLast)) {
+        PyErr_Format(PyExc_ValueError,
+            "Copy flags must be a list of length %i", pxe_AllSectionLast);
+        return NULL;
+    }
+
+    for (k = 0; k < pxe_AllSectionLast; k++) {
+        Copy[k] = PyObject_IsTrue(PyList_GetItem(py_C, k));
+        Start[k] = End[k] = 0;
+        if (Copy[k] && (Source == NULL)) {
+            PyErr_SetString(PyExc_ValueError,
+                "Sections can only be copied from a source file");
+            return NULL;
+        }
+    }
+
+    // Byte range of each section in the source file
+    if (Source != NULL) {
+        if (!PyList_Check(py_O) || (PyList_Size(py_O) != pxe_AllSectionLast)) {
+            PyErr_Format(PyExc_ValueError,
+                "Offsets must be a list of length %i", pxe_AllSectionLast);
+            return NULL;
+        }
+
+        for (k = 0; k < pxe_AllSectionLast; k++)
+            if (!PyArg_ParseTuple(PyList_GetItem(py_O, k), "ll",
+                Start + k, End + k)) return NULL;
+    }
+
+    if (PyErr_Occurred()) return NULL;
+
+    // Data entries to write; None writes them all
+    nTitle = -1;
+    if (py_T != Py_None) {
+        if (!PyList_Check(py_T)) {
+            PyErr_SetString(PyExc_TypeError, "Data titles must be a list");
+            return NULL;
+        }
+
+        nTitle = (int) PyList_Size(py_T);
+
+        ierr = xf_Error(xf_Alloc((void **)&Titles, max(nTitle, 1), sizeof(char *)));
+
+        if (ierr != xf_OK) return NULL;
+
+        for (j = 0; j < nTitle; j++) {
+            py_t = PyList_GetItem(py_T, j);
+            Titles[j] = PyString_Check(py_t) ? PyString_AsString(py_t) : NULL;
+        }
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+
+    ierr = xf_Error(xf_Alloc((void **)&buf, PX_WRITE_BUFFER, sizeof(char)));
+
+    fid = src = NULL;
+    if (ierr == xf_OK) {
+        fid = fopen(fname, "wb");
+        if (fid == NULL) ierr = xf_Error(xf_FILE_WRITE_ERROR);
+    }
+
+    // The sections are written in large blocks.
+    if (ierr == xf_OK) setvbuf(fid, NULL, _IOFBF, PX_WRITE_BUFFER);
+
+    if ((ierr == xf_OK) && (Source != NULL)) {
+        src = fopen(Source, "rb");
+        if (src == NULL) ierr = xf_Error(xf_FILE_READ_ERROR);
+    }
+
+    // Link the requested data entries into a temporary data set.
+    DataSet = *All->DataSet;
+    if ((ierr == xf_OK) && (nTitle >= 0) && !Copy[pxe_AllDataSet]) {
+        j = 0;
+        for (D = All->DataSet->Head; D != NULL; D = D->Next) j++;
+
+        ierr = xf_Error(xf_Alloc((void **)&Kept, max(j, 1), sizeof(xf_Data *)));
+        if (ierr == xf_OK)
+            ierr = xf_Error(xf_Alloc((void **)&Next, max(j, 1), sizeof(xf_Data *)));
+        if (ierr == xf_OK)
+            ierr = xf_Error(xf_Alloc((void **)&Prev, max(j, 1), sizeof(xf_Data *)));
+
+        for (D = All->DataSet->Head; (ierr == xf_OK) && (D != NULL); D = D->Next) {
+            for (j = 0; j < nTitle; j++)
+                if ((Titles[j] != NULL) && (strcmp(Titles[j], D->Title) == 0))
+                    break;
+            if (j < nTitle) Kept[nKept++] = D;
+        }
+
+        if (ierr == xf_OK) {
+            for (j = 0; j < nKept; j++) {
+                Next[j] = Kept[j]->Next;
+                Prev[j] = Kept[j]->Prev;
+                Kept[j]->Prev = (j > 0) ? Kept[j-1] : NULL;
+                Kept[j]->Next = (j < nKept - 1) ? Kept[j+1] : NULL;
+            }
+
+            DataSet.Head = (nKept > 0) ? Kept[0] : NULL;
+            DataSet.Tail = (nKept > 0) ? Kept[nKept-1] : NULL;
+        }
+    }
+
+    // Write each section from memory or copy it from the source.
+    for (k = 0; (ierr == xf_OK) && (k < pxe_AllSectionLast); k++) {
+        Offset[k] = ftell(fid);
+        if (Copy[k])
+            ierr = CopyFileSection(src, fid, Start[k], End[k], buf, PX_WRITE_BUFFER);
+        else if (k == pxe_AllDataSet)
+            ierr = xf_Error(xf_WriteDataSetBinary(All->Mesh, &DataSet, fid));
+        else
+            ierr = WriteAllSection(fid, All, k);
+    }
+
+    if (ierr == xf_OK) Offset[pxe_AllSectionLast] = ftell(fid);
+
+    // Find where each xf_Data starts if the data set was written from memory.
+    if ((ierr == xf_OK) && !Copy[pxe_AllDataSet]) {
+        for (D = DataSet.Head; D != NULL; D = D->Next) nData++;
+
+        ierr = xf_Error(xf_Alloc((void **)&DataOffset, nData + 1, sizeof(long)));
+
+        if (ierr == xf_OK)
+            Entries = (IndexDataEntries(All->Mesh, &DataSet,
+                Offset[pxe_AllDataSet], Offset[pxe_AllDataSet+1], DataOffset,
+                Header, &nHeader) == xf_OK);
+    }
+
+    // Restore the links of the data set.
+    if (Kept != NULL) {
+        for (j = 0; j < nKept; j++) {
+            Kept[j]->Next = Next[j];
+            Kept[j]->Prev = Prev[j];
+        }
+    }
+
+    if (src != NULL) fclose(src);
+
+    if ((fid != NULL) && (fclose(fid) != 0) && (ierr == xf_OK))
+        ierr = xf_Error(xf_FILE_WRITE_ERROR);
+
+    Py_END_ALLOW_THREADS
+
+    xf_Release(Titles);
+    xf_Release(Kept);
+    xf_Release(Next);
+    xf_Release(Prev);
+    xf_Release(buf);
+
+    if (ierr != xf_OK) {
+        xf_Release(DataOffset);
+        if (!PyErr_Occurred())
+            PyErr_Format(PyExc_IOError, "Could not write '%s'", fname);
+        return NULL;
+    }
+
+    // List of (start, end) of each section in the new file
+    py_L = PyList_New(pxe_AllSectionLast);
+
+    for (k = 0; (py_L != NULL) && (k < pxe_AllSectionLast); k++)
+        PyList_SET_ITEM(py_L, k, Py_BuildValue("ll", Offset[k], Offset[k+1]));
+
+    // List of (start, end) of each data entry and the header, if known
+    if (Entries) {
+        py_D = PyList_New(nData);
+        for (k = 0; (py_D != NULL) && (k < nData); k++)
+            PyList_SET_ITEM(py_D, k, Py_BuildValue("ll", DataOffset[k],
+                DataOffset[k+1]));
+        py_H = PyString_FromStringAndSize(Header, (Py_ssize_t) nHeader);
+    } else {
+        Py_INCREF(Py_None);
+        Py_INCREF(Py_None);
+        py_D = py_H = Py_None;
+    }
+
+    xf_Release(DataOffset);
+
+    if ((py_L == NULL) || (py_D == NULL) || (py_H == NULL)) {
+        Py_XDECREF(py_L);
+        Py_XDECREF(py_D);
+        Py_XDECREF(py_H);
+        return NULL;
+    }
+
+    return Py_BuildValue("NNN", py_L, py_D, py_H);
+}
+
 PyObject *
 px_GetAllMembers(PyObject *self, PyObject *args)
 {
@@ -142,3 +1132,39 @@ px_GetAllMembers(PyObject *self, PyObject *args)
     // Return a tuple of pointers
     return Py_BuildValue("nnnnn", All->Mesh, All->Geom, All->DataSet, All->Param, All->EqnSet);
 }
+
+PyObject *
+px_EqnSetLibraries(PyObject *self, PyObject *args)
+{
+    int ierr, i, n, Active;
+    EqnSetEntry *Copy = NULL;
+    PyObject *py_L;
+
+    // Copy the registry without the GIL, then build the list from the copy.
+    Py_BEGIN_ALLOW_THREADS
+    pthread_mutex_lock(&EqnSetLock);
+
+    n = nEqnSetRegistry;
+    Active = ActiveEqnSet;
+
+    ierr = xf_Error(xf_Alloc((void **) &Copy, max(n, 1), sizeof(EqnSetEntry)));
+
+    if (ierr == xf_OK)
+        for (i = 0; i < n; i++) Copy[i] = EqnSetRegistry[i];
+
+    pthread_mutex_unlock(&EqnSetLock);
+    Py_END_ALLOW_THREADS
+
+    if (ierr != xf_OK) return NULL;
+
+    // List of (name, number of users, whether the hooks point to it)
+    py_L = PyList_New(n);
+
+    for (i = 0; (py_L != NULL) && (i < n); i++)
+        PyList_SET_ITEM(py_L, i, Py_BuildValue("siN", Copy[i].Name,
+            Copy[i].nAll, PyBool_FromLong(i == Active)));
+
+    xf_Release(Copy);
+
+    return py_L;
+}
@@ -73,6 +73,68 @@ char doc_ReadAllBinary[] =
 "   *A*: :class:`int`\n"
 "       Pointer to *xf_All* struct\n";
 
+/***************************************************/
+PyObject *
+px_IndexAllBinary(PyObject *self, PyObject *args);
+
+char doc_IndexAllBinary[] =
+"Find the byte offsets of the sections of an XFlow ``'.xfa'`` file.\n"
+"\n"
+":Call:\n"
+"   >>> O, D, H = px.IndexAllBinary(XfaFile)\n"
+"\n"
+":Parameters:\n"
+"   *XfaFile*: :class:`str`\n"
+"       Name of file to index\n"
+"\n"
+":Returns:\n"
+"   *O*: :class:`list` of (:class:`int`, :class:`int`)\n"
+"       Start and end of the mesh, geometry, data set, parameter, and\n"
+"       equation set sections\n"
+"   *D*: :class:`list` of (:class:`str`, :class:`str`)\n"
+"       Title, type, start, and end of each *xf_Data* in the data set; the\n"
+"       start and end are ``None`` if *H* is ``None``\n"
+"   *H*: :class:`str` or ``None``\n"
+"       Header of a data set with one entry, used to read the entries on\n"
+"       their own; ``None`` if the entries do not add up to the data set\n"
+"\n"
+"The whole file is read once to find the offsets.\n";
+
+/***************************************************/
+PyObject *
+px_ReadAllSections(PyObject *self, PyObject *args);
+
+char doc_ReadAllSections[] =
+"Read selected sections of an XFlow ``'.xfa'`` file.\n"
+"\n"
+":Call:\n"
+"   >>> A = px.ReadAllSections(XfaFile, DefaultFlag, Offsets, Load, Titles,\n"
+"           Entries=None, Header=None)\n"
+"\n"
+":Parameters:\n"
+"   *XfaFile*: :class:`str`\n"
+"       Name of file to read from\n"
+"   *DefaultFlag*: :class:`bool`\n"
+"       Whether or not to use defaults internally\n"
+"   *Offsets*: :class:`list` of :class:`int`\n"
+"       Start of each section from :func:`IndexAllBinary`\n"
+"   *Load*: :class:`list` of :class:`bool`\n"
+"       Whether to read each section; the mesh is always read\n"
+"   *Titles*: :class:`list` of :class:`str` or ``None``\n"
+"       Titles of the *xf_Data* entries to keep; ``None`` keeps all\n"
+"   *Entries*: :class:`list` of (:class:`int`, :class:`int`) or ``None``\n"
+"       Start and end of the *xf_Data* entries to read from\n"
+"       :func:`IndexAllBinary`; ``None`` reads the whole data set\n"
+"   *Header*: :class:`str` or ``None``\n"
+"       Data set header from :func:`IndexAllBinary`, needed with *Entries*\n"
+"\n"
+":Returns:\n"
+"   *A*: :class:`int`\n"
+"       Pointer to *xf_All* struct\n"
+"\n"
+"Sections that are not requested are skipped with a seek and left empty.\n"
+"The equation set library is only loaded along with the equation set.\n";
+
 /***************************************************/
 PyObject *
 px_WriteAllBinary(PyObject *self, PyObject *args);
@@ -97,6 +159,42 @@ char doc_WriteAllBinary[] =
 "       >>> All = pyxflow.xf_All(fname='naca_Adapt_0.xfa')\n"
 "       >>> px.WriteAllBinary(All._ptr, 'test.xfa')\n";
 
+/***************************************************/
+PyObject *
+px_WriteAllSections(PyObject *self, PyObject *args);
+
+char doc_WriteAllSections[] =
+"Write an *xf_All* to file, copying unchanged sections from another file.\n"
+"\n"
+":Call:\n"
+"   >>> O, D, H = px.WriteAllSections(A, fname, Source, Offsets, Copy, Titles)\n"
+"\n"
+":Parameters:\n"
+"   *A*: :class:`int`\n"
+"       Pointer to *xf_All* struct\n"
+"   *fname*: :class:`str`\n"
+"       Name of ``.xfa`` file to create\n"
+"   *Source*: :class:`str` or ``None``\n"
+"       Name of the ``.xfa`` file that *A* was read from\n"
+"   *Offsets*: :class:`list` of (:class:`int`, :class:`int`) or ``None``\n"
+"       Start and end of each section of *Source* from\n"
+"       :func:`IndexAllBinary`\n"
+"   *Copy*: :class:`list` of :class:`bool`\n"
+"       Whether to copy each section from *Source* instead of writing it\n"
+"   *Titles*: :class:`list` of :class:`str` or ``None``\n"
+"       Titles of the *xf_Data* entries to write; ``None`` writes all\n"
+"\n"
+":Returns:\n"
+"   *O*: :class:`list` of (:class:`int`, :class:`int`)\n"
+"       Start and end of each section in the new file\n"
+"   *D*: :class:`list` of (:class:`int`, :class:`int`) or ``None``\n"
+"       Start and end of each *xf_Data* written from memory; ``None`` if the\n"
+"       data set was copied or the entries could not be located\n"
+"   *H*: :class:`str` or ``None``\n"
+"       Header of a data set with one entry (see :func:`IndexAllBinary`)\n"
+"\n"
+"Writes and copies go through a buffer of 4 MB.\n";
+
 /***************************************************/
 PyObject *
 px_GetAllMembers(PyObject *self, PyObject *args);
@@ -124,4 +222,22 @@ char doc_GetAllMembers[] =
 "       Pointer to *xf_EqnSet*\n";
 
 
+/***************************************************/
+PyObject *
+px_EqnSetLibraries(PyObject *self, PyObject *args);
+
+char doc_EqnSetLibraries[] =
+"List the equation set libraries loaded by :func:`ReadAllBinary`.\n"
+"\n"
+":Call:\n"
+"   >>> L = px.EqnSetLibraries()\n"
+"\n"
+":Returns:\n"
+"   *L*: :class:`list` of (:class:`str`, :class:`int`, :class:`bool`)\n"
+"       Name of each library, number of *xf_All* structs using it, and\n"
+"       whether it is the library currently used by libXF\n"
+"\n"
+"Each library is loaded once and stays loaded until the last *xf_All* that\n"
+"uses it is destroyed with :func:`DestroyAll`.\n";
+
 #endif
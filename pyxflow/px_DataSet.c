@@ -10,6 +10,12 @@
 #include "xf_State.h"
 #include "xf_Param.h"
 
+// Mapped GenArrays (px_Map.c)
+int
+px_IsMapped(const xf_GenArray *G);
+
+void
+px_UnmapDataSet(xf_DataSet *DataSet);
 
 // Function to create an empty geom.
 PyObject *
@@ -40,13 +46,16 @@ px_ReadDataSetFile(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "ns", &Mesh, &fname))
         return NULL;
 
+    Py_BEGIN_ALLOW_THREADS
+
     // Allocate the DataSet.
     ierr = xf_Error(xf_CreateDataSet(&DataSet));
 
-    if (ierr != xf_OK) return NULL;
-
     // Read the file into the xf_DataSet structure.
-    ierr = xf_Error(xf_ReadDataSetBinary(Mesh, NULL, fname, DataSet));
+    if (ierr == xf_OK)
+        ierr = xf_Error(xf_ReadDataSetBinary(Mesh, NULL, fname, DataSet));
+
+    Py_END_ALLOW_THREADS
 
     if (ierr != xf_OK) return NULL;
 
@@ -360,6 +369,9 @@ px_GetGenArray(PyObject *self, PyObject *args)
             dims2[1] = r;
             // Assign the data
             rValue = PyArray_SimpleNewFromData(2, dims2, NPY_DOUBLE, *G->rValue);
+            // Values mapped from a file are read-only.
+            if ((rValue != NULL) && px_IsMapped(G))
+                PyArray_CLEARFLAGS((PyArrayObject *) rValue, NPY_ARRAY_WRITEABLE);
         }
     } else {
         // Make a reference to None.
@@ -383,6 +395,9 @@ px_DestroyDataSet(PyObject *self, PyObject *args)
     // Get the pointer.
     if (!PyArg_ParseTuple(args, "n", &DataSet)) return NULL;
 
+    // Values mapped from a file are not freed by libxf.
+    px_UnmapDataSet(DataSet);
+
     // Deallocate the mesh.
     ierr = xf_Error(xf_DestroyDataSet(DataSet));
 
@@ -1,4 +1,7 @@
 #include <Python.h>
+#include <float.h>
+#include <math.h>
+#include <string.h>
 #define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
 #define PY_ARRAY_UNIQUE_SYMBOL _pyxflow_ARRAY_API
 #define NO_IMPORT_ARRAY
@@ -9,6 +12,11 @@
 #include <xf_Geom.h>
 #include <xf_GeomIO.h>
 #include <xf_String.h>
+#include <xf_Memory.h>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 
 /******************************************************************/
@@ -200,33 +208,601 @@ px_SetGeomCompPanelCoord(PyObject *self, PyObject *args)
     xf_Geom *Geom;
     xf_GeomComp *GC;
     xf_GeomCompPanel *GCP;
-    int ierr, i, nNode, dim;
-    PyObject *Py_Coord;
-    real **Coord;
-    
-    // Get the pointer and integer inputs.
-    if (!PyArg_ParseTuple(args, "niiiO", &Geom, &i, &nNode, &dim, &Py_Coord))
+    int ierr, i, iComp, nNode, nPanel, nn;
+    int *Panels, **NewPanels;
+    real *Coord, **NewCoord;
+    PyObject *py_Coord, *py_Panels = Py_None;
+    PyArrayObject *a_Coord, *a_Panels = NULL;
+
+    // Get the pointer and the arrays.
+    if (!PyArg_ParseTuple(args, "niO|O", &Geom, &iComp, &py_Coord, &py_Panels))
+        return NULL;
+
+    // Check the value of iComp.
+    if ((iComp < 0) || (iComp >= Geom->nComp)) {
+        PyErr_SetString(PyExc_RuntimeError, \
+                        "Component index exceeds dimensions.");
         return NULL;
-    printf("i = %i\n", i);
-    printf("nComp = %i\n", Geom->nComp);
+    }
+
     // Extract the panel.
-    GC = Geom->Comp+i;
-    printf("Label 1?\n");
-    GCP = GC->Data;
-    // Assign the node count.
-    GCP->nNode = nNode;
-    // Assign the component dimension.
-    GCP->dim = dim;
-    
-    xf_printf("nNode: %i\n", GCP->nNode);
-    xf_printf("dim: %i\n", GCP->dim);
-    
+    GC = Geom->Comp + iComp;
+
+    if (GC->Type != xfe_GeomCompPanel) {
+        PyErr_SetString(PyExc_TypeError, "Geometry component is not a panel.");
+        return NULL;
+    }
+
+    GCP = (xf_GeomCompPanel *) GC->Data;
+
+    ierr = xf_Error(xf_Order2nNode(GCP->Basis, GCP->Order, &nn));
+    if (ierr != xf_OK) return NULL;
+
+    // Get contiguous arrays of the correct types.
+    a_Coord = (PyArrayObject *) PyArray_FROM_OTF(py_Coord, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    if (a_Coord == NULL) return NULL;
+
+    if (py_Panels != Py_None) {
+        a_Panels = (PyArrayObject *) PyArray_FROM_OTF(py_Panels, NPY_INT, NPY_ARRAY_IN_ARRAY);
+        if (a_Panels == NULL) {
+            Py_DECREF(a_Coord);
+            return NULL;
+        }
+    }
+
+    // Check the dimensions.
+    if ((PyArray_NDIM(a_Coord) != 2) || (PyArray_DIM(a_Coord, 1) != GCP->dim)
+        || ((a_Panels != NULL) && ((PyArray_NDIM(a_Panels) != 2) || (PyArray_DIM(a_Panels, 1) != nn)))) {
+        PyErr_SetString(PyExc_ValueError, "Coordinates must be (nNode, dim) and panels (nPanel, nn).");
+        Py_DECREF(a_Coord);
+        Py_XDECREF(a_Panels);
+        return NULL;
+    }
+
+    nNode = (int) PyArray_DIM(a_Coord, 0);
+    Coord = (real *) PyArray_DATA(a_Coord);
+
+    if (a_Panels != NULL) {
+        nPanel = (int) PyArray_DIM(a_Panels, 0);
+        Panels = (int *) PyArray_DATA(a_Panels);
+    } else {
+        nPanel = GCP->nPanel;
+        Panels = (GCP->nPanel > 0) ? *GCP->Panels : NULL;
+    }
+
+    // The panels must refer to existing nodes.
+    for (i = 0; i < nPanel * nn; i++) {
+        if ((Panels[i] < 0) || (Panels[i] >= nNode)) {
+            PyErr_SetString(PyExc_IndexError, "Panel node index out of range.");
+            Py_DECREF(a_Coord);
+            Py_XDECREF(a_Panels);
+            return NULL;
+        }
+    }
+
+    /*  The new values may be a view of the old storage (for example a
+        slice of the component's own Coord), so new storage is filled before
+        the old storage is released. */
+
+    // Reallocate the coordinates if the number of nodes changed.
+    if (nNode != GCP->nNode) {
+        NewCoord = NULL;
+        ierr = xf_Error(xf_Alloc2((void ***) &NewCoord, nNode, GCP->dim, sizeof(real)));
+        if (ierr != xf_OK) {
+            Py_DECREF(a_Coord);
+            Py_XDECREF(a_Panels);
+            return NULL;
+        }
+
+        if (nNode > 0)
+            memcpy(*NewCoord, Coord, nNode * GCP->dim * sizeof(real));
+
+        xf_Release2((void **) GCP->Coord);
+        GCP->Coord = NewCoord;
+        GCP->nNode = nNode;
+    }
+    // Copy the coordinates unless they were modified in place.
+    else if ((nNode > 0) && (Coord != *GCP->Coord)) {
+        memmove(*GCP->Coord, Coord, nNode * GCP->dim * sizeof(real));
+    }
+
+    // Connectivity
+    if ((a_Panels != NULL) && (nPanel != GCP->nPanel)) {
+        NewPanels = NULL;
+        ierr = xf_Error(xf_Alloc2((void ***) &NewPanels, nPanel, nn, sizeof(int)));
+        if (ierr != xf_OK) {
+            Py_DECREF(a_Coord);
+            Py_DECREF(a_Panels);
+            return NULL;
+        }
+
+        if (nPanel > 0)
+            memcpy(*NewPanels, Panels, nPanel * nn * sizeof(int));
+
+        xf_Release2((void **) GCP->Panels);
+        GCP->Panels = NewPanels;
+        GCP->nPanel = nPanel;
+    }
+    else if ((a_Panels != NULL) && (nPanel > 0) && (Panels != *GCP->Panels)) {
+        memmove(*GCP->Panels, Panels, nPanel * nn * sizeof(int));
+    }
+
+    Py_DECREF(a_Coord);
+    Py_XDECREF(a_Panels);
+
     // Return `None`.
     Py_INCREF(Py_None);
     return Py_None;
 }
 
 
+/******************************************************************/
+// Bounding volume hierarchy of segments or triangles
+
+// Maximum number of primitives in a leaf
+#define BVH_LEAF 4
+// Maximum depth of the traversal stack
+#define BVH_STACK 128
+
+typedef struct {
+    real lo[3], hi[3]; // bounding box
+    int left, right; // children, or -1 for a leaf
+    int start, n; // range of BVH.perm in a leaf
+} BVHNode;
+
+typedef struct {
+    int nPrim; // number of primitives
+    int k; // nodes per primitive (2 or 3)
+    real *V; // vertex coordinates, padded to 3D
+    int *Prim; // vertex indices of each primitive
+    int *perm; // primitives in leaf order
+    real *cen; // primitive centroids
+    int nNode; // number of tree nodes in use
+    BVHNode *Node; // tree nodes; Node[0] is the root
+} BVH;
+
+
+// Partially sort perm[lo..hi] so that perm[m] has the median centroid
+static void
+BVHSelect(BVH *B, int lo, int hi, int m, int axis)
+{
+    int i, j, p;
+    real c;
+
+    while (hi > lo) {
+        c = B->cen[3 * B->perm[(lo + hi) / 2] + axis];
+        i = lo;
+        j = hi;
+
+        while (i <= j) {
+            while (B->cen[3 * B->perm[i] + axis] < c) i++;
+            while (B->cen[3 * B->perm[j] + axis] > c) j--;
+
+            if (i <= j) {
+                p = B->perm[i];
+                B->perm[i++] = B->perm[j];
+                B->perm[j--] = p;
+            }
+        }
+
+        if (m <= j) hi = j;
+        else if (m >= i) lo = i;
+        else return;
+    }
+}
+
+
+// Build the subtree for perm[start..start+n) in node inode
+static void
+BVHBuild(BVH *B, int inode, int start, int n)
+{
+    int i, j, d, axis;
+    real clo[3], chi[3], *x;
+    BVHNode *N = B->Node + inode;
+
+    for (d = 0; d < 3; d++) {
+        N->lo[d] = clo[d] = DBL_MAX;
+        N->hi[d] = chi[d] = -DBL_MAX;
+    }
+
+    // Bounding boxes of the vertices and centroids
+    for (i = start; i < start + n; i++) {
+        for (j = 0; j < B->k; j++) {
+            x = B->V + 3 * B->Prim[B->k * B->perm[i] + j];
+            for (d = 0; d < 3; d++) {
+                if (x[d] < N->lo[d]) N->lo[d] = x[d];
+                if (x[d] > N->hi[d]) N->hi[d] = x[d];
+            }
+        }
+
+        x = B->cen + 3 * B->perm[i];
+        for (d = 0; d < 3; d++) {
+            if (x[d] < clo[d]) clo[d] = x[d];
+            if (x[d] > chi[d]) chi[d] = x[d];
+        }
+    }
+
+    N->start = start;
+    N->n = n;
+    N->left = N->right = -1;
+
+    if (n <= BVH_LEAF) return;
+
+    // Split at the median centroid along the longest axis.
+    axis = 0;
+    for (d = 1; d < 3; d++)
+        if (chi[d] - clo[d] > chi[axis] - clo[axis]) axis = d;
+
+    BVHSelect(B, start, start + n - 1, start + n / 2, axis);
+
+    N->left = B->nNode++;
+    N->right = B->nNode++;
+
+    BVHBuild(B, N->left, start, n / 2);
+    BVHBuild(B, B->Node[inode].right, start + n / 2, n - n / 2);
+}
+
+
+// Create a tree from coordinates (nVert x dim) and primitives (nPrim x k)
+static int
+CreateBVH(int dim, int nVert, const real *Coord, int k, int nPrim, const int *Prim, BVH *B)
+{
+    int ierr, i, j, d;
+
+    B->nPrim = nPrim;
+    B->k = k;
+    B->Prim = (int *) Prim;
+    B->nNode = 1;
+    B->V = NULL;
+    B->perm = NULL;
+    B->cen = NULL;
+    B->Node = NULL;
+
+    ierr = xf_Error(xf_Alloc((void **) &B->V, 3 * nVert, sizeof(real)));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(xf_Alloc((void **) &B->perm, nPrim, sizeof(int)));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(xf_Alloc((void **) &B->cen, 3 * nPrim, sizeof(real)));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(xf_Alloc((void **) &B->Node, 2 * nPrim, sizeof(BVHNode)));
+
+    if (ierr != xf_OK) return ierr;
+
+    for (i = 0; i < nVert; i++)
+        for (d = 0; d < 3; d++)
+            B->V[3 * i + d] = (d < dim) ? Coord[dim * i + d] : 0.0;
+
+    for (i = 0; i < nPrim; i++) {
+        B->perm[i] = i;
+
+        for (d = 0; d < 3; d++) {
+            B->cen[3 * i + d] = 0.0;
+            for (j = 0; j < k; j++)
+                B->cen[3 * i + d] += B->V[3 * Prim[k * i + j] + d] / k;
+        }
+    }
+
+    BVHBuild(B, 0, 0, nPrim);
+
+    return xf_OK;
+}
+
+
+static void
+DestroyBVH(BVH *B)
+{
+    xf_Release((void *) B->V);
+    xf_Release((void *) B->perm);
+    xf_Release((void *) B->cen);
+    xf_Release((void *) B->Node);
+}
+
+
+// Squared distance from a point to a bounding box
+static real
+BoxDist2(const BVHNode *N, const real *x)
+{
+    int d;
+    real e, r = 0.0;
+
+    for (d = 0; d < 3; d++) {
+        if (x[d] < N->lo[d]) e = N->lo[d] - x[d];
+        else if (x[d] > N->hi[d]) e = x[d] - N->hi[d];
+        else continue;
+        r += e * e;
+    }
+
+    return r;
+}
+
+
+// Closest point on segment ab; w[0] is the fraction along the segment
+static void
+ClosestOnSegment(const real *a, const real *b, const real *x, real *y, real *w)
+{
+    int d;
+    real ab[3], t = 0.0, l2 = 0.0;
+
+    for (d = 0; d < 3; d++) {
+        ab[d] = b[d] - a[d];
+        t += (x[d] - a[d]) * ab[d];
+        l2 += ab[d] * ab[d];
+    }
+
+    t = (l2 > 0.0) ? t / l2 : 0.0;
+    t = (t < 0.0) ? 0.0 : ((t > 1.0) ? 1.0 : t);
+
+    for (d = 0; d < 3; d++) y[d] = a[d] + t * ab[d];
+
+    w[0] = t;
+}
+
+
+static real
+Dot3(const real *u, const real *v)
+{
+    return u[0] * v[0] + u[1] * v[1] + u[2] * v[2];
+}
+
+
+// Closest point on triangle abc; w holds the weights of b and c
+static void
+ClosestOnTriangle(const real *a, const real *b, const real *c, const real *x, real *y, real *w)
+{
+    /*  Regions of the triangle are tested in turn as in Ericson, "Real-Time
+        Collision Detection," Section 5.1.5. */
+
+    int d;
+    real ab[3], ac[3], ax[3], bx[3], cx[3];
+    real d1, d2, d3, d4, d5, d6, va, vb, vc, v, u, den;
+
+    for (d = 0; d < 3; d++) {
+        ab[d] = b[d] - a[d];
+        ac[d] = c[d] - a[d];
+        ax[d] = x[d] - a[d];
+        bx[d] = x[d] - b[d];
+        cx[d] = x[d] - c[d];
+    }
+
+    d1 = Dot3(ab, ax);
+    d2 = Dot3(ac, ax);
+    d3 = Dot3(ab, bx);
+    d4 = Dot3(ac, bx);
+    d5 = Dot3(ab, cx);
+    d6 = Dot3(ac, cx);
+
+    vc = d1 * d4 - d3 * d2;
+    vb = d5 * d2 - d1 * d6;
+    va = d3 * d6 - d5 * d4;
+
+    if ((d1 <= 0.0) && (d2 <= 0.0)) {
+        // vertex a
+        u = 0.0;
+        v = 0.0;
+    } else if ((d3 >= 0.0) && (d4 <= d3)) {
+        // vertex b
+        u = 1.0;
+        v = 0.0;
+    } else if ((d6 >= 0.0) && (d5 <= d6)) {
+        // vertex c
+        u = 0.0;
+        v = 1.0;
+    } else if ((vc <= 0.0) && (d1 >= 0.0) && (d3 <= 0.0)) {
+        // edge ab
+        u = d1 / (d1 - d3);
+        v = 0.0;
+    } else if ((vb <= 0.0) && (d2 >= 0.0) && (d6 <= 0.0)) {
+        // edge ac
+        u = 0.0;
+        v = d2 / (d2 - d6);
+    } else if ((va <= 0.0) && (d4 - d3 >= 0.0) && (d5 - d6 >= 0.0)) {
+        // edge bc
+        v = (d4 - d3) / ((d4 - d3) + (d5 - d6));
+        u = 1.0 - v;
+    } else {
+        // interior
+        den = va + vb + vc;
+        u = (den != 0.0) ? vb / den : 0.0;
+        v = (den != 0.0) ? vc / den : 0.0;
+    }
+
+    for (d = 0; d < 3; d++) y[d] = a[d] + u * ab[d] + v * ac[d];
+
+    w[0] = u;
+    w[1] = v;
+}
+
+
+// Closest point on any primitive to x
+static void
+BVHQuery(const BVH *B, const real *x, int *ibest, real *ybest, real *wbest, real *d2best)
+{
+    int i, d, p, nstack, stack[BVH_STACK];
+    int *P;
+    real y[3], w[2], r, rl, rr;
+    const BVHNode *N;
+
+    *ibest = -1;
+    *d2best = DBL_MAX;
+
+    nstack = 0;
+    stack[nstack++] = 0;
+
+    while (nstack > 0) {
+        N = B->Node + stack[--nstack];
+
+        if (BoxDist2(N, x) >= *d2best) continue;
+
+        if (N->left < 0) {
+            for (i = N->start; i < N->start + N->n; i++) {
+                p = B->perm[i];
+                P = B->Prim + B->k * p;
+
+                if (B->k == 2)
+                    ClosestOnSegment(B->V + 3 * P[0], B->V + 3 * P[1], x, y, w);
+                else
+                    ClosestOnTriangle(B->V + 3 * P[0], B->V + 3 * P[1], B->V + 3 * P[2], x, y, w);
+
+                r = 0.0;
+                for (d = 0; d < 3; d++) r += (y[d] - x[d]) * (y[d] - x[d]);
+
+                if (r < *d2best) {
+                    *d2best = r;
+                    *ibest = p;
+                    for (d = 0; d < 3; d++) ybest[d] = y[d];
+                    for (d = 0; d < B->k - 1; d++) wbest[d] = w[d];
+                }
+            }
+            continue;
+        }
+
+        // Visit the nearer child first.
+        rl = BoxDist2(B->Node + N->left, x);
+        rr = BoxDist2(B->Node + N->right, x);
+
+        if (rl < rr) {
+            stack[nstack++] = N->right;
+            stack[nstack++] = N->left;
+        } else {
+            stack[nstack++] = N->left;
+            stack[nstack++] = N->right;
+        }
+    }
+}
+
+
+/******************************************************************/
+// Function to find the closest points on a set of segments or triangles
+PyObject *
+px_ProjectPoints(PyObject *self, PyObject *args)
+{
+    int ierr, i, d, dim, k, nVert, nPrim, nThread = 1;
+    int *Prim, *I;
+    npy_intp n, pydim[2];
+    real *Coord, *X, *Y, *W, *D, x[3], y[3], w[2], r;
+    BVH B;
+    PyObject *py_V, *py_P, *py_X, *py_Y, *py_I, *py_W, *py_D;
+    PyArrayObject *a_V, *a_P, *a_X;
+
+    // Parse the inputs.
+    if (!PyArg_ParseTuple(args, "OOO|i", &py_V, &py_P, &py_X, &nThread))
+        return NULL;
+
+    // Get contiguous arrays of the correct types.
+    a_V = (PyArrayObject *) PyArray_FROM_OTF(py_V, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    a_P = (PyArrayObject *) PyArray_FROM_OTF(py_P, NPY_INT, NPY_ARRAY_IN_ARRAY);
+    a_X = (PyArrayObject *) PyArray_FROM_OTF(py_X, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    if ((a_V == NULL) || (a_P == NULL) || (a_X == NULL)) {
+        Py_XDECREF(a_V);
+        Py_XDECREF(a_P);
+        Py_XDECREF(a_X);
+        return NULL;
+    }
+
+    // Check the dimensions.
+    if ((PyArray_NDIM(a_V) != 2) || (PyArray_NDIM(a_P) != 2) || (PyArray_NDIM(a_X) != 2)
+        || (PyArray_DIM(a_V, 1) != PyArray_DIM(a_X, 1))
+        || (PyArray_DIM(a_V, 1) < 2) || (PyArray_DIM(a_V, 1) > 3)
+        || (PyArray_DIM(a_P, 1) < 2) || (PyArray_DIM(a_P, 1) > 3)
+        || (PyArray_DIM(a_P, 0) < 1)) {
+        PyErr_SetString(PyExc_ValueError, "Inputs must be (nVert, dim), (nPrim, 2 or 3), and (n, dim) arrays.");
+        Py_DECREF(a_V);
+        Py_DECREF(a_P);
+        Py_DECREF(a_X);
+        return NULL;
+    }
+
+    dim = (int) PyArray_DIM(a_V, 1);
+    nVert = (int) PyArray_DIM(a_V, 0);
+    k = (int) PyArray_DIM(a_P, 1);
+    nPrim = (int) PyArray_DIM(a_P, 0);
+    n = PyArray_DIM(a_X, 0);
+
+    Coord = (real *) PyArray_DATA(a_V);
+    Prim = (int *) PyArray_DATA(a_P);
+    X = (real *) PyArray_DATA(a_X);
+
+    for (i = 0; i < k * nPrim; i++) {
+        if ((Prim[i] < 0) || (Prim[i] >= nVert)) {
+            PyErr_SetString(PyExc_IndexError, "Primitive vertex index out of range.");
+            Py_DECREF(a_V);
+            Py_DECREF(a_P);
+            Py_DECREF(a_X);
+            return NULL;
+        }
+    }
+
+    // Output arrays
+    pydim[0] = n;
+    pydim[1] = dim;
+    py_Y = PyArray_SimpleNew(2, pydim, NPY_DOUBLE);
+    py_I = PyArray_SimpleNew(1, pydim, NPY_INT);
+    py_D = PyArray_SimpleNew(1, pydim, NPY_DOUBLE);
+    pydim[1] = k - 1;
+    py_W = PyArray_SimpleNew(2, pydim, NPY_DOUBLE);
+
+    if ((py_Y == NULL) || (py_I == NULL) || (py_D == NULL) || (py_W == NULL)) {
+        Py_XDECREF(py_Y);
+        Py_XDECREF(py_I);
+        Py_XDECREF(py_D);
+        Py_XDECREF(py_W);
+        Py_DECREF(a_V);
+        Py_DECREF(a_P);
+        Py_DECREF(a_X);
+        return NULL;
+    }
+
+    Y = (real *) PyArray_DATA((PyArrayObject *) py_Y);
+    I = (int *) PyArray_DATA((PyArrayObject *) py_I);
+    D = (real *) PyArray_DATA((PyArrayObject *) py_D);
+    W = (real *) PyArray_DATA((PyArrayObject *) py_W);
+
+    Py_BEGIN_ALLOW_THREADS
+
+    ierr = xf_Error(CreateBVH(dim, nVert, Coord, k, nPrim, Prim, &B));
+
+    if (ierr == xf_OK) {
+        #ifdef _OPENMP
+        #pragma omp parallel for num_threads(nThread) private(d, x, y, w, r) schedule(static, 1024) if (nThread > 1)
+        #endif
+        for (i = 0; i < n; i++) {
+            for (d = 0; d < 3; d++) x[d] = (d < dim) ? X[dim * i + d] : 0.0;
+
+            BVHQuery(&B, x, I + i, y, w, &r);
+
+            for (d = 0; d < dim; d++) Y[dim * i + d] = y[d];
+            for (d = 0; d < k - 1; d++) W[(k - 1) * i + d] = w[d];
+            D[i] = sqrt(r);
+        }
+    }
+
+    DestroyBVH(&B);
+
+    Py_END_ALLOW_THREADS
+
+    Py_DECREF(a_V);
+    Py_DECREF(a_P);
+    Py_DECREF(a_X);
+
+    if (ierr != xf_OK) {
+        Py_DECREF(py_Y);
+        Py_DECREF(py_I);
+        Py_DECREF(py_D);
+        Py_DECREF(py_W);
+        return NULL;
+    }
+
+    return Py_BuildValue("NNNN", py_Y, py_I, py_W, py_D);
+}
+
+
 /******************************************************************/
 // Function to destroy the mesh
 PyObject *
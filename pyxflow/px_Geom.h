@@ -107,10 +107,65 @@ char doc_GeomComp[] =
 PyObject *
 px_SetGeomCompPanelCoord(PyObject *self, PyObject *args);
 char doc_SetGeomCompPanelCoord[] =
-"Set node coordinates for an *xf_GeomCompPanel* geometry component.\n";
+"Set node coordinates for an *xf_GeomCompPanel* geometry component.\n"
+"\n"
+"The coordinates (and panels, if given) are copied into the existing storage\n"
+"when the sizes are unchanged, and the storage is reallocated otherwise.  If\n"
+"*Coord* is the array returned by :func:`GeomComp` and was modified in place,\n"
+"nothing is copied.  Arrays from :func:`GeomComp` must be fetched again after\n"
+"a change in size.\n"
+"\n"
+":Call:\n"
+"   >>> px.SetGeomCompPanelCoord(G, i, Coord, Panels=None)\n"
+"\n"
+":Parameters:\n"
+"   *G*: :class:`int`\n"
+"       Pointer to *xf_Geom* instance\n"
+"   *i*: :class:`int`\n"
+"       Index of geometry component, which must be a panel component\n"
+"   *Coord*: :class:`numpy.array` (*nNode*, *dim*)\n"
+"       Coordinates of the nodes\n"
+"   *Panels*: :class:`numpy.array` (*nPanel*, *nn*) or ``None``\n"
+"       Indices of nodes in each panel; if ``None``, the panels are kept\n"
+"\n"
+":Returns:\n"
+"   ``None``\n";
 
 
 
+PyObject *
+px_ProjectPoints(PyObject *self, PyObject *args);
+char doc_ProjectPoints[] =
+"Find the closest point on a set of segments or triangles to each point.\n"
+"\n"
+"The primitives are sorted into a bounding volume hierarchy, which is used to\n"
+"skip primitives that cannot be closer than the best one found so far.\n"
+"\n"
+":Call:\n"
+"   >>> Y, I, W, D = px.ProjectPoints(V, P, X, nThread=1)\n"
+"\n"
+":Parameters:\n"
+"   *V*: :class:`numpy.array` (*nVert*, *dim*)\n"
+"       Coordinates of the vertices, *dim* is 2 or 3\n"
+"   *P*: :class:`numpy.array` (*nPrim*, *k*)\n"
+"       Vertex indices of each segment (*k* = 2) or triangle (*k* = 3)\n"
+"   *X*: :class:`numpy.array` (*n*, *dim*)\n"
+"       Coordinates of the points to project\n"
+"   *nThread*: :class:`int`\n"
+"       Number of threads if compiled with OpenMP\n"
+"\n"
+":Returns:\n"
+"   *Y*: :class:`numpy.array` (*n*, *dim*)\n"
+"       Closest point to each point\n"
+"   *I*: :class:`numpy.array` (*n*)\n"
+"       Index of the primitive containing each closest point\n"
+"   *W*: :class:`numpy.array` (*n*, *k* - 1)\n"
+"       Local coordinates of each closest point: the fraction along the\n"
+"       segment, or the weights of the second and third triangle vertices\n"
+"   *D*: :class:`numpy.array` (*n*)\n"
+"       Distance from each point to its closest point\n";
+
+
 PyObject *
 px_DestroyGeom(PyObject *self, PyObject *args);
 char doc_DestroyGeom[] =
@@ -0,0 +1,315 @@
+#include <Python.h>
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#define PY_ARRAY_UNIQUE_SYMBOL _pyxflow_ARRAY_API
+#define NO_IMPORT_ARRAY
+#include <numpy/arrayobject.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include "xf_AllStruct.h"
+#include "xf_All.h"
+#include "xf_Data.h"
+#include "xf_Memory.h"
+
+/* Real values of constant-rank GenArrays can be mapped from a cache file
+   instead of living on the heap.  The mapping is private, so the pages are
+   shared with other processes that map the same file until somebody writes to
+   them.  The cache file for an xf_Data holds the values of each such array,
+   in order, at offsets aligned to the page size.  Mapped arrays are recorded
+   here so they can be unmapped before libxf frees the GenArray.  The registry
+   is only accessed while holding the GIL. */
+
+typedef struct {
+    xf_GenArray *G; // GenArray with mapped values
+    void *Base; // start of the mapping
+    size_t Len; // length of the mapping
+} MapEntry;
+
+static MapEntry *MapRegistry = NULL;
+static int nMapRegistry = 0;
+static int sizeMapRegistry = 0;
+
+
+static int
+MapIndex(const xf_GenArray *G)
+{
+    int i;
+
+    for (i = 0; i < nMapRegistry; i++)
+        if (MapRegistry[i].G == G) return i;
+
+    return -1;
+}
+
+
+int
+px_IsMapped(const xf_GenArray *G)
+{
+    return (nMapRegistry > 0) && (MapIndex(G) >= 0);
+}
+
+
+static int
+DataGenArrays(xf_Data *D, xf_GenArray ***pG, int *pnG)
+{
+    /*  List the GenArrays of an xf_Data that can be mapped: real values with
+        a constant rank. */
+
+    int ierr, i, k, nV, nG;
+    xf_Vector **V, *V1;
+    xf_GenArray *G;
+
+    if (D->Type == xfe_VectorGroup) {
+        nV = ((xf_VectorGroup *) D->Data)->nVector;
+        V = ((xf_VectorGroup *) D->Data)->Vector;
+    } else if (D->Type == xfe_Vector) {
+        nV = 1;
+        V1 = (xf_Vector *) D->Data;
+        V = &V1;
+    } else {
+        nV = 0;
+        V = NULL;
+    }
+
+    nG = 0;
+    for (k = 0; k < nV; k++) nG += V[k]->nArray;
+
+    ierr = xf_Error(xf_Alloc((void **) pG, max(nG, 1), sizeof(xf_GenArray *)));
+
+    if (ierr != xf_OK) return ierr;
+
+    (*pnG) = 0;
+    for (k = 0; k < nV; k++) {
+        for (i = 0; i < V[k]->nArray; i++) {
+            G = V[k]->GenArray + i;
+            if ((G->vr == NULL) && (G->rValue != NULL) && (G->n*G->r > 0))
+                (*pG)[(*pnG)++] = G;
+        }
+    }
+
+    return xf_OK;
+}
+
+
+static size_t
+MapOffsets(xf_GenArray **G, int nG, size_t *Offset)
+{
+    // Page-aligned offset of each array; returns the size of the file.
+    int i;
+    size_t page, off;
+
+    page = (size_t) sysconf(_SC_PAGESIZE);
+
+    off = 0;
+    for (i = 0; i < nG; i++) {
+        Offset[i] = off;
+        off += ((size_t) G[i]->n * G[i]->r * sizeof(real) + page - 1) / page * page;
+    }
+
+    return off;
+}
+
+
+static void
+UnmapGenArray(int i)
+{
+    xf_GenArray *G;
+
+    G = MapRegistry[i].G;
+    munmap(MapRegistry[i].Base, MapRegistry[i].Len);
+
+    // Only the row pointers are left for libxf to free.
+    xf_Release((void *) G->rValue);
+    G->rValue = NULL;
+
+    MapRegistry[i] = MapRegistry[--nMapRegistry];
+}
+
+
+void
+px_UnmapDataSet(xf_DataSet *DataSet)
+{
+    // Unmap the arrays of a data set before it is destroyed.
+    int i, k, nG;
+    xf_Data *D;
+    xf_GenArray **G;
+
+    if ((nMapRegistry == 0) || (DataSet == NULL)) return;
+
+    for (D = DataSet->Head; (nMapRegistry > 0) && (D != NULL); D = D->Next) {
+        if (DataGenArrays(D, &G, &nG) != xf_OK) continue;
+
+        for (k = 0; k < nG; k++)
+            if ((i = MapIndex(G[k])) >= 0) UnmapGenArray(i);
+
+        xf_Release(G);
+    }
+}
+
+
+PyObject *
+px_WriteDataMap(PyObject *self, PyObject *args)
+{
+    int ierr, i, nG;
+    size_t *Offset = NULL, Size;
+    char *fname;
+    FILE *fid;
+    xf_Data *D;
+    xf_GenArray **G = NULL;
+
+    if (!PyArg_ParseTuple(args, "ns", &D, &fname)) return NULL;
+
+    ierr = xf_Error(DataGenArrays(D, &G, &nG));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(xf_Alloc((void **) &Offset, max(nG, 1), sizeof(size_t)));
+
+    if (ierr != xf_OK) {
+        xf_Release(G);
+        return NULL;
+    }
+
+    Size = MapOffsets(G, nG, Offset);
+
+    Py_BEGIN_ALLOW_THREADS
+
+    fid = fopen(fname, "wb");
+
+    if (fid == NULL) ierr = xf_Error(xf_FILE_WRITE_ERROR);
+
+    // Write each array in one call through a large buffer.
+    if (ierr == xf_OK) setvbuf(fid, NULL, _IOFBF, 1 << 22);
+
+    for (i = 0; (ierr == xf_OK) && (i < nG); i++) {
+        if ((fseek(fid, (long) Offset[i], SEEK_SET) != 0) ||
+            (fwrite(G[i]->rValue[0], sizeof(real), (size_t) G[i]->n*G[i]->r, fid)
+                != (size_t) G[i]->n*G[i]->r))
+            ierr = xf_Error(xf_FILE_WRITE_ERROR);
+    }
+
+    // Pad the last page so that every mapping lies inside the file.
+    if ((ierr == xf_OK) && (nG > 0)) {
+        if ((fseek(fid, (long) Size - 1, SEEK_SET) != 0) || (fputc(0, fid) == EOF))
+            ierr = xf_Error(xf_FILE_WRITE_ERROR);
+    }
+
+    if ((fid != NULL) && (fclose(fid) != 0) && (ierr == xf_OK))
+        ierr = xf_Error(xf_FILE_WRITE_ERROR);
+
+    Py_END_ALLOW_THREADS
+
+    xf_Release(G);
+    xf_Release(Offset);
+
+    if (ierr != xf_OK) {
+        PyErr_Format(PyExc_IOError, "Could not write '%s'", fname);
+        return NULL;
+    }
+
+    // Return the size of the file.
+    return Py_BuildValue("n", (Py_ssize_t) Size);
+}
+
+
+PyObject *
+px_MapData(PyObject *self, PyObject *args)
+{
+    int ierr, i, j, nG, nMapped, fd;
+    size_t *Offset = NULL, Size, Len;
+    char *fname;
+    void *Base;
+    real **rValue;
+    struct stat st;
+    xf_Data *D;
+    xf_GenArray **G = NULL;
+
+    if (!PyArg_ParseTuple(args, "ns", &D, &fname)) return NULL;
+
+    ierr = xf_Error(DataGenArrays(D, &G, &nG));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(xf_Alloc((void **) &Offset, max(nG, 1), sizeof(size_t)));
+
+    if (ierr != xf_OK) {
+        xf_Release(G);
+        return NULL;
+    }
+
+    Size = MapOffsets(G, nG, Offset);
+
+    // Check the file before changing anything.
+    fd = open(fname, O_RDONLY);
+
+    if (fd < 0) {
+        PyErr_SetFromErrnoWithFilename(PyExc_IOError, fname);
+        xf_Release(G);
+        xf_Release(Offset);
+        return NULL;
+    }
+
+    if ((fstat(fd, &st) != 0) || ((size_t) st.st_size < Size)) {
+        PyErr_Format(PyExc_IOError, "Cache file '%s' does not match the data",
+            fname);
+        close(fd);
+        xf_Release(G);
+        xf_Release(Offset);
+        return NULL;
+    }
+
+    // Make room in the registry.
+    if (sizeMapRegistry < nMapRegistry + nG) {
+        sizeMapRegistry = 2*(nMapRegistry + nG);
+        ierr = xf_Error(xf_ReAlloc((void **) &MapRegistry, sizeMapRegistry,
+            sizeof(MapEntry)));
+    }
+
+    nMapped = 0;
+    for (i = 0; (ierr == xf_OK) && (i < nG); i++) {
+        // Already mapped by an earlier call
+        if (MapIndex(G[i]) >= 0) continue;
+
+        Len = (size_t) G[i]->n * G[i]->r * sizeof(real);
+        Base = mmap(NULL, Len, PROT_READ | PROT_WRITE, MAP_PRIVATE, fd,
+            (off_t) Offset[i]);
+
+        if (Base == MAP_FAILED) {
+            PyErr_SetFromErrnoWithFilename(PyExc_IOError, fname);
+            ierr = xf_FILE_READ_ERROR;
+            break;
+        }
+
+        // New row pointers into the mapping
+        rValue = NULL;
+        ierr = xf_Error(xf_Alloc((void **) &rValue, G[i]->n, sizeof(real *)));
+
+        if (ierr != xf_OK) {
+            munmap(Base, Len);
+            break;
+        }
+
+        for (j = 0; j < G[i]->n; j++)
+            rValue[j] = ((real *) Base) + (size_t) j*G[i]->r;
+
+        // Free the values read by libxf.
+        xf_Release2((void **) G[i]->rValue);
+        G[i]->rValue = rValue;
+
+        MapRegistry[nMapRegistry].G = G[i];
+        MapRegistry[nMapRegistry].Base = Base;
+        MapRegistry[nMapRegistry].Len = Len;
+        nMapRegistry++;
+        nMapped++;
+    }
+
+    close(fd);
+    xf_Release(G);
+    xf_Release(Offset);
+
+    if (ierr != xf_OK) return NULL;
+
+    // Return the number of arrays mapped.
+    return Py_BuildValue("i", nMapped);
+}
@@ -0,0 +1,54 @@
+#ifndef _PX_MAP_H
+#define _PX_MAP_H
+
+/***************************************************/
+PyObject *
+px_WriteDataMap(PyObject *self, PyObject *args);
+
+char doc_WriteDataMap[] =
+"Write the real values of an *xf_Data* to a file that can be mapped.\n"
+"\n"
+":Call:\n"
+"   >>> n = px.WriteDataMap(D, fname)\n"
+"\n"
+":Parameters:\n"
+"   *D*: :class:`int`\n"
+"       Pointer to *xf_Data* struct\n"
+"   *fname*: :class:`str`\n"
+"       Name of file to create\n"
+"\n"
+":Returns:\n"
+"   *n*: :class:`int`\n"
+"       Size of the file in bytes\n"
+"\n"
+"The values of each *xf_GenArray* with real values and a constant rank are\n"
+"written in order, each starting at a multiple of the page size.\n";
+
+/***************************************************/
+PyObject *
+px_MapData(PyObject *self, PyObject *args);
+
+char doc_MapData[] =
+"Replace the real values of an *xf_Data* with a mapping of a file.\n"
+"\n"
+":Call:\n"
+"   >>> n = px.MapData(D, fname)\n"
+"\n"
+":Parameters:\n"
+"   *D*: :class:`int`\n"
+"       Pointer to *xf_Data* struct\n"
+"   *fname*: :class:`str`\n"
+"       Name of a file written by :func:`WriteDataMap`\n"
+"\n"
+":Returns:\n"
+"   *n*: :class:`int`\n"
+"       Number of *xf_GenArray* structs that were mapped\n"
+"\n"
+"The values read by XFlow are freed, and the pages are shared with other\n"
+"processes that map the same file.  The mapping is private, so changes are\n"
+"never written to the file, and the arrays from :func:`GetGenArray` are\n"
+"read-only.  Mappings are removed by :func:`DestroyDataSet` and\n"
+":func:`DestroyAll`.  Any *rValue* arrays obtained before this call must\n"
+"not be used afterward.\n";
+
+#endif
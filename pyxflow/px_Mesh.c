@@ -39,13 +39,16 @@ px_ReadGriFile(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "s", &InputFile))
         return NULL;
 
+    Py_BEGIN_ALLOW_THREADS
+
     // Allocate the mesh.
     ierr = xf_Error(xf_CreateMesh(&Mesh));
 
-    if (ierr != xf_OK) return NULL;
-
     // Read the .gri file into the xf_Mesh structure.
-    ierr = xf_Error(xf_ReadGriFile(InputFile, NULL, Mesh));
+    if (ierr == xf_OK)
+        ierr = xf_Error(xf_ReadGriFile(InputFile, NULL, Mesh));
+
+    Py_END_ALLOW_THREADS
 
     if (ierr != xf_OK) return NULL;
 
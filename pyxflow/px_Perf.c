@@ -0,0 +1,133 @@
+#include <Python.h>
+#include <pythread.h>
+#include <time.h>
+
+#include "px_Timer.h"
+
+// Names of the phases in px.PerfStats()
+static const char *PerfPhaseName[pxe_PerfLast] = {
+    "cull", "subdivide", "basis", "scalar", "output"};
+
+int px_PerfOn = 0;
+
+// Module totals; guarded by PerfLock since the extraction functions commit
+// their counts with the GIL released.
+static px_PerfData PerfTotal;
+static PyThread_type_lock PerfLock = NULL;
+
+double
+px_PerfClock(void)
+{
+    struct timespec ts;
+
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+
+    return (double) ts.tv_sec + 1e-9 * (double) ts.tv_nsec;
+}
+
+void
+px_PerfInit(px_PerfData *P)
+{
+    int k;
+
+    for (k = 0; k < pxe_PerfLast; k++) {
+        P->n[k] = 0;
+        P->t[k] = 0.0;
+        P->bytes[k] = 0.0;
+    }
+}
+
+void
+px_PerfCommit(px_PerfData *P)
+{
+    int k;
+
+    if ((!px_PerfOn) || (PerfLock == NULL)) return;
+
+    PyThread_acquire_lock(PerfLock, WAIT_LOCK);
+
+    for (k = 0; k < pxe_PerfLast; k++) {
+        PerfTotal.n[k] += P->n[k];
+        PerfTotal.t[k] += P->t[k];
+        PerfTotal.bytes[k] += P->bytes[k];
+    }
+
+    PyThread_release_lock(PerfLock);
+
+    px_PerfInit(P);
+}
+
+PyObject *
+px_PerfEnable(PyObject *self, PyObject *args)
+{
+    int flag;
+
+    if (!PyArg_ParseTuple(args, "i", &flag)) return NULL;
+
+    // The lock is created the first time the counters are turned on.
+    if (PerfLock == NULL) {
+        PerfLock = PyThread_allocate_lock();
+
+        if (PerfLock == NULL) return PyErr_NoMemory();
+
+        px_PerfInit(&PerfTotal);
+    }
+
+    px_PerfOn = (flag != 0);
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+
+PyObject *
+px_PerfStats(PyObject *self, PyObject *args)
+{
+    int k;
+    px_PerfData P;
+    PyObject *py_S, *py_v;
+
+    px_PerfInit(&P);
+
+    if (PerfLock != NULL) {
+        Py_BEGIN_ALLOW_THREADS
+        PyThread_acquire_lock(PerfLock, WAIT_LOCK);
+        Py_END_ALLOW_THREADS
+
+        P = PerfTotal;
+
+        PyThread_release_lock(PerfLock);
+    }
+
+    if ((py_S = PyDict_New()) == NULL) return NULL;
+
+    for (k = 0; k < pxe_PerfLast; k++) {
+        py_v = Py_BuildValue("idd", P.n[k], P.t[k], P.bytes[k]);
+
+        if ((py_v == NULL) || (PyDict_SetItemString(py_S, PerfPhaseName[k], py_v) != 0)) {
+            Py_XDECREF(py_v);
+            Py_DECREF(py_S);
+            return NULL;
+        }
+
+        Py_DECREF(py_v);
+    }
+
+    return py_S;
+}
+
+PyObject *
+px_PerfReset(PyObject *self, PyObject *args)
+{
+    if (PerfLock != NULL) {
+        Py_BEGIN_ALLOW_THREADS
+        PyThread_acquire_lock(PerfLock, WAIT_LOCK);
+        Py_END_ALLOW_THREADS
+
+        px_PerfInit(&PerfTotal);
+
+        PyThread_release_lock(PerfLock);
+    }
+
+    Py_INCREF(Py_None);
+    return Py_None;
+}
@@ -0,0 +1,54 @@
+#ifndef _PX_PERF_H
+#define _PX_PERF_H
+
+/***************************************************/
+PyObject *
+px_PerfEnable(PyObject *self, PyObject *args);
+
+char doc_PerfEnable[] =
+"Turn the internal performance counters on or off.\n"
+"\n"
+":Call:\n"
+"   >>> px.PerfEnable(flag)\n"
+"\n"
+":Parameters:\n"
+"   *flag*: :class:`bool`\n"
+"       Whether or not to record the counters\n"
+"\n"
+":Returns:\n"
+"   ``None``\n";
+
+/***************************************************/
+PyObject *
+px_PerfStats(PyObject *self, PyObject *args);
+
+char doc_PerfStats[] =
+"Get the internal performance counters.\n"
+"\n"
+":Call:\n"
+"   >>> S = px.PerfStats()\n"
+"\n"
+":Returns:\n"
+"   *S*: :class:`dict`\n"
+"       Tuple of (*calls*, *time*, *bytes*) for each internal phase of the\n"
+"       extraction functions: ``'cull'``, ``'subdivide'``, ``'basis'``,\n"
+"       ``'scalar'``, and ``'output'``\n"
+"\n"
+"The phases are timed once per element, so *calls* is the number of\n"
+"elements processed in each phase.  *bytes* is the memory allocated for\n"
+"output buffers.\n";
+
+/***************************************************/
+PyObject *
+px_PerfReset(PyObject *self, PyObject *args);
+
+char doc_PerfReset[] =
+"Set the internal performance counters to zero.\n"
+"\n"
+":Call:\n"
+"   >>> px.PerfReset()\n"
+"\n"
+":Returns:\n"
+"   ``None``\n";
+
+#endif // _PX_PERF_H
@@ -1,4 +1,5 @@
 #include <Python.h>
+#include <math.h>
 
 #include "px_NumPy.h"
 
@@ -14,9 +15,64 @@
 #include "xf_EqnSetHook.h"
 #include "xf_Data.h"
 
+#include "px_Timer.h"
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 #define DIMP 2
 #define TRINN 3
 
+// Keep the equation set hooks on the library of an EqnSet (px_All.c)
+int
+px_HoldEqnSet(const xf_EqnSet *EqnSet);
+void
+px_DropEqnSet(void);
+
+/* NumPy arrays that own memory from xf_Alloc */
+
+static void
+ReleaseCapsule(PyObject *py_cap)
+{
+    xf_Release(PyCapsule_GetPointer(py_cap, NULL));
+}
+
+static PyObject*
+OwnedArray(int nd, npy_intp *dims, int typenum, void *data)
+{
+    /*  Wrap data in a NumPy array whose base is a capsule that calls
+        xf_Release when the array is deallocated.  On failure, the data
+        are released and NULL is returned. */
+
+    PyObject *py_a, *py_cap;
+
+    if (data == NULL) return PyArray_ZEROS(nd, dims, typenum, 0);
+
+    py_a = PyArray_SimpleNewFromData(nd, dims, typenum, data);
+
+    if (py_a == NULL) {
+        xf_Release(data);
+        return NULL;
+    }
+
+    py_cap = PyCapsule_New(data, NULL, ReleaseCapsule);
+
+    if (py_cap == NULL) {
+        Py_DECREF(py_a);
+        xf_Release(data);
+        return NULL;
+    }
+
+    // steals the reference to py_cap, even on failure
+    if (PyArray_SetBaseObject((PyArrayObject *) py_a, py_cap) < 0) {
+        Py_DECREF(py_a);
+        return NULL;
+    }
+
+    return py_a;
+}
+
 /* General plotting supporting functions and objects */
 
 typedef struct {
@@ -136,12 +192,20 @@ FindFaceSubData(xf_Mesh *Mesh, int ibfgrp, int ibface, const int *pOrder, SubDat
     dim = Mesh->Dim;
 
     // Get data from left element
-    xf_FaceElements(Mesh, ibfgrp, ibface, &egrp, &elem, &face, NULL, NULL, NULL);
+    ierr = xf_Error(xf_FaceElements(Mesh, ibfgrp, ibface, &egrp, &elem, &face, NULL, NULL, NULL));
+
+    if (ierr != xf_OK) return ierr;
 
     QOrder = Mesh->ElemGroup[egrp].QOrder;
     QBasis = Mesh->ElemGroup[egrp].QBasis;
 
-    Order = ((pOrder != NULL) ? (*pOrder) : 2*QOrder+1);
+    // An order of 0 gives the Lagrange nodes of the face geometry.
+    if (pOrder == NULL)
+        Order = 2*QOrder+1;
+    else if ((*pOrder) <= 0)
+        Order = QOrder;
+    else
+        Order = (*pOrder);
 
     ierr = xf_Error(xf_Basis2Shape(QBasis, &Shape));
 
@@ -187,6 +251,31 @@ FindFaceSubData(xf_Mesh *Mesh, int ibfgrp, int ibface, const int *pOrder, SubDat
     return xf_OK;
 }
 
+static int
+SubElemNodes(enum xfe_ShapeType Shape, int *nv)
+{
+    /*  Number of nodes in each sub-element from xf_GetRefineCoords.  All
+        shapes are refined into simplices (see TRINN in the 2D plots). */
+
+    switch (Shape) {
+    case xfe_Segment:
+        (*nv) = 2;
+        break;
+    case xfe_Triangle:
+    case xfe_Quadrilateral:
+        (*nv) = 3;
+        break;
+    case xfe_Tetrahedron:
+    case xfe_Hexahedron:
+        (*nv) = 4;
+        break;
+    default:
+        return xf_NOT_SUPPORTED;
+    }
+
+    return xf_OK;
+}
+
 
 static enum xfe_Bool
 PointInsideBoundingBox(int dim, const real *x, const real *xmin, const real *xmax, real buffer)
@@ -205,6 +294,30 @@ PointInsideBoundingBox(int dim, const real *x, const real *xmin, const real *xma
     return Inside;
 }
 
+static enum xfe_Bool
+NodesInWindow(const xf_Mesh *Mesh, int egrp, int elem, int nn, const real *xmin, const real *xmax,
+              real buffer)
+{
+    /*  True if one of the nn geometry nodes of the element is inside the
+        buffered window.  No libxf calls, so this is safe in threads. */
+
+    int dim, i, d, inode;
+    real xglob[xf_MAXDIM];
+
+    dim = Mesh->Dim;
+
+    for (i = 0; i < nn; i++) {
+        inode = Mesh->ElemGroup[egrp].Node[elem][i];
+
+        for (d = 0; d < dim; d++)
+            xglob[d] = Mesh->Coord[inode][d];
+
+        if (PointInsideBoundingBox(dim, xglob, xmin, xmax, buffer)) return xfe_True;
+    }
+
+    return xfe_False;
+}
+
 static int
 ElemInsideBoundingBox(const xf_Mesh *Mesh, int egrp, int elem, const real *xmin, const real *xmax,
                       real buffer, enum xfe_Bool *Inside)
@@ -213,30 +326,118 @@ ElemInsideBoundingBox(const xf_Mesh *Mesh, int egrp, int elem, const real *xmin,
         maybe should check the global positions of nodes on faces, since
         nodes could be completely interior to the element. */
 
-    int ierr, dim, i, d, inode, Order, nn;
-    enum xfe_BasisType Basis;
-    real xglob[xf_MAXDIM];
+    int ierr, nn;
+
+    ierr = xf_Error(xf_Order2nNode(Mesh->ElemGroup[egrp].QBasis, Mesh->ElemGroup[egrp].QOrder, &nn));
+
+    if (ierr != xf_OK) return ierr;
+
+    (*Inside) = NodesInWindow(Mesh, egrp, elem, nn, xmin, xmax, buffer);
+
+    return xf_OK;
+}
+
+static void
+NodeBounds(const xf_Mesh *Mesh, int egrp, int elem, int nn, real *emin, real *emax)
+{
+    /*  Bounding box of the nn geometry nodes of an element; no libxf calls */
+
+    int dim, i, d, inode;
 
     dim = Mesh->Dim;
 
-    Order = Mesh->ElemGroup[egrp].QOrder;
-    Basis = Mesh->ElemGroup[egrp].QBasis;
+    for (i = 0; i < nn; i++) {
+        inode = Mesh->ElemGroup[egrp].Node[elem][i];
+
+        for (d = 0; d < dim; d++) {
+            if ((i == 0) || (Mesh->Coord[inode][d] < emin[d])) emin[d] = Mesh->Coord[inode][d];
+            if ((i == 0) || (Mesh->Coord[inode][d] > emax[d])) emax[d] = Mesh->Coord[inode][d];
+        }
+    }
+}
+
+static int
+ElemNodeBounds(const xf_Mesh *Mesh, int egrp, int elem, real *emin, real *emax)
+{
+    /*  Bounding box of the geometry nodes of an element */
 
-    ierr = xf_Error(xf_Order2nNode(Basis, Order, &nn));
+    int ierr, nn;
+
+    ierr = xf_Error(xf_Order2nNode(Mesh->ElemGroup[egrp].QBasis, Mesh->ElemGroup[egrp].QOrder, &nn));
 
     if (ierr != xf_OK) return ierr;
 
-    (*Inside) = xfe_False;
+    NodeBounds(Mesh, egrp, elem, nn, emin, emax);
 
-    for (i = 0; (i < nn) && (!(*Inside)); i++) {
-        inode = Mesh->ElemGroup[egrp].Node[elem][i];
+    return xf_OK;
+}
 
-        for (d = 0; d < dim; d++)
-            xglob[d] = Mesh->Coord[inode][d];
+static enum xfe_Bool
+BoxInTile(int dim, const real *emin, const real *emax, const real *xmin, const real *xmax,
+          const real *tile)
+{
+    /*  Tile test of ElemInWindow for an element bounding box */
+
+    int d;
+    real xc, r;
 
-        (*Inside) = PointInsideBoundingBox(dim, xglob, xmin, xmax, buffer);
+    for (d = 0, r = 0.0; d < dim; d++) {
+        xc = 0.5 * (emin[d] + emax[d]);
+
+        if ((xc < xmin[d]) || (xc >= xmax[d])) return xfe_False;
+
+        r = max(r, (emax[d] - emin[d]) / (xmax[d] - xmin[d]));
     }
 
+    return ((r > tile[0]) && (r <= tile[1])) ? xfe_True : xfe_False;
+}
+
+static int
+ElemInWindow(const xf_Mesh *Mesh, int egrp, int elem, const real *xmin, const real *xmax,
+             real buffer, const real *tile, enum xfe_Bool *Inside)
+{
+    /*  Select the elements for a plot window.  Without tile, an element is
+        kept if one of its nodes is inside the (buffered) window.  With tile
+        = {rlo, rhi}, it is kept if the center of its node bounding box is in
+        [xmin, xmax) and the largest ratio r of its bounding box to the
+        window size satisfies rlo < r <= rhi, so that windows that tile the
+        plane select each element at most once. */
+
+    int ierr;
+    real emin[xf_MAXDIM], emax[xf_MAXDIM];
+
+    if (tile == NULL)
+        return ElemInsideBoundingBox(Mesh, egrp, elem, xmin, xmax, buffer, Inside);
+
+    ierr = xf_Error(ElemNodeBounds(Mesh, egrp, elem, emin, emax));
+
+    if (ierr != xf_OK) return ierr;
+
+    (*Inside) = BoxInTile(Mesh->Dim, emin, emax, xmin, xmax, tile);
+
+    return xf_OK;
+}
+
+static int
+ElemOverlapsBoundingBox(const xf_Mesh *Mesh, int egrp, int elem, const real *xmin, const real *xmax,
+                        enum xfe_Bool *Overlap)
+{
+    /*  Compare the bounding box of the element nodes to the window.  Unlike
+        ElemInsideBoundingBox, this also catches elements that are larger
+        than the window. */
+
+    int ierr, d;
+    real emin[xf_MAXDIM], emax[xf_MAXDIM];
+
+    ierr = xf_Error(ElemNodeBounds(Mesh, egrp, elem, emin, emax));
+
+    if (ierr != xf_OK) return ierr;
+
+    (*Overlap) = xfe_True;
+
+    for (d = 0; (d < Mesh->Dim) && (*Overlap); d++)
+        if ((emax[d] < xmin[d]) || (emin[d] > xmax[d])) (*Overlap) = xfe_False;
+
     return xf_OK;
 }
 
@@ -264,378 +465,2748 @@ UnpackRealList(PyObject *PyL, int n, real *l, enum xfe_Bool fit)
     return xf_OK;
 }
 
-/* Mesh plotting */
-
-typedef struct {
-    real *x; // global coordinates of nodes on face
-    int *nn; // number of nodes
-    int xsize; // size of xglob allocated
-    int nnsize; // size of nn allocated
-    int nface; // number of faces
-} MeshPlotData;
-
 static int
-InitMeshPlotData(MeshPlotData *MPD)
+UnpackTile(PyObject *py_tile, real *tile, real **ptile)
 {
-    MPD->x  = NULL;
-    MPD->nn = NULL;
-    MPD->xsize = 0;
-    MPD->nnsize = 0;
-    MPD->nface = 0;
-    return xf_OK;
-}
+    // Element size range [rlo, rhi] of a tile (see ElemInWindow), or NULL
+    int ierr;
 
-static int
-DestroyMeshPlotData(MeshPlotData *MPD)
-{
-    xf_Release((void *) MPD->x );
-    xf_Release((void *) MPD->nn);
+    (*ptile) = NULL;
+
+    if (py_tile == Py_None) return xf_OK;
+
+    ierr = xf_Error(UnpackRealList(py_tile, 2, tile, xfe_True));
+
+    if (ierr != xf_OK) return ierr;
+
+    (*ptile) = tile;
 
     return xf_OK;
 }
 
-
 static int
-MeshPlotData_1D(xf_Mesh *Mesh, int egrp, int elem, SubData *FSD, MeshPlotData *MPD)
+UnpackElemList(const xf_Mesh *Mesh, PyObject *py_elems, PyArrayObject **pa,
+               int **pList, int *pnList)
 {
-    int ierr, nface, face, nn, i, f;
-    real xref[xf_MAXDIM], xglob[xf_MAXDIM];
-    enum xfe_Bool OnLeft;
-    enum xfe_FaceType FaceType;
-    xf_IFace IFace;
-    xf_Face Face;
-
-    if ((nface = Mesh->ElemGroup[egrp].nFace[elem]) != 2) return xf_CODE_LOGIC_ERROR;
-
-    // Reallocate MPD->nn if necessary
-    if (MPD->nnsize < nface) {
-        MPD->nnsize = nface;
-        ierr = xf_Error(xf_ReAlloc((void **)&MPD->nn, MPD->nnsize, sizeof(int)));
+    /*  Candidate elements as an (n, 2) array of (egrp, elem), or NULL for
+        all elements.  The array is returned in *pa so that the caller can
+        drop it after the element loop. */
 
-        if (ierr != xf_OK) return ierr;
-    }
+    int k, *List;
+    npy_intp n;
+    PyArrayObject *a;
 
-    // in 1D, the node is always at reference coordinate xi=0. on the face
-    xref[0] = 0.;
+    (*pa) = NULL;
+    (*pList) = NULL;
+    (*pnList) = 0;
 
-    for (face = 0, i = 0, f = 0; face < nface; face++) {
-        Face = Mesh->ElemGroup[egrp].Face[elem][face];
-        xf_FaceGroupInfo(Mesh, Face.Group, &FaceType, NULL, NULL);
+    if (py_elems == Py_None) return xf_OK;
 
-        if (FaceType == xfe_FaceInterior) {
-            IFace = Mesh->IFace[Face.Number];
+    a = (PyArrayObject *) PyArray_FROM_OTF(py_elems, NPY_INT, NPY_ARRAY_IN_ARRAY);
 
-            ierr = xf_Error(xf_IsElemOnLeft(IFace, egrp, elem, &OnLeft));
+    if (a == NULL) return xf_INPUT_ERROR;
 
-            if (ierr != xf_OK) return ierr;
-        } else OnLeft = xfe_True;
+    if ((PyArray_NDIM(a) != 2) || (PyArray_DIM(a, 1) != 2) ||
+        (PyArray_DIM(a, 0) > INT_MAX)) {
+        PyErr_SetString(PyExc_ValueError, "Element list must have shape (n, 2)");
+        Py_DECREF(a);
+        return xf_INPUT_ERROR;
+    }
 
-        if (!OnLeft) continue;
+    n = PyArray_DIM(a, 0);
+    List = (int *) PyArray_DATA(a);
+
+    for (k = 0; k < n; k++) {
+        if ((List[2*k] < 0) || (List[2*k] >= Mesh->nElemGroup) ||
+            (List[2*k+1] < 0) ||
+            (List[2*k+1] >= Mesh->ElemGroup[List[2*k]].nElem)) {
+            PyErr_Format(PyExc_IndexError, "Element (%d, %d) is not in the mesh",
+                List[2*k], List[2*k+1]);
+            Py_DECREF(a);
+            return xf_INPUT_ERROR;
+        }
+    }
 
-        // always only one node on the face
-        nn = 1;
+    (*pa) = a;
+    (*pList) = List;
+    (*pnList) = (int) n;
 
-        // Reallocate MPD->x if necessary
-        if (MPD->xsize < DIMP * (i + nn)) {
-            MPD->xsize = DIMP * (i + nn);
-            ierr = xf_Error(xf_ReAlloc((void **)&MPD->x, MPD->xsize, sizeof(real)));
+    return xf_OK;
+}
 
-            if (ierr != xf_OK) return ierr;
-        }
+/* Plane slicing of 3D meshes */
 
-        ierr = xf_Error(xf_Ref2GlobFace(Mesh, Face.Group, Face.Number, &FSD->PhiData, nn, xref, xglob));
+#define SLICE_SLACK 0.1
 
-        if (ierr != xf_OK) return ierr;
+typedef struct {
+    real p0[3]; // point on the plane
+    real n[3]; // unit normal
+    real e[DIMP][3]; // in-plane axes used for plot coordinates
+    real *bounds; // precomputed element bounds (optional)
+    int *boff; // offset of each element group in bounds
+    real *d; // signed distance of sub-nodes to the plane
+    int dsize; // size of d allocated
+    int *edge; // cut point on each sub-node pair, or -1
+    int edgesize; // size of edge allocated
+    int *cut; // sub-node pair for each cut point
+    int psize; // number of cut points allocated
+    int tsize; // number of cut triangles allocated
+    SubData CSD; // cut points and triangles (xglob is in-plane)
+} SliceData;
 
-        // in 1D, y-position in plot is set to 0.0
-        MPD->x[i * DIMP + 0] = xglob[0];
-        MPD->x[i * DIMP + 1] = 0.0;
+static int
+InitSliceData(xf_Mesh *Mesh, PyObject *py_plane, PyArrayObject *py_bounds,
+              const real *xmin, const real *xmax, SliceData *SLD)
+{
+    /*  The plane is given as [x0, y0, z0, nx, ny, nz].  If it is not a
+        list, the plane z = const through the middle of the window is
+        used.  The in-plane axes are the two coordinate axes least aligned
+        with the normal, projected onto the plane, so that slices normal to
+        a coordinate axis are plotted in the remaining coordinates. */
+
+    int ierr, d, k, a[3], tmp, egrp;
+    real l[6], nrm, dot;
+
+    SLD->bounds = NULL;
+    SLD->boff = NULL;
+    SLD->d = NULL;
+    SLD->dsize = 0;
+    SLD->edge = NULL;
+    SLD->edgesize = 0;
+    SLD->cut = NULL;
+    SLD->psize = 0;
+    SLD->tsize = 0;
+
+    ierr = xf_Error(InitSubData(&SLD->CSD));
 
-        MPD->nn[f] = 1;
+    if (ierr != xf_OK) return ierr;
 
-        f++;
-        i += nn;
-    } // face
+    if (Mesh->Dim != 3) return xf_OK;
 
-    // store number of faces in view
-    MPD->nface = f;
+    if (PyList_Check(py_plane)) {
+        ierr = xf_Error(UnpackRealList(py_plane, 6, l, xfe_True));
 
-    return xf_OK;
-}
+        if (ierr != xf_OK) return ierr;
+    } else {
+        for (d = 0; d < 3; d++) l[d] = 0.5 * (xmin[d] + xmax[d]);
+        l[3] = l[4] = 0.0;
+        l[5] = 1.0;
+    }
 
-static int
-MeshPlotData_2D(xf_Mesh *Mesh, int egrp, int elem, int *pOrder, SubData *FSD, MeshPlotData *MPD)
-{
-    int ierr, nface, face, nn, i, f, ibfgrp, ibface;
-    enum xfe_Bool OnLeft;
-    enum xfe_FaceType FaceType;
-    xf_IFace IFace;
-    xf_Face Face;
+    for (d = 0, nrm = 0.0; d < 3; d++) nrm += l[3+d] * l[3+d];
 
-    nface = Mesh->ElemGroup[egrp].nFace[elem];
+    if (nrm <= 0.0) {
+        PyErr_SetString(PyExc_RuntimeError, "Slice plane normal must be nonzero");
+        return xf_INPUT_ERROR;
+    }
 
-    // Reallocate MPD->nn if necessary
-    if (MPD->nnsize < nface) {
-        MPD->nnsize = nface;
-        ierr = xf_Error(xf_ReAlloc((void **)&MPD->nn, MPD->nnsize, sizeof(int)));
+    for (d = 0; d < 3; d++) {
+        SLD->p0[d] = l[d];
+        SLD->n[d] = l[3+d] / sqrt(nrm);
+    }
 
-        if (ierr != xf_OK) return ierr;
+    // sort the axes by alignment with the normal (stable)
+    for (d = 0; d < 3; d++) a[d] = d;
+    for (d = 1; d < 3; d++)
+        for (k = d; (k > 0) && (fabs(SLD->n[a[k]]) < fabs(SLD->n[a[k-1]])); k--) {
+            tmp = a[k]; a[k] = a[k-1]; a[k-1] = tmp;
+        }
+    if (a[1] < a[0]) {
+        tmp = a[0]; a[0] = a[1]; a[1] = tmp;
     }
 
-    for (face = 0, i = 0, f = 0; face < nface; face++) {
-        Face = Mesh->ElemGroup[egrp].Face[elem][face];
-        xf_FaceGroupInfo(Mesh, Face.Group, &FaceType, &ibfgrp, NULL);
+    // Gram-Schmidt on the two least aligned axes
+    for (k = 0; k < DIMP; k++) {
+        for (d = 0; d < 3; d++) SLD->e[k][d] = ((d == a[k]) ? 1.0 : 0.0);
 
-        if (FaceType == xfe_FaceInterior) {
-            IFace = Mesh->IFace[Face.Number];
+        dot = SLD->n[a[k]];
+        for (d = 0; d < 3; d++) SLD->e[k][d] -= dot * SLD->n[d];
 
-            ierr = xf_Error(xf_IsElemOnLeft(IFace, egrp, elem, &OnLeft));
+        if (k == 1) {
+            dot = SLD->e[0][a[1]];
+            for (d = 0; d < 3; d++) SLD->e[1][d] -= dot * SLD->e[0][d];
+        }
 
-            if (ierr != xf_OK) return ierr;
-        } else OnLeft = xfe_True;
+        for (d = 0, nrm = 0.0; d < 3; d++) nrm += SLD->e[k][d] * SLD->e[k][d];
+        for (d = 0; d < 3; d++) SLD->e[k][d] /= sqrt(nrm);
+    }
 
-        if (!OnLeft) continue;
+    // precomputed bounds, if any
+    if (py_bounds != NULL) {
+        ierr = xf_Error(xf_Alloc((void **) &SLD->boff, Mesh->nElemGroup, sizeof(int)));
 
-        ierr = xf_Error(FindFaceSubData(\
-            Mesh, ibfgrp, Face.Number, pOrder, FSD));
         if (ierr != xf_OK) return ierr;
 
-        nn = FSD->nnode;
-
-        // Reallocate MPD->x if necessary (over-allocating for speed)
-        if (MPD->xsize < DIMP * (i + nn)) {
-            MPD->xsize = 2 * DIMP * (i + nn);
-            ierr = xf_Error(xf_ReAlloc((void **)&MPD->x, MPD->xsize, sizeof(real)));
+        for (egrp = 0, k = 0; egrp < Mesh->nElemGroup; egrp++) {
+            SLD->boff[egrp] = k;
+            k += Mesh->ElemGroup[egrp].nElem;
+        }
 
-            if (ierr != xf_OK) return ierr;
+        if (PyArray_SIZE(py_bounds) != 6 * k) {
+            PyErr_SetString(PyExc_RuntimeError, "Element bounds have incorrect dimensions");
+            return xf_INPUT_ERROR;
         }
 
-        // copy global coordinates
-        xf_V_Add(FSD->xglob, DIMP * nn, xfe_Set, MPD->x + DIMP * i);
+        SLD->bounds = (real *) PyArray_DATA(py_bounds);
+    }
 
-        MPD->nn[f] = nn;
+    return xf_OK;
+}
 
-        f++;
-        i += nn;
-    } // face
+static int
+DestroySliceData(SliceData *SLD)
+{
+    int ierr;
 
-    // store number of faces in view
-    MPD->nface = f;
+    xf_Release((void *) SLD->boff);
+    xf_Release((void *) SLD->d);
+    xf_Release((void *) SLD->edge);
+    xf_Release((void *) SLD->cut);
+
+    ierr = xf_Error(DestroySubData(&SLD->CSD));
+
+    if (ierr != xf_OK) return ierr;
 
     return xf_OK;
 }
 
 static int
-MeshPlotData_3D(xf_Mesh *Mesh, int egrp, int elem, int *pOrder, SubData *ESD, SubData *FSD, MeshPlotData *MPD)
+CopySliceData(const SliceData *SLD, SliceData *TSLD)
 {
-    return xf_NOT_SUPPORTED;
+    /*  Workspace for one thread: the plane and the element bounds are
+        shared with SLD, but the cut storage is separate.  Release with
+        DestroySliceWork. */
+
+    (*TSLD) = (*SLD);
+    TSLD->d = NULL;
+    TSLD->dsize = 0;
+    TSLD->edge = NULL;
+    TSLD->edgesize = 0;
+    TSLD->cut = NULL;
+    TSLD->psize = 0;
+    TSLD->tsize = 0;
+
+    return xf_Error(InitSubData(&TSLD->CSD));
 }
 
-/* Scalar plotting */
+static int
+DestroySliceWork(SliceData *TSLD)
+{
+    // boff belongs to the original
+    TSLD->boff = NULL;
 
-typedef struct {
-    int egrp, elem; // element index
-    int *IParam; // integer parameter array for EqnSet
-    real *RParam; // real-valued parameter array for EqnSet
-    int nAux; // number of auxiliary vectors
-    xf_Vector **VAux; // pointers to auxiliary vectors
-    real *U, *gU; // storage for state and gradient at plotting nodes
-    int Usize, gUsize; // size of storage at plotting nodes
-    real *s; // storage for scalar at plotting nodes
-    int ssize; // size of storage for scalar at plotting nodes
-    xf_BasisTable *PhiTable; // table to avoid recalculation of basis functions
-    xf_BasisData *BD; // basis data for interpolating scalar
-    xf_JacobianData *JD; // Jacobian data for calculating gradients
-} ScalarPlotData;
+    return xf_Error(DestroySliceData(TSLD));
+}
+
+static enum xfe_Bool
+PlaneCrossesBox(const SliceData *SLD, const real *emin, const real *emax)
+{
+    /*  Compare the plane to a bounding box, padded to allow for curved
+        elements */
+
+    int d;
+    real dc, r;
+
+    // distance from box center to plane vs. projected half-size of box
+    for (d = 0, dc = 0.0, r = 0.0; d < 3; d++) {
+        dc += SLD->n[d] * (0.5 * (emin[d] + emax[d]) - SLD->p0[d]);
+        r += fabs(SLD->n[d]) * 0.5 * (emax[d] - emin[d]);
+    }
+
+    return (fabs(dc) <= (1.0 + SLICE_SLACK) * r) ? xfe_True : xfe_False;
+}
+
+static void
+SliceBounds(const xf_Mesh *Mesh, int egrp, int elem, int nn, const SliceData *SLD,
+            real *emin, real *emax)
+{
+    /*  Bounding box of an element for the plane test: the precomputed
+        bounds if available, or the bounds of its nn geometry nodes */
+
+    int d;
+    const real *b;
+
+    if (SLD->bounds == NULL) {
+        NodeBounds(Mesh, egrp, elem, nn, emin, emax);
+        return;
+    }
+
+    b = SLD->bounds + 6 * (SLD->boff[egrp] + elem);
+    for (d = 0; d < 3; d++) {
+        emin[d] = b[d];
+        emax[d] = b[3+d];
+    }
+}
 
 static int
-InitScalarPlotData(xf_EqnSet *EqnSet, ScalarPlotData *SPD)
+PlaneCrossesElem(const xf_Mesh *Mesh, int egrp, int elem, const SliceData *SLD, enum xfe_Bool *Cross)
+{
+    /*  Compare the plane to the bounding box of the element.  The
+        precomputed bounds are used if available. */
+
+    int ierr, nn;
+    real emin[3], emax[3];
+
+    ierr = xf_Error(xf_Order2nNode(Mesh->ElemGroup[egrp].QBasis, Mesh->ElemGroup[egrp].QOrder, &nn));
+
+    if (ierr != xf_OK) return ierr;
+
+    SliceBounds(Mesh, egrp, elem, nn, SLD, emin, emax);
+
+    (*Cross) = PlaneCrossesBox(SLD, emin, emax);
+
+    return xf_OK;
+}
+
+static enum xfe_Bool
+ElemCrossesPlane(const xf_Mesh *Mesh, int egrp, int elem, int nn, const SliceData *SLD)
+{
+    // Plane test of ElemSelected; always true below 3D
+    real emin[xf_MAXDIM], emax[xf_MAXDIM];
+
+    if (Mesh->Dim != 3) return xfe_True;
+
+    SliceBounds(Mesh, egrp, elem, nn, SLD, emin, emax);
+
+    return PlaneCrossesBox(SLD, emin, emax);
+}
+
+static enum xfe_Bool
+ElemSelected(const xf_Mesh *Mesh, int egrp, int elem, int nn, const real *xmin, const real *xmax,
+             real buffer, const real *tile, const SliceData *SLD)
+{
+    /*  The plane test (3D) and ElemInWindow in one, given the number nn of
+        geometry nodes of the element group.  There are no libxf calls, so
+        elements can be tested in parallel. */
+
+    real emin[xf_MAXDIM], emax[xf_MAXDIM];
+
+    if (!ElemCrossesPlane(Mesh, egrp, elem, nn, SLD)) return xfe_False;
+
+    if (tile == NULL) return NodesInWindow(Mesh, egrp, elem, nn, xmin, xmax, buffer);
+
+    NodeBounds(Mesh, egrp, elem, nn, emin, emax);
+
+    return BoxInTile(Mesh->Dim, emin, emax, xmin, xmax, tile);
+}
+
+static int
+SliceDistance(SliceData *SLD, int nnode, const real *xglob)
+{
+    /*  Signed distance from each node to the plane */
+
+    int ierr, i, d;
+
+    if (SLD->dsize < nnode) {
+        SLD->dsize = nnode;
+        ierr = xf_Error(xf_ReAlloc((void **) &SLD->d, SLD->dsize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    for (i = 0; i < nnode; i++)
+        for (d = 0, SLD->d[i] = 0.0; d < 3; d++)
+            SLD->d[i] += SLD->n[d] * (xglob[3*i+d] - SLD->p0[d]);
+
+    return xf_OK;
+}
+
+static void
+SliceProject(const SliceData *SLD, const real *x, real *xp)
+{
+    int k, d;
+
+    for (k = 0; k < DIMP; k++)
+        for (d = 0, xp[k] = 0.0; d < 3; d++)
+            xp[k] += SLD->e[k][d] * x[d];
+}
+
+static int
+SliceCutPoint(const SubData *ESD, SliceData *SLD, int a, int b, int *ip)
+{
+    /*  Index of the point where the plane cuts sub-node pair (a, b),
+        adding it to SLD->CSD if it is new */
+
+    int ierr, d, k;
+    real t, x[3];
+    SubData *CSD = &SLD->CSD;
+
+    if (a > b) {
+        k = a; a = b; b = k;
+    }
+
+    k = a * ESD->nnode + b;
+
+    if (SLD->edge[k] >= 0) {
+        (*ip) = SLD->edge[k];
+        return xf_OK;
+    }
+
+    if (SLD->psize <= CSD->nnode) {
+        SLD->psize = 2 * (CSD->nnode + 1);
+        ierr = xf_Error(xf_ReAlloc((void **) &CSD->xref, 3 * SLD->psize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(xf_ReAlloc((void **) &CSD->xglob, DIMP * SLD->psize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(xf_ReAlloc((void **) &SLD->cut, 2 * SLD->psize, sizeof(int)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    (*ip) = CSD->nnode++;
+
+    t = SLD->d[a] / (SLD->d[a] - SLD->d[b]);
+
+    for (d = 0; d < 3; d++) {
+        CSD->xref[3*(*ip)+d] = ESD->xref[3*a+d] + t * (ESD->xref[3*b+d] - ESD->xref[3*a+d]);
+        x[d] = ESD->xglob[3*a+d] + t * (ESD->xglob[3*b+d] - ESD->xglob[3*a+d]);
+    }
+
+    SliceProject(SLD, x, CSD->xglob + DIMP * (*ip));
+
+    SLD->cut[2*(*ip)] = a;
+    SLD->cut[2*(*ip)+1] = b;
+    SLD->edge[k] = (*ip);
+
+    return xf_OK;
+}
+
+static int
+SliceTriangle(SliceData *SLD, int i0, int i1, int i2)
 {
     int ierr;
+    SubData *CSD = &SLD->CSD;
 
-    SPD->egrp = SPD->elem = 0;
+    if (SLD->tsize <= CSD->nselem) {
+        SLD->tsize = 2 * (CSD->nselem + 1);
+        ierr = xf_Error(xf_ReAlloc((void **) &CSD->selem, TRINN * SLD->tsize, sizeof(int)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    CSD->selem[TRINN*CSD->nselem] = i0;
+    CSD->selem[TRINN*CSD->nselem+1] = i1;
+    CSD->selem[TRINN*CSD->nselem+2] = i2;
+    CSD->nselem++;
+
+    return xf_OK;
+}
+
+static int
+SliceTet(const SubData *ESD, SliceData *SLD, const int *v)
+{
+    /*  Intersect a linear sub-tetrahedron with the plane, giving either
+        nothing, a triangle, or a quadrilateral (two triangles) */
+
+    int ierr, i, npos, nneg, pos[4], neg[4], q[4];
+    const int *odd, *even;
+
+    for (i = 0, npos = 0, nneg = 0; i < 4; i++) {
+        if (SLD->d[v[i]] >= 0.0) pos[npos++] = v[i];
+        else neg[nneg++] = v[i];
+    }
+
+    if ((npos == 0) || (nneg == 0)) return xf_OK;
+
+    if (npos == 2) {
+        ierr = xf_Error(SliceCutPoint(ESD, SLD, pos[0], neg[0], q));
+        if (ierr != xf_OK) return ierr;
+        ierr = xf_Error(SliceCutPoint(ESD, SLD, pos[0], neg[1], q+1));
+        if (ierr != xf_OK) return ierr;
+        ierr = xf_Error(SliceCutPoint(ESD, SLD, pos[1], neg[1], q+2));
+        if (ierr != xf_OK) return ierr;
+        ierr = xf_Error(SliceCutPoint(ESD, SLD, pos[1], neg[0], q+3));
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(SliceTriangle(SLD, q[0], q[1], q[2]));
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(SliceTriangle(SLD, q[0], q[2], q[3]));
+        if (ierr != xf_OK) return ierr;
+
+        return xf_OK;
+    }
+
+    // one vertex on its own side of the plane
+    odd = ((npos == 1) ? pos : neg);
+    even = ((npos == 1) ? neg : pos);
+
+    for (i = 0; i < 3; i++) {
+        ierr = xf_Error(SliceCutPoint(ESD, SLD, odd[0], even[i], q+i));
+        if (ierr != xf_OK) return ierr;
+    }
+
+    ierr = xf_Error(SliceTriangle(SLD, q[0], q[1], q[2]));
+    if (ierr != xf_OK) return ierr;
+
+    return xf_OK;
+}
+
+static int
+SliceElemSubData(SubData *ESD, SliceData *SLD)
+{
+    /*  Intersect the sub-elements (tetrahedra) in ESD with the plane.  On
+        exit SLD->CSD holds the reference coordinates, in-plane
+        coordinates, and triangles of the cut. */
+
+    int ierr, i, k, nv;
+
+    ierr = xf_Error(SubElemNodes(ESD->Shape, &nv));
+
+    if (ierr != xf_OK) return ierr;
+
+    if (nv != 4) return xf_NOT_SUPPORTED;
+
+    SLD->CSD.nnode = 0;
+    SLD->CSD.nselem = 0;
+    SLD->CSD.PointsChanged = xfe_True;
+
+    ierr = xf_Error(SliceDistance(SLD, ESD->nnode, ESD->xglob));
+
+    if (ierr != xf_OK) return ierr;
+
+    if (SLD->edgesize < ESD->nnode * ESD->nnode) {
+        SLD->edgesize = ESD->nnode * ESD->nnode;
+        ierr = xf_Error(xf_ReAlloc((void **) &SLD->edge, SLD->edgesize, sizeof(int)));
+
+        if (ierr != xf_OK) return ierr;
+
+        for (k = 0; k < SLD->edgesize; k++) SLD->edge[k] = -1;
+    }
+
+    for (i = 0; i < ESD->nselem; i++) {
+        ierr = xf_Error(SliceTet(ESD, SLD, ESD->selem + nv * i));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    // reset the touched entries of the edge map
+    for (i = 0; i < SLD->CSD.nnode; i++)
+        SLD->edge[SLD->cut[2*i] * ESD->nnode + SLD->cut[2*i+1]] = -1;
+
+    return xf_OK;
+}
+
+/* Mesh plotting */
+
+typedef struct {
+    real *x; // global coordinates of nodes on face
+    int *nn; // number of nodes
+    int xsize; // size of xglob allocated
+    int nnsize; // size of nn allocated
+    int nface; // number of faces
+} MeshPlotData;
+
+static int
+InitMeshPlotData(MeshPlotData *MPD)
+{
+    MPD->x  = NULL;
+    MPD->nn = NULL;
+    MPD->xsize = 0;
+    MPD->nnsize = 0;
+    MPD->nface = 0;
+    return xf_OK;
+}
+
+static int
+DestroyMeshPlotData(MeshPlotData *MPD)
+{
+    xf_Release((void *) MPD->x );
+    xf_Release((void *) MPD->nn);
+
+    return xf_OK;
+}
+
+
+static int
+MeshPlotData_1D(xf_Mesh *Mesh, int egrp, int elem, SubData *FSD, MeshPlotData *MPD)
+{
+    int ierr, nface, face, nn, i, f;
+    real xref[xf_MAXDIM], xglob[xf_MAXDIM];
+    enum xfe_Bool OnLeft;
+    enum xfe_FaceType FaceType;
+    xf_IFace IFace;
+    xf_Face Face;
+
+    if ((nface = Mesh->ElemGroup[egrp].nFace[elem]) != 2) return xf_CODE_LOGIC_ERROR;
+
+    // Reallocate MPD->nn if necessary
+    if (MPD->nnsize < nface) {
+        MPD->nnsize = nface;
+        ierr = xf_Error(xf_ReAlloc((void **)&MPD->nn, MPD->nnsize, sizeof(int)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    // in 1D, the node is always at reference coordinate xi=0. on the face
+    xref[0] = 0.;
+
+    for (face = 0, i = 0, f = 0; face < nface; face++) {
+        Face = Mesh->ElemGroup[egrp].Face[elem][face];
+        xf_FaceGroupInfo(Mesh, Face.Group, &FaceType, NULL, NULL);
+
+        if (FaceType == xfe_FaceInterior) {
+            IFace = Mesh->IFace[Face.Number];
+
+            ierr = xf_Error(xf_IsElemOnLeft(IFace, egrp, elem, &OnLeft));
+
+            if (ierr != xf_OK) return ierr;
+        } else OnLeft = xfe_True;
+
+        if (!OnLeft) continue;
+
+        // always only one node on the face
+        nn = 1;
+
+        // Reallocate MPD->x if necessary
+        if (MPD->xsize < DIMP * (i + nn)) {
+            MPD->xsize = DIMP * (i + nn);
+            ierr = xf_Error(xf_ReAlloc((void **)&MPD->x, MPD->xsize, sizeof(real)));
+
+            if (ierr != xf_OK) return ierr;
+        }
+
+        ierr = xf_Error(xf_Ref2GlobFace(Mesh, Face.Group, Face.Number, &FSD->PhiData, nn, xref, xglob));
+
+        if (ierr != xf_OK) return ierr;
+
+        // in 1D, y-position in plot is set to 0.0
+        MPD->x[i * DIMP + 0] = xglob[0];
+        MPD->x[i * DIMP + 1] = 0.0;
+
+        MPD->nn[f] = 1;
+
+        f++;
+        i += nn;
+    } // face
+
+    // store number of faces in view
+    MPD->nface = f;
+
+    return xf_OK;
+}
+
+static int
+MeshPlotData_2D(xf_Mesh *Mesh, int egrp, int elem, int *pOrder, SubData *FSD, MeshPlotData *MPD)
+{
+    int ierr, nface, face, nn, i, f, ibfgrp, ibface;
+    enum xfe_Bool OnLeft;
+    enum xfe_FaceType FaceType;
+    xf_IFace IFace;
+    xf_Face Face;
+
+    nface = Mesh->ElemGroup[egrp].nFace[elem];
+
+    // Reallocate MPD->nn if necessary
+    if (MPD->nnsize < nface) {
+        MPD->nnsize = nface;
+        ierr = xf_Error(xf_ReAlloc((void **)&MPD->nn, MPD->nnsize, sizeof(int)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    for (face = 0, i = 0, f = 0; face < nface; face++) {
+        Face = Mesh->ElemGroup[egrp].Face[elem][face];
+        xf_FaceGroupInfo(Mesh, Face.Group, &FaceType, &ibfgrp, NULL);
+
+        if (FaceType == xfe_FaceInterior) {
+            IFace = Mesh->IFace[Face.Number];
+
+            ierr = xf_Error(xf_IsElemOnLeft(IFace, egrp, elem, &OnLeft));
+
+            if (ierr != xf_OK) return ierr;
+        } else OnLeft = xfe_True;
+
+        if (!OnLeft) continue;
+
+        ierr = xf_Error(FindFaceSubData(\
+            Mesh, ibfgrp, Face.Number, pOrder, FSD));
+        if (ierr != xf_OK) return ierr;
+
+        nn = FSD->nnode;
+
+        // Reallocate MPD->x if necessary (over-allocating for speed)
+        if (MPD->xsize < DIMP * (i + nn)) {
+            MPD->xsize = 2 * DIMP * (i + nn);
+            ierr = xf_Error(xf_ReAlloc((void **)&MPD->x, MPD->xsize, sizeof(real)));
+
+            if (ierr != xf_OK) return ierr;
+        }
+
+        // copy global coordinates
+        xf_V_Add(FSD->xglob, DIMP * nn, xfe_Set, MPD->x + DIMP * i);
+
+        MPD->nn[f] = nn;
+
+        f++;
+        i += nn;
+    } // face
+
+    // store number of faces in view
+    MPD->nface = f;
+
+    return xf_OK;
+}
+
+static int
+MeshPlotData_3D(xf_Mesh *Mesh, int egrp, int elem, int *pOrder, SliceData *SLD, SubData *FSD, MeshPlotData *MPD)
+{
+    /*  Intersect the subdivided faces of the element with the slice plane.
+        Each piece of the cut is stored as its own two-node line. */
+
+    int ierr, nface, face, i, j, k, f, nv, np, ibfgrp, a, b;
+    const int *selem;
+    real t, x[2][3];
+    enum xfe_Bool OnLeft;
+    enum xfe_FaceType FaceType;
+    enum xfe_ShapeType FShape;
+    xf_IFace IFace;
+    xf_Face Face;
+
+    nface = Mesh->ElemGroup[egrp].nFace[elem];
+
+    for (face = 0, f = 0; face < nface; face++) {
+        Face = Mesh->ElemGroup[egrp].Face[elem][face];
+        xf_FaceGroupInfo(Mesh, Face.Group, &FaceType, &ibfgrp, NULL);
+
+        if (FaceType == xfe_FaceInterior) {
+            IFace = Mesh->IFace[Face.Number];
+
+            ierr = xf_Error(xf_IsElemOnLeft(IFace, egrp, elem, &OnLeft));
+
+            if (ierr != xf_OK) return ierr;
+        } else OnLeft = xfe_True;
+
+        if (!OnLeft) continue;
+
+        ierr = xf_Error(FindFaceSubData(\
+            Mesh, ibfgrp, Face.Number, pOrder, FSD));
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(xf_FaceShape(FSD->Shape, FSD->Face, &FShape));
+
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(SubElemNodes(FShape, &nv));
+
+        if (ierr != xf_OK) return ierr;
+
+        ierr = xf_Error(SliceDistance(SLD, FSD->nnode, FSD->xglob));
+
+        if (ierr != xf_OK) return ierr;
+
+        for (i = 0; i < FSD->nselem; i++) {
+            selem = FSD->selem + nv * i;
+
+            // walk around the sub-triangle to find the (two) cut edges
+            for (j = 0, np = 0; (j < nv) && (np < 2); j++) {
+                a = selem[j];
+                b = selem[(j+1) % nv];
+
+                if ((SLD->d[a] >= 0.0) == (SLD->d[b] >= 0.0)) continue;
+
+                t = SLD->d[a] / (SLD->d[a] - SLD->d[b]);
+
+                for (k = 0; k < 3; k++)
+                    x[np][k] = FSD->xglob[3*a+k] + t * (FSD->xglob[3*b+k] - FSD->xglob[3*a+k]);
+
+                np++;
+            }
+
+            if (np < 2) continue;
+
+            // Reallocate MPD->nn and MPD->x if necessary
+            if (MPD->nnsize <= f) {
+                MPD->nnsize = 2 * (f + 1);
+                ierr = xf_Error(xf_ReAlloc((void **)&MPD->nn, MPD->nnsize, sizeof(int)));
+
+                if (ierr != xf_OK) return ierr;
+            }
+
+            if (MPD->xsize < 2 * DIMP * (f + 1)) {
+                MPD->xsize = 4 * DIMP * (f + 1);
+                ierr = xf_Error(xf_ReAlloc((void **)&MPD->x, MPD->xsize, sizeof(real)));
+
+                if (ierr != xf_OK) return ierr;
+            }
+
+            SliceProject(SLD, x[0], MPD->x + 2 * DIMP * f);
+            SliceProject(SLD, x[1], MPD->x + 2 * DIMP * f + DIMP);
+
+            MPD->nn[f] = 2;
+
+            f++;
+        } // i
+    } // face
+
+    // store number of lines in view
+    MPD->nface = f;
+
+    return xf_OK;
+}
+
+/* Scalar plotting */
+
+typedef struct {
+    int egrp, elem; // element index
+    int *IParam; // integer parameter array for EqnSet
+    real *RParam; // real-valued parameter array for EqnSet
+    int nAux; // number of auxiliary vectors
+    xf_Vector **VAux; // pointers to auxiliary vectors
+    real *U, *gU; // storage for state and gradient at plotting nodes
+    int Usize, gUsize; // size of storage at plotting nodes
+    real *s; // storage for scalar at plotting nodes
+    int ssize; // size of storage for scalar at plotting nodes
+    xf_BasisTable *PhiTable; // table to avoid recalculation of basis functions
+    xf_BasisData *BD; // basis data for interpolating scalar
+    xf_JacobianData *JD; // Jacobian data for calculating gradients
+    px_PerfData Perf; // basis and scalar evaluation counters
+} ScalarPlotData;
+
+static int
+InitScalarPlotData(xf_EqnSet *EqnSet, ScalarPlotData *SPD)
+{
+    int ierr;
+
+    SPD->egrp = SPD->elem = 0;
+
+    // communicate with EqnSet to fill real and integer parameters
+    ierr = xf_Error(xf_RetrieveFcnParams(NULL, EqnSet, &SPD->IParam, &SPD->RParam,
+                                         &SPD->nAux, &SPD->VAux));
+
+    if (ierr != xf_OK) return ierr;
+
+    SPD->U = SPD->gU = NULL;
+    SPD->Usize = SPD->gUsize = 0;
+    SPD->s = NULL;
+    SPD->ssize = 0;
+
+    ierr = xf_Error(xf_CreateBasisTable(&SPD->PhiTable));
+
+    if (ierr != xf_OK) return ierr;
+
+    SPD->BD = NULL;
+    SPD->JD = NULL;
+
+    px_PerfInit(&SPD->Perf);
+
+    return xf_OK;
+}
+
+static int
+DestroyScalarPlotData(ScalarPlotData *SPD)
+{
+    int ierr;
+
+    xf_Release((void *) SPD->IParam);
+    xf_Release((void *) SPD->RParam);
+    xf_Release((void *) SPD->VAux);
+    xf_Release((void *) SPD->U );
+    xf_Release((void *) SPD->gU);
+    xf_Release((void *) SPD->s );
+
+    px_PerfCommit(&SPD->Perf);
+
+    ierr = xf_Error(xf_DestroyBasisData(SPD->BD, xfe_False));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(xf_DestroyBasisTable(SPD->PhiTable));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(xf_DestroyJacobianData(SPD->JD));
+
+    if (ierr != xf_OK) return ierr;
+
+    return xf_OK;
+}
+
+static int
+ScalarValues(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, int egrp, int elem, char *Name, SubData *ESD, ScalarPlotData *SPD)
+{
+    int ierr, i, d, dim, sr, nn, nq, Order;
+    enum xfe_Bool Interpolated;
+    enum xfe_BasisType Basis;
+    real *EU;
+    double t0;
+
+    dim = Mesh->Dim;
+    sr = U->StateRank;
+
+    nq = ESD->nnode;
+
+    EU = U->GenArray[egrp].rValue[elem];
+
+    // Reallocate if necessary
+    if (SPD->Usize < sr * nq) {
+        SPD->Usize = sr * nq;
+        ierr = xf_Error(xf_ReAlloc((void **)&SPD->U, SPD->Usize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    if (SPD->gUsize < dim * sr * nq) {
+        SPD->gUsize = dim * sr * nq;
+        ierr = xf_Error(xf_ReAlloc((void **)&SPD->gU, SPD->gUsize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    if (SPD->ssize < nq) {
+        SPD->ssize = nq;
+        ierr = xf_Error(xf_ReAlloc((void **)&SPD->s, SPD->ssize, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    Interpolated = ((U->Basis != NULL) && (U->Order != NULL));
+
+    if (!Interpolated && (Name != NULL)) return xf_NOT_SUPPORTED;
+
+    if (Interpolated) {
+        xf_InterpOrderBasis(U, egrp, elem, &Order, &Basis);
+
+        ierr = xf_Error(xf_Order2nNode(Basis, Order, &nn));
+
+        if (ierr != xf_OK) return ierr;
+
+        PX_TIC(t0);
+
+        // Evaluate the basis functions for the vector
+        ierr = xf_Error(xf_EvalBasisUsingTable(Basis, Order, ESD->PointsChanged, ESD->nnode, ESD->xref,
+                                               xfb_Phi | xfb_GPhi | xfb_gPhi, SPD->PhiTable, &SPD->BD));
+
+        if (ierr != xf_OK) return ierr;
+
+        // values
+        xf_MxM_Set(SPD->BD->Phi, EU, nq, nn, sr, SPD->U);
+        
+        if (Name != NULL) {
+            // element Jacobian det and inv at points (only 1 if J is const)
+            ierr = xf_Error(xf_ElemJacobian(Mesh, egrp, elem, ESD->nnode, ESD->xref, xfb_detJ | xfb_iJ,
+                                            ESD->PointsChanged, &SPD->JD));
+
+            if (ierr != xf_OK) return ierr;
+
+            ierr = xf_Error(xf_EvalPhysicalGrad(SPD->BD, SPD->JD));
+
+            if (ierr != xf_OK) return ierr;
+
+            // gradients
+            for (d = 0; d < dim; d++)
+                xf_MxM_Set(SPD->BD->gPhi + nn * nq * d, EU, nq, nn, sr, SPD->gU + nq * sr * d);
+
+            PX_TOC(&SPD->Perf, pxe_PerfBasis, t0);
+            PX_TIC(t0);
+
+            ierr = xf_Error(xf_EqnSetScalar(EqnSet, Name, SPD->IParam, SPD->RParam, nq,
+                                            SPD->U, SPD->gU, SPD->s, NULL, NULL, NULL));
+
+            if (ierr != xf_OK) return ierr;
+
+            PX_TOC(&SPD->Perf, pxe_PerfScalar, t0);
+        } else {
+            for (i = 0; i < nq; i++) SPD->s[i] = SPD->U[i * sr];
+
+            PX_TOC(&SPD->Perf, pxe_PerfBasis, t0);
+        }
+    } else for (i = 0; i < nq; i++) SPD->s[i] = EU[0];
+
+
+    return xf_OK;
+}
+
+
+static int
+FaceElemSubData(xf_Mesh *Mesh, int ibfgrp, int ibface, SubData *FSD, SubData *ESD,
+                int *egrp, int *elem)
+{
+    /*  Convert the face sub-nodes in FSD to reference coordinates of the
+        element on the left of the face so that the element state can be
+        evaluated there.  Only ESD->nnode and ESD->xref are set. */
+
+    int ierr, face, Orient;
+    enum xfe_ShapeType Shape;
+
+    ierr = xf_Error(xf_FaceElements(Mesh, ibfgrp, ibface, egrp, elem, &face, NULL, NULL, NULL));
+
+    if (ierr != xf_OK) return ierr;
+
+    Orient = Mesh->BFaceGroup[ibfgrp].BFace[ibface].Orient;
+
+    ierr = xf_Error(xf_Basis2Shape(Mesh->ElemGroup[*egrp].QBasis, &Shape));
+
+    if (ierr != xf_OK) return ierr;
+
+    if (ESD->nnode != FSD->nnode) {
+        ESD->nnode = FSD->nnode;
+        ierr = xf_Error(xf_ReAlloc((void **) &ESD->xref, Mesh->Dim * ESD->nnode, sizeof(real)));
+
+        if (ierr != xf_OK) return ierr;
+    }
+
+    ierr = xf_Error(xf_RefFace2RefElem(Shape, face, Orient, FSD->nnode, FSD->xref, ESD->xref));
+
+    if (ierr != xf_OK) return ierr;
+
+    // the face and element change from one face to the next
+    ESD->PointsChanged = xfe_True;
+
+    return xf_OK;
+}
+
+
+static int
+ScalarPlotData_3D(xf_Mesh *Mesh, int egrp, int elem, const int *pOrder, SubData *ESD, SliceData *SLD)
+{
+    /*  Subdivide the element and intersect it with the slice plane.  The
+        scalar is then evaluated at the reference coordinates of the cut
+        points in SLD->CSD. */
+
+    int ierr;
+
+    ierr = xf_Error(FindElemSubData(Mesh, egrp, elem, pOrder, ESD));
+
+    if (ierr != xf_OK) return ierr;
+
+    ierr = xf_Error(SliceElemSubData(ESD, SLD));
+
+    if (ierr != xf_OK) return ierr;
+
+    return xf_OK;
+}
+
+
+/* Scalar rasterization */
+
+static void
+RasterTriangle(const real *x0, const real *x1, const real *x2, real s0, real s1, real s2,
+               const real *xmin, const real *dx, int nx, int ny, real *img)
+{
+    /*  Linearly interpolate the scalar over one sub-triangle at the centers
+        of the pixels it covers; this matches Gouraud shading of the same
+        sub-triangles. */
+
+    int i, j, i0, i1, j0, j1;
+    real det, l0, l1, xp, yp, eps = 1e-10;
+    real xlo, xhi, ylo, yhi;
+
+    det = (x1[1] - x2[1]) * (x0[0] - x2[0]) + (x2[0] - x1[0]) * (x0[1] - x2[1]);
+
+    if (det == 0.0) return;
+
+    // bounding box of the triangle
+    xlo = min(x0[0], min(x1[0], x2[0]));
+    xhi = max(x0[0], max(x1[0], x2[0]));
+    ylo = min(x0[1], min(x1[1], x2[1]));
+    yhi = max(x0[1], max(x1[1], x2[1]));
+
+    // pixel centers inside the bounding box
+    i0 = max((int) ceil((xlo - xmin[0]) / dx[0] - 0.5), 0);
+    i1 = min((int) floor((xhi - xmin[0]) / dx[0] - 0.5), nx - 1);
+    j0 = max((int) ceil((ylo - xmin[1]) / dx[1] - 0.5), 0);
+    j1 = min((int) floor((yhi - xmin[1]) / dx[1] - 0.5), ny - 1);
+
+    for (j = j0; j <= j1; j++) {
+        yp = xmin[1] + (j + 0.5) * dx[1];
+
+        for (i = i0; i <= i1; i++) {
+            xp = xmin[0] + (i + 0.5) * dx[0];
+
+            // barycentric coordinates
+            l0 = ((x1[1] - x2[1]) * (xp - x2[0]) + (x2[0] - x1[0]) * (yp - x2[1])) / det;
+            l1 = ((x2[1] - x0[1]) * (xp - x2[0]) + (x0[0] - x2[0]) * (yp - x2[1])) / det;
+
+            if ((l0 < -eps) || (l1 < -eps) || (l0 + l1 > 1.0 + eps)) continue;
+
+            img[(npy_intp) j * nx + i] = l0 * s0 + l1 * s1 + (1.0 - l0 - l1) * s2;
+        }
+    }
+}
+
+
+/* Scalar contours */
+
+static int
+FindLevelRange(int nlev, const real *lev, real cmin, real cmax, int *l0, int *l1)
+{
+    /*  Find the range [l0, l1) of the sorted levels that satisfy
+        cmin < level <= cmax using bisection. */
+
+    int lo, hi, mid;
+
+    lo = 0;
+    hi = nlev;
+
+    while (lo < hi) {
+        mid = (lo + hi) / 2;
+        if (lev[mid] <= cmin) lo = mid + 1;
+        else hi = mid;
+    }
+
+    (*l0) = lo;
+    hi = nlev;
+
+    while (lo < hi) {
+        mid = (lo + hi) / 2;
+        if (lev[mid] <= cmax) lo = mid + 1;
+        else hi = mid;
+    }
+
+    (*l1) = lo;
+
+    return xf_OK;
+}
+
+static void
+ContourSegment(const real *x, const real *y, const int *t, const real *c, real level, real *seg)
+{
+    /*  Find the two points where a level crosses a triangle.  A vertex is
+        above the level if its value is greater than or equal to the level,
+        so exactly two edges change sign. */
+
+    int k, a, b, n;
+    real w;
+
+    for (k = 0, n = 0; (k < TRINN) && (n < 2); k++) {
+        a = t[k];
+        b = t[(k + 1) % TRINN];
+
+        if ((c[a] >= level) == (c[b] >= level)) continue;
+
+        w = (level - c[a]) / (c[b] - c[a]);
+        seg[2 * n + 0] = x[a] + w * (x[b] - x[a]);
+        seg[2 * n + 1] = y[a] + w * (y[b] - y[a]);
+        n++;
+    }
+}
+
+
+static int
+CullElems(xf_Mesh *Mesh, const real *xmin, const real *xmax, double buffer,
+          const real *tile, const int *List, int nList, const SliceData *SLD,
+          int nThread, px_PerfData *P, int *pnElem, int **pEG, int **pEL);
+
+static int
+MeshPlotElems(xf_Mesh *Mesh, real *xmin, real *xmax, double buffer,
+              const real *tile, const int *List, int nList, int *pOrder, SliceData *SLD,
+              SubData *FSD, MeshPlotData *MPD,
+              real **px, real **py, int *pnp, int **pc, int *pnc)
+{
+    /*  Element loop of px_MeshPlotData.  No Python objects are used here, so
+        this is called with the GIL released. */
+
+    int ierr, dim, i, k, nn, nntotal, egrp, elem, nElem;
+    int *EG = NULL, *EL = NULL;
+    real *x, *y;
+    int psize, np;
+    int *c;
+    int csize, nc;
+    double t0;
+    px_PerfData P;
+
+    dim = Mesh->Dim;
+
+    px_PerfInit(&P);
+
+    x = y = NULL;
+    psize = 0;
+    np = 0;
+    c = NULL;
+    nc = 0;
+    csize = 0;
+    nn = 0;
+
+    // Elements that cross the slice plane and are inside the window
+    ierr = xf_Error(CullElems(Mesh, xmin, xmax, buffer, tile, List, nList, SLD, 1, &P,
+                              &nElem, &EG, &EL));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    for (k = 0; k < nElem; k++) {
+        egrp = EG[k];
+        elem = EL[k];
+
+        PX_TIC(t0);
+
+        if (dim == 1) {
+            ierr = xf_Error(MeshPlotData_1D(\
+                Mesh, egrp, elem, FSD, MPD));
+        } else if (dim == 2) {
+            ierr = xf_Error(MeshPlotData_2D(\
+                Mesh, egrp, elem, pOrder, FSD, MPD));
+        } else if (dim == 3) {
+            ierr = xf_Error(MeshPlotData_3D(\
+                Mesh, egrp, elem, pOrder, SLD, FSD, MPD));
+        } else {
+            ierr = xf_Error(xf_NOT_SUPPORTED);
+        }
+
+        if (ierr != xf_OK) goto cleanup;
+
+        PX_TOC(&P, pxe_PerfSubdivide, t0);
+        PX_TIC(t0);
+
+        // Add data
+        for(i = 0, nntotal = 0; i < MPD->nface; i++) nntotal += MPD->nn[i];
+
+        // reallocate x and y if necessary
+        if (psize < (np + nntotal)) {
+            // larger than necessary, hopefully reducing the number of reallocs
+            psize = 2 * (np + nntotal);
+            PX_BYTES(&P, pxe_PerfOutput, 2.0 * psize * sizeof(real));
+            ierr = xf_Error(xf_ReAlloc((void **)&x, psize, sizeof(real)));
+
+            if (ierr != xf_OK) goto cleanup;
+
+            ierr = xf_Error(xf_ReAlloc((void **)&y, psize, sizeof(real)));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // node position data
+        for (i = 0; i < nntotal; i++) {
+            x[np + i] = MPD->x[DIMP * i];
+            y[np + i] = MPD->x[DIMP * i + 1];
+        }
+
+        np += nntotal;
+
+        // reallocate connectivity data if necessary
+        if (csize < (nc + MPD->nface)) {
+            // larger than necessary, hopefully reducing the number of reallocs
+            csize = 2 * (nc + MPD->nface);
+            PX_BYTES(&P, pxe_PerfOutput, 1.0 * csize * sizeof(int));
+            ierr = xf_Error(xf_ReAlloc((void **)&c, csize, sizeof(int)));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // connectivity data
+        for (i = 0; i < MPD->nface; i++) {
+            c[nc + i] = nn;
+            nn += MPD->nn[i];
+        }
+
+        nc += MPD->nface;
+
+        PX_TOC(&P, pxe_PerfOutput, t0);
+    }
+
+    // Trim
+    ierr = xf_Error(xf_ReAlloc((void **)&x, np, sizeof(real)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_ReAlloc((void **)&y, np, sizeof(real)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_ReAlloc((void **)&c, nc, sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    (*px) = x;
+    (*py) = y;
+    (*pc) = c;
+    (*pnp) = np;
+    (*pnc) = nc;
+
+    px_PerfCommit(&P);
+
+cleanup:
+    xf_Release((void *) EG);
+    xf_Release((void *) EL);
+
+    if (ierr != xf_OK) {
+        xf_Release((void *) x);
+        xf_Release((void *) y);
+        xf_Release((void *) c);
+    }
+
+    return ierr;
+}
+
+PyObject*
+px_MeshPlotData(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    int ierr, dim;
+    int Order, *pOrder;
+    npy_intp pydim[3];
+    real xmin[xf_MAXDIM], xmax[xf_MAXDIM];
+    real *x, *y;
+    int np;
+    int *c;
+    int nc;
+    double buffer = 0.5;
+    SubData FSD;
+    SliceData SLD;
+    MeshPlotData MPD;
+    PyObject *py_x, *py_y, *py_c, *py_min, *py_max, *py_order;
+    PyObject *py_plane = Py_None, *py_bounds = Py_None, *py_tile = Py_None;
+    PyObject *py_elems = Py_None;
+    PyArrayObject *a_bounds = NULL, *a_elems;
+    real tile[2], *ptile;
+    int *List, nList;
+    xf_Mesh *Mesh;
+    static char *kwlist[] = {"M", "xmin", "xmax", "order", "buffer", "plane",
+        "bounds", "tile", "elems", NULL};
+
+    // Parse the inputs.
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "nOOO|dOOOO", kwlist, \
+            &Mesh, &py_min, &py_max, &py_order, &buffer, &py_plane, &py_bounds,
+            &py_tile, &py_elems))
+        return NULL;
+
+    ierr = xf_Error(UnpackTile(py_tile, tile, &ptile));
+
+    if (ierr != xf_OK) return NULL;
+
+    dim = Mesh->Dim;
+
+    ierr = xf_Error(UnpackRealList(py_min, dim, xmin, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(UnpackRealList(py_max, dim, xmax, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    if (PyInt_Check(py_order)){
+        Order = (int) PyInt_AsLong(py_order);
+        pOrder = &Order;
+    }
+    else{
+        pOrder= NULL;
+    }
+
+    // Precomputed element bounds for slicing
+    if ((dim == 3) && (py_bounds != Py_None)) {
+        a_bounds = (PyArrayObject *) PyArray_FROM_OTF(py_bounds, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+        if (a_bounds == NULL) return NULL;
+    }
+
+    // Candidate elements, e.g. the elements of a tile
+    ierr = xf_Error(UnpackElemList(Mesh, py_elems, &a_elems, &List, &nList));
+
+    if (ierr != xf_OK) {
+        Py_XDECREF(a_bounds);
+        return NULL;
+    }
+
+    // Init the face and slice data
+    ierr = xf_Error(InitMeshPlotData(&MPD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(InitSliceData(Mesh, py_plane, a_bounds, xmin, xmax, &SLD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(InitSubData(&FSD));
+
+    if (ierr != xf_OK) return NULL;
+
+    // Extract the data without holding the GIL.
+    Py_BEGIN_ALLOW_THREADS
+    ierr = xf_Error(MeshPlotElems(Mesh, xmin, xmax, buffer, ptile, List, nList, \
+        pOrder, &SLD, &FSD, &MPD, &x, &y, &np, &c, &nc));
+    Py_END_ALLOW_THREADS
+
+    Py_XDECREF(a_elems);
+
+    if (ierr != xf_OK) return NULL;
+
+    // Convert to python arrays
+    // positions
+    pydim[0] = np;
+    py_x = OwnedArray(1, pydim, NPY_DOUBLE, (void *)x);
+    py_y = OwnedArray(1, pydim, NPY_DOUBLE, (void *)y);
+    // connectivity
+    pydim[0] = nc;
+    py_c = OwnedArray(1, pydim, NPY_INT, (void *)c);
+
+    // clean up
+    ierr = xf_Error(DestroyMeshPlotData(&MPD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(DestroySliceData(&SLD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(DestroySubData(&FSD));
+
+    if (ierr != xf_OK) return NULL;
+
+    Py_XDECREF(a_bounds);
+
+    return Py_BuildValue("NNN", py_x, py_y, py_c);
+}
+
+static int
+ScalarElemSubData(xf_Vector *U, xf_Mesh *Mesh, int egrp, int elem, const int *pOrder,
+                  SubData *ESD, SliceData *SLD, SubData **pPSD)
+{
+    /*  Subdivide one element for a scalar plot.  (*pPSD) is set to the
+        sub-nodes where the scalar is evaluated, which are the cut points
+        in SLD->CSD for 3D meshes. */
+
+    int ierr, Order;
+
+    // default plot order based on geometry and solution orders
+    if (pOrder != NULL)
+        Order = (*pOrder);
+    else
+        Order = 2 * max(Mesh->ElemGroup[egrp].QOrder, xf_InterpOrder(U, egrp, elem)) + 1;
+
+    if ((Mesh->Dim >= 1) && (Mesh->Dim < 3)) {
+        // Simple in this case
+        ierr = xf_Error(FindElemSubData(Mesh, egrp, elem, &Order, ESD));
+
+        if (ierr != xf_OK) return ierr;
+
+        (*pPSD) = ESD;
+    } else if (Mesh->Dim == 3) {
+        // Harder, need to calculate the xref along the cut plane
+        ierr = xf_Error(ScalarPlotData_3D(Mesh, egrp, elem, &Order, ESD, SLD));
+
+        if (ierr != xf_OK) return ierr;
+
+        (*pPSD) = &SLD->CSD;
+    } else return xf_Error(xf_NOT_SUPPORTED);
+
+    return xf_OK;
+}
+
+static void
+PerfAdd(px_PerfData *P, int k, int n, double t0)
+{
+    // Time phase k for n elements that were processed together
+    if (!px_PerfOn) return;
+
+    P->t[k] += px_PerfClock() - t0;
+    P->n[k] += n;
+}
+
+static int
+CullElems(xf_Mesh *Mesh, const real *xmin, const real *xmax, double buffer,
+          const real *tile, const int *List, int nList, const SliceData *SLD,
+          int nThread, px_PerfData *P, int *pnElem, int **pEG, int **pEL)
+{
+    /*  List the element groups (*pEG) and elements (*pEL) that pass the
+        plane and window tests, in the order of the serial loop.  If List
+        holds nList (egrp, elem) pairs, only those elements are candidates,
+        in that order, and the window test is skipped.  Only the node counts
+        of the element groups come from libxf, so the tests themselves run
+        on nThread OpenMP threads if the module was built with OpenMP. */
+
+    int ierr, egrp, elem, nTot, nElem, k;
+    int *nn = NULL, *EG = NULL, *EL = NULL;
+    enum xfe_Bool *Keep = NULL;
+    double t0;
+
+    PX_TIC(t0);
+
+    ierr = xf_Error(xf_Alloc((void **) &nn, max(Mesh->nElemGroup, 1), sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    for (egrp = 0, nTot = 0; egrp < Mesh->nElemGroup; egrp++) {
+        if (List == NULL) nTot += Mesh->ElemGroup[egrp].nElem;
+
+        ierr = xf_Error(xf_Order2nNode(Mesh->ElemGroup[egrp].QBasis,
+                                       Mesh->ElemGroup[egrp].QOrder, nn + egrp));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+    if (List != NULL) nTot = nList;
+
+    ierr = xf_Error(xf_Alloc((void **) &EG, max(nTot, 1), sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_Alloc((void **) &EL, max(nTot, 1), sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_Alloc((void **) &Keep, max(nTot, 1), sizeof(enum xfe_Bool)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    if (List != NULL) {
+        for (k = 0; k < nTot; k++) {
+            EG[k] = List[2*k];
+            EL[k] = List[2*k+1];
+        }
+    } else {
+        for (egrp = 0, k = 0; egrp < Mesh->nElemGroup; egrp++)
+            for (elem = 0; elem < Mesh->ElemGroup[egrp].nElem; elem++, k++) {
+                EG[k] = egrp;
+                EL[k] = elem;
+            }
+    }
+
+#ifdef _OPENMP
+    #pragma omp parallel for if (nThread > 1) num_threads(max(nThread, 1)) schedule(static)
+#endif
+    for (k = 0; k < nTot; k++) {
+        if (List != NULL)
+            Keep[k] = ElemCrossesPlane(Mesh, EG[k], EL[k], nn[EG[k]], SLD);
+        else
+            Keep[k] = ElemSelected(Mesh, EG[k], EL[k], nn[EG[k]], xmin, xmax, buffer,
+                                   tile, SLD);
+    }
+
+    // compact the list
+    for (k = 0, nElem = 0; k < nTot; k++) {
+        if (!Keep[k]) continue;
+        EG[nElem] = EG[k];
+        EL[nElem] = EL[k];
+        nElem++;
+    }
+
+    PerfAdd(P, pxe_PerfCull, nTot, t0);
+
+    (*pnElem) = nElem;
+    (*pEG) = EG;
+    (*pEL) = EL;
+
+cleanup:
+    xf_Release((void *) nn);
+    xf_Release((void *) Keep);
+
+    if (ierr != xf_OK) {
+        xf_Release((void *) EG);
+        xf_Release((void *) EL);
+    }
+
+    return ierr;
+}
+
+static int
+ScalarPlotList(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, int nElem, \
+               const int *EG, const int *EL, int *pOrder, char *ScalarName, \
+               enum xfe_Bool ValuesOnly, SubData *ESD, SliceData *SLD, \
+               ScalarPlotData *SPD, px_PerfData *P, real **px, real **py, \
+               int **ptri, real **pc, int *pnp, int *pntri)
+{
+    /*  Subdivide the listed elements and evaluate the scalar one element
+        at a time, growing the outputs as needed */
+
+    int ierr, k, egrp, elem, i;
+    real *x, *y, *c;
+    int psize, np, *tri, ntri, trisize, csize;
+    SubData *PSD;
+    double t0;
+
+    ierr = xf_OK;
+    x = y = NULL;
+    psize = 0;
+    np = 0;
+    tri = NULL;
+    trisize = 0;
+    ntri = 0;
+    c = NULL;
+    csize = 0;
+
+    for (k = 0; k < nElem; k++) {
+        egrp = EG[k];
+        elem = EL[k];
+
+        PX_TIC(t0);
+
+        ierr = xf_Error(ScalarElemSubData(U, Mesh, egrp, elem, pOrder, ESD, SLD, &PSD));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        PX_TOC(P, pxe_PerfSubdivide, t0);
+
+        // the plane may miss the element
+        if (PSD->nnode == 0) continue;
+
+        ierr = xf_Error(ScalarValues(U, Mesh, EqnSet, egrp, elem, ScalarName, PSD, SPD));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        PX_TIC(t0);
+
+        // reallocate x and y if necessary
+        if ((!ValuesOnly) && (psize < DIMP * (np + PSD->nnode))) {
+            psize = 2 * DIMP * (np + PSD->nnode);
+            PX_BYTES(P, pxe_PerfOutput, 2.0 * psize * sizeof(real));
+            ierr = xf_Error(xf_ReAlloc((void **)&x, psize, sizeof(real)));
+
+            if (ierr != xf_OK) goto cleanup;
+
+            ierr = xf_Error(xf_ReAlloc((void **)&y, psize, sizeof(real)));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // reallocate c if necessary
+        if (csize < np + PSD->nnode) {
+            csize = 2 * (np + PSD->nnode);
+            PX_BYTES(P, pxe_PerfOutput, 1.0 * csize * sizeof(real));
+            ierr = xf_Error(xf_ReAlloc((void **)&c, csize, sizeof(real)));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // scalar values
+        for (i = 0; i < PSD->nnode; i++)
+            c[np + i] = SPD->s[i];
+
+        if (ValuesOnly) {
+            np += PSD->nnode;
+            PX_TOC(P, pxe_PerfOutput, t0);
+            continue;
+        }
+
+        // node position data
+        for (i = 0; i < PSD->nnode; i++) {
+            x[np + i] = PSD->xglob[DIMP * i];
+            y[np + i] = PSD->xglob[DIMP * i + 1];
+        }
+
+        // reallocate tri if necessary
+        if (trisize < TRINN * (ntri + PSD->nselem)) {
+            trisize = 2 * TRINN * (ntri + PSD->nselem);
+            PX_BYTES(P, pxe_PerfOutput, 1.0 * trisize * sizeof(int));
+            ierr = xf_Error(xf_ReAlloc((void **)&tri, trisize, sizeof(int)));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // sub-triangle data
+        for (i = 0; i < TRINN * PSD->nselem; i++)
+            tri[TRINN * ntri + i] = np + PSD->selem[i];
+
+        ntri += PSD->nselem;
+
+        np += PSD->nnode;
+
+        PX_TOC(P, pxe_PerfOutput, t0);
+    }
+
+    // Trim
+    ierr = xf_Error(xf_ReAlloc((void **)&c, np, sizeof(real)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    if (!ValuesOnly) {
+        ierr = xf_Error(xf_ReAlloc((void **)&x, np, sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        ierr = xf_Error(xf_ReAlloc((void **)&y, np, sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        ierr = xf_Error(xf_ReAlloc((void **)&tri, TRINN * ntri, sizeof(int)));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+cleanup:
+    if (ierr != xf_OK) {
+        xf_Release((void *) x);
+        xf_Release((void *) y);
+        xf_Release((void *) tri);
+        xf_Release((void *) c);
+        return ierr;
+    }
+
+    (*px) = x;
+    (*py) = y;
+    (*ptri) = tri;
+    (*pc) = c;
+    (*pnp) = np;
+    (*pntri) = ntri;
+
+    return xf_OK;
+}
+
+#ifdef _OPENMP
+// Maximum number of sub-nodes in one call to xf_EqnSetScalar
+#define SCALAR_BATCH 65536
+
+typedef struct {
+    int egrp; // element group
+    int Order; // refinement order
+    int UOrder; // interpolation order of the vector
+    enum xfe_BasisType UBasis; // interpolation basis of the vector
+    int nq; // number of sub-nodes
+    int nselem; // number of sub-triangles
+    int *selem; // list of sub-triangle nodes (unrolled)
+    int nnQ, nnU; // number of geometry and vector basis functions
+    real *PhiQ, *GPhiQ; // geometry basis and reference gradients at sub-nodes
+    real *PhiU, *GPhiU; // vector basis and reference gradients at sub-nodes
+} PlotTable;
+
+static int
+CopyReals(const real *a, int n, real **pb)
+{
+    int ierr;
+
+    ierr = xf_Error(xf_Alloc((void **) pb, max(n, 1), sizeof(real)));
+
+    if (ierr != xf_OK) return ierr;
+
+    memcpy((*pb), a, n * sizeof(real));
+
+    return xf_OK;
+}
+
+static int
+BuildPlotTable(xf_Mesh *Mesh, enum xfe_Bool Interpolated, enum xfe_Bool Gradients,
+               ScalarPlotData *SPD, PlotTable *T)
+{
+    /*  Refine the reference element of group T->egrp and tabulate the
+        geometry and vector bases at the sub-nodes.  The tables only depend
+        on (egrp, Order, UOrder, UBasis), so each one is computed once.  The
+        gradients have the layout of BD->gPhi: [dim][nq][nn]. */
+
+    int ierr, flags, nsbound, *sbound = NULL;
+    real *xref = NULL;
+    enum xfe_ShapeType Shape;
+    xf_ElemGroup *EGroup = Mesh->ElemGroup + T->egrp;
+
+    flags = (Gradients ? (xfb_Phi | xfb_GPhi) : xfb_Phi);
+
+    ierr = xf_Error(xf_Basis2Shape(EGroup->QBasis, &Shape));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_GetRefineCoords(Shape, T->Order, &T->nq, &xref, &T->nselem, &T->selem,
+                                       &nsbound, &sbound));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    // geometry basis
+    ierr = xf_Error(xf_Order2nNode(EGroup->QBasis, EGroup->QOrder, &T->nnQ));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_EvalBasisUsingTable(EGroup->QBasis, EGroup->QOrder, xfe_True, T->nq, xref,
+                                           flags, SPD->PhiTable, &SPD->BD));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(CopyReals(SPD->BD->Phi, T->nq * T->nnQ, &T->PhiQ));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    if (Gradients) {
+        ierr = xf_Error(CopyReals(SPD->BD->GPhi, Mesh->Dim * T->nq * T->nnQ, &T->GPhiQ));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+    if (!Interpolated) goto cleanup;
+
+    // vector basis
+    ierr = xf_Error(xf_Order2nNode(T->UBasis, T->UOrder, &T->nnU));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_EvalBasisUsingTable(T->UBasis, T->UOrder, xfe_True, T->nq, xref,
+                                           flags, SPD->PhiTable, &SPD->BD));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(CopyReals(SPD->BD->Phi, T->nq * T->nnU, &T->PhiU));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    if (Gradients) {
+        ierr = xf_Error(CopyReals(SPD->BD->GPhi, Mesh->Dim * T->nq * T->nnU, &T->GPhiU));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+cleanup:
+    xf_Release((void *) xref);
+    xf_Release((void *) sbound);
+
+    return ierr;
+}
+
+static void
+DestroyPlotTable(PlotTable *T)
+{
+    xf_Release((void *) T->selem);
+    xf_Release((void *) T->PhiQ);
+    xf_Release((void *) T->GPhiQ);
+    xf_Release((void *) T->PhiU);
+    xf_Release((void *) T->GPhiU);
+}
+
+static int
+PlotTableElem(const xf_Mesh *Mesh, const xf_Vector *U, const PlotTable *T, int egrp, int elem,
+              enum xfe_Bool Interpolated, int nb, real *x, real *y, real *s, real *Ub, real *gUb)
+{
+    /*  Map the sub-nodes of one element of a 2D mesh and interpolate the
+        vector there using the tables in T, without libxf calls.  The
+        coordinates go to x and y unless they are NULL.  If Ub is NULL, the
+        first state component (or the element value of a vector that is not
+        interpolated) goes to s.  Otherwise the states and their physical
+        gradients go to Ub and gUb, in the layout that xf_EqnSetScalar uses
+        for a batch of nb points.  Returns 1 if the geometry Jacobian is
+        singular at a sub-node and 0 otherwise. */
+
+    int q, n, i, r, sr, nq, nnQ, nnU;
+    int *Node;
+    real *EU, *X;
+    real J[2][2], iJ[2][2], det, G0, G1;
+
+    sr = U->StateRank;
+    nq = T->nq;
+    nnQ = T->nnQ;
+    nnU = T->nnU;
+    Node = Mesh->ElemGroup[egrp].Node[elem];
+    EU = U->GenArray[egrp].rValue[elem];
+
+    for (q = 0; q < nq; q++) {
+        // node position data
+        if (x != NULL) {
+            x[q] = y[q] = 0.0;
+            for (n = 0; n < nnQ; n++) {
+                X = Mesh->Coord[Node[n]];
+                x[q] += T->PhiQ[q*nnQ+n] * X[0];
+                y[q] += T->PhiQ[q*nnQ+n] * X[1];
+            }
+        }
+
+        if (!Interpolated) {
+            s[q] = EU[0];
+            continue;
+        }
+
+        if (Ub == NULL) {
+            for (n = 0, s[q] = 0.0; n < nnU; n++)
+                s[q] += T->PhiU[q*nnU+n] * EU[n*sr];
+            continue;
+        }
+
+        // states
+        for (r = 0; r < sr; r++)
+            for (n = 0, Ub[q*sr+r] = 0.0; n < nnU; n++)
+                Ub[q*sr+r] += T->PhiU[q*nnU+n] * EU[n*sr+r];
+
+        // geometry Jacobian, J[i][j] = dx_i/dxi_j
+        for (i = 0; i < 2; i++) {
+            J[i][0] = J[i][1] = 0.0;
+            for (n = 0; n < nnQ; n++) {
+                X = Mesh->Coord[Node[n]];
+                J[i][0] += X[i] * T->GPhiQ[(0*nq+q)*nnQ+n];
+                J[i][1] += X[i] * T->GPhiQ[(1*nq+q)*nnQ+n];
+            }
+        }
+
+        det = J[0][0] * J[1][1] - J[0][1] * J[1][0];
+
+        if (det == 0.0) return 1;
+
+        iJ[0][0] = J[1][1] / det;
+        iJ[0][1] = -J[0][1] / det;
+        iJ[1][0] = -J[1][0] / det;
+        iJ[1][1] = J[0][0] / det;
+
+        // physical gradients, d/dx_i = sum_j iJ[j][i] d/dxi_j
+        for (r = 0; r < sr; r++) {
+            for (n = 0, G0 = G1 = 0.0; n < nnU; n++) {
+                G0 += T->GPhiU[(0*nq+q)*nnU+n] * EU[n*sr+r];
+                G1 += T->GPhiU[(1*nq+q)*nnU+n] * EU[n*sr+r];
+            }
+
+            for (i = 0; i < 2; i++)
+                gUb[(i*nb+q)*sr+r] = iJ[0][i] * G0 + iJ[1][i] * G1;
+        }
+    }
+
+    return 0;
+}
+
+static int
+ScalarPlotListThreaded(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, int nElem, \
+                       const int *EG, const int *EL, int *pOrder, char *ScalarName, \
+                       enum xfe_Bool ValuesOnly, ScalarPlotData *SPD, int nThread, \
+                       px_PerfData *P, real **px, real **py, int **ptri, real **pc, \
+                       int *pnp, int *pntri)
+{
+    /*  Threaded version of ScalarPlotList for 2D meshes with the same
+        output.  libxf is only called from serial sections.  The refinement
+        and basis tables are computed once for each element group and order
+        (BuildPlotTable), and they also give the number of sub-nodes and
+        sub-triangles of each element, so the outputs are allocated once at
+        their final size.  The threads then map the sub-nodes and
+        interpolate the vector with these tables, each element writing to
+        its own slice of the outputs.  A named scalar is evaluated from the
+        interpolated states with one xf_EqnSetScalar call per batch of
+        sub-nodes. */
+
+    int ierr, k, k0, k1, j, n, nb, nbmax, nTable, tsize, nBad, sr, Order, UOrder;
+    int *ET = NULL, *noff = NULL, *toff = NULL, *tri = NULL;
+    real *x = NULL, *y = NULL, *c = NULL, *Ub = NULL, *gUb = NULL;
+    enum xfe_Bool Interpolated, Gradients;
+    enum xfe_BasisType UBasis;
+    PlotTable *Table = NULL, *T;
+    double t0;
+
+    sr = U->StateRank;
+    nTable = tsize = 0;
+
+    Interpolated = ((U->Basis != NULL) && (U->Order != NULL));
+    Gradients = (ScalarName != NULL) ? xfe_True : xfe_False;
+
+    // same restriction as ScalarValues
+    if (!Interpolated && Gradients) return xf_Error(xf_NOT_SUPPORTED);
+
+    PX_TIC(t0);
+
+    ierr = xf_Error(xf_Alloc((void **) &ET, max(nElem, 1), sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_Alloc((void **) &noff, nElem + 1, sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(xf_Alloc((void **) &toff, nElem + 1, sizeof(int)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    // table of each element
+    for (k = 0; k < nElem; k++) {
+        UOrder = 0;
+        UBasis = xfe_BasisLast;
+
+        if (Interpolated) {
+            ierr = xf_Error(xf_InterpOrderBasis(U, EG[k], EL[k], &UOrder, &UBasis));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        // default plot order as in ScalarElemSubData
+        if (pOrder != NULL)
+            Order = (*pOrder);
+        else
+            Order = 2 * max(Mesh->ElemGroup[EG[k]].QOrder, xf_InterpOrder(U, EG[k], EL[k])) + 1;
+
+        // most often the same table as the previous element
+        for (n = nTable - 1; n >= 0; n--) {
+            T = Table + n;
+            if ((T->egrp == EG[k]) && (T->Order == Order) &&
+                (T->UOrder == UOrder) && (T->UBasis == UBasis)) break;
+        }
+
+        if (n < 0) {
+            if (nTable == tsize) {
+                tsize = 2 * tsize + 4;
+                ierr = xf_Error(xf_ReAlloc((void **) &Table, tsize, sizeof(PlotTable)));
+
+                if (ierr != xf_OK) goto cleanup;
+            }
+
+            n = nTable++;
+            T = Table + n;
+            T->egrp = EG[k];
+            T->Order = Order;
+            T->UOrder = UOrder;
+            T->UBasis = UBasis;
+            T->nq = T->nselem = T->nnQ = T->nnU = 0;
+            T->selem = NULL;
+            T->PhiQ = T->GPhiQ = T->PhiU = T->GPhiU = NULL;
+
+            ierr = xf_Error(BuildPlotTable(Mesh, Interpolated, Gradients, SPD, T));
+
+            if (ierr != xf_OK) goto cleanup;
+        }
+
+        ET[k] = n;
+        noff[k+1] = Table[n].nq;
+        toff[k+1] = Table[n].nselem;
+    }
+
+    noff[0] = toff[0] = 0;
+    for (k = 0; k < nElem; k++) {
+        noff[k+1] += noff[k];
+        toff[k+1] += toff[k];
+    }
+
+    PerfAdd(P, pxe_PerfSubdivide, nElem, t0);
+
+    // outputs at their final size
+    ierr = xf_Error(xf_Alloc((void **) &c, max(noff[nElem], 1), sizeof(real)));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    if (!ValuesOnly) {
+        ierr = xf_Error(xf_Alloc((void **) &x, max(noff[nElem], 1), sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        ierr = xf_Error(xf_Alloc((void **) &y, max(noff[nElem], 1), sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        ierr = xf_Error(xf_Alloc((void **) &tri, max(TRINN * toff[nElem], 1), sizeof(int)));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+    PX_BYTES(P, pxe_PerfOutput, (1.0 + 2.0 * (!ValuesOnly)) * noff[nElem] * sizeof(real)
+             + (!ValuesOnly) * TRINN * toff[nElem] * sizeof(int));
+
+    // states and gradients for batches of sub-nodes; an element with more
+    // sub-nodes than a batch gets a batch of its own
+    nbmax = SCALAR_BATCH;
+
+    if (Gradients) {
+        for (k = 0; k < nElem; k++)
+            nbmax = max(nbmax, noff[k+1] - noff[k]);
+
+        ierr = xf_Error(xf_Alloc((void **) &Ub, sr * nbmax, sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        ierr = xf_Error(xf_Alloc((void **) &gUb, 2 * sr * nbmax, sizeof(real)));
+
+        if (ierr != xf_OK) goto cleanup;
+    }
+
+    for (k0 = 0; k0 < nElem; k0 = k1) {
+        // elements [k0, k1) in this batch
+        k1 = k0 + 1;
+
+        if (!Gradients)
+            k1 = nElem;
+        else
+            while ((k1 < nElem) && (noff[k1+1] - noff[k0] <= nbmax)) k1++;
+
+        nb = noff[k1] - noff[k0];
+        nBad = 0;
+
+        PX_TIC(t0);
+
+        #pragma omp parallel for num_threads(nThread) private(T, j) schedule(dynamic, 16) reduction(+:nBad)
+        for (k = k0; k < k1; k++) {
+            T = Table + ET[k];
+
+            nBad += PlotTableElem(Mesh, U, T, EG[k], EL[k], Interpolated, nb,
+                                  ValuesOnly ? NULL : x + noff[k],
+                                  ValuesOnly ? NULL : y + noff[k], c + noff[k],
+                                  Gradients ? Ub + sr * (noff[k] - noff[k0]) : NULL,
+                                  Gradients ? gUb + sr * (noff[k] - noff[k0]) : NULL);
+
+            // sub-triangle data
+            if (!ValuesOnly)
+                for (j = 0; j < TRINN * T->nselem; j++)
+                    tri[TRINN * toff[k] + j] = noff[k] + T->selem[j];
+        }
+
+        PerfAdd(P, pxe_PerfBasis, k1 - k0, t0);
+
+        if (nBad > 0) {
+            ierr = xf_Error(xf_INPUT_ERROR);
+            goto cleanup;
+        }
+
+        if (!Gradients) continue;
+
+        PX_TIC(t0);
+
+        ierr = xf_Error(xf_EqnSetScalar(EqnSet, ScalarName, SPD->IParam, SPD->RParam, nb,
+                                        Ub, gUb, c + noff[k0], NULL, NULL, NULL));
+
+        if (ierr != xf_OK) goto cleanup;
+
+        PerfAdd(P, pxe_PerfScalar, k1 - k0, t0);
+    }
+
+    (*px) = x;
+    (*py) = y;
+    (*ptri) = tri;
+    (*pc) = c;
+    (*pnp) = noff[nElem];
+    (*pntri) = toff[nElem];
+
+cleanup:
+    for (n = 0; n < nTable; n++)
+        DestroyPlotTable(Table + n);
+
+    xf_Release((void *) Table);
+    xf_Release((void *) ET);
+    xf_Release((void *) noff);
+    xf_Release((void *) toff);
+    xf_Release((void *) Ub);
+    xf_Release((void *) gUb);
+
+    if (ierr != xf_OK) {
+        xf_Release((void *) x);
+        xf_Release((void *) y);
+        xf_Release((void *) tri);
+        xf_Release((void *) c);
+    }
+
+    return ierr;
+}
+#endif
+
+static int
+ScalarPlotElems(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, \
+                real *xmin, real *xmax, double buffer, const real *tile, \
+                const int *List, int nList, int *pOrder, char *ScalarName, \
+                enum xfe_Bool ValuesOnly, int nThread, SubData *ESD, \
+                SliceData *SLD, ScalarPlotData *SPD, \
+                real **px, real **py, int **ptri, real **pc, int *pnp, int *pntri)
+{
+    /*  Element loop of ScalarPlotArrays.  No Python objects are used here,
+        so this is called with the GIL released.  With nThread > 1, the
+        element tests and, for 2D meshes, the interpolation run on OpenMP
+        threads.  The slices of 3D meshes cut each element at different
+        reference points, which needs libxf for every element, so they are
+        evaluated serially. */
+
+    int ierr, nElem, *EG, *EL;
+    px_PerfData P;
+
+    px_PerfInit(&P);
+
+    ierr = xf_Error(CullElems(Mesh, xmin, xmax, buffer, tile, List, nList, SLD, nThread, &P,
+                              &nElem, &EG, &EL));
+
+    if (ierr != xf_OK) return ierr;
+
+#ifdef _OPENMP
+    if ((nThread > 1) && (Mesh->Dim == 2))
+        ierr = xf_Error(ScalarPlotListThreaded(U, Mesh, EqnSet, nElem, EG, EL, pOrder, \
+            ScalarName, ValuesOnly, SPD, nThread, &P, px, py, ptri, pc, pnp, pntri));
+    else
+#endif
+    ierr = xf_Error(ScalarPlotList(U, Mesh, EqnSet, nElem, EG, EL, pOrder, ScalarName, \
+        ValuesOnly, ESD, SLD, SPD, &P, px, py, ptri, pc, pnp, pntri));
+
+    xf_Release((void *) EG);
+    xf_Release((void *) EL);
+
+    px_PerfCommit(&P);
+
+    return ierr;
+}
+
+static xf_EqnSet*
+ArgEqnSet(PyObject *args)
+{
+    /*  The equation set passed as the third argument of the scalar
+        functions that only take positional arguments, or NULL if there is
+        none.  Parse errors are left for the function itself to report. */
+    Py_ssize_t p;
+
+    if (!PyTuple_Check(args) || (PyTuple_Size(args) < 3)) return NULL;
+
+    p = PyNumber_AsSsize_t(PyTuple_GET_ITEM(args, 2), NULL);
+
+    if (PyErr_Occurred()) {
+        PyErr_Clear();
+        return NULL;
+    }
+
+    return (xf_EqnSet *) p;
+}
+
+// Arguments of ScalarPlotArrays, shared with ScalarPlotEqnSet
+static char *ScalarPlotKwList[] = {"U", "M", "E", "Name", "xmin", "xmax",
+    "order", "buffer", "plane", "bounds", "nThread", "tile", "elems", NULL};
+static char ScalarPlotFormat[] = "nnnOOOO|dOOiOO";
+
+static xf_EqnSet*
+ScalarPlotEqnSet(PyObject *args, PyObject *kwds)
+{
+    /*  ArgEqnSet for px_ScalarPlotData and px_ScalarPlotValues, where the
+        equation set can also be passed as a keyword.  The arguments are
+        parsed with the spec of ScalarPlotArrays. */
+    double buffer;
+    int nThread;
+    PyObject *o;
+    xf_Vector *U;
+    xf_Mesh *Mesh;
+    xf_EqnSet *EqnSet;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, ScalarPlotFormat, ScalarPlotKwList,
+            &U, &Mesh, &EqnSet, &o, &o, &o, &o, &buffer, &o, &o, &nThread, &o, &o)) {
+        PyErr_Clear();
+        return NULL;
+    }
+
+    return EqnSet;
+}
+
+static PyObject*
+ScalarPlotArrays(PyObject *args, PyObject *kwds, enum xfe_Bool ValuesOnly)
+{
+    /*  Worker for px_ScalarPlotData and px_ScalarPlotValues.  The sub-nodes
+        are visited in the same order in both cases, so the values from
+        px_ScalarPlotValues line up with an earlier triangulation as long as
+        the window, order, and plane are unchanged. */
+
+    int ierr, dim;
+    int Order, *pOrder;
+    real xmin[xf_MAXDIM], xmax[xf_MAXDIM];
+    npy_intp pydim[3];
+    PyObject *py_c, *py_tri, *py_x, *py_y, *py_scalar, *py_min, *py_max, *py_order;
+    real *x, *y, *c;
+    int np, *tri, ntri;
+    char *ScalarName;
+    double buffer = 0.5;
+    PyObject *py_plane = Py_None, *py_bounds = Py_None, *py_tile = Py_None;
+    PyObject *py_elems = Py_None;
+    PyArrayObject *a_bounds = NULL, *a_elems;
+    real tile[2], *ptile;
+    int *List, nList;
+    xf_Vector *U;
+    xf_Mesh *Mesh;
+    xf_EqnSet *EqnSet;
+    SubData ESD;
+    SliceData SLD;
+    ScalarPlotData SPD;
+    int nThread = 1;
+
+    // Parse the inputs.
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, ScalarPlotFormat, ScalarPlotKwList, \
+            &U, &Mesh, &EqnSet, &py_scalar, &py_min, &py_max, &py_order,
+            &buffer, &py_plane, &py_bounds, &nThread, &py_tile, &py_elems))
+        return NULL;
+
+    ierr = xf_Error(UnpackTile(py_tile, tile, &ptile));
+
+    if (ierr != xf_OK) return NULL;
+
+    dim = Mesh->Dim;
+
+    ierr = xf_Error(UnpackRealList(py_min, dim, xmin, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(UnpackRealList(py_max, dim, xmax, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    // Call xf_EqnSetScalar or just use the first entry in the vector?
+    ScalarName = PyString_Check(py_scalar) ? PyString_AsString(py_scalar) : NULL;
+
+    // Was the requested plot order passed?
+    if (PyInt_Check(py_order)) {
+        Order = (int) PyInt_AsLong(py_order);
+        pOrder = &Order;
+    }
+    else {
+        pOrder = NULL;
+    }
+
+    // Precomputed element bounds for slicing
+    if ((dim == 3) && (py_bounds != Py_None)) {
+        a_bounds = (PyArrayObject *) PyArray_FROM_OTF(py_bounds, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+        if (a_bounds == NULL) return NULL;
+    }
+
+    // Candidate elements, e.g. the elements of a tile
+    ierr = xf_Error(UnpackElemList(Mesh, py_elems, &a_elems, &List, &nList));
+
+    if (ierr != xf_OK) {
+        Py_XDECREF(a_bounds);
+        return NULL;
+    }
+
+    ierr = xf_Error(InitScalarPlotData(EqnSet, &SPD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(InitSubData(&ESD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(InitSliceData(Mesh, py_plane, a_bounds, xmin, xmax, &SLD));
+
+    if (ierr != xf_OK) return NULL;
+
+    // Extract the data without holding the GIL.
+    Py_BEGIN_ALLOW_THREADS
+    ierr = xf_Error(ScalarPlotElems(U, Mesh, EqnSet, xmin, xmax, buffer, \
+        ptile, List, nList, pOrder, ScalarName, ValuesOnly, nThread, &ESD, &SLD, \
+        &SPD, &x, &y, &tri, &c, &np, &ntri));
+    Py_END_ALLOW_THREADS
+
+    Py_XDECREF(a_elems);
+
+    if (ierr != xf_OK) return NULL;
+
+    // scalar (c)
+    pydim[0] = np;
+    py_c = OwnedArray(1, pydim, NPY_DOUBLE, (void *)c);
+
+    if (!ValuesOnly) {
+        // Convert to python arrays
+        // positions
+        pydim[0] = np;
+        py_x = OwnedArray(1, pydim, NPY_DOUBLE, (void *)x);
+        py_y = OwnedArray(1, pydim, NPY_DOUBLE, (void *)y);
+        // triangles
+        pydim[0] = ntri;
+        pydim[1] = TRINN;
+        py_tri = OwnedArray(2, pydim, NPY_INT, (void *)tri);
+    }
+
+    ierr = xf_Error(DestroyScalarPlotData(&SPD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(DestroySubData(&ESD));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(DestroySliceData(&SLD));
+
+    if (ierr != xf_OK) return NULL;
+
+    Py_XDECREF(a_bounds);
+
+    if (ValuesOnly) return py_c;
+
+    return Py_BuildValue("NNNN", py_x, py_y, py_tri, py_c);
+}
+
+PyObject*
+px_ScalarPlotData(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *py_out = NULL;
+
+    // The hooks stay on this library until the extraction is done.
+    if (px_HoldEqnSet(ScalarPlotEqnSet(args, kwds)) == xf_OK)
+        py_out = ScalarPlotArrays(args, kwds, xfe_False);
+
+    px_DropEqnSet();
+
+    return py_out;
+}
+
+PyObject*
+px_ScalarPlotValues(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *py_out = NULL;
+
+    if (px_HoldEqnSet(ScalarPlotEqnSet(args, kwds)) == xf_OK)
+        py_out = ScalarPlotArrays(args, kwds, xfe_True);
+
+    px_DropEqnSet();
+
+    return py_out;
+}
+
+PyObject*
+px_ElemBounds(PyObject *self, PyObject *args)
+{
+    int ierr, dim, egrp, elem, nElem, k;
+    npy_intp pydim[2];
+    real *B;
+    PyObject *py_B;
+    xf_Mesh *Mesh;
+
+    // Parse the inputs.
+    if (!PyArg_ParseTuple(args, "n", &Mesh))
+        return NULL;
+
+    dim = Mesh->Dim;
+
+    for (egrp = 0, nElem = 0; egrp < Mesh->nElemGroup; egrp++)
+        nElem += Mesh->ElemGroup[egrp].nElem;
+
+    pydim[0] = nElem;
+    pydim[1] = 2 * dim;
+    py_B = PyArray_SimpleNew(2, pydim, NPY_DOUBLE);
+
+    if (py_B == NULL) return NULL;
+
+    B = (real *) PyArray_DATA((PyArrayObject *) py_B);
+
+    for (egrp = 0, k = 0; egrp < Mesh->nElemGroup; egrp++) {
+        for (elem = 0; elem < Mesh->ElemGroup[egrp].nElem; elem++, k++) {
+            ierr = xf_Error(ElemNodeBounds(Mesh, egrp, elem, B + 2*dim*k, B + 2*dim*k + dim));
+
+            if (ierr != xf_OK) {
+                Py_DECREF(py_B);
+                return NULL;
+            }
+        }
+    }
+
+    return py_B;
+}
+
+static PyObject*
+ScalarRaster(PyObject *args)
+{
+    int ierr, dim, egrp, elem, k, nx, ny;
+    int QOrder, UOrder, Order, *n;
+    enum xfe_Bool FixedOrder, Overlap, SPDInit = xfe_False;
+    real xmin[xf_MAXDIM], xmax[xf_MAXDIM], dx[DIMP];
+    npy_intp i, npix, pydim[2];
+    PyObject *py_img, *py_scalar, *py_min, *py_max, *py_order;
+    real *img;
+    char *ScalarName;
+    xf_Vector *U;
+    xf_Mesh *Mesh;
+    xf_EqnSet *EqnSet;
+    SubData ESD;
+    ScalarPlotData SPD;
+
+    // Parse the inputs.
+    if (!PyArg_ParseTuple(args, "nnnOOOiiO", &U, &Mesh, &EqnSet, \
+            &py_scalar, &py_min, &py_max, &nx, &ny, &py_order))
+        return NULL;
+
+    dim = Mesh->Dim;
+
+    if (dim != 2) {
+        PyErr_SetString(PyExc_RuntimeError, \
+                        "Rasterization requires a two-dimensional mesh.");
+        return NULL;
+    }
+
+    if ((nx <= 0) || (ny <= 0)) {
+        PyErr_SetString(PyExc_RuntimeError, "Image size must be positive.");
+        return NULL;
+    }
+
+    // The pixel count and the byte count must both fit in npy_intp.
+    if ((npy_intp) ny > NPY_MAX_INTP / (npy_intp) sizeof(real) / nx) {
+        PyErr_SetString(PyExc_ValueError, "Image size is too large.");
+        return NULL;
+    }
+
+    npix = (npy_intp) nx * ny;
+
+    ierr = xf_Error(UnpackRealList(py_min, dim, xmin, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    ierr = xf_Error(UnpackRealList(py_max, dim, xmax, xfe_True));
+
+    if (ierr != xf_OK) return NULL;
+
+    // Call xf_EqnSetScalar or just use the first entry in the vector?
+    ScalarName = PyString_Check(py_scalar) ? PyString_AsString(py_scalar) : NULL;
+
+    // Was the requested plot order passed?
+    FixedOrder = PyInt_Check(py_order);
+    if (FixedOrder)
+        Order = (int) PyInt_AsLong(py_order);
+
+    // The image is allocated by NumPy; pixels not covered are NaN.
+    pydim[0] = ny;
+    pydim[1] = nx;
+    py_img = PyArray_SimpleNew(2, pydim, NPY_DOUBLE);
+
+    if (py_img == NULL) return NULL;
+
+    img = (real *) PyArray_DATA((PyArrayObject *) py_img);
+
+    for (i = 0; i < npix; i++) img[i] = NAN;
+
+    // pixel size
+    dx[0] = (xmax[0] - xmin[0]) / nx;
+    dx[1] = (xmax[1] - xmin[1]) / ny;
+
+    ierr = xf_Error(InitSubData(&ESD));
+
+    if (ierr != xf_OK) goto cleanup;
+
+    ierr = xf_Error(InitScalarPlotData(EqnSet, &SPD));
 
-    // communicate with EqnSet to fill real and integer parameters
-    ierr = xf_Error(xf_RetrieveFcnParams(NULL, EqnSet, &SPD->IParam, &SPD->RParam,
-                                         &SPD->nAux, &SPD->VAux));
+    if (ierr != xf_OK) goto cleanup;
 
-    if (ierr != xf_OK) return ierr;
+    SPDInit = xfe_True;
 
-    SPD->U = SPD->gU = NULL;
-    SPD->Usize = SPD->gUsize = 0;
-    SPD->s = NULL;
-    SPD->ssize = 0;
+    for (egrp = 0; egrp < Mesh->nElemGroup; egrp++) {
+        QOrder = Mesh->ElemGroup[egrp].QOrder;
+        for (elem = 0; elem < Mesh->ElemGroup[egrp].nElem; elem++) {
+            // check if element touches the window
+            ierr = xf_Error(ElemOverlapsBoundingBox(Mesh, egrp, elem, xmin, xmax, &Overlap));
 
-    ierr = xf_Error(xf_CreateBasisTable(&SPD->PhiTable));
+            if (ierr != xf_OK) goto cleanup;
 
-    if (ierr != xf_OK) return ierr;
+            if (!Overlap) continue;
 
-    SPD->BD = NULL;
-    SPD->JD = NULL;
+            if (!FixedOrder) {
+                UOrder = xf_InterpOrder(U, egrp, elem);
+                Order = 2 * max(QOrder, UOrder) + 1;
+            }
 
-    return xf_OK;
-}
+            ierr = xf_Error(FindElemSubData(Mesh, egrp, elem, &Order, &ESD));
 
-static int
-DestroyScalarPlotData(ScalarPlotData *SPD)
-{
-    int ierr;
+            if (ierr != xf_OK) goto cleanup;
 
-    xf_Release((void *) SPD->IParam);
-    xf_Release((void *) SPD->RParam);
-    xf_Release((void *) SPD->VAux);
-    xf_Release((void *) SPD->U );
-    xf_Release((void *) SPD->gU);
+            ierr = xf_Error(ScalarValues(U, Mesh, EqnSet, egrp, elem, ScalarName, &ESD, &SPD));
 
-    ierr = xf_Error(xf_DestroyBasisData(SPD->BD, xfe_False));
+            if (ierr != xf_OK) goto cleanup;
 
-    if (ierr != xf_OK) return ierr;
+            // scan-convert each sub-triangle
+            for (k = 0; k < ESD.nselem; k++) {
+                n = ESD.selem + TRINN * k;
+                RasterTriangle(ESD.xglob + DIMP * n[0], ESD.xglob + DIMP * n[1],
+                               ESD.xglob + DIMP * n[2], SPD.s[n[0]], SPD.s[n[1]], SPD.s[n[2]],
+                               xmin, dx, nx, ny, img);
+            }
 
-    ierr = xf_Error(xf_DestroyBasisTable(SPD->PhiTable));
+        } // elem
+    } // egrp
 
-    if (ierr != xf_OK) return ierr;
+cleanup:
+    // Every exit after the image is created goes through here.
+    if (SPDInit && (xf_Error(DestroyScalarPlotData(&SPD)) != xf_OK))
+        ierr = xf_Error(xf_MEMORY_ERROR);
 
-    ierr = xf_Error(xf_DestroyJacobianData(SPD->JD));
+    if ((xf_Error(DestroySubData(&ESD)) != xf_OK) && (ierr == xf_OK))
+        ierr = xf_Error(xf_MEMORY_ERROR);
 
-    if (ierr != xf_OK) return ierr;
+    if (ierr != xf_OK) {
+        Py_DECREF(py_img);
+        return NULL;
+    }
 
-    return xf_OK;
+    return py_img;
 }
 
-static int
-ScalarValues(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, int egrp, int elem, char *Name, SubData *ESD, ScalarPlotData *SPD)
+PyObject*
+px_ScalarRaster(PyObject *self, PyObject *args)
 {
-    int ierr, i, d, dim, sr, nn, nq, Order;
-    enum xfe_Bool Interpolated;
-    enum xfe_BasisType Basis;
-    real *EU;
+    PyObject *py_out = NULL;
 
-    dim = Mesh->Dim;
-    sr = U->StateRank;
+    if (px_HoldEqnSet(ArgEqnSet(args)) == xf_OK)
+        py_out = ScalarRaster(args);
 
-    nq = ESD->nnode;
+    px_DropEqnSet();
 
-    EU = U->GenArray[egrp].rValue[elem];
+    return py_out;
+}
 
-    // Reallocate if necessary
-    if (SPD->Usize < sr * nq) {
-        SPD->Usize = sr * nq;
-        ierr = xf_Error(xf_ReAlloc((void **)&SPD->U, SPD->Usize, sizeof(real)));
+PyObject*
+px_ScalarContour(PyObject *self, PyObject *args)
+{
+    int ierr, i, l, l0, l1, ntri, nlev, *tri, *t, *nseg = NULL;
+    real *x, *y, *c, *lev, cmin, cmax;
+    real **seg = NULL;
+    npy_intp pydim[3], np;
+    PyObject *py_x, *py_y, *py_tri, *py_c, *py_lev, *py_seg, *py_out = NULL;
+    PyArrayObject *a_x, *a_y, *a_tri, *a_c, *a_lev;
 
-        if (ierr != xf_OK) return ierr;
-    }
+    // Parse the inputs.
+    if (!PyArg_ParseTuple(args, "OOOOO", &py_x, &py_y, &py_tri, &py_c, &py_lev))
+        return NULL;
 
-    if (SPD->gUsize < dim * sr * nq) {
-        SPD->gUsize = dim * sr * nq;
-        ierr = xf_Error(xf_ReAlloc((void **)&SPD->gU, SPD->gUsize, sizeof(real)));
+    // Get contiguous arrays of the correct types.
+    a_x = (PyArrayObject *) PyArray_FROM_OTF(py_x, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    a_y = (PyArrayObject *) PyArray_FROM_OTF(py_y, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    a_tri = (PyArrayObject *) PyArray_FROM_OTF(py_tri, NPY_INT, NPY_ARRAY_IN_ARRAY);
+    a_c = (PyArrayObject *) PyArray_FROM_OTF(py_c, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+    a_lev = (PyArrayObject *) PyArray_FROM_OTF(py_lev, NPY_DOUBLE, NPY_ARRAY_IN_ARRAY);
+
+    if ((a_x == NULL) || (a_y == NULL) || (a_tri == NULL) || (a_c == NULL) || (a_lev == NULL)) {
+        Py_XDECREF(a_x);
+        Py_XDECREF(a_y);
+        Py_XDECREF(a_tri);
+        Py_XDECREF(a_c);
+        Py_XDECREF(a_lev);
+        return NULL;
+    }
 
-        if (ierr != xf_OK) return ierr;
+    x = (real *) PyArray_DATA(a_x);
+    y = (real *) PyArray_DATA(a_y);
+    c = (real *) PyArray_DATA(a_c);
+    tri = (int *) PyArray_DATA(a_tri);
+    lev = (real *) PyArray_DATA(a_lev);
+    ntri = (int) (PyArray_SIZE(a_tri) / TRINN);
+    nlev = (int) PyArray_SIZE(a_lev);
+    np = PyArray_SIZE(a_c);
+
+    // The triangles must index nodes that have coordinates and values.
+    if ((PyArray_SIZE(a_x) != np) || (PyArray_SIZE(a_y) != np)) {
+        PyErr_SetString(PyExc_ValueError, "x, y, and c must have the same size.");
+        ierr = xf_INPUT_ERROR;
+        goto cleanup;
     }
 
-    if (SPD->ssize < nq) {
-        SPD->ssize = nq;
-        ierr = xf_Error(xf_ReAlloc((void **)&SPD->s, SPD->ssize, sizeof(real)));
+    for (i = 0; i < TRINN * ntri; i++) {
+        if ((tri[i] < 0) || (tri[i] >= np)) {
+            PyErr_Format(PyExc_IndexError,
+                "Triangle node %d is out of range for %ld nodes", tri[i], (long) np);
+            ierr = xf_INPUT_ERROR;
+            goto cleanup;
+        }
+    }
 
-        if (ierr != xf_OK) return ierr;
+    // Levels must be increasing for the bisection.
+    for (l = 1; l < nlev; l++) {
+        if (lev[l] < lev[l-1]) {
+            PyErr_SetString(PyExc_RuntimeError, "Contour levels must be increasing.");
+            ierr = xf_INPUT_ERROR;
+            goto cleanup;
+        }
     }
 
-    Interpolated = ((U->Basis != NULL) && (U->Order != NULL));
+    ierr = xf_Error(xf_Alloc((void **)&nseg, nlev + 1, sizeof(int)));
 
-    if (!Interpolated && (Name != NULL)) return xf_NOT_SUPPORTED;
+    if (ierr != xf_OK) goto cleanup;
 
-    if (Interpolated) {
-        xf_InterpOrderBasis(U, egrp, elem, &Order, &Basis);
+    ierr = xf_Error(xf_Alloc((void **)&seg, nlev + 1, sizeof(real *)));
 
-        ierr = xf_Error(xf_Order2nNode(Basis, Order, &nn));
+    if (ierr != xf_OK) goto cleanup;
 
-        if (ierr != xf_OK) return ierr;
+    for (l = 0; l < nlev; l++) nseg[l] = 0;
 
-        // Evaluate the basis functions for the vector
-        ierr = xf_Error(xf_EvalBasisUsingTable(Basis, Order, ESD->PointsChanged, ESD->nnode, ESD->xref,
-                                               xfb_Phi | xfb_GPhi | xfb_gPhi, SPD->PhiTable, &SPD->BD));
+    py_out = PyList_New((Py_ssize_t) nlev);
 
-        if (ierr != xf_OK) return ierr;
+    if (py_out == NULL) {
+        ierr = xf_MEMORY_ERROR;
+        goto cleanup;
+    }
 
-        // values
-        xf_MxM_Set(SPD->BD->Phi, EU, nq, nn, sr, SPD->U);
-        
-        if (Name != NULL) {
-            // element Jacobian det and inv at points (only 1 if J is const)
-            ierr = xf_Error(xf_ElemJacobian(Mesh, egrp, elem, ESD->nnode, ESD->xref, xfb_detJ | xfb_iJ,
-                                            ESD->PointsChanged, &SPD->JD));
+    // First pass: count the segments on each level.
+    for (i = 0; i < ntri; i++) {
+        t = tri + TRINN * i;
+        cmin = min(c[t[0]], min(c[t[1]], c[t[2]]));
+        cmax = max(c[t[0]], max(c[t[1]], c[t[2]]));
 
-            if (ierr != xf_OK) return ierr;
+        FindLevelRange(nlev, lev, cmin, cmax, &l0, &l1);
 
-            ierr = xf_Error(xf_EvalPhysicalGrad(SPD->BD, SPD->JD));
+        for (l = l0; l < l1; l++) nseg[l]++;
+    }
 
-            if (ierr != xf_OK) return ierr;
+    // Allocate the output arrays.
+    for (l = 0; l < nlev; l++) {
+        pydim[0] = nseg[l];
+        pydim[1] = 2;
+        pydim[2] = DIMP;
+        py_seg = PyArray_SimpleNew(3, pydim, NPY_DOUBLE);
 
-            // gradients
-            for (d = 0; d < dim; d++)
-                xf_MxM_Set(SPD->BD->gPhi + nn * nq * d, EU, nq, nn, sr, SPD->gU + nq * sr * d);
+        if (py_seg == NULL) {
+            ierr = xf_MEMORY_ERROR;
+            goto cleanup;
+        }
 
-            ierr = xf_Error(xf_EqnSetScalar(EqnSet, Name, SPD->IParam, SPD->RParam, nq,
-                                            SPD->U, SPD->gU, SPD->s, NULL, NULL, NULL));
+        seg[l] = (real *) PyArray_DATA((PyArrayObject *) py_seg);
+        // The list owns the array from here on.
+        PyList_SetItem(py_out, (Py_ssize_t) l, py_seg);
+        nseg[l] = 0;
+    }
 
-            if (ierr != xf_OK) return ierr;
-        } else for (i = 0; i < nq; i++) SPD->s[i] = SPD->U[i * sr];
-    } else for (i = 0; i < nq; i++) SPD->s[i] = EU[0];
+    // Second pass: find the segments.
+    for (i = 0; i < ntri; i++) {
+        t = tri + TRINN * i;
+        cmin = min(c[t[0]], min(c[t[1]], c[t[2]]));
+        cmax = max(c[t[0]], max(c[t[1]], c[t[2]]));
 
+        FindLevelRange(nlev, lev, cmin, cmax, &l0, &l1);
 
-    return xf_OK;
-}
+        for (l = l0; l < l1; l++) {
+            ContourSegment(x, y, t, c, lev[l], seg[l] + 2 * DIMP * nseg[l]);
+            nseg[l]++;
+        }
+    }
 
+    ierr = xf_OK;
 
-static int
-ScalarPlotData_3D(xf_Vector *U, xf_Mesh *Mesh, xf_EqnSet *EqnSet, int egrp, int elem, SubData *ESD)
-{
-    return xf_NOT_SUPPORTED;
-}
+cleanup:
+    // Every exit after the inputs are converted goes through here.
+    xf_Release((void *) nseg);
+    xf_Release((void *) seg);
 
+    Py_DECREF(a_x);
+    Py_DECREF(a_y);
+    Py_DECREF(a_tri);
+    Py_DECREF(a_c);
+    Py_DECREF(a_lev);
 
-PyObject*
-px_MeshPlotData(PyObject *self, PyObject *args)
+    if (ierr != xf_OK) {
+        // Only a failed xf_Alloc leaves no exception set.
+        if (!PyErr_Occurred()) PyErr_NoMemory();
+        // Also frees the level arrays already created.
+        Py_XDECREF(py_out);
+        return NULL;
+    }
+
+    return py_out;
+}
+
+static PyObject*
+BFaceScalarData(PyObject *args)
 {
-    int ierr, dim, i, nn, nntotal, egrp, elem;
-    int Order, *pOrder;
-    npy_intp pydim[3];
-    enum xfe_Bool Inside;
-    real xmin[xf_MAXDIM], xmax[xf_MAXDIM];
-    real *x, *y;
-    int psize, np;
-    int *c;
-    int csize, nc;
-    SubData ESD, FSD;
-    MeshPlotData MPD;
-    PyObject *py_x, *py_y, *py_c, *py_min, *py_max, *py_order;
+    int ierr, dim, ibfgrp, ibface, nBFace, egrp, elem, i, j, d, nName;
+    int Order, *pOrder, np, psize, *c;
+    npy_intp pydim[2];
+    PyObject *py_names, *py_order, *py_name, *py_x, *py_s, *py_c;
+    real *x, *v;
+    char **Names;
+    xf_Vector *U;
     xf_Mesh *Mesh;
+    xf_EqnSet *EqnSet;
+    SubData ESD, FSD;
+    ScalarPlotData SPD;
 
     // Parse the inputs.
-    if (!PyArg_ParseTuple(args, "nOOO", &Mesh, &py_min, &py_max, &py_order))
+    if (!PyArg_ParseTuple(args, "nnniOO", &U, &Mesh, &EqnSet, \
+            &ibfgrp, &py_names, &py_order))
         return NULL;
 
     dim = Mesh->Dim;
 
-    ierr = xf_Error(UnpackRealList(py_min, dim, xmin, xfe_True));
+    // Check the group index.
+    if ((ibfgrp < 0) || (ibfgrp >= Mesh->nBFaceGroup)) {
+        PyErr_SetString(PyExc_RuntimeError, \
+                        "Boundary face group index exceeds dimensions.");
+        return NULL;
+    }
 
-    if (ierr != xf_OK) return NULL;
+    // Check the list of names.
+    if (!PyList_Check(py_names)) {
+        PyErr_SetString(PyExc_TypeError, "Scalar names must be a list");
+        return NULL;
+    }
 
-    ierr = xf_Error(UnpackRealList(py_max, dim, xmax, xfe_True));
+    nName = (int) PyList_Size(py_names);
+
+    ierr = xf_Error(xf_Alloc((void **)&Names, max(nName, 1), sizeof(char *)));
 
     if (ierr != xf_OK) return NULL;
 
-    if (PyInt_Check(py_order)){
+    // Call xf_EqnSetScalar or just use the first entry in the vector?
+    for (j = 0; j < nName; j++) {
+        py_name = PyList_GetItem(py_names, j);
+        Names[j] = PyString_Check(py_name) ? PyString_AsString(py_name) : NULL;
+    }
+
+    if (PyInt_Check(py_order)) {
         Order = (int) PyInt_AsLong(py_order);
         pOrder = &Order;
-    }
-    else{
-        pOrder= NULL;
+    } else {
+        pOrder = NULL;
     }
 
-    // Init the face and element data
-    ierr = xf_Error(InitMeshPlotData(&MPD));
+    // The state and equation set are only used for scalars.
+    if (nName > 0) {
+        ierr = xf_Error(InitScalarPlotData(EqnSet, &SPD));
 
-    if (ierr != xf_OK) return NULL;
+        if (ierr != xf_OK) return NULL;
+    }
 
     ierr = xf_Error(InitSubData(&ESD));
 
@@ -645,107 +3216,108 @@ px_MeshPlotData(PyObject *self, PyObject *args)
 
     if (ierr != xf_OK) return NULL;
 
-    x = y = NULL;
-    psize = 0;
-    np = 0;
-    c = NULL;
-    nc = 0;
-    csize = 0;
-    nn = 0;
+    nBFace = Mesh->BFaceGroup[ibfgrp].nBFace;
 
-    for (egrp = 0; egrp < Mesh->nElemGroup; egrp++) {
-        for (elem = 0; elem < Mesh->ElemGroup[egrp].nElem; elem++) {
-            // Check if element is inside window.
-            ierr = xf_Error(ElemInsideBoundingBox(\
-                Mesh, egrp, elem, xmin, xmax, 0.5, &Inside));
-            if (ierr != xf_OK) return NULL;
+    // face offsets
+    ierr = xf_Error(xf_Alloc((void **)&c, nBFace + 1, sizeof(int)));
 
-            if (!Inside) continue;
+    if (ierr != xf_OK) return NULL;
 
-            if (dim == 1) {
-                ierr = xf_Error(MeshPlotData_1D(\
-                    Mesh, egrp, elem, &FSD, &MPD));
-                if (ierr != xf_OK) return NULL;
-            } else if (dim == 2) {
-                ierr = xf_Error(MeshPlotData_2D(\
-                    Mesh, egrp, elem, pOrder, &FSD, &MPD));
-                if (ierr != xf_OK) return NULL;
-            } else if (dim == 3) {
-                ierr = xf_Error(MeshPlotData_3D(\
-                    Mesh, egrp, elem, pOrder, &ESD, &FSD, &MPD));
-                if (ierr != xf_OK) return NULL;
-            } else return NULL;
+    x = v = NULL;
+    psize = 0;
+    np = 0;
 
-            // Add data
-            for(i = 0, nntotal = 0; i < MPD.nface; i++) nntotal += MPD.nn[i];
+    for (ibface = 0; ibface < nBFace; ibface++) {
+        // Subdivide the face.
+        ierr = xf_Error(FindFaceSubData(Mesh, ibfgrp, ibface, pOrder, &FSD));
 
-            // reallocate x and y if necessary
-            if (psize < (np + nntotal)) {
-                // larger than necessary, hopefully reducing the number of reallocs
-                psize = 2 * (np + nntotal);
-                ierr = xf_Error(xf_ReAlloc((void **)&x, psize, sizeof(real)));
+        if (ierr != xf_OK) goto cleanup;
 
-                if (ierr != xf_OK) return NULL;
+        // Same points in the element reference space
+        ierr = xf_Error(FaceElemSubData(Mesh, ibfgrp, ibface, &FSD, &ESD, &egrp, &elem));
 
-                ierr = xf_Error(xf_ReAlloc((void **)&y, psize, sizeof(real)));
+        if (ierr != xf_OK) goto cleanup;
 
-                if (ierr != xf_OK) return NULL;
-            }
+        // reallocate x and v if necessary
+        if (psize < np + FSD.nnode) {
+            psize = 2 * (np + FSD.nnode);
+            ierr = xf_Error(xf_ReAlloc((void **)&x, dim * psize, sizeof(real)));
 
-            // node position data
-            for (i = 0; i < nntotal; i++) {
-                x[np + i] = MPD.x[DIMP * i];
-                y[np + i] = MPD.x[DIMP * i + 1];
-            }
+            if (ierr != xf_OK) goto cleanup;
 
-            np += nntotal;
+            ierr = xf_Error(xf_ReAlloc((void **)&v, max(nName, 1) * psize, sizeof(real)));
 
-            // reallocate connectivity data if necessary
-            if (csize < (nc + MPD.nface)) {
-                // larger than necessary, hopefully reducing the number of reallocs
-                csize = 2 * (nc + MPD.nface);
-                ierr = xf_Error(xf_ReAlloc((void **)&c, csize, sizeof(int)));
+            if (ierr != xf_OK) goto cleanup;
+        }
 
-                if (ierr != xf_OK) return NULL;
-            }
+        // node position data
+        for (i = 0; i < FSD.nnode; i++)
+            for (d = 0; d < dim; d++)
+                x[dim * (np + i) + d] = FSD.xglob[dim * i + d];
 
-            // connectivity data
-            for (i = 0; i < MPD.nface; i++) {
-                c[nc + i] = nn;
-                nn += MPD.nn[i];
-            }
+        // scalar values
+        for (j = 0; j < nName; j++) {
+            ierr = xf_Error(ScalarValues(U, Mesh, EqnSet, egrp, elem, Names[j], &ESD, &SPD));
 
-            nc += MPD.nface;
+            if (ierr != xf_OK) goto cleanup;
 
-        } // elem
-    } // egrp
+            // basis and Jacobian data can be reused for the next scalar
+            ESD.PointsChanged = xfe_False;
 
-    // Trim
-    ierr = xf_Error(xf_ReAlloc((void **)&x, np, sizeof(real)));
+            for (i = 0; i < FSD.nnode; i++)
+                v[nName * (np + i) + j] = SPD.s[i];
+        }
 
-    if (ierr != xf_OK) return NULL;
+        c[ibface] = np;
+        np += FSD.nnode;
+    } // ibface
+
+    c[nBFace] = np;
+
+cleanup:
+    // A face that cannot be evaluated releases everything made so far.
+    if (ierr != xf_OK) {
+        if (!PyErr_Occurred())
+            PyErr_Format(PyExc_RuntimeError, \
+                         "Failed to evaluate boundary face %d of group %d.", ibface, ibfgrp);
+        xf_Release((void *) c);
+        xf_Release((void *) x);
+        xf_Release((void *) v);
+        xf_Release((void *) Names);
+        if (nName > 0) DestroyScalarPlotData(&SPD);
+        DestroySubData(&ESD);
+        DestroySubData(&FSD);
+        return NULL;
+    }
 
-    ierr = xf_Error(xf_ReAlloc((void **)&y, np, sizeof(real)));
+    // Trim
+    ierr = xf_Error(xf_ReAlloc((void **)&x, dim * np, sizeof(real)));
 
     if (ierr != xf_OK) return NULL;
 
-    ierr = xf_Error(xf_ReAlloc((void **)&c, nc, sizeof(int)));
+    ierr = xf_Error(xf_ReAlloc((void **)&v, nName * np, sizeof(real)));
 
     if (ierr != xf_OK) return NULL;
 
     // Convert to python arrays
     // positions
     pydim[0] = np;
-    py_x = PyArray_SimpleNewFromData(1, pydim, NPY_DOUBLE, (void *)x);
-    py_y = PyArray_SimpleNewFromData(1, pydim, NPY_DOUBLE, (void *)y);
-    // connectivity
-    pydim[0] = nc;
-    py_c = PyArray_SimpleNewFromData(1, pydim, NPY_INT, (void *)c);
+    pydim[1] = dim;
+    py_x = OwnedArray(2, pydim, NPY_DOUBLE, (void *)x);
+    // scalars
+    pydim[1] = nName;
+    py_s = OwnedArray(2, pydim, NPY_DOUBLE, (void *)v);
+    // face offsets
+    pydim[0] = nBFace + 1;
+    py_c = OwnedArray(1, pydim, NPY_INT, (void *)c);
 
-    // clean up
-    ierr = xf_Error(DestroyMeshPlotData(&MPD));
+    xf_Release((void *) Names);
 
-    if (ierr != xf_OK) return NULL;
+    if (nName > 0) {
+        ierr = xf_Error(DestroyScalarPlotData(&SPD));
+
+        if (ierr != xf_OK) return NULL;
+    }
 
     ierr = xf_Error(DestroySubData(&ESD));
 
@@ -755,21 +3327,33 @@ px_MeshPlotData(PyObject *self, PyObject *args)
 
     if (ierr != xf_OK) return NULL;
 
-    return Py_BuildValue("OOO", py_x, py_y, py_c);
+    return Py_BuildValue("NNN", py_x, py_s, py_c);
 }
 
 PyObject*
-px_ScalarPlotData(PyObject *self, PyObject *args)
+px_BFaceScalarData(PyObject *self, PyObject *args)
+{
+    PyObject *py_out = NULL;
+
+    if (px_HoldEqnSet(ArgEqnSet(args)) == xf_OK)
+        py_out = BFaceScalarData(args);
+
+    px_DropEqnSet();
+
+    return py_out;
+}
+
+static PyObject*
+ElemGroupSubData(PyObject *args)
 {
-    int ierr, dim, egrp, elem, i;
+    int ierr, dim, sr, egrp, elem, elem0, elem1, i, j, k, d, nName, nv;
     int QOrder, UOrder, Order;
-    enum xfe_Bool FixedOrder, Inside;
-    real xmin[xf_MAXDIM], xmax[xf_MAXDIM];
-    npy_intp pydim[3];
-    PyObject *py_c, *py_tri, *py_x, *py_y, *py_scalar, *py_min, *py_max, *py_order;
-    real *x, *y, *c;
-    int psize, np, *tri, ntri, trisize, csize;
-    char *ScalarName;
+    int np, psize, *t, nt, tsize;
+    enum xfe_Bool FixedOrder, Interpolated;
+    npy_intp pydim[2];
+    PyObject *py_names, *py_order, *py_name, *py_x, *py_t, *py_s, *py_u;
+    real *x, *v, *u, *EU;
+    char **Names;
     xf_Vector *U;
     xf_Mesh *Mesh;
     xf_EqnSet *EqnSet;
@@ -777,28 +3361,49 @@ px_ScalarPlotData(PyObject *self, PyObject *args)
     ScalarPlotData SPD;
 
     // Parse the inputs.
-    if (!PyArg_ParseTuple(args, "nnnOOOO", \
-            &U, &Mesh, &EqnSet, &py_scalar, &py_min, &py_max, &py_order))
+    if (!PyArg_ParseTuple(args, "nnniiiOO", &U, &Mesh, &EqnSet, \
+            &egrp, &elem0, &elem1, &py_names, &py_order))
         return NULL;
 
     dim = Mesh->Dim;
+    sr = U->StateRank;
 
-    ierr = xf_Error(UnpackRealList(py_min, dim, xmin, xfe_True));
+    // Check the group and element indices.
+    if ((egrp < 0) || (egrp >= Mesh->nElemGroup)) {
+        PyErr_SetString(PyExc_RuntimeError, \
+                        "Element group index exceeds dimensions.");
+        return NULL;
+    }
 
-    if (ierr != xf_OK) return NULL;
+    elem0 = max(elem0, 0);
+    elem1 = min(elem1, Mesh->ElemGroup[egrp].nElem);
 
-    ierr = xf_Error(UnpackRealList(py_max, dim, xmax, xfe_True));
+    // Check the list of names.
+    if (!PyList_Check(py_names)) {
+        PyErr_SetString(PyExc_TypeError, "Scalar names must be a list");
+        return NULL;
+    }
+
+    nName = (int) PyList_Size(py_names);
+
+    ierr = xf_Error(xf_Alloc((void **)&Names, max(nName, 1), sizeof(char *)));
 
     if (ierr != xf_OK) return NULL;
 
     // Call xf_EqnSetScalar or just use the first entry in the vector?
-    ScalarName = PyString_Check(py_scalar) ? PyString_AsString(py_scalar) : NULL;
+    Names[0] = NULL;
+    for (j = 0; j < nName; j++) {
+        py_name = PyList_GetItem(py_names, j);
+        Names[j] = PyString_Check(py_name) ? PyString_AsString(py_name) : NULL;
+    }
 
     // Was the requested plot order passed?
     FixedOrder = PyInt_Check(py_order);
     if (FixedOrder)
         Order = (int) PyInt_AsLong(py_order);
 
+    Interpolated = ((U->Basis != NULL) && (U->Order != NULL));
+
     ierr = xf_Error(InitScalarPlotData(EqnSet, &SPD));
 
     if (ierr != xf_OK) return NULL;
@@ -807,121 +3412,121 @@ px_ScalarPlotData(PyObject *self, PyObject *args)
 
     if (ierr != xf_OK) return NULL;
 
-    x = y = NULL;
+    x = v = u = NULL;
     psize = 0;
     np = 0;
-    tri = NULL;
-    trisize = 0;
-    ntri = 0;
-    c = NULL;
-    csize = 0;
+    t = NULL;
+    tsize = 0;
+    nt = 0;
+    nv = dim + 1;
 
-    for (egrp = 0; egrp < Mesh->nElemGroup; egrp++) {
-        QOrder = Mesh->ElemGroup[egrp].QOrder;
-        for (elem = 0; elem < Mesh->ElemGroup[egrp].nElem; elem++) {
-            // check if element is inside window
-            ierr = xf_Error(ElemInsideBoundingBox(Mesh, egrp, elem, xmin, xmax, 0.5, &Inside));
+    QOrder = Mesh->ElemGroup[egrp].QOrder;
 
-            if (ierr != xf_OK) return NULL;
+    for (elem = elem0; elem < elem1; elem++) {
+        if (!FixedOrder){
+            UOrder = xf_InterpOrder(U, egrp, elem);
+            Order = 2 * max(QOrder, UOrder) + 1;
+        }
 
-            if (!Inside) continue;
+        // Subdivide the element.
+        ierr = xf_Error(FindElemSubData(Mesh, egrp, elem, &Order, &ESD));
 
-            if ((dim >= 1) && (dim < 3)) {
-                // Simple in this case
-                if (!FixedOrder){
-                    UOrder = xf_InterpOrder(U, egrp, elem);
-                    Order = 2 * max(QOrder, UOrder) + 1;
-                }
-                ierr = xf_Error(FindElemSubData(Mesh, egrp, elem, &Order, &ESD));
+        if (ierr != xf_OK) return NULL;
 
-                if (ierr != xf_OK) return NULL;
-            } else if (dim == 3) {
-                // Harder, need to calculate the xref along the cut plane
-                ierr = xf_Error(ScalarPlotData_3D(U, Mesh, EqnSet, egrp, elem, &ESD));
+        ierr = xf_Error(SubElemNodes(ESD.Shape, &nv));
 
-                if (ierr != xf_OK) return NULL;
-            } else return NULL;
+        if (ierr != xf_OK) return NULL;
 
-            ierr = xf_Error(ScalarValues(U, Mesh, EqnSet, egrp, elem, ScalarName, &ESD, &SPD));
+        // reallocate x, u, and v if necessary
+        if (psize < np + ESD.nnode) {
+            psize = 2 * (np + ESD.nnode);
+            ierr = xf_Error(xf_ReAlloc((void **)&x, dim * psize, sizeof(real)));
 
             if (ierr != xf_OK) return NULL;
 
-            // reallocate x and y if necessary
-            if (psize < DIMP * (np + ESD.nnode)) {
-                psize = 2 * DIMP * (np + ESD.nnode);
-                ierr = xf_Error(xf_ReAlloc((void **)&x, psize, sizeof(real)));
+            ierr = xf_Error(xf_ReAlloc((void **)&u, sr * psize, sizeof(real)));
 
-                if (ierr != xf_OK) return NULL;
+            if (ierr != xf_OK) return NULL;
 
-                ierr = xf_Error(xf_ReAlloc((void **)&y, psize, sizeof(real)));
+            ierr = xf_Error(xf_ReAlloc((void **)&v, max(nName, 1) * psize, sizeof(real)));
 
-                if (ierr != xf_OK) return NULL;
-            }
+            if (ierr != xf_OK) return NULL;
+        }
 
-            // reallocate c if necessary
-            if (csize < np + ESD.nnode) {
-                csize = 2 * (np + ESD.nnode);
-                ierr = xf_Error(xf_ReAlloc((void **)&c, csize, sizeof(real)));
+        // reallocate t if necessary
+        if (tsize < nv * (nt + ESD.nselem)) {
+            tsize = 2 * nv * (nt + ESD.nselem);
+            ierr = xf_Error(xf_ReAlloc((void **)&t, tsize, sizeof(int)));
 
-                if (ierr != xf_OK) return NULL;
-            }
+            if (ierr != xf_OK) return NULL;
+        }
 
-            for (i = 0; i < ESD.nnode; i++) {
-                // node position data
-                x[np + i] = ESD.xglob[DIMP * i];
-                y[np + i] = ESD.xglob[DIMP * i + 1];
-                // scalar values
-                c[np + i] = SPD.s[i];
-            }
+        // node position data
+        for (i = 0; i < ESD.nnode; i++)
+            for (d = 0; d < dim; d++)
+                x[dim * (np + i) + d] = ESD.xglob[dim * i + d];
 
-            // reallocate tri if necessary
-            if (trisize < TRINN * (ntri + ESD.nselem)) {
-                trisize = 2 * TRINN * (ntri + ESD.nselem);
-                ierr = xf_Error(xf_ReAlloc((void **)&tri, trisize, sizeof(real)));
+        // sub-element data
+        for (i = 0; i < nv * ESD.nselem; i++)
+            t[nv * nt + i] = np + ESD.selem[i];
 
-                if (ierr != xf_OK) return NULL;
-            }
+        // scalar values (and states from the first call)
+        for (j = 0; j < max(nName, 1); j++) {
+            ierr = xf_Error(ScalarValues(U, Mesh, EqnSet, egrp, elem, Names[j], &ESD, &SPD));
 
-            // sub-triangle data
-            for (i = 0; i < TRINN * ESD.nselem; i++)
-                tri[TRINN * ntri + i] = np + ESD.selem[i];
+            if (ierr != xf_OK) return NULL;
 
-            ntri += ESD.nselem;
+            // basis and Jacobian data can be reused for the next scalar
+            ESD.PointsChanged = xfe_False;
 
-            np += ESD.nnode;
+            for (i = 0; (i < ESD.nnode) && (j < nName); i++)
+                v[nName * (np + i) + j] = SPD.s[i];
+        }
 
-        } // elem
-    } // egrp
+        // states
+        EU = U->GenArray[egrp].rValue[elem];
+        for (i = 0; i < ESD.nnode; i++)
+            for (k = 0; k < sr; k++)
+                u[sr * (np + i) + k] = (Interpolated ? SPD.U[sr * i + k] : EU[k]);
+
+        nt += ESD.nselem;
+        np += ESD.nnode;
+    } // elem
 
     // Trim
-    ierr = xf_Error(xf_ReAlloc((void **)&x, np, sizeof(real)));
+    ierr = xf_Error(xf_ReAlloc((void **)&x, dim * np, sizeof(real)));
 
     if (ierr != xf_OK) return NULL;
 
-    ierr = xf_Error(xf_ReAlloc((void **)&y, np, sizeof(real)));
+    ierr = xf_Error(xf_ReAlloc((void **)&u, sr * np, sizeof(real)));
 
     if (ierr != xf_OK) return NULL;
 
-    ierr = xf_Error(xf_ReAlloc((void **)&c, np, sizeof(real)));
+    ierr = xf_Error(xf_ReAlloc((void **)&v, nName * np, sizeof(real)));
 
     if (ierr != xf_OK) return NULL;
 
-    ierr = xf_Error(xf_ReAlloc((void **)&tri, TRINN * ntri, sizeof(int)));
+    ierr = xf_Error(xf_ReAlloc((void **)&t, nv * nt, sizeof(int)));
 
     if (ierr != xf_OK) return NULL;
 
     // Convert to python arrays
     // positions
     pydim[0] = np;
-    py_x = PyArray_SimpleNewFromData(1, pydim, NPY_DOUBLE, (void *)x);
-    py_y = PyArray_SimpleNewFromData(1, pydim, NPY_DOUBLE, (void *)y);
-    // scalar (c)
-    pydim[0] = np;
-    py_c = PyArray_SimpleNewFromData(1, pydim, NPY_DOUBLE, (void *)c);
-    // triangles
-    pydim[0] = ntri;
-    pydim[1] = TRINN;
-    py_tri = PyArray_SimpleNewFromData(2, pydim, NPY_INT, (void *)tri);
+    pydim[1] = dim;
+    py_x = OwnedArray(2, pydim, NPY_DOUBLE, (void *)x);
+    // states
+    pydim[1] = sr;
+    py_u = OwnedArray(2, pydim, NPY_DOUBLE, (void *)u);
+    // scalars
+    pydim[1] = nName;
+    py_s = OwnedArray(2, pydim, NPY_DOUBLE, (void *)v);
+    // sub-elements
+    pydim[0] = nt;
+    pydim[1] = nv;
+    py_t = OwnedArray(2, pydim, NPY_INT, (void *)t);
+
+    xf_Release((void *) Names);
 
     ierr = xf_Error(DestroyScalarPlotData(&SPD));
 
@@ -931,5 +3536,18 @@ px_ScalarPlotData(PyObject *self, PyObject *args)
 
     if (ierr != xf_OK) return NULL;
 
-    return Py_BuildValue("OOOO", py_x, py_y, py_tri, py_c);
+    return Py_BuildValue("NNNN", py_x, py_t, py_u, py_s);
+}
+
+PyObject*
+px_ElemGroupSubData(PyObject *self, PyObject *args)
+{
+    PyObject *py_out = NULL;
+
+    if (px_HoldEqnSet(ArgEqnSet(args)) == xf_OK)
+        py_out = ElemGroupSubData(args);
+
+    px_DropEqnSet();
+
+    return py_out;
 }
@@ -3,12 +3,13 @@
 
 
 PyObject *
-px_MeshPlotData(PyObject *self, PyObject *args);
+px_MeshPlotData(PyObject *self, PyObject *args, PyObject *kwds);
 char doc_MeshPlotData[] =
 "Calculate mesh data for plotting\n"
 "\n"
 ":Call:\n"
-"   >>> x, y, C = px.MeshPlotData(M, xmin, xmax, order)\n"
+"   >>> x, y, C = px.MeshPlotData(M, xmin, xmax, order, buffer=0.5,\n"
+"           plane=None, bounds=None, tile=None, elems=None)\n"
 "\n"
 ":Parameters:\n"
 "   *M*: :class:`int`\n"
@@ -19,6 +20,23 @@ char doc_MeshPlotData[] =
 "       List of maximum coordinates for each dimension\n"
 "   *order*: :class:`int`\n"
 "       Plot order\n"
+"   *buffer*: :class:`float`\n"
+"       Fraction of window size by which elements may lie outside window\n"
+"   *plane*: :class:`list`\n"
+"       Slice plane ``[x0, y0, z0, nx, ny, nz]`` for 3D meshes; if not a\n"
+"       list, the plane *z* = const through the middle of the window is used\n"
+"   *bounds*: :class:`numpy.array` (*nElem*, 6)\n"
+"       Element bounds from :func:`ElemBounds` used to cull elements that the\n"
+"       plane does not cross; computed on the fly if ``None``\n"
+"   *tile*: ``[rlo, rhi]``\n"
+"       Instead of using *buffer*, keep the elements whose node bounding box\n"
+"       has its center in [*xmin*, *xmax*) and a size, relative to the\n"
+"       window, in (*rlo*, *rhi*]; windows that tile the plane then select\n"
+"       each element at most once\n"
+"   *elems*: :class:`numpy.array` (*n*, 2)\n"
+"       Element group and index of the candidate elements, such as the\n"
+"       elements binned into a tile; only the slice plane test is applied to\n"
+"       them, and *buffer* and *tile* are ignored\n"
 "\n"
 ":Returns:\n"
 "   *x*: :class:`numpy.array`\n"
@@ -27,15 +45,19 @@ char doc_MeshPlotData[] =
 "       Vector of nodal *y*-coordinates\n"
 "   *C*: :class:`numpy.array`\n"
 "       Connectivity data; segment ``f`` has endpoints\n"
-"       ``(x[C[f]],y[C[f]])``  and ``(x[C[f+1]],y[C[f+1]])``.\n";
+"       ``(x[C[f]],y[C[f]])``  and ``(x[C[f+1]],y[C[f+1]])``.\n"
+"\n"
+"For 3D meshes, *x* and *y* are coordinates in the slice plane.\n";
 
 PyObject *
-px_ScalarPlotData(PyObject *self, PyObject *args);
+px_ScalarPlotData(PyObject *self, PyObject *args, PyObject *kwds);
 char doc_ScalarPlotData[] =
 "Calculate scalar data for plotting\n"
 "\n"
 ":Call:\n"
-"   >>> x, y, T, u = px.MeshPlotData(U, M, E, Name, xmin, xmax, order)\n"
+"   >>> x, y, T, u = px.ScalarPlotData(U, M, E, Name, xmin, xmax, order,\n"
+"           buffer=0.5, plane=None, bounds=None, nThread=1, tile=None,\n"
+"           elems=None)\n"
 "\n"
 ":Parameters:\n"
 "   *U*: :class:`int`\n"
@@ -52,6 +74,22 @@ char doc_ScalarPlotData[] =
 "       List of maximum coordinates for each dimension\n"
 "   *order*: :class:`int`\n"
 "       Plot order. If ``None``, vector solution order is used.\n"
+"   *buffer*: :class:`float`\n"
+"       Fraction of window size by which elements may lie outside window\n"
+"   *plane*: :class:`list`\n"
+"       Slice plane ``[x0, y0, z0, nx, ny, nz]`` for 3D meshes; if not a\n"
+"       list, the plane *z* = const through the middle of the window is used\n"
+"   *bounds*: :class:`numpy.array` (*nElem*, 6)\n"
+"       Element bounds from :func:`ElemBounds` used to cull elements that the\n"
+"       plane does not cross; computed on the fly if ``None``\n"
+"   *nThread*: :class:`int`\n"
+"       Number of OpenMP threads for the element culling and, on 2D meshes,\n"
+"       the interpolation; xflow itself is only called from one thread;\n"
+"       ignored if the module was built without OpenMP\n"
+"   *tile*: ``[rlo, rhi]``\n"
+"       Element selection for tiles; see :func:`MeshPlotData`\n"
+"   *elems*: :class:`numpy.array` (*n*, 2)\n"
+"       Candidate elements; see :func:`MeshPlotData`\n"
 "\n"
 ":Returns:\n"
 "   *x*: :class:`numpy.array` (*np*)\n"
@@ -61,7 +99,180 @@ char doc_ScalarPlotData[] =
 "   *T*: :class:`numpy.array` (*np*, *3*)\n"
 "       Triangulation matrix; node indices for each triangle\n"
 "   *u*: :class:`numpy.array` (*np*)\n"
-"       Scalar value at each node\n";
+"       Scalar value at each node\n"
+"\n"
+"For 3D meshes, the scalar is evaluated where the slice plane cuts each\n"
+"element, and *x* and *y* are coordinates in the slice plane.\n";
+
+PyObject *
+px_ScalarPlotValues(PyObject *self, PyObject *args, PyObject *kwds);
+char doc_ScalarPlotValues[] =
+"Calculate scalar values at the nodes from :func:`ScalarPlotData`\n"
+"\n"
+":Call:\n"
+"   >>> u = px.ScalarPlotValues(U, M, E, Name, xmin, xmax, order,\n"
+"           buffer=0.5, plane=None, bounds=None, nThread=1, tile=None,\n"
+"           elems=None)\n"
+"\n"
+":Parameters:\n"
+"   Same as :func:`ScalarPlotData`\n"
+"\n"
+":Returns:\n"
+"   *u*: :class:`numpy.array` (*np*)\n"
+"       Scalar value at each node\n"
+"\n"
+"The nodes are in the same order as the output of :func:`ScalarPlotData`\n"
+"with the same window, order, and plane, so this can be used to update an\n"
+"existing plot without recalculating the triangulation.\n";
+
+PyObject *
+px_ElemBounds(PyObject *self, PyObject *args);
+char doc_ElemBounds[] =
+"Calculate the bounding box of each element\n"
+"\n"
+":Call:\n"
+"   >>> B = px.ElemBounds(M)\n"
+"\n"
+":Parameters:\n"
+"   *M*: :class:`int`\n"
+"       Pointer to *xf_Mesh* structure\n"
+"\n"
+":Returns:\n"
+"   *B*: :class:`numpy.array` (*nElem*, 2 * *dim*)\n"
+"       Minimum coordinates followed by maximum coordinates of the nodes of\n"
+"       each element, with element groups listed in order\n";
+
+PyObject *
+px_ScalarRaster(PyObject *self, PyObject *args);
+char doc_ScalarRaster[] =
+"Rasterize a scalar onto a uniform image\n"
+"\n"
+":Call:\n"
+"   >>> I = px.ScalarRaster(U, M, E, Name, xmin, xmax, nx, ny, order)\n"
+"\n"
+":Parameters:\n"
+"   *U*: :class:`int`\n"
+"       Pointer to *xf_Vector* structure\n"
+"   *M*: :class:`int`\n"
+"       Pointer to *xf_Mesh* structure\n"
+"   *E*: :class:`int`\n"
+"       Pointer to *xf_EqnSet* structure\n"
+"   *Name*: :class:`str`\n"
+"       Name of scalar to plot. If ``None``, first vector entry is used.\n"
+"   *xmin*: :class:`list`\n"
+"       List of minimum coordinates of image\n"
+"   *xmax*: :class:`list`\n"
+"       List of maximum coordinates of image\n"
+"   *nx*: :class:`int`\n"
+"       Number of pixels in the *x*-direction\n"
+"   *ny*: :class:`int`\n"
+"       Number of pixels in the *y*-direction\n"
+"   *order*: :class:`int`\n"
+"       Plot order. If ``None``, vector solution order is used.\n"
+"\n"
+":Returns:\n"
+"   *I*: :class:`numpy.array` (*ny*, *nx*)\n"
+"       Scalar value at each pixel center; row ``0`` is at *ymin*, and\n"
+"       pixels outside the mesh are ``NaN``\n";
+
+PyObject *
+px_ScalarContour(PyObject *self, PyObject *args);
+char doc_ScalarContour[] =
+"Calculate iso-contour line segments of triangulated scalar data\n"
+"\n"
+":Call:\n"
+"   >>> S = px.ScalarContour(x, y, T, u, levels)\n"
+"\n"
+":Parameters:\n"
+"   *x*: :class:`numpy.array` (*np*)\n"
+"       Vector of nodal *x*-coordinates\n"
+"   *y*: :class:`numpy.array` (*np*)\n"
+"       Vector of nodal *y*-coordinates\n"
+"   *T*: :class:`numpy.array` (*nt*, *3*)\n"
+"       Triangulation matrix; node indices for each triangle\n"
+"   *u*: :class:`numpy.array` (*np*)\n"
+"       Scalar value at each node\n"
+"   *levels*: :class:`numpy.array` (*nl*)\n"
+"       Increasing list of contour levels\n"
+"\n"
+":Returns:\n"
+"   *S*: :class:`list` (*nl*) of :class:`numpy.array` (*ns*, *2*, *2*)\n"
+"       Line segment endpoints for each level\n"
+"\n"
+":Examples:\n"
+"   The inputs are usually the outputs of :func:`ScalarPlotData`.\n"
+"\n"
+"       >>> x, y, T, u = px.ScalarPlotData(U, M, E, Name, xmin, xmax, None)\n"
+"       >>> S = px.ScalarContour(x, y, T, u, np.linspace(0, 1, 11))\n";
+
+PyObject *
+px_BFaceScalarData(PyObject *self, PyObject *args);
+char doc_BFaceScalarData[] =
+"Evaluate scalars at the subdivided nodes of a boundary face group\n"
+"\n"
+":Call:\n"
+"   >>> X, S, C = px.BFaceScalarData(U, M, E, i, Names, order)\n"
+"\n"
+":Parameters:\n"
+"   *U*: :class:`int`\n"
+"       Pointer to *xf_Vector* structure\n"
+"   *M*: :class:`int`\n"
+"       Pointer to *xf_Mesh* structure\n"
+"   *E*: :class:`int`\n"
+"       Pointer to *xf_EqnSet* structure\n"
+"   *i*: :class:`int`\n"
+"       Index of the boundary face group\n"
+"   *Names*: :class:`list` (*ns*)\n"
+"       Names of scalars; ``None`` uses the first vector entry\n"
+"   *order*: :class:`int`\n"
+"       Face subdivision order. If ``None``, ``2*QOrder+1`` of the adjacent\n"
+"       element is used; ``0`` gives the Lagrange nodes of each face.\n"
+"       *U* and *E* may be ``0`` if *Names* is empty.\n"
+"\n"
+":Returns:\n"
+"   *X*: :class:`numpy.array` (*np*, *dim*)\n"
+"       Coordinates of the face sub-nodes\n"
+"   *S*: :class:`numpy.array` (*np*, *ns*)\n"
+"       Scalar values at the face sub-nodes\n"
+"   *C*: :class:`numpy.array` (*nBFace* + 1)\n"
+"       Offsets; face ``f`` has sub-nodes ``C[f]`` to ``C[f+1]-1``\n";
+
 
+PyObject *
+px_ElemGroupSubData(PyObject *self, PyObject *args);
+char doc_ElemGroupSubData[] =
+"Subdivide the elements of a group and evaluate states and scalars\n"
+"\n"
+":Call:\n"
+"   >>> X, T, V, S = px.ElemGroupSubData(U, M, E, egrp, elem0, elem1,\n"
+"           Names, order)\n"
+"\n"
+":Parameters:\n"
+"   *U*: :class:`int`\n"
+"       Pointer to *xf_Vector* structure\n"
+"   *M*: :class:`int`\n"
+"       Pointer to *xf_Mesh* structure\n"
+"   *E*: :class:`int`\n"
+"       Pointer to *xf_EqnSet* structure\n"
+"   *egrp*: :class:`int`\n"
+"       Index of element group\n"
+"   *elem0*: :class:`int`\n"
+"       Index of first element to process\n"
+"   *elem1*: :class:`int`\n"
+"       One more than the index of the last element to process\n"
+"   *Names*: :class:`list` (:class:`str`)\n"
+"       Names of scalars to evaluate\n"
+"   *order*: :class:`int`\n"
+"       Subdivision order. If ``None``, vector solution order is used.\n"
+"\n"
+":Returns:\n"
+"   *X*: :class:`numpy.array` (*np*, *dim*)\n"
+"       Coordinates of sub-nodes\n"
+"   *T*: :class:`numpy.array` (*nt*, *dim* + 1)\n"
+"       Sub-node indices of each simplex sub-element\n"
+"   *V*: :class:`numpy.array` (*np*, *sr*)\n"
+"       State vector at each sub-node\n"
+"   *S*: :class:`numpy.array` (*np*, *nName*)\n"
+"       Value of each scalar at each sub-node\n";
 
 #endif
@@ -0,0 +1,43 @@
+#ifndef _PX_TIMER_H
+#define _PX_TIMER_H
+
+/* Opt-in counters for the internal phases of the extraction functions.  The
+   counts are accumulated in a local px_PerfData and added to the module
+   totals once per call with px_PerfCommit.  When the counters are off, the
+   macros do nothing but test px_PerfOn. */
+
+enum pxe_PerfPhase {
+    pxe_PerfCull, // window and plane tests
+    pxe_PerfSubdivide, // element subdivision and reference-to-global maps
+    pxe_PerfBasis, // basis evaluation and interpolation
+    pxe_PerfScalar, // equation set scalar evaluation
+    pxe_PerfOutput, // growing and filling the output buffers
+    pxe_PerfLast
+};
+
+typedef struct {
+    int n[pxe_PerfLast]; // number of times each phase was timed
+    double t[pxe_PerfLast]; // wall time in each phase (s)
+    double bytes[pxe_PerfLast]; // bytes allocated in each phase
+} px_PerfData;
+
+// Nonzero if the counters are on
+extern int px_PerfOn;
+
+double
+px_PerfClock(void);
+
+void
+px_PerfInit(px_PerfData *P);
+
+void
+px_PerfCommit(px_PerfData *P);
+
+// Start and stop a timer for phase k
+#define PX_TIC(t0) ((t0) = (px_PerfOn ? px_PerfClock() : 0.0))
+#define PX_TOC(P, k, t0) do { if (px_PerfOn) { \
+        (P)->t[k] += px_PerfClock() - (t0); (P)->n[k]++; } } while (0)
+// Count bytes allocated in phase k
+#define PX_BYTES(P, k, nb) do { if (px_PerfOn) (P)->bytes[k] += (nb); } while (0)
+
+#endif // _PX_TIMER_H
@@ -57,7 +57,9 @@ _pyxflow = Extension("_pyxflow",
         "px_Mesh.c",
         "px_DataSet.c",
         "px_Plot.c",
-        "px_All.c"])
+        "px_All.c",
+        "px_Perf.c",
+        "px_Map.c"])
 
 # Compile and link
 setup(